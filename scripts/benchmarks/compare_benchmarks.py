@@ -0,0 +1,121 @@
+"""
+Compares two sets of benchmark results saved by run_benchmarks.py and flags performance regressions i.e. benchmarks that got slower, used more memory or no longer reach an accuracy level. Exits with a non-zero status if any regressions are found.
+
+python compare_benchmarks.py old.json new.json --threshold 1.25
+"""
+import argparse
+import sys
+import numpy as np
+
+from measure import load_results
+
+
+parser = argparse.\
+    ArgumentParser(description="Compare two sets of benchmark results.")
+
+parser.add_argument('old', help='The baseline results.')
+parser.add_argument('new', help='The new results.')
+
+parser.add_argument('--threshold', default=1.25, type=float,
+                    help='Flag a regression if new/old is above this ratio.')
+
+parser.add_argument('--min_time', default=1e-2, type=float,
+                    help='Ignore timings where both runs are below this '
+                         'many seconds since they are dominated by noise.')
+
+args = parser.parse_args()
+
+
+# columns identifying each benchmark
+KEY_COLS = ['kind', 'name', 'loss', 'penalty', 'solver',
+            'n_samples', 'n_features', 'density', 'dtype']
+
+
+def get_key(record):
+    return tuple(record.get(col, None) for col in KEY_COLS)
+
+
+def get_metrics(record):
+    """
+    The metrics we compare; smaller is better for all of these.
+    """
+    if record.get('status', None) != 'ok':
+        return {}
+
+    if record['kind'] == 'solve':
+        names = [k for k in record.keys() if k.startswith('tta_')]
+        names.append('peak_mem_mb')
+
+    elif record['kind'] == 'path_cv':
+        names = ['tune_runtime']
+
+    else:
+        names = ['runtime']
+
+    return {name: record[name] for name in names}
+
+
+def is_time(name):
+    return name.startswith('tta_') or name.endswith('runtime')
+
+
+old_records, old_meta = load_results(args.old)
+new_records, new_meta = load_results(args.new)
+
+old_records = {get_key(r): r for r in old_records}
+new_records = {get_key(r): r for r in new_records}
+
+print('old: yaglm {} (commit {})'.format(old_meta['env']['yaglm'],
+                                          old_meta['env']['git_commit']))
+print('new: yaglm {} (commit {})'.format(new_meta['env']['yaglm'],
+                                          new_meta['env']['git_commit']))
+print()
+
+regressions = []
+improvements = []
+for key, new in new_records.items():
+    if key not in old_records:
+        continue
+
+    old_metrics = get_metrics(old_records[key])
+    new_metrics = get_metrics(new)
+
+    # a benchmark that used to work now fails
+    if len(old_metrics) > 0 and len(new_metrics) == 0:
+        regressions.append((key, 'status', new.get('status', None)))
+        continue
+
+    for name, old_val in old_metrics.items():
+        new_val = new_metrics.get(name, np.nan)
+
+        # no longer reaches this accuracy
+        if np.isfinite(old_val) and not np.isfinite(new_val):
+            regressions.append((key, name, 'now unreached'))
+            continue
+
+        if not (np.isfinite(old_val) and np.isfinite(new_val)):
+            continue
+
+        if is_time(name) and max(old_val, new_val) < args.min_time:
+            continue
+
+        ratio = new_val / max(old_val, np.finfo(float).eps)
+        if ratio > args.threshold:
+            regressions.append((key, name, '{:1.2f}x'.format(ratio)))
+        elif ratio < 1 / args.threshold:
+            improvements.append((key, name, '{:1.2f}x'.format(ratio)))
+
+
+def print_items(items):
+    for key, name, info in items:
+        desc = ' '.join(str(k) for k in key if k is not None)
+        print('  {}: {} {}'.format(desc, name, info))
+
+
+print('{} improvements'.format(len(improvements)))
+print_items(improvements)
+print()
+print('{} regressions'.format(len(regressions)))
+print_items(regressions)
+
+sys.exit(1 if len(regressions) > 0 else 0)
@@ -0,0 +1,93 @@
+"""
+Benchmarks the time it takes to import yaglm and its estimators in a fresh python process and checks that the estimators do not import heavy optional libraries (e.g. pandas or matplotlib).
+
+python import_time.py --out results/import_time.json
+"""
+from time import perf_counter
+import subprocess
+import argparse
+import sys
+import json
+
+from measure import get_env_info, save_results
+
+
+parser = argparse.\
+    ArgumentParser(description="Benchmark the yaglm import time.")
+
+parser.add_argument('--n_repeats', default=5, type=int,
+                    help='Number of times to repeat each timing; '
+                         'the fastest time is reported.')
+
+parser.add_argument('--out', default=None,
+                    help='(Optional) File where the results are saved.')
+
+args = parser.parse_args()
+
+
+# import statements to time
+STATEMENTS = {'numpy': 'import numpy',
+              'sklearn_base': 'import sklearn.base',
+              'yaglm': 'import yaglm',
+              'Glm': 'from yaglm.Glm import Glm',
+              'GlmCV': 'from yaglm import GlmCV',
+              'FISTA': 'from yaglm.solver.FISTA import FISTA'
+              }
+
+# these should never be imported by the statements above
+FORBIDDEN = {'yaglm': ['sklearn', 'scipy', 'pandas', 'matplotlib'],
+             'Glm': ['pandas', 'matplotlib', 'seaborn', 'tqdm', 'cvxpy'],
+             'FISTA': ['pandas', 'matplotlib', 'seaborn', 'tqdm', 'cvxpy']
+             }
+
+
+def get_imported(stmt, modules):
+    """
+    Returns the modules in a list that were imported by running a statement in a fresh process.
+    """
+    code = "import sys; {}; " \
+           "print(','.join(m for m in {} if m in sys.modules))".\
+           format(stmt, list(modules))
+
+    out = subprocess.check_output([sys.executable, '-c', code])
+    return [m for m in out.decode().strip().split(',') if len(m) > 0]
+
+
+def time_import(stmt, n_repeats):
+    """
+    Returns the fastest wall clock time of running a statement in a fresh process.
+    """
+    runtimes = []
+    for _ in range(n_repeats):
+        start_time = perf_counter()
+        subprocess.check_call([sys.executable, '-c', stmt])
+        runtimes.append(perf_counter() - start_time)
+
+    return min(runtimes)
+
+
+records = []
+n_bad = 0
+base_time = time_import('pass', n_repeats=args.n_repeats)
+for name, stmt in STATEMENTS.items():
+    runtime = time_import(stmt, n_repeats=args.n_repeats) - base_time
+
+    record = {'kind': 'import', 'name': name, 'runtime': runtime}
+
+    if name in FORBIDDEN:
+        bad = get_imported(stmt, FORBIDDEN[name])
+        record['forbidden_imports'] = bad
+        n_bad += len(bad)
+    else:
+        bad = []
+
+    records.append(record)
+    print('{:<40} {:1.3f}s {}'.
+          format(stmt, runtime,
+                 '' if len(bad) == 0 else 'imported: {}'.format(bad)))
+
+if args.out is not None:
+    save_results(fpath=args.out, records=records,
+                 meta={'suite': 'import', 'env': get_env_info()})
+
+sys.exit(1 if n_bad > 0 else 0)
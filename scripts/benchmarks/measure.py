@@ -0,0 +1,300 @@
+"""
+Utilities for timing solvers, measuring their accuracy against high precision reference solutions, measuring their memory use and saving/loading the results.
+"""
+from time import perf_counter
+import tracemalloc
+import platform
+import subprocess
+import json
+import os
+import numpy as np
+import scipy
+import sklearn
+
+import yaglm
+from yaglm.opt.from_config.loss import get_glm_loss_func
+from yaglm.opt.from_config.mat_and_func import get_mat_and_func
+from yaglm.opt.from_config.penalty import get_penalty_func
+
+
+def get_objective_func(X, y, loss, penalty, fit_intercept=True):
+    """
+    Gets the objective function, loss(coef, intercept) + penalty(coef), used to compare the solvers. The penalty is computed as q(mat @ coef) using the decomposition from get_mat_and_func() so it is available for every penalty any of the solvers support.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_samples, n_features)
+        The covariate data.
+
+    y: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The response data.
+
+    loss: LossConfig
+        The loss.
+
+    penalty: PenaltyConfig
+        The penalty.
+
+    fit_intercept: bool
+        Whether or not we fit an intercept.
+
+    Output
+    ------
+    objective: callable(coef, intercept) -> float
+        The objective function.
+    """
+    loss_func = get_glm_loss_func(config=loss, X=X, y=y,
+                                  fit_intercept=fit_intercept)
+
+    mat, func_config = get_mat_and_func(config=penalty,
+                                        n_features=X.shape[1])
+
+    n_responses = y.shape[1] if y.ndim == 2 else None
+    func = get_penalty_func(config=func_config,
+                            n_features=mat.shape[0],
+                            n_responses=n_responses)
+
+    def objective(coef, intercept):
+        coef = np.asarray(coef, dtype=float)
+
+        if fit_intercept:
+            intercept = np.asarray(intercept, dtype=float)
+            if coef.ndim == 2:
+                x = np.vstack([intercept.reshape(1, -1), coef])
+            else:
+                x = np.concatenate([intercept.reshape(-1), coef])
+        else:
+            x = coef
+
+        obj = loss_func.eval(x)
+        if func is not None:
+            obj += func.eval(mat @ coef)
+
+        return float(obj)
+
+    return objective
+
+
+def run_solver(solver, X, y, loss, penalty, fit_intercept=True,
+               n_repeats=1):
+    """
+    Sets up and runs a solver.
+
+    Parameters
+    ----------
+    solver: GlmSolver
+        The solver.
+
+    X, y, loss, penalty, fit_intercept:
+        See get_objective_func().
+
+    n_repeats: int
+        Number of times to run the solver. The fastest runtime is reported to reduce timing noise.
+
+    Output
+    ------
+    soln, runtime
+
+    soln: dict
+        The solution's coefficient and intercept.
+
+    runtime: float
+        The runtime, including the setup time.
+    """
+    runtimes = []
+    for _ in range(n_repeats):
+        start_time = perf_counter()
+        solver.setup(X=X, y=y, loss=loss, penalty=penalty,
+                     fit_intercept=fit_intercept)
+        soln = solver.solve()[0]
+        runtimes.append(perf_counter() - start_time)
+
+    return soln, min(runtimes)
+
+
+def get_peak_memory(solver, X, y, loss, penalty, fit_intercept=True):
+    """
+    Measures the peak memory (in MB) allocated while setting up and running a solver. This is measured in a separate run from the timings since tracemalloc slows down the code.
+
+    Parameters
+    ----------
+    solver, X, y, loss, penalty, fit_intercept:
+        See run_solver().
+
+    Output
+    ------
+    peak_mem: float
+        The peak memory in megabytes.
+    """
+    tracemalloc.start()
+    try:
+        run_solver(solver=solver, X=X, y=y, loss=loss, penalty=penalty,
+                   fit_intercept=fit_intercept)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peak / 1e6
+
+
+def get_reference(solvers, objective, X, y, loss, penalty,
+                  fit_intercept=True):
+    """
+    Computes a high precision reference objective value by running several high precision solvers and taking the best objective value.
+
+    Parameters
+    ----------
+    solvers: dict of GlmSolver
+        The high precision solvers.
+
+    objective: callable
+        The objective function from get_objective_func().
+
+    X, y, loss, penalty, fit_intercept:
+        See run_solver().
+
+    Output
+    ------
+    ref_obj, ref_solver
+
+    ref_obj: float
+        The best objective value. This is np.nan if no solver was able to solve the problem.
+
+    ref_solver: None, str
+        Name of the solver that found the best objective value.
+    """
+    ref_obj, ref_solver = np.nan, None
+    for name, solver in solvers.items():
+
+        if not solver.is_applicable(loss=loss, penalty=penalty):
+            continue
+
+        try:
+            soln = run_solver(solver=solver, X=X, y=y,
+                              loss=loss, penalty=penalty,
+                              fit_intercept=fit_intercept)[0]
+            obj = objective(soln['coef'], soln['intercept'])
+        except Exception:
+            continue
+
+        if np.isfinite(obj) and not obj >= ref_obj:
+            ref_obj, ref_solver = obj, name
+
+    return ref_obj, ref_solver
+
+
+def get_subopt(obj, ref_obj):
+    """
+    The relative suboptimality, (obj - ref_obj) / max(|ref_obj|, 1). Negative values (e.g. from rounding errors) are clipped to zero.
+    """
+    subopt = (obj - ref_obj) / max(abs(ref_obj), 1)
+    return max(subopt, 0)
+
+
+def get_time_to_accuracy(runtimes, subopts, accuracies):
+    """
+    Gets the time needed to reach each accuracy level from a trace of runs at increasingly small tolerances.
+
+    Parameters
+    ----------
+    runtimes: list of float
+        The runtimes for each run.
+
+    subopts: list of float
+        The relative suboptimality for each run.
+
+    accuracies: list of float
+        The accuracy levels.
+
+    Output
+    ------
+    tta: dict
+        The time to reach each accuracy level, keyed as 'tta_1e-06'. This is np.nan if no run reached this accuracy.
+    """
+    tta = {}
+    for acc in accuracies:
+        times = [t for (t, s) in zip(runtimes, subopts) if s <= acc]
+        tta['tta_{:.0e}'.format(acc)] = min(times) if len(times) else np.nan
+
+    return tta
+
+
+def get_env_info():
+    """
+    Information about the environment the benchmarks are run in so results from different machines/versions can be told apart.
+
+    Output
+    ------
+    info: dict
+    """
+    info = {'yaglm': yaglm.__version__,
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'sklearn': sklearn.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            }
+
+    # git commit if this is a git checkout
+    try:
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        info['git_commit'] = subprocess.\
+            check_output(['git', 'rev-parse', 'HEAD'],
+                         cwd=repo_dir, stderr=subprocess.DEVNULL).\
+            decode().strip()
+    except Exception:
+        info['git_commit'] = None
+
+    return info
+
+
+def save_results(fpath, records, meta):
+    """
+    Saves the benchmark results to a json file.
+
+    Parameters
+    ----------
+    fpath: str
+        Path to the file.
+
+    records: list of dicts
+        The benchmark results; one record per benchmark.
+
+    meta: dict
+        Information about the benchmark run e.g. the environment and suite.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(fpath)), exist_ok=True)
+
+    with open(fpath, 'w') as f:
+        json.dump({'meta': meta, 'records': records}, f,
+                  indent=1, default=_to_json)
+
+
+def load_results(fpath):
+    """
+    Loads the benchmark results saved by save_results().
+
+    Output
+    ------
+    records, meta
+    """
+    with open(fpath, 'r') as f:
+        out = json.load(f)
+
+    return out['records'], out['meta']
+
+
+def _to_json(x):
+    """
+    Converts numpy types to something json can handle.
+    """
+    if isinstance(x, np.integer):
+        return int(x)
+    elif isinstance(x, np.floating):
+        return float(x)
+    elif isinstance(x, np.ndarray):
+        return x.tolist()
+    else:
+        raise TypeError("Cannot convert {} to json".format(type(x)))
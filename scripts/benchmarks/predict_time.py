@@ -0,0 +1,128 @@
+"""
+Benchmarks the prediction time of a fitted Glm and of its compact export (see yaglm.compact) against the plain product X @ coef_ + intercept_ for dense (row and column major), CSR and CSC data with a sparse and a fully dense coefficient. Fails if prediction is much slower than the plain product e.g. because of copying the active columns of X for a dense coefficient.
+
+python predict_time.py --out results/predict_time.json
+"""
+from time import perf_counter
+from tempfile import TemporaryDirectory
+import argparse
+import os
+import sys
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.utils.extmath import safe_sparse_dot
+
+from yaglm.Glm import Glm
+from yaglm.config.penalty import Ridge
+from yaglm.compact import save_compact_glm, load_compact_glm
+
+from measure import get_env_info, save_results
+
+
+parser = argparse.\
+    ArgumentParser(description="Benchmark the yaglm prediction time.")
+
+parser.add_argument('--n_samples', default=20000, type=int,
+                    help='Number of samples to predict.')
+
+parser.add_argument('--n_features', default=2000, type=int,
+                    help='Number of features.')
+
+parser.add_argument('--density', default=0.05, type=float,
+                    help='Density of the sparse X.')
+
+parser.add_argument('--n_repeats', default=5, type=int,
+                    help='Number of times to repeat each timing; '
+                         'the fastest time is reported.')
+
+parser.add_argument('--max_slowdown', default=1.5, type=float,
+                    help='Fail if predicting takes longer than this '
+                         'multiple of the plain product.')
+
+parser.add_argument('--out', default=None,
+                    help='(Optional) File where the results are saved.')
+
+args = parser.parse_args()
+
+
+def time_func(func, n_repeats):
+    """
+    Returns the fastest wall clock time of calling a function.
+    """
+    runtimes = []
+    for _ in range(n_repeats):
+        start_time = perf_counter()
+        func()
+        runtimes.append(perf_counter() - start_time)
+
+    return min(runtimes)
+
+
+########
+# data #
+########
+rng = np.random.RandomState(0)
+X_dense = rng.normal(size=(args.n_samples, args.n_features))
+X_sparse = csr_matrix(X_dense * (rng.uniform(size=X_dense.shape) <
+                                 args.density))
+
+datasets = {'dense_C': X_dense,
+            'dense_F': np.asfortranarray(X_dense),
+            'csr': X_sparse,
+            'csc': X_sparse.tocsc()}
+
+# ridge has a fully dense coefficient; zero out most of it for
+# the sparse coefficient
+est = Glm(penalty=Ridge(pen_val=1e-2))
+est.fit(X_dense[:500], X_dense[:500, :10].sum(axis=1))
+dense_coef = est.coef_.copy()
+sparse_coef = dense_coef * (rng.uniform(size=dense_coef.shape) < 0.005)
+
+records = []
+n_bad = 0
+with TemporaryDirectory() as tmpdir:
+    fpath = os.path.join(tmpdir, 'model.yaglm')
+
+    for (data_name, X), (coef_name, coef) in \
+            [(d, c) for d in datasets.items()
+             for c in [('dense_coef', dense_coef),
+                       ('sparse_coef', sparse_coef)]]:
+
+        est.coef_ = coef
+        save_compact_glm(est, fpath)
+        compact = load_compact_glm(fpath)
+
+        base_time = time_func(lambda: safe_sparse_dot(X, est.coef_,
+                                                      dense_output=True) +
+                              est.intercept_,
+                              n_repeats=args.n_repeats)
+
+        funcs = {'glm': lambda: est.decision_function(X, check_input=False),
+                 'compact': lambda: compact.decision_function(X)}
+
+        for model_name, func in funcs.items():
+            runtime = time_func(func, n_repeats=args.n_repeats)
+
+            # only a dense coefficient has to match the plain product;
+            # the active set should make a sparse coefficient faster
+            bad = coef_name == 'dense_coef' and \
+                runtime > args.max_slowdown * base_time
+            n_bad += bad
+
+            records.append({'kind': 'predict',
+                            'name': '{}_{}_{}'.format(model_name, data_name,
+                                                      coef_name),
+                            'n_samples': args.n_samples,
+                            'n_features': args.n_features,
+                            'runtime': runtime,
+                            'base_runtime': base_time})
+
+            print('{:<8} {:<8} {:<12} {:1.4f}s (X @ coef_: {:1.4f}s) {}'.
+                  format(model_name, data_name, coef_name, runtime, base_time,
+                         'SLOWER THAN X @ coef_' if bad else ''))
+
+if args.out is not None:
+    save_results(fpath=args.out, records=records,
+                 meta={'suite': 'predict', 'env': get_env_info()})
+
+sys.exit(1 if n_bad > 0 else 0)
@@ -0,0 +1,203 @@
+"""
+The loss, penalty, solver and data grids used by the benchmark suite.
+"""
+import numpy as np
+from sklearn.preprocessing import LabelBinarizer
+
+from yaglm.config.loss import LinReg, LogReg, Poisson, Huber, Quantile, \
+    Multinomial
+from yaglm.config.penalty import NoPenalty, Ridge, Lasso, ElasticNet, \
+    GroupLasso, MultiTaskLasso, NuclearNorm, FusedLasso, GeneralizedLasso
+from yaglm.toy_data import sample_sparse_lin_reg, sample_sparse_log_reg, \
+    sample_sparse_poisson_reg, sample_sparse_multinomial
+from yaglm.trend_filtering import get_tf1
+
+from yaglm.solver.FISTA import FISTA
+from yaglm.solver.ZhuADMM import ZhuADMM
+from yaglm.solver.ExactADMM import ExactADMM
+from yaglm.solver.ProxNewton import ProxNewton
+from yaglm.solver.Cvxpy import Cvxpy
+
+
+# each suite is a grid of data settings; every combination is run
+SUITES = {'quick': {'shape': [(200, 20), (1000, 100)],
+                    'density': [None],
+                    'dtype': ['float64']
+                    },
+
+          'sparse': {'shape': [(500, 50)],
+                     'density': [0.1],
+                     'dtype': ['float64', 'float32']
+                     },
+
+          'full': {'shape': [(200, 20), (1000, 100), (10000, 200),
+                             (500, 2000)],
+                   'density': [None, 0.05],
+                   'dtype': ['float64', 'float32']
+                   }
+          }
+
+# the relative suboptimality levels for the time-to-accuracy measurements
+ACCURACIES = [1e-2, 1e-4, 1e-6]
+
+# solvers are run at each of these tolerances to trace out the
+# time vs. accuracy curve
+TOLS = [1e-2, 1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8]
+
+
+def get_losses():
+    """
+    Output
+    ------
+    losses: dict of LossConfig
+    """
+    return {'lin_reg': LinReg(),
+            'log_reg': LogReg(),
+            'poisson': Poisson(),
+            'huber': Huber(),
+            'quantile': Quantile(),
+            'multinomial': Multinomial()
+            }
+
+
+def get_penalties(n_features, multi_response=False):
+    """
+    Parameters
+    ----------
+    n_features: int
+        Number of features.
+
+    multi_response: bool
+        Whether or not the response has multiple columns.
+
+    Output
+    ------
+    penalties: dict of PenaltyConfig
+    """
+    groups = [list(range(n_features // 2)),
+              list(range(n_features // 2, n_features))]
+
+    penalties = {'no_penalty': NoPenalty(),
+                 'ridge': Ridge(pen_val=0.1),
+                 'lasso': Lasso(pen_val=0.05),
+                 'enet': ElasticNet(pen_val=0.05, mix_val=0.5),
+                 'group_lasso': GroupLasso(pen_val=0.05, groups=groups),
+                 'fused_lasso': FusedLasso(pen_val=0.05, edgelist='chain'),
+                 'gen_lasso': GeneralizedLasso(pen_val=0.05,
+                                               mat=get_tf1(n_features))
+                 }
+
+    if multi_response:
+        penalties = {'no_penalty': NoPenalty(),
+                     'ridge': Ridge(pen_val=0.1),
+                     'lasso': Lasso(pen_val=0.05),
+                     'multi_task_lasso': MultiTaskLasso(pen_val=0.05),
+                     'nuclear_norm': NuclearNorm(pen_val=0.05)
+                     }
+
+    return penalties
+
+
+def get_solvers(tol):
+    """
+    The solvers configured to stop at a given tolerance.
+
+    Parameters
+    ----------
+    tol: float
+        The tolerance.
+
+    Output
+    ------
+    solvers: dict of GlmSolver
+    """
+    return {'fista': FISTA(tol=tol, max_iter=int(1e4)),
+            'zhu_admm': ZhuADMM(atol=tol, rtol=tol, max_iter=int(1e4)),
+            'exact_admm': ExactADMM(atol=tol, rtol=tol, max_iter=int(1e4)),
+            'prox_newton': ProxNewton(tol=tol),
+            'cvxpy': Cvxpy()  # cvxpy's own defaults
+            }
+
+
+def get_reference_solvers():
+    """
+    High precision solvers used to compute the reference solutions. These are tried in order.
+
+    Output
+    ------
+    solvers: dict of GlmSolver
+    """
+    return {'fista': FISTA(tol=1e-12, stop_crit='x_L2', rel_crit=True,
+                           max_iter=int(1e5)),
+            'exact_admm': ExactADMM(atol=1e-12, rtol=1e-12,
+                                    max_iter=int(1e5)),
+            'zhu_admm': ZhuADMM(atol=1e-12, rtol=1e-12, max_iter=int(1e5)),
+            'cvxpy': Cvxpy(zero_tol=0)
+            }
+
+
+def sample_data(loss, n_samples, n_features, density=None, dtype='float64',
+                random_state=0):
+    """
+    Samples a toy dataset for a given loss.
+
+    Parameters
+    ----------
+    loss: str
+        Name of the loss.
+
+    n_samples: int
+        Number of samples.
+
+    n_features: int
+        Number of features.
+
+    density: None, float
+        (Optional) If provided, X is a sparse matrix with this fraction of non-zero entries.
+
+    dtype: str
+        The dtype of X.
+
+    random_state: int
+        The seed.
+
+    Output
+    ------
+    X, y
+
+    X: array-like, shape (n_samples, n_features)
+        The covariate data.
+
+    y: array-like, shape (n_samples, ) or (n_samples, n_classes)
+        The response. For the multinomial loss this is the one-hot encoded response.
+    """
+    kws = {'n_samples': n_samples,
+           'n_features': n_features,
+           'n_nonzero': min(10, n_features),
+           'random_state': random_state}
+
+    # sparse designs must have identity covariance
+    if density is not None:
+        kws['X_density'] = density
+        kws['cov'] = 'ident'
+
+    if loss in ['lin_reg', 'huber', 'quantile']:
+        X, y = sample_sparse_lin_reg(**kws)[0:2]
+
+    elif loss == 'log_reg':
+        X, y = sample_sparse_log_reg(**kws)[0:2]
+
+    elif loss == 'poisson':
+        X, y = sample_sparse_poisson_reg(**kws)[0:2]
+
+    elif loss == 'multinomial':
+        X, y = sample_sparse_multinomial(**kws)[0:2]
+        y = LabelBinarizer().fit_transform(y).astype(float)
+
+    else:
+        raise ValueError("No sampler for loss={}".format(loss))
+
+    X = X.astype(dtype)
+    y = np.asarray(y)
+
+    return X, y
@@ -0,0 +1,233 @@
+"""
+Benchmarks the solvers over a grid of losses, penalties and data settings (n_samples, n_features, X density, X dtype). For each problem we measure
+
+- the time each solver needs to reach a given relative suboptimality, measured against a high precision reference solution,
+- the peak memory used by each solver,
+- the throughput (fits per second) of the path algorithm used for cross-validation.
+
+The results are saved to a json file that can be compared to a previous run with compare_benchmarks.py to catch performance regressions e.g.
+
+python run_benchmarks.py --suite quick --out results/new.json
+python compare_benchmarks.py results/old.json results/new.json
+"""
+from time import perf_counter
+from itertools import product
+import argparse
+import numpy as np
+
+from yaglm.GlmTuned import GlmCV
+from yaglm.config.penalty import Lasso
+from yaglm.solver.FISTA import FISTA
+from yaglm.solver.ZhuADMM import ZhuADMM
+from yaglm.solver.ExactADMM import ExactADMM
+
+from problems import SUITES, ACCURACIES, TOLS, get_losses, get_penalties, \
+    get_solvers, get_reference_solvers, sample_data
+from measure import get_objective_func, run_solver, get_peak_memory, \
+    get_reference, get_subopt, get_time_to_accuracy, get_env_info, \
+    save_results
+
+
+parser = argparse.\
+    ArgumentParser(description="Benchmark the solvers for various "
+                               "loss + penalty combinations.")
+
+parser.add_argument('--suite', default='quick', choices=list(SUITES.keys()),
+                    help='Which grid of data settings to run.')
+
+parser.add_argument('--out', default='benchmark_results.json',
+                    help='File where the results are saved.')
+
+parser.add_argument('--losses', default=None, nargs='+',
+                    help='(Optional) Only run these losses.')
+
+parser.add_argument('--penalties', default=None, nargs='+',
+                    help='(Optional) Only run these penalties.')
+
+parser.add_argument('--solvers', default=None, nargs='+',
+                    help='(Optional) Only run these solvers.')
+
+parser.add_argument('--n_repeats', default=3, type=int,
+                    help='Number of times to repeat each timing; '
+                         'the fastest time is reported.')
+
+parser.add_argument('--n_pen_vals', default=20, type=int,
+                    help='Number of penalty values for the path benchmarks.')
+
+parser.add_argument('--cv', default=3, type=int,
+                    help='Number of folds for the path benchmarks.')
+
+parser.add_argument('--no_path', action='store_true', default=False,
+                    help='Skip the path/cross-validation benchmarks.')
+
+args = parser.parse_args()
+
+
+def keep(name, include):
+    return include is None or name in include
+
+
+def bench_solvers(X, y, loss, penalty, data_info):
+    """
+    Runs the time-to-accuracy and memory benchmarks for each solver on one problem.
+    """
+    records = []
+
+    objective = get_objective_func(X=X, y=y, loss=loss, penalty=penalty)
+    ref_obj, ref_solver = get_reference(solvers=get_reference_solvers(),
+                                        objective=objective,
+                                        X=X, y=y, loss=loss, penalty=penalty)
+
+    for solver_name, solver in get_solvers(tol=1).items():
+        if not keep(solver_name, args.solvers) or \
+                not solver.is_applicable(loss=loss, penalty=penalty):
+            continue
+
+        record = {'kind': 'solve', 'solver': solver_name, **data_info,
+                  'ref_obj': ref_obj, 'ref_solver': ref_solver}
+
+        # trace out the time vs. accuracy curve
+        runtimes, subopts = [], []
+        try:
+            for tol in TOLS:
+                solver = get_solvers(tol=tol)[solver_name]
+                soln, runtime = run_solver(solver=solver, X=X, y=y,
+                                           loss=loss, penalty=penalty,
+                                           n_repeats=args.n_repeats)
+
+                obj = objective(soln['coef'], soln['intercept'])
+                runtimes.append(runtime)
+                subopts.append(get_subopt(obj, ref_obj))
+
+            mem_solver = get_solvers(tol=np.median(TOLS))[solver_name]
+            peak_mem = get_peak_memory(solver=mem_solver, X=X, y=y,
+                                       loss=loss, penalty=penalty)
+
+        except Exception as e:
+            record['status'] = 'failed: {}'.format(repr(e))
+            records.append(record)
+            print('{} failed on {}'.format(solver_name, data_info),
+                  flush=True)
+            continue
+
+        record['status'] = 'ok'
+        record['tols'] = TOLS
+        record['runtimes'] = runtimes
+        record['subopts'] = subopts
+        record['peak_mem_mb'] = peak_mem
+        record.update(get_time_to_accuracy(runtimes=runtimes,
+                                           subopts=subopts,
+                                           accuracies=ACCURACIES))
+        records.append(record)
+
+        print('{loss} {penalty} {solver} {n_samples}x{n_features} '
+              '(density={density}, {dtype}): '
+              'min subopt={subopt:1.2e}, '
+              'total time={runtime:1.3f}s, '
+              'peak mem={mem:1.2f}MB'.
+              format(**data_info, solver=solver_name,
+                     subopt=min(subopts), runtime=sum(runtimes),
+                     mem=peak_mem), flush=True)
+
+    return records
+
+
+def bench_path(X, y, loss, data_info):
+    """
+    Benchmarks the throughput of the Lasso path algorithm used for cross-validation.
+    """
+    records = []
+
+    path_solvers = {'fista': FISTA(), 'zhu_admm': ZhuADMM(),
+                    'exact_admm': ExactADMM()}
+
+    penalty = Lasso().tune(n_pen_vals=args.n_pen_vals)
+
+    for solver_name, solver in path_solvers.items():
+        if not keep(solver_name, args.solvers) or \
+                not solver.is_applicable(loss=loss, penalty=Lasso()):
+            continue
+
+        record = {'kind': 'path_cv', 'solver': solver_name, **data_info,
+                  'penalty': 'lasso',
+                  'n_pen_vals': args.n_pen_vals, 'cv': args.cv}
+
+        est = GlmCV(loss=loss, penalty=penalty, solver=solver, cv=args.cv)
+
+        try:
+            runtimes, tune_runtimes = [], []
+            for _ in range(args.n_repeats):
+                start_time = perf_counter()
+                est.fit(X, y)
+                runtimes.append(perf_counter() - start_time)
+                tune_runtimes.append(est.tune_info_['runtime']['tune'])
+
+        except Exception as e:
+            record['status'] = 'failed: {}'.format(repr(e))
+            records.append(record)
+            continue
+
+        runtime = min(runtimes)
+        tune_runtime = min(tune_runtimes)
+        n_fits = args.n_pen_vals * args.cv
+
+        record['status'] = 'ok'
+        record['runtime'] = runtime
+        record['tune_runtime'] = tune_runtime
+        record['fits_per_sec'] = n_fits / tune_runtime
+        records.append(record)
+
+        print('{loss} path {solver} {n_samples}x{n_features}: '
+              '{fps:1.1f} fits/sec'.
+              format(**data_info, solver=solver_name,
+                     fps=record['fits_per_sec']), flush=True)
+
+    return records
+
+
+#################
+# run the suite #
+#################
+suite = SUITES[args.suite]
+records = []
+start_time = perf_counter()
+
+for (n_samples, n_features), density, dtype in \
+        product(suite['shape'], suite['density'], suite['dtype']):
+
+    for loss_name, loss in get_losses().items():
+        if not keep(loss_name, args.losses):
+            continue
+
+        X, y = sample_data(loss=loss_name,
+                           n_samples=n_samples, n_features=n_features,
+                           density=density, dtype=dtype)
+
+        penalties = get_penalties(n_features=n_features,
+                                  multi_response=y.ndim == 2)
+
+        data_info = {'loss': loss_name,
+                     'n_samples': n_samples, 'n_features': n_features,
+                     'density': density, 'dtype': dtype}
+
+        for pen_name, penalty in penalties.items():
+            if not keep(pen_name, args.penalties):
+                continue
+
+            records.extend(bench_solvers(X=X, y=y,
+                                         loss=loss, penalty=penalty,
+                                         data_info={**data_info,
+                                                    'penalty': pen_name}))
+
+        if not args.no_path and y.ndim == 1:
+            records.extend(bench_path(X=X, y=y, loss=loss,
+                                      data_info=data_info))
+
+meta = {'suite': args.suite,
+        'grid': suite,
+        'accuracies': ACCURACIES,
+        'total_runtime': perf_counter() - start_time,
+        'env': get_env_info()}
+
+save_results(fpath=args.out, records=records, meta=meta)
+print('Saved {} results to {}'.format(len(records), args.out))
@@ -14,9 +14,15 @@ if version is None:
 install_requires = ['numpy',
                     'pandas',
                     'scikit-learn',
-                    'scipy'
+                    'scipy',
+                    'tqdm'
                     ]
 
+# optional dependencies that are only imported when they are used
+extras_require = {'viz': ['matplotlib', 'seaborn'],
+                  'cvxpy': ['cvxpy']
+                  }
+
 
 setup(name='yaglm',
       version=version,
@@ -26,6 +32,7 @@ setup(name='yaglm',
       license='MIT',
       packages=find_packages(),
       install_requires=install_requires,
+      extras_require=extras_require,
       test_suite='nose.collector',
       tests_require=['nose'],
       zip_safe=False)
@@ -1,10 +1,18 @@
 from copy import deepcopy
+import numpy as np
 
 from yaglm.base import BaseGlm
 from yaglm.LossMixin import LossMixin
-from yaglm.GlmTuned import GlmCV
 from yaglm.config.penalty_utils import get_unflavored, get_flavor_kind
 from yaglm.adaptive import set_adaptive_weights
+from yaglm.config.loss import get_loss_config
+from yaglm.config.penalty import get_penalty_config
+from yaglm.config.constraint import get_constraint_config
+from yaglm.config.base_params import get_base_config
+from yaglm.processing import get_X_sums, update_X_sums, \
+    get_center_scale_from_sums
+from yaglm.opt.glm_loss.gram import get_gram_sums, update_gram_sums
+from yaglm.solver.GramFISTA import GramFISTA
 
 
 class Glm(LossMixin, BaseGlm):
@@ -39,6 +47,10 @@ class Glm(LossMixin, BaseGlm):
 
         # TODO: make sure none of the configs are tuners
 
+        # fit() starts over so discard any partial_fit() statistics
+        self.__dict__.pop('gram_sums_', None)
+        self.__dict__.pop('X_sums_', None)
+
         ##############################################
         # setup, preprocess, and prefitting routines #
         ##############################################
@@ -66,8 +78,187 @@ class Glm(LossMixin, BaseGlm):
                                pre_pro_out=pre_pro_out,
                                init_data=init_data)
 
+        # GramFISTA works with the Gram matrix anyway so we keep the
+        # statistics needed to update this fit with partial_fit()
+        if isinstance(solver, GramFISTA) and self._is_partial_fittable():
+            self._init_partial_fit_sums(**raw_data)
+
         return self
 
+    def partial_fit(self, X, y, sample_weight=None, offsets=None, decay=1):
+        """
+        Incrementally fits a penalized linear regression model as new rows of data arrive. We accumulate the (weighted) summary statistics of X and y needed for the least squares loss and the standardization i.e. the column sums, X.T @ X and X.T @ y. Each call then solves the problem for all the data seen so far with GramFISTA, which only needs these statistics, warm started from the current coefficient. The cost of each call only depends on the number of new rows (and n_features^2).
+
+        The statistics are accumulated over the partial_fit() calls. fit() restarts them from its training data if the solver is GramFISTA and discards them otherwise, in which case partial_fit() raises an error for an already fit estimator instead of silently dropping the previous data. Only the linear regression loss with an unflavored penalty supported by GramFISTA is available and no statistical inference is run.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            The new covariate data.
+
+        y: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The new response data.
+
+        sample_weight: None or array-like, shape (n_samples,)
+            (Optional) Individual weights for each new sample.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) The offsets for each new sample.
+
+        decay: float
+            Exponential forgetting; the weights of all the previous samples are multiplied by this factor before adding the new samples. Must be in (0, 1]. If decay=1, all samples are weighted equally. Note the number of samples in the 1 / n_samples normalization of the loss is also decayed i.e. n_samples is the effective sample size sum_k decay^(age of sample k). The fit therefore equals a batch fit with sample weights proportional to decay^age rescaled to sum to the number of rows. Decaying shrinks the effective sample size and so increases the relative strength of the penalty compared to the batch fit with unscaled weights decay^age.
+
+        Output
+        ------
+        self
+            Fitted estimator.
+        """
+
+        configs, solver = self._get_partial_fit_setup()
+
+        X, y, sample_weight, offsets = \
+            self._validate_data(X=X, y=y,
+                                sample_weight=sample_weight,
+                                offsets=offsets)
+
+        #################################
+        # update the summary statistics #
+        #################################
+        if not hasattr(self, 'gram_sums_'):
+            if hasattr(self, 'coef_'):
+                raise ValueError("This estimator was fit without keeping the "
+                                 "statistics of its training data so it "
+                                 "cannot be updated with partial_fit. Call "
+                                 "partial_fit on the initial data instead of "
+                                 "fit or use solver=GramFISTA()")
+
+            self._init_partial_fit_sums(X=X, y=y,
+                                        sample_weight=sample_weight,
+                                        offsets=offsets)
+
+        else:
+            if X.shape[1] != len(self.gram_sums_['shift']):
+                raise ValueError("X has {} features, but partial_fit was "
+                                 "started with {} features".
+                                 format(X.shape[1],
+                                        len(self.gram_sums_['shift'])))
+
+            y = np.asarray(y, dtype=float)
+            if offsets is not None:
+                y = y - offsets
+
+            self.gram_sums_ = update_gram_sums(self.gram_sums_,
+                                               X_rows=X, y_rows=y,
+                                               sample_weight=sample_weight,
+                                               decay=decay)
+
+            if self.standardize:
+                self.X_sums_ = update_X_sums(self.X_sums_, X_rows=X,
+                                             sample_weight=sample_weight,
+                                             decay=decay)
+
+        # the standardization is a column scaling; the centering is
+        # handled by the centered Gram matrix
+        pre_pro_out = {}
+        if self.standardize:
+            _, X_scale = get_center_scale_from_sums(self.X_sums_)
+            X_scale[X_scale <= np.finfo(float).eps] = 1
+            pre_pro_out['X_scale'] = X_scale
+
+        ########################################
+        # solve warm started from the last fit #
+        ########################################
+        solver.setup_from_gram_sums(self.gram_sums_,
+                                    X_scale=pre_pro_out.get('X_scale', None),
+                                    **configs)
+
+        coef_init = None
+        if hasattr(self, 'coef_') and \
+                np.shape(self.coef_) == solver.loss_func_.Xty.shape:
+            coef_init = self.coef_
+            if self.standardize:
+                coef_init = (X_scale * coef_init.T).T
+
+        fit_out, _, opt_info = solver.solve(coef_init=coef_init)
+
+        self._set_fit(fit_out=fit_out,
+                      pre_pro_out=pre_pro_out,
+                      configs=configs,
+                      opt_info=opt_info)
+
+        return self
+
+    def _get_partial_fit_setup(self):
+        """
+        Checks partial_fit() is available for this estimator.
+
+        Output
+        ------
+        configs, solver
+
+        configs: dict
+            The loss, penalty and constraint configs.
+
+        solver: GramFISTA
+            The solver.
+        """
+        configs = {'loss': get_loss_config(self.loss),
+                   'penalty': get_penalty_config(self.penalty),
+                   'constraint': get_constraint_config(self.constraint)}
+
+        if get_base_config(configs['loss']).name != 'lin_reg':
+            raise NotImplementedError("partial_fit is only available for "
+                                      "the linear regression loss")
+
+        if get_flavor_kind(configs['penalty']) is not None:
+            raise NotImplementedError("partial_fit is not available for "
+                                      "flavored penalties")
+
+        if self.inferencer is not None:
+            raise NotImplementedError("partial_fit does not run "
+                                      "statistical inference")
+
+        if isinstance(self.solver, GramFISTA):
+            solver = self.solver
+        elif self.solver in ['default', 'gram_fista']:
+            solver = GramFISTA()
+        else:
+            raise ValueError("partial_fit requires the GramFISTA solver")
+
+        if not solver.is_applicable(**configs):
+            raise ValueError("GramFISTA is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(configs['loss'], configs['penalty'],
+                                    configs['constraint']))
+
+        return configs, solver
+
+    def _is_partial_fittable(self):
+        """
+        Whether or not partial_fit() is available for this estimator.
+        """
+        try:
+            self._get_partial_fit_setup()
+            return True
+        except (ValueError, NotImplementedError):
+            return False
+
+    def _init_partial_fit_sums(self, X, y, sample_weight=None, offsets=None):
+        """
+        Computes the summary statistics of the (validated) data used by partial_fit().
+        """
+        y = np.asarray(y, dtype=float)
+        if offsets is not None:
+            y = y - offsets
+
+        self.gram_sums_ = get_gram_sums(X, y=y,
+                                        fit_intercept=self.fit_intercept,
+                                        sample_weight=sample_weight)
+
+        if self.standardize:
+            self.X_sums_ = get_X_sums(X, fit_intercept=self.fit_intercept,
+                                      sample_weight=sample_weight)
+
     def get_unflavored_tunable(self):
         """
         Gets a cross-validation version of this estimator. Ensures the penalty is not flavored.
@@ -83,4 +274,5 @@ class Glm(LossMixin, BaseGlm):
         # unflavor penalty
         params['penalty'] = get_unflavored(params['penalty'])
 
+        from yaglm.GlmTuned import GlmCV  # avoid importing the tuning code
         return GlmCV(**params)
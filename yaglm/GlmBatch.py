@@ -0,0 +1,383 @@
+import numpy as np
+from copy import deepcopy
+from sklearn.base import BaseEstimator
+
+from yaglm.autoassign import autoassign
+from yaglm.config.loss import get_loss_config
+from yaglm.config.penalty import get_penalty_config, NoPenalty
+from yaglm.config.base_params import get_base_config
+from yaglm.config.penalty_utils import get_flavor_kind
+from yaglm.solver.BatchFISTA import BatchFISTA
+
+from yaglm.opt.algo.batch_fista import solve_batch_fista
+from yaglm.opt.from_config.loss import get_glm_loss_func
+from yaglm.opt.from_config.penalty import get_penalty_func
+from yaglm.opt.penalty.utils import get_entrywise_pen_vals
+from yaglm.opt.penalty.batch import BatchEntrywise
+from yaglm.opt.glm_loss.batch import BatchGlm
+
+
+class GlmBatch(BaseEstimator):
+    """
+    Fits many independent penalized GLMs that share the same loss, penalty and number of features e.g. one model per data segment. The problems are stacked and solved together with a single vectorized FISTA loop, which avoids the per-model Python overhead of fitting each problem with yaglm.Glm.
+
+    Currently supports single response losses with smooth sample losses (e.g. linear, logistic, poisson, huber regression) and the lasso, ridge and elastic net penalties.
+
+    Parameters
+    ----------
+    loss: str, LossConfig
+        The loss function.
+
+    penalty: None, PenaltyConfig
+        The penalty config object; must be None, Lasso, Ridge or ElasticNet.
+
+    standardize: bool
+        Whether or not to perform internal standardization of each problem before fitting the data. Note the fitted coefficients/intercepts are transformed to be on the original scale of the input data.
+
+    fit_intercept: bool
+        Whether or not to fit intercepts, which are not penalized.
+
+    solver: None, BatchFISTA
+        The solver config. If None, will use BatchFISTA().
+
+    Attributes
+    ----------
+    coef_: array-like, shape (n_problems, n_features)
+        The fitted coefficient for each problem.
+
+    intercept_: array-like, shape (n_problems, )
+        The fitted intercept for each problem.
+
+    opt_info_: dict
+        Data output by the optimization algorithm.
+    """
+    @autoassign
+    def __init__(self, loss='lin_reg', penalty=None,
+                 standardize=True, fit_intercept=True,
+                 solver=None): pass
+
+    def fit(self, X, y, sample_weight=None, pen_vals=None):
+        """
+        Fits each of the penalized GLMs.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_problems, n_samples, n_features) or list of array-like
+            The training covariate data for each problem. If a list is provided each problem may have a different number of samples.
+
+        y: array-like, shape (n_problems, n_samples) or list of array-like
+            The training response data for each problem. For logistic regression these should be 0/1 labels.
+
+        sample_weight: None, array-like, shape (n_problems, n_samples) or list of array-like
+            (Optional) Individual weights for each sample.
+
+        pen_vals: None, array-like, shape (n_problems, )
+            (Optional) The penalty value for each problem. If provided this overrides penalty.pen_val.
+
+        Output
+        ------
+        self
+            Fitted estimator.
+        """
+        ##########################
+        # setup data and configs #
+        ##########################
+        X, y, sample_weight, n_samples = \
+            stack_problems(X=X, y=y, sample_weight=sample_weight)
+        n_problems, _, n_features = X.shape
+
+        loss_config = get_base_config(get_loss_config(self.loss))
+        penalty_config = get_base_config(get_penalty_config(self.penalty))
+
+        if get_flavor_kind(penalty_config) is not None:
+            raise NotImplementedError("GlmBatch does not currently support "
+                                      "flavored penalties")
+
+        solver = self.solver if self.solver is not None else BatchFISTA()
+
+        ##############
+        # preprocess #
+        ##############
+        if self.standardize:
+            X, X_offset, X_scale = \
+                batch_center_scale(X=X, sample_weight=sample_weight,
+                                   n_samples=n_samples,
+                                   fit_intercept=self.fit_intercept)
+
+        #####################
+        # setup loss/penalty #
+        #####################
+
+        # get the GLM input loss e.g. LeastSquares
+        template = get_glm_loss_func(config=loss_config,
+                                     X=np.zeros((1, n_features)),
+                                     y=np.zeros(1))
+
+        loss_func = BatchGlm(X=X, y=y,
+                             loss_class=type(template.glm_loss),
+                             fit_intercept=self.fit_intercept,
+                             sample_weight=sample_weight,
+                             n_samples=n_samples,
+                             **template.loss_kws)
+
+        if not loss_func.is_smooth:
+            raise NotImplementedError("GlmBatch requires a smooth loss; "
+                                      "got {}".format(loss_config))
+
+        pen_func = get_batch_penalty_func(config=penalty_config,
+                                          n_problems=n_problems,
+                                          n_features=n_features,
+                                          fit_intercept=self.fit_intercept,
+                                          pen_vals=pen_vals)
+
+        #########
+        # solve #
+        #########
+        if self.fit_intercept:
+            init_val = np.zeros((n_problems, n_features + 1))
+        else:
+            init_val = np.zeros((n_problems, n_features))
+
+        if loss_func.grad_lip is not None:
+            step = 'lip'
+            backtracking = False
+        else:
+            step = 1
+            backtracking = True
+
+        soln, opt_info = solve_batch_fista(smooth_func=loss_func,
+                                           init_val=init_val,
+                                           non_smooth_func=pen_func,
+                                           step=step,
+                                           backtracking=backtracking,
+                                           **solver.get_solve_kws())
+
+        ##################
+        # format the fit #
+        ##################
+        if self.fit_intercept:
+            coef = soln[:, 1:]
+            intercept = soln[:, 0]
+        else:
+            coef = soln
+            intercept = np.zeros(n_problems)
+
+        if self.standardize:
+            coef = coef / X_scale
+            if self.fit_intercept:
+                intercept = intercept - (coef * X_offset).sum(axis=1)
+
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.opt_info_ = opt_info
+
+        return self
+
+    def decision_function(self, X):
+        """
+        The GLM decision function i.e. z = X_k @ coef_k + intercept_k for each problem.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_problems, n_samples, n_features) or list of array-like
+            The covariate data for each problem.
+
+        Output
+        ------
+        z: array-like, shape (n_problems, n_samples) or list of array-like
+            The decision function values for each problem.
+        """
+        if isinstance(X, (list, tuple)):
+            return [np.asarray(X[k]) @ self.coef_[k] + self.intercept_[k]
+                    for k in range(len(X))]
+
+        else:
+            X = np.asarray(X)
+            z = np.matmul(X, self.coef_[:, :, np.newaxis])[:, :, 0]
+            return z + self.intercept_[:, np.newaxis]
+
+
+def stack_problems(X, y, sample_weight=None):
+    """
+    Stacks the data from multiple problems into arrays with a leading batch axis. Problems with fewer samples are padded with zero weight samples.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_problems, n_samples, n_features) or list of array-like
+        The covariate data for each problem.
+
+    y: array-like, shape (n_problems, n_samples) or list of array-like
+        The response data for each problem.
+
+    sample_weight: None, array-like, shape (n_problems, n_samples) or list of array-like
+        (Optional) Individual weights for each sample.
+
+    Output
+    ------
+    X, y, sample_weight, n_samples
+
+    X: array-like, shape (n_problems, n_samples_max, n_features)
+        The stacked covariate data.
+
+    y: array-like, shape (n_problems, n_samples_max)
+        The stacked responses.
+
+    sample_weight: None, array-like, shape (n_problems, n_samples_max)
+        The stacked sample weights. Padded samples have zero weight. This is None if no weights were provided and no padding was needed.
+
+    n_samples: array-like, shape (n_problems, )
+        The number of samples for each problem.
+    """
+    if not isinstance(X, (list, tuple)):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        assert X.ndim == 3, "X should have shape " \
+            "(n_problems, n_samples, n_features)"
+
+        if y.ndim != 2:
+            raise NotImplementedError("GlmBatch currently only supports "
+                                      "single response losses.")
+
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=float)
+
+        n_samples = X.shape[1] * np.ones(X.shape[0])
+        return X, y, sample_weight, n_samples
+
+    n_problems = len(X)
+    n_samples = np.array([len(X[k]) for k in range(n_problems)])
+    n_max = n_samples.max()
+    n_features = np.asarray(X[0]).shape[1]
+
+    X_stack = np.zeros((n_problems, n_max, n_features))
+    y_stack = np.zeros((n_problems, n_max))
+    weights = np.zeros((n_problems, n_max))
+    for k in range(n_problems):
+        n = n_samples[k]
+        X_stack[k, :n, :] = X[k]
+        y_stack[k, :n] = np.asarray(y[k]).reshape(-1)
+
+        if sample_weight is None:
+            weights[k, :n] = 1
+        else:
+            weights[k, :n] = sample_weight[k]
+
+    # only use the weights if we have to
+    if sample_weight is None and np.all(n_samples == n_max):
+        weights = None
+
+    return X_stack, y_stack, weights, n_samples.astype(float)
+
+
+def batch_center_scale(X, sample_weight=None, n_samples=None,
+                       fit_intercept=True):
+    """
+    Standardizes the columns of each problem's data matrix. This matches yaglm.processing.process_X for each problem i.e. if fit_intercept=True the columns are centered by their (weighted) mean and scaled by their (weighted) standard deviation. Otherwise the columns are scaled so their norm is sqrt(n_samples).
+
+    Parameters
+    ----------
+    X: array-like, shape (n_problems, n_samples, n_features)
+        The stacked covariate data.
+
+    sample_weight: None, array-like, shape (n_problems, n_samples)
+        (Optional) The stacked sample weights.
+
+    n_samples: None, array-like, shape (n_problems, )
+        The number of samples for each problem.
+
+    fit_intercept: bool
+        Whether or not we fit an intercept.
+
+    Output
+    ------
+    X, X_offset, X_scale
+
+    X: array-like, shape (n_problems, n_samples, n_features)
+        The standardized data.
+
+    X_offset: None, array-like, shape (n_problems, n_features)
+        The column means.
+
+    X_scale: array-like, shape (n_problems, n_features)
+        The column scales.
+    """
+    if n_samples is None:
+        n_samples = X.shape[1] * np.ones(X.shape[0])
+
+    if fit_intercept:
+        if sample_weight is None:
+            X_offset = X.mean(axis=1)
+            X = X - X_offset[:, np.newaxis, :]
+            X_scale = np.sqrt((X ** 2).mean(axis=1))
+
+        else:
+            w = sample_weight / sample_weight.sum(axis=1, keepdims=True)
+            X_offset = np.matmul(w[:, np.newaxis, :], X)[:, 0, :]
+            X = X - X_offset[:, np.newaxis, :]
+            X_scale = np.sqrt(np.matmul(w[:, np.newaxis, :], X ** 2)[:, 0, :])
+
+    else:
+        X_offset = None
+        X_scale = np.sqrt((X ** 2).sum(axis=1) / n_samples[:, np.newaxis])
+
+    # for columns with zero scale reset scale to 1
+    X_scale[X_scale <= np.finfo(float).eps] = 1
+
+    X = X / X_scale[:, np.newaxis, :]
+
+    return X, X_offset, X_scale
+
+
+def get_batch_penalty_func(config, n_problems, n_features,
+                           fit_intercept=True, pen_vals=None):
+    """
+    Gets the batched penalty function from a PenaltyConfig.
+
+    Parameters
+    ----------
+    config: None, PenaltyConfig
+        The penalty config; must be None, Lasso, Ridge or ElasticNet.
+
+    n_problems: int
+        Number of problems.
+
+    n_features: int
+        Number of features.
+
+    fit_intercept: bool
+        Whether or not we fit an intercept.
+
+    pen_vals: None, array-like, shape (n_problems, )
+        (Optional) The penalty value for each problem. If provided this overrides config.pen_val.
+
+    Output
+    ------
+    func: None, yaglm.opt.penalty.batch.BatchEntrywise
+        The penalty function.
+    """
+    if config is None or isinstance(config, NoPenalty):
+        return None
+
+    if pen_vals is not None:
+        config = deepcopy(config)
+        config.set_params(pen_val=1)
+
+    func = get_penalty_func(config=config, n_features=n_features)
+    lasso_vals, ridge_vals = \
+        get_entrywise_pen_vals(func, coef_shape=(n_features, ))
+
+    # broadcast to each problem
+    if pen_vals is None:
+        mult = np.ones((n_problems, 1))
+    else:
+        mult = np.array(pen_vals, dtype=float).reshape(n_problems, 1)
+
+    if lasso_vals is not None:
+        lasso_vals = mult * lasso_vals
+
+    if ridge_vals is not None:
+        ridge_vals = mult * ridge_vals
+
+    return BatchEntrywise(lasso_pen_vals=lasso_vals,
+                          ridge_pen_vals=ridge_vals,
+                          fit_intercept=fit_intercept)
@@ -9,7 +9,7 @@ from yaglm.base import TunedGlm
 from yaglm.LossMixin import LossMixin
 
 from yaglm.tune.backend import get_cross_validation_jobs, \
-    get_validation_jobs, get_train_jobs
+    get_validation_jobs, get_train_jobs, get_tune_counters
 from yaglm.tune.select import select_tune_param, cv_select_tune_param
 
 from yaglm.autoassign import autoassign
@@ -44,7 +44,8 @@ class GlmCV(LossMixin, TunedGlm):
                  verbose=0,
                  n_jobs=None,
                  pre_dispatch='2*n_jobs',
-                 path_algo=True): pass
+                 path_algo=True,
+                 copy_folds='auto'): pass
 
     def fit(self, X, y, sample_weight=None, offsets=None):
         """
@@ -116,7 +117,8 @@ class GlmCV(LossMixin, TunedGlm):
                                       solver=solver,
                                       tune_iter=self.tuner_,
                                       path_algo=self.path_algo,
-                                      solver_init=deepcopy(solver_init)
+                                      solver_init=deepcopy(solver_init),
+                                      copy_folds=self.copy_folds
                                       )
 
         # fit and score all models!
@@ -154,6 +156,13 @@ class GlmCV(LossMixin, TunedGlm):
                                init_data=init_data)
 
         tune_info['runtime']['refit'] = time() - start_time
+
+        # possibly total the solver instrumentation counters
+        counters = get_tune_counters(tune_results=self.tune_results_,
+                                     opt_info=getattr(self, 'opt_info_', None))
+        if counters is not None:
+            tune_info['counters'] = counters
+
         self.tune_info_ = tune_info
         return self
 
@@ -184,7 +193,8 @@ class GlmValidation(LossMixin, TunedGlm):
                  verbose=0,
                  n_jobs=None,
                  pre_dispatch='2*n_jobs',
-                 path_algo=True): pass
+                 path_algo=True,
+                 copy_folds='auto'): pass
 
     def fit(self, X, y, sample_weight=None, offsets=None):
         """
@@ -268,7 +278,8 @@ class GlmValidation(LossMixin, TunedGlm):
                                 train=train,
                                 test=test,
                                 path_algo=self.path_algo,
-                                solver_init=deepcopy(solver_init)
+                                solver_init=deepcopy(solver_init),
+                                copy_folds=self.copy_folds
                                 )
 
         # fit and score all models
@@ -297,6 +308,12 @@ class GlmValidation(LossMixin, TunedGlm):
 
         tune_info['runtime']['refit'] = time() - start_time
 
+        # possibly total the solver instrumentation counters
+        counters = get_tune_counters(tune_results=self.tune_results_,
+                                     opt_info=getattr(self, 'opt_info_', None))
+        if counters is not None:
+            tune_info['counters'] = counters
+
         self.tune_info_ = tune_info
         return self
 
@@ -304,6 +321,8 @@ class GlmValidation(LossMixin, TunedGlm):
 class GlmTrainMetric(LossMixin, TunedGlm):
     """
     Tunes a GLM model using generalized cross-validation (GCV).
+
+    For ridge regression the leave-one-out and GCV errors of every penalty value are computed from a single decomposition by solver=RidgeSVD(); set select_metric='loo' or select_metric='gcv' to tune with these. Because the loss is normalized by the number of samples, the LOO error of pen_val is the exact LOO error of refitting with pen_val * n_samples / (n_samples - 1); see RidgeSVD.
     """
 
     def fit(self, X, y, sample_weight=None, offsets=None):
@@ -402,6 +421,137 @@ class GlmTrainMetric(LossMixin, TunedGlm):
         self._set_fit_from(estimators[self.best_tune_idx_])
 
         tune_info['runtime']['refit'] = time() - start_time
+
+        # possibly total the solver instrumentation counters
+        counters = get_tune_counters(tune_results=self.tune_results_,
+                                     opt_info=getattr(self, 'opt_info_', None))
+        if counters is not None:
+            tune_info['counters'] = counters
+
         self.tune_info_ = tune_info
 
         return self
+
+
+class GlmALO(LossMixin, TunedGlm):
+    """
+    Tunes a GLM model using approximate leave-one-out cross-validation (ALO). The ALO predictions along the tuning path are computed from the full data fits so tuning only costs about one path fit instead of the K + 1 path fits of K-fold cross-validation; see yaglm.tune.alo.get_alo_correction.
+
+    ALO is available for the linear, logistic, poisson and huber regression losses with (possibly adaptive) Lasso, ElasticNet, GroupLasso and Ridge penalties.
+
+    For ridge regression the ALO scores are the leave-one-out scores of refits with the penalty value rescaled by n_samples / (n_samples - 1) because the loss is normalized by the number of samples; see yaglm.tune.alo.get_alo_correction.
+
+    The tuning results are formatted like GlmCV's with a single fold whose test scores are the ALO scores.
+
+    References
+    ----------
+    Rad, K.R. and Maleki, A., 2020. A scalable estimate of the out-of-sample prediction error via approximate leave-one-out cross-validation. Journal of the Royal Statistical Society: Series B (Statistical Methodology), 82(4), pp.965-996.
+    """
+
+    def fit(self, X, y, sample_weight=None, offsets=None):
+        """
+        Fits the penalized GLM and tunes the parameters with approximate leave-one-out cross-validation.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            The training covariate data.
+
+        y: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The training response data.
+
+        sample_weight: None or array-like, shape (n_samples,)
+            (Optional) Individual weights for each sample.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) The offsets for each sample.
+
+        Output
+        ------
+        self
+            Fitted estimator.
+        """
+
+        start_time = time()
+        tune_info = {'runtime': {}}
+
+        ##############################################
+        # setup, preprocess, and prefitting routines #
+        ##############################################
+        pro_data, raw_data, pre_pro_out, \
+            configs, solver, init_data, inferencer = \
+            self.setup_and_prefit(X=X, y=y,
+                                  sample_weight=sample_weight,
+                                  offsets=offsets)
+
+        # store inferencer
+        self.inferencer_ = inferencer
+
+        ###############################
+        # setup tuning parameter grid #
+        ###############################
+
+        # setup tuning parameter grids from the data
+        self.tuner_ = self.get_tuner(configs=configs,
+                                     pro_data=pro_data,
+                                     init_data=init_data)
+
+        tune_info['runtime']['prefit'] = time() - start_time
+
+        ##################################
+        # compute tuning path + ALO risk #
+        ##################################
+        start_time = time()
+
+        # set the solver initialization data
+        # only used for non-convex, non-lla algorithm
+        solver_init = self._get_solver_init(init_data)
+
+        # setup generator iterating over all the parameter settings
+        job_configs = get_train_jobs(pro_data=pro_data,
+                                     raw_data=raw_data,
+                                     pre_pro_out=pre_pro_out,
+                                     est=self,
+                                     solver=solver,
+                                     tune_iter=self.tuner_,
+                                     path_algo=self.path_algo,
+                                     solver_init=deepcopy(solver_init),
+                                     alo=True
+                                     )
+
+        # fit and score all models!
+        self.tune_results_ = self._run_fit_and_score_jobs(job_configs)
+
+        # select best tuning parameter values
+        self.best_tune_idx_, self.best_tune_params_ = \
+            cv_select_tune_param(self.tune_results_,
+                                 metric=self._get_select_metric(),
+                                 rule='best',
+                                 prefer_larger_param=True)
+
+        tune_info['runtime']['tune'] = time() - start_time
+
+        ##########################################
+        # solve with the best parameter settings #
+        ##########################################
+        start_time = time()
+
+        best_tune_configs = get_from(self.tuner_.iter_configs(),
+                                     idx=self.best_tune_idx_)
+
+        self._fit_from_configs(pro_data=pro_data, raw_data=raw_data,
+                               configs=best_tune_configs,
+                               solver=solver,
+                               pre_pro_out=pre_pro_out,
+                               init_data=init_data)
+
+        tune_info['runtime']['refit'] = time() - start_time
+
+        # possibly total the solver instrumentation counters
+        counters = get_tune_counters(tune_results=self.tune_results_,
+                                     opt_info=getattr(self, 'opt_info_', None))
+        if counters is not None:
+            tune_info['counters'] = counters
+
+        self.tune_info_ = tune_info
+        return self
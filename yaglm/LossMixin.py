@@ -65,7 +65,7 @@ class LossMixin:
                                    check_input=check_input
                                    )
 
-    def predict(self, X, offsets=None):
+    def predict(self, X, offsets=None, check_input=True):
         """
         Returns the predicted values. For regressors this is the E[Y|X], while for classifies this is the predicted class label.
 
@@ -77,24 +77,30 @@ class LossMixin:
         offsets: None, float, array-like, shape (n_samples, )
             (Optional) The offsets for each sample.
 
+        check_input: bool
+            Whether or not to validate X; see decision_function().
+
         Output
         ------
         y_pred: array-like, shape (n_samples, ) or (n_samples, n_responses)
             The predictions.
         """
         if self._estimator_type == 'regressor':
-            return self.predict_expected(X, offsets=offsets)
+            return self.predict_expected(X, offsets=offsets,
+                                         check_input=check_input)
 
         elif self._estimator_type == 'classifier':
 
-            scores = self.decision_function(X, offsets=offsets)
+            scores = self.decision_function(X, offsets=offsets,
+                                            check_input=check_input)
             if len(scores.shape) == 1:
                 indices = (scores > 0).astype(int)
             else:
                 indices = scores.argmax(axis=1)
             return self.classes_[indices]
 
-    def score(self, X, y, sample_weight=None, offsets=None):
+    def score(self, X, y, sample_weight=None, offsets=None,
+              check_input=True):
         """
         Scores the predictions using the default score strategy e.g. r2_score for linear regression, accuracy for classifiers and D squared for poission.
 
@@ -112,13 +118,16 @@ class LossMixin:
         offsets: None, float, array-like, shape (n_samples, )
             (Optional) The offsets for each sample.
 
+        check_input: bool
+            Whether or not to validate X; see decision_function().
+
         Output
         ------
         score: float
             The score; higher is better.
         """
 
-        y_pred = self.predict(X, offsets=offsets)
+        y_pred = self.predict(X, offsets=offsets, check_input=check_input)
         loss_config = get_base_config(get_loss_config(self.loss))
 
         if loss_config.name in ['lin_reg', 'huber', 'quantile', 'poisson',
@@ -136,7 +145,7 @@ class LossMixin:
             return accuracy_score(y_true=y, y_pred=y_pred,
                                   sample_weight=sample_weight)
 
-    def predict_proba(self, X, offsets=None):
+    def predict_proba(self, X, offsets=None, check_input=True):
         """"
         Predicted class probabilities.
 
@@ -148,6 +157,9 @@ class LossMixin:
         offsets: None, float, array-like, shape (n_samples, )
             (Optional) The offsets for each sample.
 
+        check_input: bool
+            Whether or not to validate X; see decision_function().
+
         Output
         ------
         prob: array-like, shape (n_samples, ) or (n_samples, n_classes)
@@ -159,9 +171,10 @@ class LossMixin:
             raise ValueError("{} does not support predict_proba".
                              format(loss_config.name))
 
-        return self.predict_expected(X, offsets=offsets)
+        return self.predict_expected(X, offsets=offsets,
+                                     check_input=check_input)
 
-    def predict_log_proba(self, X, offsets=None):
+    def predict_log_proba(self, X, offsets=None, check_input=True):
         """
         Log of the predicted class probabilities.
 
@@ -172,15 +185,19 @@ class LossMixin:
 
         offsets: None, float, array-like, shape (n_samples, )
             (Optional) The offsets for each sample.
+
+        check_input: bool
+            Whether or not to validate X; see decision_function().
         Output
         ------
         prob: array-like, shape (n_samples, ) or (n_samples, n_classes)
             The logs of the probabilities either for class 1 (for logistic regression) or for all the classes (for multinomial.)
 
         """
-        return np.log(self.predict_proba(X, offsets=offsets))
+        return np.log(self.predict_proba(X, offsets=offsets,
+                                         check_input=check_input))
 
-    def predict_expected(self, X, offsets=None):
+    def predict_expected(self, X, offsets=None, check_input=True):
         """
         Returns E[Y|X], the estimatead expected value of Y given X.
 
@@ -192,6 +209,9 @@ class LossMixin:
         offsets: None, float, array-like, shape (n_samples, )
             (Optional) The offsets for each sample.
 
+        check_input: bool
+            Whether or not to validate X; see decision_function().
+
         Output
         ------
         expected: array-like (n_samples, n_responses)
@@ -199,7 +219,8 @@ class LossMixin:
         """
         check_is_fitted(self)
 
-        z = self.decision_function(X, offsets=offsets)
+        z = self.decision_function(X, offsets=offsets,
+                                   check_input=check_input)
         loss_config = get_base_config(get_loss_config(self.loss))
 
         if loss_config.name in ['lin_reg', 'huber', 'quantile', 'l2',
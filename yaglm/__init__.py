@@ -1 +1,31 @@
 __version__ = "0.3.3"
+
+from importlib import import_module
+
+# The estimators are imported lazily (PEP 562) the first time they are
+# accessed so that "import yaglm" is cheap and importing one estimator
+# does not pull in the code (e.g. pandas for the tuning code) needed
+# by the others. Glm and GlmBatch are not exported here since they would
+# shadow the yaglm.Glm and yaglm.GlmBatch submodules; import them with
+# "from yaglm.Glm import Glm" and "from yaglm.GlmBatch import GlmBatch".
+_LAZY_ATTRS = {'GlmCV': 'yaglm.GlmTuned',
+               'GlmValidation': 'yaglm.GlmTuned',
+               'GlmTrainMetric': 'yaglm.GlmTuned',
+               'GlmALO': 'yaglm.GlmTuned'
+               }
+
+__all__ = list(_LAZY_ATTRS.keys())
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError("module {!r} has no attribute {!r}".
+                         format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals().keys()).union(__all__))
@@ -1,16 +1,18 @@
 import numpy as np
 from copy import deepcopy
+from time import time
 from sklearn.base import BaseEstimator
 from sklearn.utils.validation import check_is_fitted
-from sklearn.utils.extmath import safe_sparse_dot
 from sklearn.utils.validation import check_array, _check_y, \
     _check_sample_weight, FLOAT_DTYPES
 
 from yaglm.autoassign import autoassign
 from yaglm.processing import process_X, deprocess_fit, process_init_data, \
-    _check_offsets
+    _check_offsets, get_X_sums
 from yaglm.utils import fit_if_unfitted, get_coef_and_intercept, \
     is_str_and_matches, get_shapes_from
+from yaglm.sparse_utils import is_out_of_core, check_out_of_core, \
+    get_active_coef, active_set_dot
 
 from yaglm.config.loss import get_loss_config
 from yaglm.config.constraint import get_constraint_config
@@ -123,7 +125,7 @@ class BaseGlm(BaseEstimator):
     def _validate_data(self, X, y, sample_weight=None, offsets=None,
                        accept_sparse=True):
         """
-        Validates the X/y data. This should not change the raw input data, but may reformat the data (e.g. convert pandas to numpy).
+        Validates the X/y data. This should not change the raw input data, but may reformat the data (e.g. convert pandas to numpy). Out-of-core X data (e.g. np.memmap) are left as is so they are never copied.
 
         Parameters
         ----------
@@ -146,8 +148,11 @@ class BaseGlm(BaseEstimator):
         ------
         X, y, sample_weight, offsets
         """
-        X = check_array(X, accept_sparse=accept_sparse,
-                        dtype=FLOAT_DTYPES)
+        if is_out_of_core(X):
+            X = check_out_of_core(X)
+        else:
+            X = check_array(X, accept_sparse=accept_sparse,
+                            dtype=FLOAT_DTYPES)
 
         if sample_weight is not None:
             sample_weight = _check_sample_weight(sample_weight, X,
@@ -170,7 +175,7 @@ class BaseGlm(BaseEstimator):
         return X, y, sample_weight, offsets
 
     def preprocess(self, X, y, sample_weight=None, offsets=None,
-                   copy=True, check_input=True):
+                   copy=True, check_input=True, X_sums=None):
         """
         Preprocesses the data for fitting.
 
@@ -195,6 +200,9 @@ class BaseGlm(BaseEstimator):
         copy: bool
             Whether or not to copy the X/y arrays or modify them in place.
 
+        X_sums: None, dict
+            (Optional) Precomputed summary statistics of X used to compute the standardization e.g. the statistics of a cross-validation training fold computed by downdating the full data statistics. See get_X_sums() and yaglm.processing.downdate_X_sums().
+
         Output
         ------
         pro_data, pre_pro_out
@@ -212,8 +220,9 @@ class BaseGlm(BaseEstimator):
                 The processed sample weights. Ensures sum(sample_weight) = n_samples. Possibly incorporate class weights.
 
         pro_pro_out: dict
-            Data from preprocessing e.g. X_center, X_scale.
+            Data from preprocessing e.g. X_center, X_scale. Also includes the preprocessing runtime.
         """
+        start_time = time()
 
         if sample_weight is not None:
             if copy:
@@ -232,7 +241,8 @@ class BaseGlm(BaseEstimator):
                            sample_weight=sample_weight,
                            copy=copy,
                            check_input=check_input,
-                           accept_sparse=True)
+                           accept_sparse=True,
+                           X_sums=X_sums)
 
         # subclass should implement this
         # possibly process y
@@ -242,11 +252,35 @@ class BaseGlm(BaseEstimator):
                             copy=copy)
 
         out.update(y_out)
+        out['runtime'] = time() - start_time
 
         pro_data = {'X': X, 'y': y,
                     'sample_weight': sample_weight, 'offsets': offsets}
         return pro_data, out
 
+    def get_X_sums(self, X, sample_weight=None):
+        """
+        Computes the summary statistics of X from which preprocess() can compute the standardization of X or of any subset of its rows (see yaglm.processing.get_X_sums).
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            The raw covariate data.
+
+        sample_weight: None, array-like, shape (n_samples, )
+            (Optional) The raw sample weights.
+
+        Output
+        ------
+        X_sums: None, dict
+            The summary statistics. None if we do not standardize X.
+        """
+        if not self.standardize:
+            return None
+
+        return get_X_sums(X, fit_intercept=self.fit_intercept,
+                          sample_weight=sample_weight)
+
     def get_unflavored_tunable(self):
         """
         Returns an unflavored and tunable version of this estimator. If this estimator is not tunable, will return the cross-validation version by default.
@@ -534,6 +568,11 @@ class BaseGlm(BaseEstimator):
         solver_init = {} if solver_init is None else solver_init
         fit_out, _,  opt_info = solver.solve(**solver_init)
 
+        # add the preprocessing time to the instrumentation counters
+        if opt_info is not None and 'counters' in opt_info:
+            opt_info['counters']['runtime_preprocess'] = \
+                pre_pro_out.get('runtime', np.nan)
+
         ###############
         # Fit relaxed #
         ###############
@@ -652,12 +691,14 @@ class BaseGlm(BaseEstimator):
 
         return self
 
-    def decision_function(self, X, offsets=None):
+    def decision_function(self, X, offsets=None, check_input=True):
         """
         The GLM decision function i.e. z = X.T @ coef + interept or
 
         z = X.T @ coef + interept + offests
 
+        If the coefficient's active set is small, only the columns of X in the active set are used; see yaglm.sparse_utils.active_set_dot.
+
         Parameters
         ----------
         X: array-like, shape (n_samples, n_features)
@@ -665,18 +706,36 @@ class BaseGlm(BaseEstimator):
 
         offsets: None, array-like, shape (n_samples, )
             (Optional) Offsets for the decision function.
+
+        check_input: bool
+            Whether or not to validate X. Skipping validation avoids a pass over X for trusted inputs e.g. arrays or sparse matrices that are known to be finite.
+
         Output
         ------
         z: array-like, shape (n_samples, ) or (n_samples, n_responses)
             The decision function values.
         """
         check_is_fitted(self)
-        X = check_array(X, accept_sparse=['csr', 'csc', 'coo'])
+        if check_input:
+            if is_out_of_core(X):
+                X = check_out_of_core(X)
+            else:
+                X = check_array(X, accept_sparse=['csr', 'csc', 'coo'])
+
+        if X.shape[1] != self.coef_.shape[0]:
+            raise ValueError("X has {} features, but the model was fit "
+                             "with {} features".
+                             format(X.shape[1], self.coef_.shape[0]))
+
+        # the active set is computed from coef_ every time so it is never
+        # stale; this is O(n_features), which is cheap compared to X @ coef
+        active_idxs, active_coef = get_active_coef(self.coef_)
 
         # TODO: for multi-response our coef_ is the transpose of sklearn's
         # convention. I think our choice of (n_features, n_responses)
         # Do we want to be stick with this choice?
-        z = safe_sparse_dot(X, self.coef_, dense_output=True)
+        z = active_set_dot(X, active_idxs=active_idxs,
+                           active_coef=active_coef)
 
         if hasattr(self, 'intercept_') and self.intercept_ is not None:
             z += self.intercept_
@@ -0,0 +1,391 @@
+"""
+A compact, versioned file format for fitted GLMs and a minimal predictor that only depends on numpy.
+
+The file stores the active set of the coefficient, the intercept and whatever is needed to map the linear predictor to predictions (the link function and the class labels). The coefficient is already on the scale of the raw data so any preprocessing (e.g. standardization) is folded in. Everything else e.g. the tuning results, configs and inferencer is dropped.
+
+The file layout is
+
+- 8 bytes: the magic string b'\\x93YAGLM\\x00\\x00'
+- 8 bytes: the length of the header (little endian uint64)
+- the utf-8 encoded json header describing the model and the arrays
+- the raw arrays, each aligned to 64 bytes
+
+so the arrays can be memory-mapped without copying.
+
+Example
+-------
+from yaglm.compact import save_compact_glm, load_compact_glm
+
+save_compact_glm(est, 'model.yaglm')
+model = load_compact_glm('model.yaglm')
+model.predict(X)
+"""
+import json
+import mmap
+import numpy as np
+
+# bump this if the layout changes in a backwards incompatible way
+FORMAT_VERSION = 1
+
+_MAGIC = b'\x93YAGLM\x00\x00'
+_ALIGN = 64
+
+# only slice out the active columns of X when the active set is at most
+# this fraction of the features, otherwise copying the columns costs
+# more than X @ coef; see yaglm.sparse_utils.active_set_dot
+_MAX_ACTIVE_FRAC_ROW_MAJOR = 0.01
+_MAX_ACTIVE_FRAC_COL_MAJOR = 0.1
+
+# maps the loss to the inverse link used by predict_expected
+_LINKS = {'lin_reg': 'identity',
+          'l2': 'identity',
+          'huber': 'identity',
+          'quantile': 'identity',
+          'smoothed_quantile': 'identity',
+          'poisson': 'log',
+          'log_reg': 'logit',
+          'multinomial': 'softmax',
+          'hinge': None,
+          'huberized_hinge': None,
+          'logistic_hinge': None
+          }
+
+
+def save_compact_glm(estimator, fpath):
+    """
+    Saves a fitted GLM in the compact format; see load_compact_glm().
+
+    Parameters
+    ----------
+    estimator: Glm, GlmCV, etc
+        The fitted estimator.
+
+    fpath: str
+        Where to save the model.
+    """
+    from sklearn.utils.validation import check_is_fitted
+    from yaglm.config.loss import get_loss_config
+    from yaglm.config.base_params import get_base_config
+    from yaglm.sparse_utils import get_active_coef
+    from yaglm import __version__
+
+    check_is_fitted(estimator)
+    loss = get_base_config(get_loss_config(estimator.loss))
+    if loss.name not in _LINKS:
+        raise NotImplementedError("Saving the {} loss is not currently "
+                                  "supported".format(loss.name))
+
+    coef = np.asarray(estimator.coef_, dtype=float)
+    active_idxs, active_coef = get_active_coef(coef)
+
+    intercept = getattr(estimator, 'intercept_', None)
+    if intercept is None:
+        intercept = np.zeros(coef.shape[1:])
+
+    arrays = {'active_idxs': active_idxs.astype(np.int64),
+              'active_coef': active_coef,
+              'intercept': np.asarray(intercept, dtype=float)}
+
+    header = {'format_version': FORMAT_VERSION,
+              'yaglm_version': __version__,
+              'loss': loss.name,
+              'link': _LINKS[loss.name],
+              'estimator_type': loss._estimator_type,
+              'n_features': coef.shape[0],
+              'coef_shape': list(coef.shape)}
+
+    if hasattr(estimator, 'classes_'):
+        header['classes'] = np.asarray(estimator.classes_).tolist()
+
+    ####################
+    # layout of arrays #
+    ####################
+    header['arrays'] = {}
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arr = arr.astype(arr.dtype.newbyteorder('<'), copy=False)
+        arrays[name] = arr
+
+        header['arrays'][name] = {'dtype': arr.dtype.str,
+                                  'shape': list(arr.shape),
+                                  'offset': offset}
+        offset = _align(offset + arr.nbytes)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(_MAGIC) + 8 + len(header_bytes))
+
+    with open(fpath, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(np.uint64(len(header_bytes)).astype('<u8').tobytes())
+        f.write(header_bytes)
+
+        for name, arr in arrays.items():
+            start = data_start + header['arrays'][name]['offset']
+            f.write(b'\x00' * (start - f.tell()))
+            f.write(arr.tobytes())
+
+
+def load_compact_glm(fpath, mmap_mode=True):
+    """
+    Loads a GLM saved by save_compact_glm(). This only requires numpy.
+
+    Parameters
+    ----------
+    fpath: str
+        The saved model.
+
+    mmap_mode: bool
+        Whether or not to memory-map the arrays instead of reading them into memory.
+
+    Output
+    ------
+    model: CompactGlm
+        The model.
+    """
+    with open(fpath, 'rb') as f:
+        if mmap_mode:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    if bytes(buffer[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError("{} is not a compact yaglm model".format(fpath))
+
+    header_start = len(_MAGIC) + 8
+    header_len = int(np.frombuffer(buffer, dtype='<u8', count=1,
+                                   offset=len(_MAGIC))[0])
+    header = json.loads(bytes(buffer[header_start:header_start + header_len]).
+                        decode('utf-8'))
+
+    if header['format_version'] > FORMAT_VERSION:
+        raise ValueError("{} was saved with format version {}, but this "
+                         "version of yaglm only reads versions <= {}".
+                         format(fpath, header['format_version'],
+                                FORMAT_VERSION))
+
+    data_start = _align(header_start + header_len)
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+        shape = tuple(info['shape'])
+        arrays[name] = np.frombuffer(buffer, dtype=dtype,
+                                     count=int(np.prod(shape)),
+                                     offset=data_start + info['offset']).\
+            reshape(shape)
+
+    classes = header.get('classes', None)
+    if classes is not None:
+        classes = np.asarray(classes)
+
+    return CompactGlm(active_idxs=arrays['active_idxs'],
+                      active_coef=arrays['active_coef'],
+                      intercept=arrays['intercept'],
+                      n_features=header['n_features'],
+                      loss=header['loss'],
+                      link=header['link'],
+                      estimator_type=header['estimator_type'],
+                      classes=classes)
+
+
+class CompactGlm:
+    """
+    A minimal numpy only GLM predictor that only stores the active set of the coefficient. When most of the features are active, the full coefficient is rebuilt in memory for prediction since slicing out the active columns of X would copy most of X. No input validation is performed.
+
+    Parameters
+    ----------
+    active_idxs: array-like of ints, shape (n_active, )
+        The indices of the non-zero rows of the coefficient.
+
+    active_coef: array-like, shape (n_active, ) or (n_active, n_responses)
+        The non-zero rows of the coefficient.
+
+    intercept: array-like, shape () or (n_responses, )
+        The intercept.
+
+    n_features: int
+        The number of features.
+
+    loss: str
+        The name of the loss.
+
+    link: None, str
+        The inverse link used to compute E[Y|X]. Must be one of [None, 'identity', 'log', 'logit', 'softmax'].
+
+    estimator_type: str
+        Either 'regressor' or 'classifier'.
+
+    classes: None, array-like, shape (n_classes, )
+        The class labels for classifiers.
+    """
+    def __init__(self, active_idxs, active_coef, intercept, n_features,
+                 loss, link, estimator_type, classes=None):
+        self.active_idxs = active_idxs
+        self.active_coef = active_coef
+        self.intercept = intercept
+        self.n_features = n_features
+        self.loss = loss
+        self.link = link
+        self.estimator_type = estimator_type
+        self.classes = classes
+
+        self._coef = None
+
+    @property
+    def coef(self):
+        """
+        The full coefficient, shape (n_features, ) or (n_features, n_responses); built from the active set the first time it is used.
+        """
+        if self._coef is None:
+            active_coef = np.asarray(self.active_coef)
+            coef = np.zeros((self.n_features, ) + active_coef.shape[1:],
+                            dtype=active_coef.dtype)
+            coef[self.active_idxs] = active_coef
+            self._coef = coef
+
+        return self._coef
+
+    def decision_function(self, X, offsets=None):
+        """
+        The GLM decision function i.e. z = X.T @ coef + interept + offests.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features) or (n_features, )
+            The covariate data; a 1d array is treated as a single sample. Scipy sparse matrices are also supported.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) Offsets for the decision function.
+
+        Output
+        ------
+        z: array-like, shape (n_samples, ), (n_samples, n_responses) or the shape of the intercept for a single sample.
+            The decision function values.
+        """
+        # only slice out the active columns when the active set is small
+        if hasattr(X, 'tocsc'):
+            # scipy sparse matrices; column slicing CSR never pays off
+            if X.format not in ['csr', 'csc']:
+                X = X.tocsc()
+            max_frac = _MAX_ACTIVE_FRAC_COL_MAJOR if X.format == 'csc' else 0
+
+        else:
+            X = np.asarray(X)
+            max_frac = _MAX_ACTIVE_FRAC_COL_MAJOR if X.ndim == 2 and \
+                X.flags.f_contiguous and not X.flags.c_contiguous \
+                else _MAX_ACTIVE_FRAC_ROW_MAJOR
+
+        if len(self.active_idxs) <= max_frac * self.n_features:
+            if X.ndim == 1:
+                z = X[self.active_idxs] @ self.active_coef
+            else:
+                z = np.asarray(X[:, self.active_idxs] @ self.active_coef)
+
+        else:
+            z = np.asarray(X @ self.coef)
+
+        z = z + self.intercept
+
+        if offsets is not None:
+            z = z + offsets
+
+        return z
+
+    def predict_expected(self, X, offsets=None):
+        """
+        Returns E[Y|X], the estimatead expected value of Y given X.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features) or (n_features, )
+            The covariate data.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) The offsets for each sample.
+
+        Output
+        ------
+        expected: array-like (n_samples, n_responses)
+            The predicted expected values.
+        """
+        z = self.decision_function(X, offsets=offsets)
+
+        if self.link == 'identity':
+            return z
+
+        elif self.link == 'log':
+            return np.exp(z)
+
+        elif self.link == 'logit':
+            return _expit(z)
+
+        elif self.link == 'softmax':
+            return _softmax(z)
+
+        else:
+            raise NotImplementedError("{} does not support predict_expected".
+                                      format(self.loss))
+
+    def predict(self, X, offsets=None):
+        """
+        Returns the predicted values. For regressors this is the E[Y|X], while for classifies this is the predicted class label.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features) or (n_features, )
+            The covariate data.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) The offsets for each sample.
+
+        Output
+        ------
+        y_pred: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The predictions.
+        """
+        if self.estimator_type == 'regressor':
+            return self.predict_expected(X, offsets=offsets)
+
+        scores = self.decision_function(X, offsets=offsets)
+        if self.active_coef.ndim == 1:
+            indices = (scores > 0).astype(int)
+        else:
+            indices = scores.argmax(axis=-1)
+        return self.classes[indices]
+
+    def predict_proba(self, X, offsets=None):
+        """"
+        Predicted class probabilities.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features) or (n_features, )
+            The covariate data.
+
+        offsets: None, float, array-like, shape (n_samples, )
+            (Optional) The offsets for each sample.
+
+        Output
+        ------
+        prob: array-like, shape (n_samples, ) or (n_samples, n_classes)
+            The probabilities either for class 1 (for logistic regression) or for all the classes (for multinomial.)
+        """
+        if self.link not in ['logit', 'softmax']:
+            raise ValueError("{} does not support predict_proba".
+                             format(self.loss))
+
+        return self.predict_expected(X, offsets=offsets)
+
+
+def _align(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _expit(z):
+    return np.exp(-np.logaddexp(0, -z))
+
+
+def _softmax(z):
+    z = z - z.max(axis=-1, keepdims=True)
+    exp_z = np.exp(z)
+    return exp_z / exp_z.sum(axis=-1, keepdims=True)
@@ -178,7 +178,7 @@ class Multinomial(LossConfig):
     """
     name = 'multinomial'
     _estimator_type = "classifier"
-    _non_func_params = ['clas_weight']
+    _non_func_params = ['class_weight']
 
     is_exp_fam = True
     has_scale = False
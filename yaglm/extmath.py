@@ -3,6 +3,8 @@ from scipy.sparse import issparse
 from scipy.special import loggamma
 import numpy as np
 
+from yaglm.sparse_utils import RowChunked
+
 
 def log_binom(n, k):
     """
@@ -72,6 +74,12 @@ def weighted_mean_std(X, sample_weight=None, ddof=0):
         TOT_WEIGHT = n_samples
         _sample_weight = None
 
+    # out-of-core matrices are summarized one block of rows at a time
+    if isinstance(X, RowChunked):
+        MEAN, VAR = _row_chunked_mean_var(X, sample_weight=_sample_weight)
+        VAR *= TOT_WEIGHT / (TOT_WEIGHT - ddof)
+        return MEAN, np.sqrt(VAR)
+
     # sklearn has this built in for sparse matrices
     # TODO: can we find this somewhere for dense?
     if issparse(X):
@@ -94,3 +102,219 @@ def weighted_mean_std(X, sample_weight=None, ddof=0):
         VAR = VAR / (TOT_WEIGHT - ddof)
 
         return MEAN, np.sqrt(VAR)
+
+
+def _row_chunked_mean_var(X, sample_weight=None):
+    """
+    Computes the (possibly weighted) column means and variances of a RowChunked matrix without loading the entire matrix into memory. Uses the running updates of (Chan et al, 1979) so the variances are not computed from the numerically unstable difference of sums of squares.
+
+    Parameters
+    ----------
+    X: RowChunked, shape (n_samples, n_features)
+        The data matrix.
+
+    sample_weight: None, array-like shape (n_samples)
+        The optional sample weights.
+
+    Output
+    ------
+    mean, var
+
+    mean: array-like, shape (n_features, )
+        The weighted mean for each feature.
+
+    var: array-like, shape (n_features, )
+        The weighted variance (with divisor equal to the total weight) for each feature.
+
+    References
+    ----------
+    Chan, T.F., Golub, G.H. and LeVeque, R.J., 1979. Updating formulae and a pairwise algorithm for computing sample variances. Stanford University.
+    """
+    n_features = X.shape[1]
+    tot = 0
+    mean = np.zeros(n_features)
+    m2 = np.zeros(n_features)  # sum of squared deviations from the mean
+
+    for left, right, block in X.iter_row_blocks():
+        if sample_weight is None:
+            w = np.ones(right - left)
+        else:
+            w = sample_weight[left:right]
+
+        block_tot = w.sum()
+        if block_tot <= 0:
+            continue
+
+        block_mean = w @ block / block_tot
+        block_m2 = w @ ((block - block_mean) ** 2)
+
+        # combine the running statistics with this block's statistics
+        delta = block_mean - mean
+        new_tot = tot + block_tot
+        mean = mean + delta * (block_tot / new_tot)
+        m2 = m2 + block_m2 + delta ** 2 * (tot * block_tot / new_tot)
+        tot = new_tot
+
+    return mean, m2 / tot
+
+
+def weighted_shifted_sums(X, shift, sample_weight=None, chunk_size=10000):
+    """
+    Computes the (possibly weighted) column sums of X - shift and (X - shift)^2. When the shift is close to the column means, the means and variances computed from these sums are numerically stable. Since sums are additive, the sums for a subset of the rows of X can be computed by subtracting the sums of the other rows.
+
+    Dense matrices are processed one block of rows at a time so X is never copied. Out-of-core matrices are streamed over blocks of rows. For sparse matrices we only touch the non-zero entries.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or RowChunked, shape (n_samples, n_features)
+        The data matrix.
+
+    shift: float, array-like, shape (n_features, )
+        The shift for each column.
+
+    sample_weight: None, array-like shape (n_samples)
+        The optional sample weights.
+
+    chunk_size: int
+        Number of rows of a dense matrix to process at once.
+
+    Output
+    ------
+    sum_w, sums, sums_sq
+
+    sum_w: float
+        The sum of the sample weights (or n_samples if no weights are provided).
+
+    sums: array-like, shape (n_features, )
+        The weighted column sums of X - shift.
+
+    sums_sq: array-like, shape (n_features, )
+        The weighted column sums of (X - shift)^2.
+    """
+    n_samples, n_features = X.shape
+    shift = np.zeros(n_features) + np.asarray(shift, dtype=float)
+
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=float).reshape(-1)
+        sum_w = sample_weight.sum()
+    else:
+        sum_w = float(n_samples)
+
+    if issparse(X):
+        # the non-zero entries contribute w_i * (x_ij - shift_j) while
+        # the zero entries contribute -w_i * shift_j
+        X = X.tocoo()
+        if sample_weight is None:
+            w = np.ones(X.nnz)
+        else:
+            w = sample_weight[X.row]
+
+        resid = X.data - shift[X.col]
+        nz_sum_w = np.bincount(X.col, weights=w, minlength=n_features)
+        zero_sum_w = sum_w - nz_sum_w
+
+        sums = np.bincount(X.col, weights=w * resid,
+                           minlength=n_features) - zero_sum_w * shift
+
+        sums_sq = np.bincount(X.col, weights=w * resid ** 2,
+                              minlength=n_features) + zero_sum_w * shift ** 2
+
+        return sum_w, sums, sums_sq
+
+    if isinstance(X, RowChunked):
+        blocks = X.iter_row_blocks()
+    else:
+        blocks = ((left, min(left + chunk_size, n_samples),
+                   X[left:min(left + chunk_size, n_samples)])
+                  for left in range(0, n_samples, chunk_size))
+
+    sums = np.zeros(n_features)
+    sums_sq = np.zeros(n_features)
+    for left, right, block in blocks:
+        resid = block - shift
+
+        if sample_weight is None:
+            sums += resid.sum(axis=0)
+            sums_sq += (resid ** 2).sum(axis=0)
+        else:
+            w = sample_weight[left:right]
+            sums += w @ resid
+            sums_sq += w @ resid ** 2
+
+    return sum_w, sums, sums_sq
+
+
+def weighted_shifted_gram(X, shift, sample_weight=None, chunk_size=10000):
+    """
+    Computes the (possibly weighted) Gram matrix of X - shift i.e. (X - shift).T @ diag(sample_weight) @ (X - shift) as well as the weighted column sums of X - shift. Like weighted_shifted_sums(), the Gram matrix for a subset of the rows of X can be computed by subtracting the Gram matrix of the other rows.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or RowChunked, shape (n_samples, n_features)
+        The data matrix.
+
+    shift: float, array-like, shape (n_features, )
+        The shift for each column.
+
+    sample_weight: None, array-like shape (n_samples)
+        The optional sample weights.
+
+    chunk_size: int
+        Number of rows of a dense matrix to process at once.
+
+    Output
+    ------
+    sum_w, sums, gram
+
+    sum_w: float
+        The sum of the sample weights (or n_samples if no weights are provided).
+
+    sums: array-like, shape (n_features, )
+        The weighted column sums of X - shift.
+
+    gram: array-like, shape (n_features, n_features)
+        The weighted Gram matrix of X - shift.
+    """
+    n_samples, n_features = X.shape
+    shift = np.zeros(n_features) + np.asarray(shift, dtype=float)
+
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=float).reshape(-1)
+        sum_w = sample_weight.sum()
+    else:
+        sum_w = float(n_samples)
+
+    if issparse(X):
+        # (X - 1 s^T)^T W (X - 1 s^T)
+        # = X^T W X - X^T w s^T - s w^T X + sum(w) s s^T
+        w = np.ones(n_samples) if sample_weight is None else sample_weight
+        gram = (X.T @ X.multiply(w.reshape(-1, 1))).toarray()
+        Xtw = np.asarray(X.T @ w).reshape(-1)
+
+        gram -= np.outer(Xtw, shift) + np.outer(shift, Xtw)
+        gram += sum_w * np.outer(shift, shift)
+        sums = Xtw - sum_w * shift
+
+        return sum_w, sums, gram
+
+    if isinstance(X, RowChunked):
+        blocks = X.iter_row_blocks()
+    else:
+        blocks = ((left, min(left + chunk_size, n_samples),
+                   X[left:min(left + chunk_size, n_samples)])
+                  for left in range(0, n_samples, chunk_size))
+
+    sums = np.zeros(n_features)
+    gram = np.zeros((n_features, n_features))
+    for left, right, block in blocks:
+        resid = block - shift
+
+        if sample_weight is None:
+            sums += resid.sum(axis=0)
+            gram += resid.T @ resid
+        else:
+            w = sample_weight[left:right]
+            sums += w @ resid
+            gram += resid.T @ (w.reshape(-1, 1) * resid)
+
+    return sum_w, sums, gram
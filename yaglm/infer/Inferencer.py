@@ -1,5 +1,4 @@
 from numbers import Number
-from pandas.core.dtypes.inference import is_array_like
 from copy import deepcopy
 import numpy as np
 
@@ -78,7 +77,7 @@ class Inferencer(Config):
             # if a float or array was provided use this value
             if isinstance(self.scale, Number):
                 self.scale_ = deepcopy(self.scale)
-            elif is_array_like(self.scale):
+            elif hasattr(self.scale, 'dtype') and np.ndim(self.scale) > 0:
                 self.scale_ = np.array(self.scale).reshape(-1)
 
             elif self.scale is not None:
@@ -1,8 +1,10 @@
 import numpy as np
+from scipy.sparse import issparse
 
 from yaglm.config.base import Config
 from yaglm.autoassign import autoassign
 from yaglm.utils import count_support, fit_if_unfitted
+from yaglm.opt.algo.exact_admm import get_centered_gram
 
 
 class LinRegNoiseEst(Config):
@@ -29,13 +31,19 @@ class ViaRidge(LinRegNoiseEst):
     fit_intercept: bool
         Whether or not to fit a ridge regression intercept.
 
+    rank: None, int
+        (Optional) Use a randomized truncated SVD of X with this rank e.g. for large sparse X. See lin_reg_var_via_ridge().
+
+    random_state: None, int
+        The seed for the randomized SVD.
+
     Attributes
     ----------
     pen_val_: float
         The ridge penalty value we used.
 
-    scale_: float
-        The estimated noise standard deviation.
+    scale_: float, array-like
+        The estimated noise standard deviation. For multiple responses this has shape (n_responses, ).
 
     References
     ----------
@@ -43,7 +51,8 @@ class ViaRidge(LinRegNoiseEst):
     Liu, X., Zheng, S. and Feng, X., 2020. Estimation of error variance via ridge regression. Biometrika, 107(2), pp.481-488.
     """
     @autoassign
-    def __init__(self, pen_val='default', fit_intercept=True): pass
+    def __init__(self, pen_val='default', fit_intercept=True,
+                 rank=None, random_state=None): pass
 
     def fit(self, X, y, sample_weight=None):
 
@@ -51,7 +60,9 @@ class ViaRidge(LinRegNoiseEst):
             lin_reg_var_via_ridge(X=X, y=y,
                                   fit_intercept=self.fit_intercept,
                                   pen_val=self.pen_val,
-                                  sample_weight=sample_weight)
+                                  sample_weight=sample_weight,
+                                  rank=self.rank,
+                                  random_state=self.random_state)
         self.scale_ = np.sqrt(sigma_sq)
 
         return self
@@ -131,13 +142,15 @@ class OrganicLasso(LinRegNoiseEst):
 
 # TODO: rewrite formulas so pen_val is on scale where we average the loss
 def lin_reg_var_via_ridge(X, y, fit_intercept=True, pen_val='default',
-                          sample_weight=None):
+                          sample_weight=None, rank=None, random_state=None):
     """
     Estimates the linear regression noise variance use the ridge regression based method from (Liu et al, 2020).
 
+    The estimate only depends on the ridge hat matrix A = X @ (X.T @ X / n + pen_val * I)^{-1} @ X.T / n through y.T @ (I - A) @ y and trace(A), which we compute from the eigendecomposition of the smaller of X.T @ X and X @ X.T. This never forms an n_samples x n_samples matrix when n_samples > n_features and the decomposition is shared by all the penalty values.
+
     Parameters
     ----------
-    X: array-like, shape (n_samples, n_features)
+    X: array-like, sparse matrix, shape (n_samples, n_features)
         The training covariate data.
 
     y: array-like, shape (n_samples, ) or (n_samples, n_responses)
@@ -146,19 +159,25 @@ def lin_reg_var_via_ridge(X, y, fit_intercept=True, pen_val='default',
     fit_intercept: bool
         Whether or not we should include an intercept.
 
-    pen_val: str, float
-        The ridge penalty value to use. If 'default', will use the value from section 3 of (Liu et al, 2020)
+    pen_val: str, float, array-like
+        The ridge penalty value to use. If 'default', will use the value from section 3 of (Liu et al, 2020). If an array-like of penalty values is provided, we return the estimate for each value.
 
     sample_weight: None or array-like,  shape (n_samples,)
         (Optional) Individual weights for each sample.
 
+    rank: None, int
+        (Optional) If provided, we use a randomized truncated SVD of X with this rank instead of the exact decomposition e.g. when both dimensions of a sparse X are large. The contribution of the remaining singular values is approximated to first order in 1 / pen_val so the estimate is accurate when they are small compared to n_samples * pen_val; it is exact if rank is at least the rank of X.
+
+    random_state: None, int, RandomState
+        The seed for the randomized SVD.
+
     Output
     ------
-    sigma_sq: float
-        An estimate of the noise variance.
+    sigma_sq: float, array-like
+        An estimate of the noise variance. If y has multiple responses this has shape (n_responses, ). If multiple penalty values are provided this has shape (n_pen_vals, ) or (n_pen_vals, n_responses).
 
-    pen_val: float
-        The penalty value used.
+    pen_val: float, array-like
+        The penalty value(s) used.
 
     References
     ----------
@@ -168,34 +187,123 @@ def lin_reg_var_via_ridge(X, y, fit_intercept=True, pen_val='default',
     if sample_weight is not None:
         raise NotImplementedError
 
+    y = np.asarray(y, dtype=float)
+
     # if we fit an intercept just assume the intercept is given by the mean
     if fit_intercept:
-        y = y - np.array(y).mean()
+        y = y - y.mean(axis=0)
 
     n, d = X.shape
 
-    if pen_val == 'default':
+    if isinstance(pen_val, str) and pen_val == 'default':
         alpha = 0.1
         pen_val = alpha * abs(X.T @ y).max() / (n * d)
 
-    # compute (X^TX + pen_val I)^{-1}
-    if n <= d:
-        # directly
-        xtx_i_inv = np.linalg.inv(X.T @ X / n + pen_val * np.eye(d))
-    else:
-        # Woodbury matrix identity
-        xxt_i_inv = np.linalg.inv(X @ X.T / n + pen_val * np.eye(n))
-        xtx_i_inv = (1/pen_val) * (np.eye(d) - (1 / n) * X.T @ xxt_i_inv @ X)
+    # y.T @ A @ y = sum_k y_coefs_k / (evals_k + pen_val)
+    # trace(A) = sum_k evals_k / (evals_k + pen_val)
+    evals, y_coefs, y_tail, trace_tail = \
+        _get_ridge_hat_spectrum(X=X, y=y, rank=rank,
+                                random_state=random_state)
+
+    y_sq = (y ** 2).sum(axis=0)
 
     # see (2) in (Liu et al, 2020)
-    A = (1 / n) * X @ xtx_i_inv @ X.T
-    sigma_sq_cup = (1 / n) * y.T @ (np.eye(n) - A) @ y
-    sigma_sq = sigma_sq_cup / (1 - np.trace(A) / n)
+    sigma_sq = []
+    pen_vals = np.array(pen_val, dtype=float).reshape(-1)
+    for lam in pen_vals:
+        inv = 1 / (evals + lam)
 
-    # other information to return
-    # info = {'pen_val': pen_val}
+        sigma_sq_cup = (1 / n) * (y_sq - inv @ y_coefs - y_tail / lam)
+        trace_A = (evals * inv).sum() + trace_tail / lam
+
+        sigma_sq.append(sigma_sq_cup / (1 - trace_A / n))
+
+    if np.ndim(pen_val) == 0:
+        return sigma_sq[0], pen_val
+    else:
+        return np.array(sigma_sq), pen_val
 
-    return sigma_sq, pen_val
+
+def _get_ridge_hat_spectrum(X, y, rank=None, random_state=None):
+    """
+    Computes the spectral quantities of the ridge hat matrix needed by lin_reg_var_via_ridge().
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix, shape (n_samples, n_features)
+        The covariate data.
+
+    y: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The response data.
+
+    rank: None, int
+        (Optional) Rank of the randomized truncated SVD. If None, we use the exact eigendecomposition.
+
+    random_state: None, int, RandomState
+        The seed for the randomized SVD.
+
+    Output
+    ------
+    evals, y_coefs, y_tail, trace_tail
+
+    evals: array-like, shape (n_components, )
+        The eigenvalues of X.T @ X / n_samples.
+
+    y_coefs: array-like, shape (n_components, ) or (n_components, n_responses)
+        evals * (U.T @ y) ** 2 where U are the left singular vectors of X.
+
+    y_tail: float, array-like
+        The first order coefficient of y.T @ A @ y in 1 / pen_val from the singular values excluded by the truncated SVD.
+
+    trace_tail: float
+        The first order coefficient of trace(A) in 1 / pen_val from the singular values excluded by the truncated SVD.
+    """
+    n, d = X.shape
+
+    if rank is not None and rank < min(n, d):
+        from sklearn.utils.extmath import randomized_svd
+
+        U, svals, _ = randomized_svd(X, n_components=rank,
+                                     random_state=random_state)
+        evals = svals ** 2 / n
+
+        Uty = U.T @ y
+        y_coefs = evals.reshape((-1, ) + (1, ) * (y.ndim - 1)) * Uty ** 2
+
+        # X.T @ A @ X ~= X.T @ X / (n * pen_val) on the orthogonal
+        # complement of the top singular vectors
+        y_perp = y - U @ Uty
+        y_tail = (np.asarray(X.T @ y_perp) ** 2).sum(axis=0) / n
+
+        if issparse(X):
+            fro_sq = (X.data ** 2).sum()
+        else:
+            fro_sq = (np.asarray(X) ** 2).sum()
+        trace_tail = max(fro_sq - (svals ** 2).sum(), 0) / n
+
+        return evals, y_coefs, y_tail, trace_tail
+
+    if n > d:
+        # X.T @ X / n = V @ diag(evals) @ V.T
+        # then y.T @ A @ y = sum_k (V.T @ X.T @ y)_k^2 / n / (evals_k + pen_val)
+        gram = get_centered_gram(X=X, sample_weight=np.ones(n))
+        evals, V = np.linalg.eigh(gram)
+        evals = np.clip(evals, a_min=0, a_max=None)
+        y_coefs = np.asarray(V.T @ (X.T @ y)) ** 2 / n
+
+    else:
+        # X @ X.T / n = U @ diag(evals) @ U.T
+        if issparse(X):
+            XXt = (X @ X.T).toarray()
+        else:
+            X = np.asarray(X)
+            XXt = X @ X.T
+        evals, U = np.linalg.eigh(XXt / n)
+        evals = np.clip(evals, a_min=0, a_max=None)
+        y_coefs = evals.reshape((-1, ) + (1, ) * (y.ndim - 1)) * \
+            (U.T @ y) ** 2
+
+    return evals, y_coefs, 0, 0
 
 
 # TODO: add sample weight
@@ -1,5 +1,7 @@
 from scipy.sparse.linalg import svds
+from scipy.linalg import svd, qr
 import numpy as np
+from sklearn.utils import check_random_state
 
 
 def smallest_sval(X, solver='lobpcg', **kws):
@@ -50,9 +52,12 @@ def leading_sval(X, solver='lobpcg', **kws):
     largest_sval: float
         The largest singular value of X
     """
-    # for 1d arrays return the frobenius norm
-    if min(X.shape) == 1:
-        return np.sqrt((X.reshape(-1) ** 2).sum())
+    # for 1d arrays return the frobenius norm; we compute this with a
+    # matrix-vector product so this also works for linear operators
+    if X.shape[1] == 1:
+        return euclid_norm(np.asarray(X @ np.ones(1)))
+    elif X.shape[0] == 1:
+        return euclid_norm(np.asarray(X.T @ np.ones(1)))
 
     return svds(X, k=1, which='LM', solver=solver, **kws)[1].item()
 
@@ -67,3 +72,107 @@ def euclid_norm(x):
         The euclian or frobenius norm of x.
     """
     return np.sqrt((x ** 2).sum())
+
+
+def truncated_svd(X, rank, V_init=None, n_converge=None,
+                  max_iter=30, tol=1e-8, sval_tol=1e-3,
+                  random_state=None):
+    """
+    Computes the top singular triplets of a matrix using subspace iteration with Rayleigh-Ritz extraction. The subspace can be warm started e.g. from the right singular vectors of a nearby matrix, in which case only a few iterations are typically needed.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_rows, n_cols)
+        The matrix.
+
+    rank: int
+        Dimension of the subspace i.e. the number of singular triplets to compute.
+
+    V_init: None, array-like, shape (n_cols, r)
+        (Optional) Warm start for the right singular subspace. If r < rank the remaining directions are initialized randomly.
+
+    n_converge: None, int, callable
+        Number of leading triplets that must converge. If a callable, it is called with the current singular value estimates and returns this number. Defaults to rank.
+
+    max_iter: int
+        Maximum number of subspace iterations.
+
+    tol: float
+        The residuals ||X @ v_j - s_j u_j||_2 of the first n_converge triplets must be less than tol * s_1.
+
+    sval_tol: float
+        If n_converge < rank, the estimate of the next singular value, s_{n_converge + 1}, must change by less than sval_tol * s_{n_converge + 1} between iterations. Note this estimate is always a lower bound; its triplet may converge slowly when there is no spectral gap, but the value itself converges faster.
+
+    random_state: None, int, RandomState
+        The random seed for the random initial directions.
+
+    Output
+    ------
+    U, s, Vt, converged
+
+    U: array-like, shape (n_rows, rank)
+        The left singular vectors.
+
+    s: array-like, shape (rank, )
+        The singular values in decreasing order.
+
+    Vt: array-like, shape (rank, n_cols)
+        The right singular vectors.
+
+    converged: bool
+        Whether or not the leading triplets converged.
+
+    References
+    ----------
+    Halko, N., Martinsson, P.G. and Tropp, J.A., 2011. Finding structure with randomness: Probabilistic algorithms for constructing approximate matrix decompositions. SIAM review, 53(2), pp.217-288.
+    """
+    n_cols = X.shape[1]
+    rng = check_random_state(random_state)
+
+    # initial subspace
+    Q = rng.normal(size=(n_cols, rank))
+    if V_init is not None:
+        n_init = min(V_init.shape[1], rank)
+        Q[:, :n_init] = V_init[:, :n_init]
+    Q = qr(Q, mode='economic')[0]
+
+    Ub = s = s_prev = P = None
+    converged = False
+    for it in range(int(max_iter)):
+        Y = X @ Q
+
+        # check the residuals X @ v_j - s_j u_j of the current Ritz
+        # triplets; note X.T @ u_j = s_j v_j holds exactly
+        if s is not None:
+            if callable(n_converge):
+                n_check = n_converge(s)
+            elif n_converge is None:
+                n_check = rank
+            else:
+                n_check = n_converge
+            n_check = min(max(n_check, 1), rank)
+
+            U = P @ Ub
+            resid = Y[:, :n_check] - U[:, :n_check] * s[:n_check]
+            resid = np.sqrt((resid ** 2).sum(axis=0))
+            converged = resid.max() <= tol * max(s[0], np.finfo(float).eps)
+
+            # make sure the next singular value estimate has stabilized
+            if converged and n_check < rank:
+                converged = s_prev is not None and \
+                    abs(s[n_check] - s_prev[n_check]) <= sval_tol * s[n_check]
+
+            if converged:
+                break
+
+        s_prev = s
+        P = qr(Y, mode='economic')[0]
+        Q, R = qr(X.T @ P, mode='economic')
+
+        # P.T @ X @ Q = R.T so the Ritz vectors come from the SVD of R.T
+        Ub, s, Vbt = svd(R.T)
+        Q = Q @ Vbt.T
+
+    U = P @ Ub
+    return U, s, Q.T, converged
+
@@ -0,0 +1,372 @@
+import numpy as np
+from time import time
+
+from yaglm.opt.penalty.batch import BatchEntrywise
+from yaglm.opt.utils import progress_range
+
+
+def solve_batch_fista(smooth_func, init_val, non_smooth_func=None,
+                      step='lip',
+                      accel=True,
+                      restart=True,
+                      backtracking=False,
+                      max_iter=200,
+                      tol=1e-5, rel_crit=False, stop_crit='x_max',
+                      bt_max_steps=20,
+                      bt_shrink=0.5,
+                      bt_grow=1.58,  # 10**.2
+                      compact_frac=0.5,
+                      tracking_level=0,
+                      verbose=False):
+    """
+    Solves K independent optimization problems of the form
+
+    min_{x_k} smooth_func_k(x_k) + non_smooth_func_k(x_k)
+
+    using one vectorized ISTA/FISTA loop over the stacked (K, d) variable array. This is the batched analogue of yaglm.opt.algo.fista.solve_fista; each problem has its own step size, backtracking line search, acceleration restarts and stopping criterion. Problems that have converged are masked out and, once enough of them have converged, the remaining problems are compacted so we stop doing computation for the converged ones.
+
+    Parameters
+    ----------
+    smooth_func: yaglm.opt.glm_loss.batch.BatchGlm
+        The smooth part of the loss function. This object should implement smooth_func.grad() and smooth_func.eval() on (K, d) arrays (eval returns shape (K, )), smooth_func.subset() and possibly smooth_func.grad_lip, an array of shape (K, ).
+
+    init_val: array-like, shape (K, d)
+        The value to initialize from.
+
+    non_smooth_func: None, yaglm.opt.penalty.batch.BatchEntrywise
+        The (optional) non-smooth part of the loss function. This object should implement non_smooth_func.prox() with one step size per problem, non_smooth_func.eval() and non_smooth_func.subset().
+
+    step: float, array-like, 'lip'
+        The step size for each problem. This is either the constant step size or the base step size if backtracking is used. If step='lip', we infer theh gradient Lipchitz constants from smooth_func.grad_lip.
+
+    accel: bool
+        Whether or not to use FISTA acceleration.
+
+    restart: bool
+        Whether or not to restart the acceleration scheme. See (13) from https://bodono.github.io/publications/adap_restart.pdf
+        for the strategy we employ.
+
+    backtracking: bool
+        Whether or not to do a backtracking line search (e.g. if the Lipschtiz constant is not known).
+
+    max_iter: int
+        Maximum number of iterations.
+
+    stop_crit: str
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss']. This is checked separately for each problem.
+
+        If stop_crit='x_max' then we use ||x_new - x_prev||_max.
+
+        If stop_crit='x_L2' then we use ||x_new - x_prev||_2.
+
+        If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    bt_max_steps: int
+        Maximum number of backtracking steps to take.
+
+    bt_shrink: float
+        How much to shrink the step size in each backtracking step. Should lie strictly in the unit interval.
+
+    bt_grow: float, None
+        (Optional) How much to grow the step size each iteraction when using backgracking.
+
+    compact_frac: float
+        Compact the problems once the fraction of problems that are still running falls to or below this value.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an iteration progress bar.
+
+    Output
+    ------
+    value: array-like, shape (K, d)
+        The solutions.
+
+    opt_info: dict
+        Additional optimization data. opt_info['iter'] and opt_info['stop'] are arrays of shape (K, ) with the number of iterations and whether or not the stopping criterion was met for each problem.
+
+    References
+    ----------
+    Beck, A. and Teboulle, M., 2009. A fast iterative shrinkage-thresholding algorithm for linear inverse problems. SIAM journal on imaging sciences, 2(1), pp.183-202.
+
+    O’donoghue, B. and Candes, E., 2015. Adaptive restart for accelerated gradient schemes. Foundations of computational mathematics, 15(3), pp.715-732.
+    """
+    start_time = time()
+
+    init_val = np.array(init_val, dtype=float)
+    n_problems = init_val.shape[0]
+
+    # if there is no non_smooth function then this is just the zero function
+    if non_smooth_func is None:
+        non_smooth_func = \
+            BatchEntrywise(fit_intercept=smooth_func.fit_intercept)
+
+    # check stopping criteria
+    if tol is None:
+        stop_crit = None
+    assert stop_crit is None or stop_crit in ['x_max', 'x_L2', 'loss']
+
+    # set learning rate from Lipchitz constants
+    if isinstance(step, str) and step == 'lip':
+        glip = smooth_func.grad_lip
+        assert glip is not None,\
+            "Lipchitz constant not currently available for smooth_func."\
+            "Either manually specify a numeric step size or " \
+            "implement smooth_func.grad_lip if available."
+
+        step = 1 / np.array(glip)
+
+    step = np.array(step, dtype=float) * np.ones(n_problems)
+
+    #########################
+    # Setup problem subsets #
+    #########################
+    # the problems we are currently computing with; these are the
+    # problems that are still running plus some converged problems
+    # that have not yet been compacted away
+    work_idxs = np.arange(n_problems)
+    running = np.ones(n_problems, dtype=bool)
+    f = smooth_func
+    g = non_smooth_func
+
+    # the output
+    soln = init_val.copy()
+    n_iter = np.zeros(n_problems, dtype=int)
+    stopped = np.zeros(n_problems, dtype=bool)
+
+    ################
+    # Update steps #
+    ################
+
+    def eval_obj(x):
+        return f.eval(x) + g.eval(x)
+
+    def prox_grad_update(x, step):
+        return g.prox(x - step[:, np.newaxis] * f.grad(x), step)
+
+    def backtracking_search(x, step, bt_iter_prev):
+        # increase the step size if the last one was accepted
+        if bt_grow is not None:
+            step = np.where(bt_iter_prev == 0, step * bt_grow, step)
+
+        # equation (2.5) of (Beck and Teboulle, 2009)
+        # but we drop the non_smooth_func.eval(new) term
+        f_x = f.eval(x)
+        grad_x = f.grad(x)
+
+        x_new = np.empty_like(x)
+        bt_iter = np.zeros(x.shape[0], dtype=int)
+        accepted = np.zeros(x.shape[0], dtype=bool)
+        for b in range(bt_max_steps):
+            cand = g.prox(x - step[:, np.newaxis] * grad_x, step)
+            diff = cand - x
+
+            Q = f_x + (diff * grad_x).sum(axis=1) + \
+                (0.5 / step) * (diff ** 2).sum(axis=1)
+
+            ok = (f.eval(cand) <= Q) & ~accepted
+            x_new[ok] = cand[ok]
+            bt_iter[ok] = b
+            accepted |= ok
+
+            if accepted.all():
+                break
+            else:
+                step = np.where(accepted, step, step * bt_shrink)
+
+        # take the last candidate for problems that never satisfied the
+        # line search condition
+        x_new[~accepted] = cand[~accepted]
+        bt_iter[~accepted] = b
+
+        return x_new, step, bt_iter
+
+    ##########################
+    # Setup iteration values #
+    ##########################
+    value = init_val.copy()
+    value_prev = value.copy()
+    if accel:
+        value_aux = value.copy()
+        value_aux_prev = value.copy()
+        t = np.ones(n_problems)
+        t_prev = np.ones(n_problems)
+    bt_iter = np.zeros(n_problems, dtype=int)
+
+    if stop_crit == 'loss':
+        obj_prev = eval_obj(value)
+
+    history = {}
+    if tracking_level >= 1:
+        history['n_running'] = []
+
+    if restart:
+        history['n_restarts'] = np.zeros(n_problems, dtype=int)
+
+    it = 0
+    for it in progress_range(max_iter, verbose=verbose,
+                             desc='Batch FISTA'):
+
+        ###############
+        # Update step #
+        ###############
+        if accel:
+            # with acceleration
+
+            if backtracking:
+                value_aux, step, bt_iter = \
+                    backtracking_search(value, step, bt_iter)
+            else:
+                value_aux = prox_grad_update(value, step)
+
+            # FISTA step
+            t = 0.5 * (1 + np.sqrt(1 + 4 * t ** 2))
+            value = value_aux + \
+                ((t_prev - 1) / t)[:, np.newaxis] * \
+                (value_aux - value_aux_prev)
+
+            if restart:
+                # see equation (12) of (O'Donoghue and Candes, 2015)
+                to_restart = ((value_prev - value_aux) *
+                              (value_aux - value_aux_prev)).sum(axis=1) > 0
+                t[to_restart] = 1
+                t_prev[to_restart] = 1
+                history['n_restarts'][work_idxs[to_restart & running]] += 1
+
+        elif backtracking:
+            value, step, bt_iter = backtracking_search(value, step, bt_iter)
+
+        else:
+            value = prox_grad_update(value, step)
+
+        #####################
+        # Stopping criteria #
+        #####################
+        if stop_crit in ['x_max', 'x_L2']:
+            stop = check_no_change_rows(current=value, prev=value_prev,
+                                        tol=tol, rel_crit=rel_crit,
+                                        norm=stop_crit[2:])  # max or L2
+
+        elif stop_crit == 'loss':
+            obj = eval_obj(value)
+            diff = obj_prev - obj
+            if rel_crit:
+                diff /= (abs(obj_prev) + np.finfo(float).eps)
+            stop = diff <= tol
+            obj_prev = obj
+
+        else:
+            stop = np.zeros(len(work_idxs), dtype=bool)
+
+        # record the problems that just finished
+        newly_stopped = stop & running
+        if newly_stopped.any():
+            idxs = work_idxs[newly_stopped]
+            soln[idxs] = value[newly_stopped]
+            n_iter[idxs] = it
+            stopped[idxs] = True
+            running[newly_stopped] = False
+
+        if tracking_level >= 1:
+            history['n_running'].append(running.sum())
+
+        if not running.any():
+            break
+
+        value_prev = value.copy()
+        if accel:
+            value_aux_prev = value_aux
+            t_prev = t.copy()
+
+        ################################
+        # Compact the running problems #
+        ################################
+        if running.sum() <= compact_frac * len(work_idxs):
+            keep = np.where(running)[0]
+
+            work_idxs = work_idxs[keep]
+            running = running[keep]
+            f = f.subset(keep)
+            g = g.subset(keep)
+
+            value = value[keep]
+            value_prev = value_prev[keep]
+            step = step[keep]
+            bt_iter = bt_iter[keep]
+            if accel:
+                value_aux_prev = value_aux_prev[keep]
+                t = t[keep]
+                t_prev = t_prev[keep]
+            if stop_crit == 'loss':
+                obj_prev = obj_prev[keep]
+
+    # problems that hit the maximum number of iterations
+    if running.any():
+        soln[work_idxs[running]] = value[running]
+        n_iter[work_idxs[running]] = it
+
+    opt_info = {'runtime': time() - start_time,
+                'history': history,
+                'stop_crit': stop_crit,
+                'stop': stopped,
+                'iter': n_iter}
+
+    return soln, opt_info
+
+
+def check_no_change_rows(current, prev, norm='max', tol=None,
+                         rel_crit=False, tol_eps=np.finfo(float).eps):
+    """
+    Row-wise version of yaglm.opt.stopping.check_no_change.
+
+    Parameters
+    ----------
+    current: array-like, shape (K, d)
+        The current values.
+
+    prev: array-like, shape (K, d)
+        The previous values.
+
+    norm: str
+        What norm to use. Must be one of ['max', 'L2'].
+
+    tol: None, float
+        The tolerance stopping criteria. If None, will never stop.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale i.e. ||current - prev|| / (||prev|| + tol_eps) <= tol
+
+    tol_eps: float
+        Epsilon value for relative tolerance.
+
+    Output
+    ------
+    stop: array-like of bools, shape (K, )
+        Whether or not to stop each problem.
+    """
+    if tol is None:
+        return np.zeros(current.shape[0], dtype=bool)
+
+    if norm == 'max':
+        def f(x): return np.abs(x).max(axis=1)
+
+    elif norm == 'L2':
+        def f(x): return np.sqrt((x ** 2).sum(axis=1))
+
+    else:
+        raise ValueError("Bad input to norm: {}".format(norm))
+
+    diff_norm = f(current - prev)
+    if rel_crit:
+        diff_norm /= (f(prev) + tol_eps)
+
+    return diff_norm <= tol
+
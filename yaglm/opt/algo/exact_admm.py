@@ -0,0 +1,578 @@
+import numpy as np
+from scipy.sparse import issparse, diags, csc_matrix
+from scipy.sparse.linalg import LinearOperator, splu
+from scipy.linalg import cho_factor, cho_solve, cholesky_banded, \
+    cho_solve_banded, LinAlgError
+from time import time
+
+from yaglm.linalg_utils import euclid_norm
+
+
+def solve_exact_admm(lin_sys, Xty, mat, func,
+                     primal_init=None, dual_init=None,
+                     rho='auto',
+                     rho_update=False,
+                     atol=1e-5,
+                     rtol=1e-5,
+                     eta=2,
+                     mu=10,
+                     max_iter=1000,
+                     tracking_level=0):
+    """
+    Solves a least squares problem with a penalty applied to a linear transformation of the coefficient,
+
+    min_coef 0.5 * coef.T @ Gram @ coef - Xty.T @ coef + func(mat @ coef)
+
+    using the standard ADMM algorithm with the splitting mat @ coef = z (e.g. see Section 6.4.1 of (Boyd et al, 2011)). Unlike the linearized ADMM of (Zhu, 2017), the primal update is exact and requires solving the linear system (Gram + rho * mat.T @ mat) coef = v. This linear system is factorized once and the factorization is reused across iterations (and warm started problems) while rho is fixed.
+
+    Parameters
+    ----------
+    lin_sys: LeastSquaresLinSys
+        The linear system object; lin_sys.solve(v) solves (Gram + rho * mat.T @ mat) x = v for the current value of rho.
+
+    Xty: array-like, shape (n_features, )
+        The linear term of the least squares loss.
+
+    mat: array-like, sparse matrix, shape (n_transf, n_features)
+        The linear transformation matrix.
+
+    func: yaglm.opt.base.Func
+        The penalty applied to mat @ coef; must be proximable.
+
+    primal_init: None, array-like shape (n_features, )
+        (Optional) Initialization for the coefficient.
+
+    dual_init: None, dict
+        (Optional) Initialization for the split and scaled dual variables with keys 'z' and 'dual'.
+
+    rho: float, str
+        The ADMM penalty parameter. If rho='auto', will use lin_sys.get_default_rho().
+
+    rho_update: bool
+        Whether or not to adpatively update the rho parameter. Note changing rho means we need to refactorize the linear system.
+
+    atol, rtol: float
+        The absolute and relative stopping criteria.
+
+    eta: float
+        Amount to increase/decrease rho by.
+
+    mu: float
+        Parameter for deciding whether or not to increase rho; see (3.13) of (Boyd et al, 2011).
+
+    max_iter: int
+        Maximum number of iterations.
+
+    tracking_level: int
+        How much data to track.
+
+    Output
+    ------
+    solution, admm_data, opt_info
+
+    solution: array-like
+        The solution.
+
+    admm_data: dict
+        Data related to ADMM e.g. the dual variables.
+
+    opt_info: dict
+        Opimization tracking data e.g. the dual/primal residual history.
+
+    References
+    ----------
+    Boyd, S., Parikh, N., Chu, E., Peleato, B. and Eckstein, J., 2011. Distributed optimization and statistical learning via the alternating direction method of multipliers. Foundations and Trends in Machine learning, 3(1), pp.1-122.
+
+    Ramdas, A. and Tibshirani, R.J., 2016. Fast and flexible ADMM algorithms for trend filtering. Journal of Computational and Graphical Statistics, 25(3), pp.839-858.
+    """
+    start_time = time()
+
+    n_transf, n_features = mat.shape
+    if rho == 'auto':
+        rho = lin_sys.get_default_rho()
+    lin_sys.set_rho(rho)
+
+    ########################
+    # initialize variables #
+    ########################
+    if primal_init is None:
+        primal = np.zeros(n_features)
+    else:
+        primal = np.array(primal_init, dtype=float)
+
+    if dual_init is not None:
+        z = np.array(dual_init['z'], dtype=float)
+        dual = np.array(dual_init['dual'], dtype=float)
+    else:
+        z = mat @ primal
+        dual = np.zeros(n_transf)
+
+    # make sure we have correct shapes
+    assert z.shape[0] == n_transf
+    assert dual.shape[0] == n_transf
+
+    # cache mat.T @ z and mat.T @ dual
+    Mt_z = mat.T @ z
+    Mt_dual = mat.T @ dual
+
+    ##########################
+    # setup history tracking #
+    ##########################
+    history = {}
+    if tracking_level >= 1:
+        history['primal_resid'] = []
+        history['dual_resid'] = []
+        history['rho'] = [rho]
+
+        history['primal_tol'] = []
+        history['dual_tol'] = []
+
+    if tracking_level >= 2:
+        history['primal'] = [primal]
+
+    for it in range(int(max_iter)):
+
+        # exact primal update
+        primal = lin_sys.solve(Xty + rho * (Mt_z - Mt_dual))
+        M_primal = mat @ primal
+
+        # split variable update
+        z_new = func.prox(M_primal + dual, step=1 / rho)
+        Mt_z_new = mat.T @ z_new
+
+        # scaled dual update
+        resid = M_primal - z_new
+        dual = dual + resid
+        Mt_dual = Mt_dual + mat.T @ M_primal - Mt_z_new
+
+        # check stopping criteria; see Section 3.3 of (Boyd et al, 2011)
+        primal_resid_norm = euclid_norm(resid)
+        dual_resid_norm = rho * euclid_norm(Mt_z_new - Mt_z)
+
+        primal_tol = np.sqrt(n_transf) * atol + \
+            rtol * max(euclid_norm(M_primal), euclid_norm(z_new))
+
+        dual_tol = np.sqrt(n_features) * atol + \
+            rtol * rho * euclid_norm(Mt_dual)
+
+        z = z_new
+        Mt_z = Mt_z_new
+
+        # possibly track history
+        if tracking_level >= 1:
+            history['primal_resid'].append(primal_resid_norm)
+            history['dual_resid'].append(dual_resid_norm)
+            history['rho'].append(rho)
+
+            history['primal_tol'].append(primal_tol)
+            history['dual_tol'].append(dual_tol)
+
+        if tracking_level >= 2:
+            history['primal'].append(primal)
+
+        if primal_resid_norm <= primal_tol and dual_resid_norm <= dual_tol:
+            break
+
+        # update rho; the scaled dual variable needs to be rescaled
+        if rho_update:
+            if primal_resid_norm >= mu * dual_resid_norm:
+                rho_new = rho * eta
+
+            elif dual_resid_norm >= mu * primal_resid_norm:
+                rho_new = rho / eta
+
+            else:
+                rho_new = rho
+
+            if rho_new != rho:
+                dual *= (rho / rho_new)
+                Mt_dual *= (rho / rho_new)
+                rho = rho_new
+                lin_sys.set_rho(rho)
+
+    #################
+    # Format output #
+    #################
+    opt_info = {'iter': it,
+                'runtime': time() - start_time,
+                'history': history,
+                'n_factorizations': lin_sys.n_factorizations
+                }
+
+    admm_data = {'dual_vars': {'z': z, 'dual': dual},
+                 'rho': rho}
+
+    return primal, admm_data, opt_info
+
+
+class LeastSquaresLinSys:
+    """
+    Represents the linear system
+
+    (X_c.T @ W @ X_c / n_samples + rho * mat.T @ mat) x = v
+
+    where W = diag(sample_weight) and X_c is the weighted column centered data matrix if there is an intercept (otherwise X_c = X). Centering profiles out the unpenalized intercept. The system is factorized once for each value of rho.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix, LinearOperator, shape (n_samples, n_features)
+        The data matrix.
+
+    mat: array-like, sparse matrix, shape (n_transf, n_features)
+        The penalty's linear transformation matrix.
+
+    sample_weight: None, array-like, shape (n_samples, )
+        (Optional) Sample weights.
+
+    fit_intercept: bool
+        Whether or not there is an unpenalized intercept.
+
+    kind: str
+        How to factorize the linear system. Must be one of ['auto', 'dense', 'sparse', 'woodbury']. If 'dense', we use a dense Cholesky decomposition. If 'sparse', we use a banded Cholesky decomposition if the system has a small bandwidth (e.g. trend filtering with X = I) and otherwise a sparse LU decomposition; this requires sparse X and mat. If 'woodbury', we apply the Woodbury identity to the rank n_samples term, which is useful when n_samples << n_features and mat.T @ mat is invertible. If 'auto', we use 'sparse' when both X and mat are sparse, 'woodbury' when n_samples < n_features and mat.T @ mat can be factorized and 'dense' otherwise.
+
+    max_bandwidth: int
+        The maximum bandwidth for which we use the banded Cholesky decomposition.
+
+    gram: None, array-like, shape (n_features, n_features)
+        (Optional) The precomputed dense Gram matrix X_c.T @ W @ X_c / n_samples e.g. from yaglm.opt.glm_loss.gram.get_gram_from_sums. Only used by the dense factorization; providing it does not change which factorization is used.
+
+    References
+    ----------
+    Golub, G.H. and Van Loan, C.F., 2013. Matrix computations. JHU press.
+    """
+    def __init__(self, X, mat, sample_weight=None, fit_intercept=True,
+                 kind='auto', max_bandwidth=20, gram=None):
+
+        assert kind in ['auto', 'dense', 'sparse', 'woodbury']
+
+        self.X = X
+        self.mat = mat
+        self.fit_intercept = fit_intercept
+        self.max_bandwidth = max_bandwidth
+        self.n_factorizations = 0
+        self.rho = None
+
+        n_samples, n_features = X.shape
+        self.n_samples = n_samples
+        self.n_features = n_features
+
+        if sample_weight is None:
+            self.sample_weight = np.ones(n_samples)
+        else:
+            self.sample_weight = np.array(sample_weight, dtype=float)
+
+        # weighted column means
+        w = self.sample_weight
+        self.weight_frac = w.sum() / n_samples
+        if fit_intercept:
+            self.X_mean = np.array(X.T @ w).reshape(-1) / w.sum()
+
+        # mat.T @ mat
+        if issparse(mat):
+            self.MtM = csc_matrix(mat.T @ mat)
+        else:
+            self.MtM = np.array(mat.T @ mat)
+
+        ###########################
+        # decide how to factorize #
+        ###########################
+        if kind == 'auto':
+            if issparse(X) and issparse(mat):
+                kind = 'sparse'
+
+            elif n_samples < n_features and \
+                    not isinstance(X, LinearOperator) and \
+                    mat.shape[0] >= n_features and \
+                    self._setup_woodbury(strict=False):
+                kind = 'woodbury'
+
+            else:
+                kind = 'dense'
+
+        if kind == 'sparse' and not (issparse(X) and issparse(mat)):
+            raise ValueError("kind='sparse' requires X and mat to be "
+                             "sparse matrices")
+
+        self.kind = kind
+
+        # only the dense factorization uses the Gram matrix
+        if kind != 'dense':
+            gram = None
+
+        #######################
+        # precompute the Gram #
+        #######################
+        if self.kind == 'dense':
+            if gram is not None:
+                self.gram = np.asarray(gram)
+            else:
+                self.gram = get_centered_gram(X=X, sample_weight=w,
+                                              X_mean=self.get_X_mean())
+
+            if issparse(self.MtM):
+                self.MtM = self.MtM.toarray()
+
+        elif self.kind == 'sparse':
+            # the uncentered Gram; we handle centering with
+            # the Sherman-Morrison formula
+            self.gram = csc_matrix(X.T @ diags(w) @ X) / n_samples
+
+        elif self.kind == 'woodbury' and not hasattr(self, 'C_'):
+            self._setup_woodbury(strict=True)
+
+    def get_X_mean(self):
+        if self.fit_intercept:
+            return self.X_mean
+        else:
+            return None
+
+    def get_Xty(self, y):
+        """
+        Computes the linear term X_c.T @ W @ y / n_samples.
+
+        Parameters
+        ----------
+        y: array-like, shape (n_samples, )
+            The response.
+
+        Output
+        ------
+        Xty: array-like, shape (n_features, )
+        """
+        w = self.sample_weight
+        Xty = np.array(self.X.T @ (w * y)).reshape(-1) / self.n_samples
+        if self.fit_intercept:
+            # X_c.T @ W @ y = X.T @ W @ y - X_mean * 1.T @ W @ y
+            Xty -= self.X_mean * (w @ y) / self.n_samples
+
+        return Xty
+
+    def get_intercept(self, coef, y):
+        """
+        Computes the intercept that minimizes the loss for a given coefficient.
+
+        Parameters
+        ----------
+        coef: array-like, shape (n_features, )
+            The coefficient.
+
+        y: array-like, shape (n_samples, )
+            The response.
+
+        Output
+        ------
+        intercept: float
+        """
+        w = self.sample_weight
+        y_mean = (w @ y) / w.sum()
+        return y_mean - self.X_mean @ coef
+
+    def get_default_rho(self):
+        """
+        Returns a default value of rho that puts the two terms of the linear system on the same scale i.e. rho = mean(diag(Gram)) / mean(diag(mat.T @ mat)).
+
+        Output
+        ------
+        rho: float
+        """
+        if self.kind == 'dense':
+            gram_diag = np.diag(self.gram)
+
+        elif self.kind == 'sparse':
+            gram_diag = self.gram.diagonal()
+            if self.fit_intercept:
+                gram_diag = gram_diag - self.weight_frac * self.X_mean ** 2
+
+        elif self.kind == 'woodbury':
+            gram_diag = (self.U ** 2).sum(axis=0)
+
+        if issparse(self.MtM):
+            MtM_diag = self.MtM.diagonal()
+        else:
+            MtM_diag = np.diag(self.MtM)
+
+        if np.mean(MtM_diag) <= 0 or np.mean(gram_diag) <= 0:
+            return 1
+
+        return np.mean(gram_diag) / np.mean(MtM_diag)
+
+    def set_rho(self, rho):
+        """
+        Factorizes the linear system if rho has changed.
+
+        Parameters
+        ----------
+        rho: float
+            The ADMM penalty parameter.
+        """
+        if self.rho is not None and rho == self.rho:
+            return
+
+        self.rho = rho
+        self.n_factorizations += 1
+
+        if self.kind == 'dense':
+            self.chol_ = cho_factor(self.gram + rho * self.MtM)
+
+        elif self.kind == 'sparse':
+            self._factorize_sparse(rho)
+
+        elif self.kind == 'woodbury':
+            self._factorize_woodbury(rho)
+
+    def solve(self, v):
+        """
+        Solves the linear system for the current value of rho.
+
+        Parameters
+        ----------
+        v: array-like, shape (n_features, )
+            The right hand side.
+
+        Output
+        ------
+        x: array-like, shape (n_features, )
+            The solution.
+        """
+        if self.kind == 'dense':
+            return cho_solve(self.chol_, v)
+
+        elif self.kind == 'sparse':
+            x = self._sparse_solve(v)
+
+            # Sherman-Morrison correction for centering
+            if self.fit_intercept:
+                x += self.sm_vec_ * (self.sm_a_ @ x) / self.sm_denom_
+
+            return x
+
+        elif self.kind == 'woodbury':
+            # (rho B + U.T U)^{-1} v
+            # = B^{-1} v / rho - C (rho I + U C)^{-1} U B^{-1} v / rho
+            # where B = mat.T @ mat and C = B^{-1} U.T
+            B_inv_v = self.MtM_lu_.solve(v)
+            return (B_inv_v - self.C_ @
+                    cho_solve(self.K_chol_, self.U @ B_inv_v)) / self.rho
+
+    def _factorize_sparse(self, rho):
+        A = csc_matrix(self.gram + rho * self.MtM)
+
+        # check the bandwidth
+        A_coo = A.tocoo()
+        bandwidth = abs(A_coo.row - A_coo.col).max() if A.nnz > 0 else 0
+
+        self.banded_ = False
+        if bandwidth <= self.max_bandwidth:
+            # upper banded storage
+            ab = np.zeros((bandwidth + 1, self.n_features))
+            for k in range(bandwidth + 1):
+                ab[bandwidth - k, k:] = A.diagonal(k)
+
+            try:
+                self.chol_ = cholesky_banded(ab, lower=False)
+                self.banded_ = True
+            except LinAlgError:
+                pass
+
+        if not self.banded_:
+            self.lu_ = splu(A, permc_spec='MMD_AT_PLUS_A')
+
+        if self.fit_intercept:
+            # (A - a a.T / s)^{-1} = A^{-1} + A^{-1} a a.T A^{-1} / (s - a.T A^{-1} a)
+            # where a = X.T @ w / n and s = sum(w) / n
+            self.sm_a_ = self.X_mean * self.weight_frac
+            self.sm_vec_ = self._sparse_solve(self.sm_a_)
+            self.sm_denom_ = self.weight_frac - self.sm_a_ @ self.sm_vec_
+
+    def _sparse_solve(self, v):
+        if self.banded_:
+            return cho_solve_banded((self.chol_, False), v)
+        else:
+            return self.lu_.solve(v)
+
+    def _setup_woodbury(self, strict=True):
+        """
+        Factorizes mat.T @ mat and computes C = (mat.T @ mat)^{-1} U.T where U = sqrt(W / n) @ X_c.
+
+        Parameters
+        ----------
+        strict: bool
+            Whether to raise an error or return False if mat.T @ mat is singular.
+
+        Output
+        ------
+        success: bool
+        """
+        try:
+            self.MtM_lu_ = splu(csc_matrix(self.MtM))
+        except RuntimeError:
+            if strict:
+                raise ValueError("mat.T @ mat is singular so the woodbury "
+                                 "factorization cannot be used; try "
+                                 "kind='dense'")
+            else:
+                return False
+
+        X_c = np.asarray(self.X)
+        if self.fit_intercept:
+            X_c = X_c - self.X_mean
+        w = self.sample_weight
+        self.U = np.sqrt(w / self.n_samples).reshape(-1, 1) * X_c
+
+        self.C_ = self.MtM_lu_.solve(np.asarray(self.U.T, order='F'))
+        return True
+
+    def _factorize_woodbury(self, rho):
+        # K = rho I + U @ C
+        K = self.U @ self.C_
+        K[np.diag_indices_from(K)] += rho
+        self.K_chol_ = cho_factor(K)
+
+
+def get_centered_gram(X, sample_weight, X_mean=None, block_size=1000):
+    """
+    Computes the dense weighted Gram matrix of the centered data matrix, X_c.T @ diag(sample_weight) @ X_c / n_samples.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix, LinearOperator, shape (n_samples, n_features)
+        The data matrix.
+
+    sample_weight: array-like, shape (n_samples, )
+        The sample weights.
+
+    X_mean: None, array-like, shape (n_features, )
+        (Optional) The weighted column means to center by.
+
+    block_size: int
+        For linear operators we compute this many columns of the Gram matrix at a time.
+
+    Output
+    ------
+    gram: array-like, shape (n_features, n_features)
+        The Gram matrix.
+    """
+    n_samples, n_features = X.shape
+    w = sample_weight
+
+    if isinstance(X, LinearOperator):
+        gram = np.zeros((n_features, n_features))
+        for left in range(0, n_features, block_size):
+            right = min(left + block_size, n_features)
+            E = np.zeros((n_features, right - left))
+            E[left:right, :] = np.eye(right - left)
+            gram[:, left:right] = X.rmatmat(w.reshape(-1, 1) * X.matmat(E))
+
+    elif issparse(X):
+        gram = (X.T @ diags(w) @ X).toarray()
+
+    else:
+        gram = X.T @ (w.reshape(-1, 1) * X)
+
+    gram /= n_samples
+
+    if X_mean is not None:
+        # X_c.T W X_c = X.T W X - sum(w) * X_mean X_mean.T
+        gram -= (w.sum() / n_samples) * np.outer(X_mean, X_mean)
+
+    return gram
@@ -1,10 +1,12 @@
 import numpy as np
 from copy import deepcopy
 from time import time
-from tqdm import tqdm
 
 from yaglm.opt.base import Zero
-from yaglm.opt.stopping import check_decreasing_loss, check_no_change
+from yaglm.opt.stopping import check_decreasing_loss, check_no_change, \
+    check_duality_gap
+from yaglm.opt.counters import CountedFunc, maybe_timer
+from yaglm.opt.utils import progress_range
 
 
 def solve_fista(smooth_func, init_val, non_smooth_func=None,
@@ -17,6 +19,9 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
                 bt_max_steps=20,
                 bt_shrink=0.5,
                 bt_grow=1.58,  # 10**.2
+                dual_gap_func=None,
+                gap_freq=10,
+                counters=None,
                 tracking_level=0,
                 verbose=False):
 
@@ -55,7 +60,7 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
         Maximum number of iterations.
 
     stop_crit: str
-        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss'].
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss', 'gap'].
 
         If stop_crit='x_max' then we use ||x_new - x_prev||_max.
 
@@ -63,6 +68,8 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
 
         If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
 
+        If stop_crit='gap' then we use the duality gap computed by dual_gap_func.
+
     tol: float, None
         Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
 
@@ -78,6 +85,15 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
     bt_grow: float, None
         (Optional) How much to grow the step size each iteraction when using backgracking.
 
+    dual_gap_func: None, callable
+        (Optional) A function that takes the current value and returns the duality gap and the primal objective value e.g. yaglm.opt.duality_gap.GlmDualityGap. If provided and either stop_crit='gap' or tracking_level >= 1, the duality gap of the solution is reported in opt_info['dual_gap'].
+
+    gap_freq: int
+        How often to check the duality gap when stop_crit='gap'. Each check requires an extra pass over the data.
+
+    counters: None, yaglm.opt.counters.OptCounters
+        (Optional) Records the number of calls to and time spent in the function evaluations, gradients, proximal operators, backtracking trials, restarts and duality gap computations.
+
     tracking_level: int
         How much data to track.
 
@@ -108,20 +124,33 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
     assert non_smooth_func.is_proximable,\
         "The non-smooth penalty must be proximable!"
 
+    # possibly count the function calls
+    if counters is not None:
+        smooth_func = CountedFunc(smooth_func, counters=counters,
+                                  kind='smooth')
+        non_smooth_func = CountedFunc(non_smooth_func, counters=counters,
+                                      kind='non_smooth')
+
+        # report these even if they never happen
+        counters.add('bt_trial', count=0)
+        counters.add('restart', count=0)
+
     # Setup update stesps
     def eval_obj(x):
         return smooth_func.eval(x) + non_smooth_func.eval(x)
 
-    def prox_grad_update(x, step):
-        return non_smooth_func.prox(x - step * smooth_func.grad(x), step)
+    def prox_grad_update(x, step, grad=None):
+        if grad is None:
+            grad = smooth_func.grad(x)
+        return non_smooth_func.prox(x - step * grad, step)
 
-    def Q(new, prev, step):
+    def Q(new, prev, step, prev_value, prev_grad):
         # equation (2.5) of (Beck and Teboulle, 2009)
         # but we drop the non_smooth_func.eval(new) term
         diff = new - prev
         diff_sq = (diff ** 2).sum()
-        return smooth_func.eval(prev) + \
-            (new - prev).ravel().T @ smooth_func.grad(prev).ravel() +\
+        return prev_value + \
+            diff.ravel().T @ prev_grad.ravel() +\
             (0.5 / step) * diff_sq  # + # non_smooth_func.eval(new)
 
     def backtracking_search(x, step, bt_iter_prev):
@@ -129,14 +158,23 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
         if bt_iter_prev == 0 and bt_grow is not None:
             step *= bt_grow  # they do this in copt
 
+        # the smooth function and its gradient at x are the same
+        # for every backtracking trial so compute them once
+        value_x, grad_x = smooth_func.eval_and_grad(x)
+
         for bt_iter in range(bt_max_steps):
-            x_new = prox_grad_update(x, step)
+            x_new = prox_grad_update(x, step, grad=grad_x)
 
-            if smooth_func.eval(x_new) <= Q(new=x_new, prev=x, step=step):
+            if smooth_func.eval(x_new) <= Q(new=x_new, prev=x, step=step,
+                                            prev_value=value_x,
+                                            prev_grad=grad_x):
                 break
             else:
                 step *= bt_shrink
 
+        if counters is not None:
+            counters.add('bt_trial', count=bt_iter + 1)
+
         return x_new, step, bt_iter
 
     # setup values
@@ -154,7 +192,15 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
     # check stopping criteria
     if tol is None:
         stop_crit = None
-    assert stop_crit is None or stop_crit in ['x_max', 'x_L2', 'loss']
+    assert stop_crit is None or stop_crit in ['x_max', 'x_L2', 'loss', 'gap']
+
+    if stop_crit == 'gap':
+        assert dual_gap_func is not None, \
+            "dual_gap_func must be provided for stop_crit='gap'"
+
+    # only pay for the final duality gap if it is asked for
+    report_gap = dual_gap_func is not None and \
+        (stop_crit == 'gap' or tracking_level >= 1)
 
     # if we are using the loss tracking criteria then track the loss
     if stop_crit == 'loss' and tracking_level == 0:
@@ -173,6 +219,9 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
         if stop_crit in ['x_max', 'x_L2']:
             history['x_diff'] = []
 
+        if stop_crit == 'gap':
+            history['dual_gap'] = []
+
     if restart:
         history['restarts'] = []
 
@@ -188,7 +237,8 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
 
     stop = False
     bt_iter = 0
-    for it in tqdm(range(int(max_iter)), disable=not verbose, desc='FISTA'):
+    gap = None
+    for it in progress_range(max_iter, verbose=verbose, desc='FISTA'):
 
         ###############
         # Update step #
@@ -216,6 +266,9 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
                     t, t_prev = 1, 1
                     history['restarts'].append(it)
 
+                    if counters is not None:
+                        counters.add('restart')
+
         elif backtracking:
             # Backtracking line search
             value, step, bt_iter = backtracking_search(value, step, bt_iter)
@@ -241,7 +294,7 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
             # check x difference stopping criterion
             stop, diff_norm = check_no_change(current=value, prev=value_prev,
                                               tol=tol, rel_crit=rel_crit,
-                                              norm=stop_crit[-3:]  # max or L2
+                                              norm=stop_crit[2:]  # max or L2
                                               )
 
             if tracking_level >= 2:
@@ -256,6 +309,22 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
                                          tol=tol, rel_crit=rel_crit,
                                          on_increase='ignore')
 
+        elif stop_crit == 'gap' and it % gap_freq == 0:
+            # the accelerated value may not be feasible so we check
+            # the proximal gradient iterate
+            current = value_aux if accel else value
+            with maybe_timer(counters, 'dual_gap'):
+                gap, primal = dual_gap_func(current)
+
+            stop = check_duality_gap(gap=gap, primal=primal,
+                                     tol=tol, rel_crit=rel_crit)
+
+            if stop:
+                value = current
+
+            if tracking_level >= 2:
+                history['dual_gap'].append(gap)
+
         # TODO: delete
         # # check x difference stopping criteria
         # x_stop, diff_norm = check_no_change(current=value,
@@ -289,4 +358,14 @@ def solve_fista(smooth_func, init_val, non_smooth_func=None,
                 'stop': stop,
                 'iter': it}
 
+    # report the duality gap of the solution
+    if report_gap:
+        if not (stop_crit == 'gap' and stop):
+            with maybe_timer(counters, 'dual_gap'):
+                gap = dual_gap_func(value)[0]
+        opt_info['dual_gap'] = gap
+
+    if counters is not None:
+        opt_info['counters'] = counters.to_dict()
+
     return value, opt_info
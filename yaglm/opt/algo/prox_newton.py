@@ -0,0 +1,416 @@
+import numpy as np
+from scipy.sparse import issparse
+from time import time
+
+from yaglm.opt.utils import progress_range
+from yaglm.opt.stopping import check_no_change, check_decreasing_loss
+
+
+def solve_prox_newton(glm_loss, init_val,
+                      lasso_pen_vals=None,
+                      ridge_pen_vals=None,
+                      max_iter=50,
+                      max_cd_epochs=1000,
+                      cd_tol=1e-7,
+                      tol=1e-6, rel_crit=False, stop_crit='x_max',
+                      ls_max_steps=20,
+                      ls_shrink=0.5,
+                      ls_suff_decr=1e-4,
+                      min_hess=1e-12,
+                      tracking_level=0,
+                      verbose=False):
+    """
+    Solves a penalized GLM problem of the form
+
+    min_{coef, intercept} glm_loss(coef, intercept) + sum_j lasso_pen_vals_j |coef_j| + 0.5 * sum_j ridge_pen_vals_j coef_j^2
+
+    with a proximal Newton algorithm (Friedman et al, 2010; Lee et al, 2014). Each outer iteration forms the second order approximation of the loss in the linear predictor using the per-sample Hessian diagonals, i.e. a weighted least squares problem, solves the penalized weighted least squares problem with cyclic coordinate descent over an active set and then takes a backtracking line search step. This is the IRLS algorithm used by glmnet.
+
+    For multiple response losses (e.g. multinomial) only the diagonal of each sample's Hessian is used so the quadratic approximation separates over the responses; the line search guarantees descent.
+
+    Parameters
+    ----------
+    glm_loss: yaglm.opt.glm_loss.base.Glm
+        The GLM loss function. The input loss must implement hess_diag() and the data matrix X must be a numpy array or a scipy sparse matrix.
+
+    init_val: array-like
+        The value to initialize from; the intercept is the first entry/row if glm_loss.fit_intercept is True.
+
+    lasso_pen_vals: None, array-like, shape coef_shape
+        (Optional) The entrywise lasso penalty values.
+
+    ridge_pen_vals: None, array-like, shape coef_shape
+        (Optional) The entrywise ridge penalty values.
+
+    max_iter: int
+        Maximum number of (outer) Newton iterations.
+
+    max_cd_epochs: int
+        Maximum number of coordinate descent sweeps for each weighted least squares subproblem.
+
+    cd_tol: float
+        Tolerance for the coordinate descent subproblems. A subproblem is solved when a coordinate descent sweep changes no entry by more than cd_tol i.e. max_j |coef_j_new - coef_j_prev| <= cd_tol. This should be smaller than tol.
+
+    stop_crit: str
+        Which stopping criterion to use for the outer iterations. Must be one of ['x_max', 'x_L2', 'loss'].
+
+        If stop_crit='x_max' then we use ||x_new - x_prev||_max.
+
+        If stop_crit='x_L2' then we use ||x_new - x_prev||_2.
+
+        If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    ls_max_steps: int
+        Maximum number of backtracking line search steps.
+
+    ls_shrink: float
+        How much to shrink the step in each line search step. Should lie strictly in the unit interval.
+
+    ls_suff_decr: float
+        The sufficient decrease parameter for the Armijo line search.
+
+    min_hess: float
+        Lower bound on the Hessian diagonals; avoids zero weights e.g. for saturated logistic predictions.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an iteration progress bar.
+
+    Output
+    ------
+    value: array-like
+        The solution.
+
+    opt_info: dict
+        Additional optimization data e.g. loss history, number of coordinate descent epochs etc.
+
+    References
+    ----------
+    Friedman, J., Hastie, T. and Tibshirani, R., 2010. Regularization paths for generalized linear models via coordinate descent. Journal of statistical software, 33(1), p.1.
+
+    Lee, J.D., Sun, Y. and Saunders, M.A., 2014. Proximal Newton-type methods for minimizing composite functions. SIAM Journal on Optimization, 24(3), pp.1420-1443.
+    """
+    start_time = time()
+
+    X = glm_loss.X
+    fit_intercept = glm_loss.fit_intercept
+    var_shape = glm_loss.var_shape_
+    n_features = X.shape[1]
+
+    if issparse(X):
+        X = X.tocsc()
+        X_sq = X.multiply(X)
+    else:
+        X_sq = X ** 2
+
+    ###########################
+    # Setup penalty functions #
+    ###########################
+    # work with coefficient matrices of shape (n_features, n_responses)
+    def to_mat(vals):
+        if vals is None:
+            vals = 0
+        vals = np.array(vals, dtype=float) * np.ones(glm_loss.coef_shape_)
+        return vals.reshape(n_features, -1)
+
+    lasso_pen_vals = to_mat(lasso_pen_vals)
+    ridge_pen_vals = to_mat(ridge_pen_vals)
+
+    def split(x):
+        x = np.array(x, dtype=float).reshape(var_shape)
+        if x.ndim == 1:
+            x = x.reshape(-1, 1)
+
+        if fit_intercept:
+            return x[1:, :].copy(), x[0, :].copy()
+        else:
+            return x.copy(), np.zeros(x.shape[1])
+
+    def cat(coef, intercept):
+        if fit_intercept:
+            x = np.vstack([intercept.reshape(1, -1), coef])
+        else:
+            x = coef
+        return x.reshape(var_shape)
+
+    def eval_pen(coef):
+        return (lasso_pen_vals * abs(coef)).sum() + \
+            0.5 * (ridge_pen_vals * coef ** 2).sum()
+
+    def to_cols(z):
+        return z.reshape(z.shape[0], -1)
+
+    ##############
+    # Setup data #
+    ##############
+    value = np.array(init_val, dtype=float).reshape(var_shape)
+    value_prev = value.copy()
+
+    z = to_cols(glm_loss.get_z(value))
+    loss_val = glm_loss.glm_loss.eval(z.reshape(glm_loss.y.shape))
+    obj_val = loss_val + eval_pen(split(value)[0])
+
+    # check stopping criteria
+    if tol is None:
+        stop_crit = None
+    assert stop_crit is None or stop_crit in ['x_max', 'x_L2', 'loss']
+
+    history = {}
+    if tracking_level >= 1:
+        history['objective'] = [obj_val]
+        history['cd_epochs'] = []
+        history['ls_step'] = []
+
+    if tracking_level >= 2 and stop_crit in ['x_max', 'x_L2']:
+        history['x_diff'] = []
+
+    n_cd_epochs_total = 0
+    stop = False
+    for it in progress_range(max_iter, verbose=verbose):
+
+        ###############################
+        # Quadratic approx of loss(z) #
+        ###############################
+        z_shape = glm_loss.y.shape
+        sample_grads = to_cols(glm_loss.glm_loss.grad(z.reshape(z_shape)))
+        hess = to_cols(glm_loss.glm_loss.hess_diag(z.reshape(z_shape)))
+        hess = np.maximum(np.asarray(hess, dtype=float), min_hess)
+        sample_grads = np.asarray(sample_grads, dtype=float)
+
+        # curvature of each coordinate in the quadratic approximation
+        coord_curv = np.asarray(X_sq.T @ hess).reshape(n_features, -1)
+
+        ############################################
+        # Penalized weighted least squares with CD #
+        ############################################
+        coef, intercept = split(value)
+        coef_new = coef.copy()
+        intercept_new = intercept.copy()
+        n_epochs_this = 0
+
+        for k in range(coef.shape[1]):
+            n_epochs = _wls_coord_desc(X=X,
+                                       hess=hess[:, k],
+                                       sample_grads=sample_grads[:, k],
+                                       coef=coef_new[:, k],
+                                       intercept=intercept_new[k:k + 1],
+                                       curv=coord_curv[:, k],
+                                       lasso_pen_vals=lasso_pen_vals[:, k],
+                                       ridge_pen_vals=ridge_pen_vals[:, k],
+                                       fit_intercept=fit_intercept,
+                                       max_epochs=max_cd_epochs,
+                                       tol=cd_tol)
+            n_epochs_this = max(n_epochs_this, n_epochs)
+
+        n_cd_epochs_total += n_epochs_this
+
+        ###############
+        # Line search #
+        ###############
+        value_prox = cat(coef_new, intercept_new)
+        z_prox = to_cols(glm_loss.get_z(value_prox))
+
+        # predicted decrease of the objective
+        dz = z_prox - z
+        pen_val_cur = eval_pen(coef)
+        decr = (sample_grads * dz).sum() + eval_pen(coef_new) - pen_val_cur
+
+        step = 1
+        for _ in range(int(ls_max_steps)):
+            z_new = z + step * dz
+            coef_step = coef + step * (coef_new - coef)
+            loss_new = glm_loss.glm_loss.eval(z_new.reshape(z_shape))
+            obj_new = loss_new + eval_pen(coef_step)
+
+            if obj_new <= obj_val + ls_suff_decr * step * min(decr, 0):
+                break
+            step *= ls_shrink
+
+        # take step
+        value = value + step * (value_prox - value)
+        z = z_new
+        obj_prev = obj_val
+        obj_val = obj_new
+
+        # possibly track data
+        if tracking_level >= 1:
+            history['objective'].append(obj_val)
+            history['cd_epochs'].append(n_epochs_this)
+            history['ls_step'].append(step)
+
+        #####################
+        # Stopping criteria #
+        #####################
+        if stop_crit in ['x_max', 'x_L2']:
+
+            norm = 'max' if stop_crit == 'x_max' else 'L2'
+            stop, diff_norm = check_no_change(current=value, prev=value_prev,
+                                              tol=tol, rel_crit=rel_crit,
+                                              norm=norm)
+
+            if tracking_level >= 2:
+                history['x_diff'].append(diff_norm)
+
+        elif stop_crit == 'loss':
+            stop = check_decreasing_loss(current=obj_val, prev=obj_prev,
+                                         tol=tol, rel_crit=rel_crit,
+                                         on_increase='ignore')
+
+        if stop:
+            break
+        else:
+            value_prev = value.copy()
+
+    opt_info = {'runtime': time() - start_time,
+                'history': history,
+                'stop_crit': stop_crit,
+                'stop': stop,
+                'iter': it,
+                'n_cd_epochs': n_cd_epochs_total}
+
+    return value, opt_info
+
+
+def _wls_coord_desc(X, hess, sample_grads, coef, intercept, curv,
+                    lasso_pen_vals, ridge_pen_vals,
+                    fit_intercept=True, max_epochs=1000, tol=1e-7):
+    """
+    Cyclic coordinate descent for the penalized weighted least squares problem
+
+    min_{coef, intercept} g^T d + 0.5 * sum_i hess_i d_i^2 + sum_j lasso_pen_vals_j |coef_j| + 0.5 * sum_j ridge_pen_vals_j coef_j^2
+
+    where d = X (coef - coef_0) + (intercept - intercept_0). Following glmnet we alternate between full sweeps and sweeps over the active set and use "covariance updates" i.e. we track the coordinate gradients X^T (g + hess * d) and update them with the columns of the weighted Gram matrix X^T diag(hess) X. The Gram matrix columns are only computed for coordinates that become non-zero so the sweeps do not need to pass over X. The coefficient and intercept are updated in place.
+
+    Parameters
+    ----------
+    X: array-like or scipy.sparse.csc_matrix, shape (n_samples, n_features)
+        The data matrix.
+
+    hess: array-like, shape (n_samples, )
+        The sample weights of the quadratic approximation.
+
+    sample_grads: array-like, shape (n_samples, )
+        The gradient of the loss with respect to the linear predictor, g.
+
+    coef: array-like, shape (n_features, )
+        The coefficient; updated in place.
+
+    intercept: array-like, shape (1, )
+        The intercept; updated in place.
+
+    curv: array-like, shape (n_features, )
+        The coordinate curvatures sum_i hess_i X_ij^2.
+
+    lasso_pen_vals, ridge_pen_vals: array-like, shape (n_features, )
+        The entrywise penalty values.
+
+    fit_intercept: bool
+        Whether or not to update the intercept.
+
+    max_epochs: int
+        Maximum number of sweeps.
+
+    tol: float
+        Stop when a sweep changes no coefficient (or the intercept) by more than tol i.e. max_j |coef_j_new - coef_j_prev| <= tol.
+
+    Output
+    ------
+    n_epochs: int
+        The number of sweeps.
+    """
+    is_sp = issparse(X)
+    denoms = curv + ridge_pen_vals
+    all_idxs = list(range(X.shape[1]))
+
+    # gradients of the quadratic approximation with respect to the
+    # coordinates and the intercept
+    coord_grads = np.asarray(X.T @ sample_grads).ravel()
+    inter_grad = sample_grads.sum()
+
+    # for intercept updates
+    X_T_hess = np.asarray(X.T @ hess).ravel()
+    hess_sum = hess.sum()
+
+    # cache of weighted Gram matrix columns
+    gram_cols = {}
+
+    def get_gram_col(j):
+        if j not in gram_cols:
+            if is_sp:
+                col = X[:, j].toarray().ravel()
+            else:
+                col = X[:, j]
+            gram_cols[j] = np.asarray(X.T @ (hess * col)).ravel()
+
+        return gram_cols[j]
+
+    def update_intercept():
+        nonlocal inter_grad
+        if fit_intercept and hess_sum > 0:
+            delta = - inter_grad / hess_sum
+            intercept[0] += delta
+            coord_grads[:] += delta * X_T_hess
+            inter_grad = 0
+            return abs(delta)
+        return 0
+
+    # python floats are much faster than numpy scalars in the loop below
+    _curv = curv.tolist()
+    _denoms = denoms.tolist()
+    _thresh = lasso_pen_vals.tolist()
+
+    def sweep(idxs):
+        nonlocal inter_grad
+        max_change = 0
+        for j in idxs:
+            if _denoms[j] <= 0:
+                continue
+
+            # soft-thresholding update
+            old = coef[j]
+            val = _curv[j] * old - coord_grads[j]
+            if val > _thresh[j]:
+                new = (val - _thresh[j]) / _denoms[j]
+            elif val < - _thresh[j]:
+                new = (val + _thresh[j]) / _denoms[j]
+            else:
+                new = 0.
+
+            delta = new - old
+            if delta != 0:
+                coef[j] = new
+                coord_grads[:] += delta * get_gram_col(j)
+                inter_grad += delta * X_T_hess[j]
+                max_change = max(max_change, abs(delta))
+
+        return max(max_change, update_intercept())
+
+    update_intercept()
+    full_sweep = True
+    for epoch in range(int(max_epochs)):
+
+        if full_sweep:
+            max_change = sweep(all_idxs)
+            if max_change <= tol:
+                break
+
+            # now work on the active set
+            full_sweep = False
+
+        else:
+            active = np.where(coef != 0)[0].tolist()
+            max_change = sweep(active)
+
+            # once the active set converges check all the coordinates
+            if max_change <= tol:
+                full_sweep = True
+
+    return epoch + 1
@@ -0,0 +1,263 @@
+import numpy as np
+from time import time
+from sklearn.utils import check_random_state
+
+from yaglm.opt.base import Zero
+from yaglm.opt.utils import progress_range
+from yaglm.opt.stopping import check_decreasing_loss, check_no_change
+
+
+def solve_stochastic_prox_grad(glm_loss, init_val,
+                               smooth_pen=None,
+                               non_smooth_func=None,
+                               method='saga',
+                               step='lip',
+                               batch_size=1,
+                               max_epochs=100,
+                               tol=1e-5, rel_crit=False, stop_crit='x_max',
+                               random_state=None,
+                               tracking_level=0,
+                               verbose=False):
+    """
+    Solves an optimization problem of the form
+
+    min_x glm_loss(x) + smooth_pen(x) + non_smooth_func(x)
+
+    with a stochastic proximal gradient algorithm that only computes the gradient of the GLM loss on a (mini) batch of samples at each step. Available algorithms are SAGA (Defazio et al, 2014), prox-SVRG (Xiao and Zhang, 2014) and the plain mini-batch proximal stochastic gradient method. The smooth penalty's gradient is computed exactly at every step.
+
+    Parameters
+    ----------
+    glm_loss: yaglm.opt.glm_loss.base.Glm
+        The GLM loss function. This must implement get_z_rows(), grad_from_sample_grads() and have a glm_loss attribute implementing batch_grads().
+
+    init_val: array-like
+        The value to initialize from.
+
+    smooth_pen: None, yaglm.opt.base.Func
+        (Optional) A smooth penalty whose full gradient is computed at each step.
+
+    non_smooth_func: None, yaglm.opt.base.Func
+        (Optional) The non-smooth part of the objective, which must be proximable.
+
+    method: str
+        Which algorithm to use. Must be one of ['saga', 'svrg', 'sgd'].
+
+    step: float, 'lip'
+        The step size. If step='lip' then we use 1 / (3 * L) for SAGA, 1 / (4 * L) for SVRG and 1 / L for SGD where L is the largest per-sample gradient Lipschitz constant. For SGD the step size decays like step / sqrt(epoch + 1).
+
+    batch_size: int
+        Number of samples in each batch.
+
+    max_epochs: int
+        Maximum number of passes over the data.
+
+    stop_crit: str
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss']. The criterion is checked after every epoch.
+
+        If stop_crit='x_max' then we use ||x_new - x_prev||_max.
+
+        If stop_crit='x_L2' then we use ||x_new - x_prev||_2.
+
+        If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    random_state: None, int, np.random.RandomState
+        The seed for sampling the batches.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an epoch progress bar.
+
+    Output
+    ------
+    value: array-like
+        The solution.
+
+    opt_info: dict
+        Additional optimization data e.g. loss history, etc.
+
+    References
+    ----------
+    Defazio, A., Bach, F. and Lacoste-Julien, S., 2014. SAGA: A fast incremental gradient method with support for non-strongly convex composite objectives. In Advances in neural information processing systems (pp. 1646-1654).
+
+    Xiao, L. and Zhang, T., 2014. A proximal stochastic gradient method with progressive variance reduction. SIAM Journal on Optimization, 24(4), pp.2057-2075.
+    """
+    start_time = time()
+    assert method in ['saga', 'svrg', 'sgd']
+
+    # if there is no non_smooth function then this is just the zero function
+    if non_smooth_func is None:
+        non_smooth_func = Zero()
+
+    assert non_smooth_func.is_proximable,\
+        "The non-smooth penalty must be proximable!"
+
+    rng = check_random_state(random_state)
+    n_samples = glm_loss.glm_loss.n_samples
+    batch_size = int(min(batch_size, n_samples))
+    n_batches = int(np.ceil(n_samples / batch_size))
+
+    ##############
+    # Step sizes #
+    ##############
+    if step == 'lip':
+        lip = glm_loss.sample_grad_lip
+        assert lip is not None,\
+            "Per-sample Lipchitz constant not available for the loss. "\
+            "Please manually specify a numeric step size."
+
+        if smooth_pen is not None:
+            assert smooth_pen.grad_lip is not None
+            lip += smooth_pen.grad_lip
+
+        if method == 'saga':
+            step = 1 / (3 * lip)
+        elif method == 'svrg':
+            step = 1 / (4 * lip)
+        else:
+            step = 1 / lip
+
+    ##################
+    # Gradient setup #
+    ##################
+
+    def eval_obj(x):
+        obj = glm_loss.eval(x) + non_smooth_func.eval(x)
+        if smooth_pen is not None:
+            obj += smooth_pen.eval(x)
+        return obj
+
+    def batch_sample_grads(x, idxs):
+        return glm_loss.glm_loss.\
+            batch_grads(z=glm_loss.get_z_rows(x, idxs), idxs=idxs)
+
+    def full_sample_grads(x):
+        return glm_loss.glm_loss.\
+            batch_grads(z=glm_loss.get_z(x), idxs=slice(None))
+
+    def add_smooth_pen_grad(g, x):
+        if smooth_pen is None:
+            return g
+        else:
+            return g + smooth_pen.grad(x)
+
+    ###############
+    # Setup values #
+    ###############
+    value = np.array(init_val, dtype=float)
+    value_prev = value.copy()
+
+    if method == 'saga':
+        # table of the most recent sample gradients and their average
+        grad_table = full_sample_grads(value)
+        grad_table_avg = glm_loss.grad_from_sample_grads(grad_table) / \
+            n_samples
+
+    # check stopping criteria
+    if tol is None:
+        stop_crit = None
+    assert stop_crit is None or stop_crit in ['x_max', 'x_L2', 'loss']
+
+    # if we are using the loss tracking criteria then track the loss
+    if stop_crit == 'loss' and tracking_level == 0:
+        tracking_level = 1
+
+    history = {}
+    if tracking_level >= 1:
+        history['objective'] = [eval_obj(value)]
+
+    if tracking_level >= 2 and stop_crit in ['x_max', 'x_L2']:
+        history['x_diff'] = []
+
+    stop = False
+    for epoch in progress_range(max_epochs, verbose=verbose,
+                                desc=method.upper()):
+
+        if method == 'svrg':
+            # full gradient at the snapshot
+            snapshot = value.copy()
+            snapshot_grad = glm_loss.grad_from_sample_grads(
+                full_sample_grads(snapshot)) / n_samples
+
+        if method == 'sgd':
+            epoch_step = step / np.sqrt(epoch + 1)
+        else:
+            epoch_step = step
+
+        perm = rng.permutation(n_samples)
+        for b in range(n_batches):
+            idxs = perm[b * batch_size:(b + 1) * batch_size]
+
+            sample_grads = batch_sample_grads(value, idxs)
+
+            if method == 'saga':
+                diff = sample_grads - grad_table[idxs]
+                diff_grad = glm_loss.grad_from_sample_grads(diff, idxs)
+
+                direction = diff_grad / len(idxs) + grad_table_avg
+
+                # update the gradient table
+                grad_table_avg = grad_table_avg + diff_grad / n_samples
+                grad_table[idxs] = sample_grads
+
+            elif method == 'svrg':
+                diff = sample_grads - batch_sample_grads(snapshot, idxs)
+                direction = glm_loss.grad_from_sample_grads(diff, idxs) / \
+                    len(idxs) + snapshot_grad
+
+            else:
+                direction = glm_loss.\
+                    grad_from_sample_grads(sample_grads, idxs) / len(idxs)
+
+            direction = add_smooth_pen_grad(direction, value)
+
+            value = non_smooth_func.prox(value - epoch_step * direction,
+                                         epoch_step)
+
+        # possibly track data
+        if tracking_level >= 1:
+            history['objective'].append(eval_obj(value))
+
+        #####################
+        # Stopping criteria #
+        #####################
+        if stop_crit in ['x_max', 'x_L2']:
+
+            # check x difference stopping criterion
+            norm = 'max' if stop_crit == 'x_max' else 'L2'
+            stop, diff_norm = check_no_change(current=value, prev=value_prev,
+                                              tol=tol, rel_crit=rel_crit,
+                                              norm=norm)
+
+            if tracking_level >= 2:
+                history['x_diff'].append(diff_norm)
+
+        elif stop_crit == 'loss':
+            current = history['objective'][-1]
+            prev = history['objective'][-2]
+
+            # check loss change criterion
+            stop = check_decreasing_loss(current=current, prev=prev,
+                                         tol=tol, rel_crit=rel_crit,
+                                         on_increase='ignore')
+
+        if stop:
+            break
+        else:
+            value_prev = value.copy()
+
+    opt_info = {'runtime': time() - start_time,
+                'history': history,
+                'stop_crit': stop_crit,
+                'stop': stop,
+                'step': step,
+                'iter': epoch}
+
+    return value, opt_info
@@ -1,10 +1,13 @@
 from copy import deepcopy
-from scipy.sparse import diags
+from scipy.sparse import issparse
+from scipy.sparse.linalg import LinearOperator
 import numpy as np
 from time import time
 
 from yaglm.linalg_utils import leading_sval, euclid_norm
 from yaglm.opt.base import Zero
+from yaglm.opt.counters import CountedFunc, maybe_timer
+from yaglm.sparse_utils import HStacked, InterceptAugmented
 
 # TODO: handle matrix shaped parameters
 # TODO: allow A1 and or A2 to be None for the identity
@@ -19,6 +22,10 @@ def solve(g1, g2, A1, A2,
           eta=2,
           mu=10,
           max_iter=1000,
+          dual_gap_func=None,
+          gap_tol=None,
+          gap_freq=10,
+          counters=None,
           tracking_level=0
           ):
     """
@@ -46,9 +53,10 @@ def solve(g1, g2, A1, A2,
         has shape (n_row(A_2), ).
 
     D_mat: str, yaglm.addm.addm.DMatrix
-        The D matrix. If str, must be one of ['prop_id', 'diag'].
-        If 'prop_id' then D will be ||A||_op * I_d.
-        If 'diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d |A^TA|_{ij}.
+        The D matrix. If str, must be one of ['prop_id', 'diag', 'abs_diag'].
+        If 'prop_id' then D will be ||A||_op^2 * I_d.
+        If 'diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d |A^TA|_{ij}; this is computed one block of columns at a time.
+        If 'abs_diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d (|A|^T|A|)_{ij}, which upper bounds the 'diag' option and can be computed in O(nnz(A)) operations.
 
     rho: float
         The ADMM penalty parameter.
@@ -68,6 +76,18 @@ def solve(g1, g2, A1, A2,
     max_iter: int
         Maximum number of iterations.
 
+    dual_gap_func: None, callable
+        (Optional) A function that takes the primal variable and returns the duality gap and the primal objective value of the original problem e.g. yaglm.opt.duality_gap.GlmDualityGap. If provided and either gap_tol is provided or tracking_level >= 1, the duality gap of the solution is reported in opt_info['dual_gap'].
+
+    gap_tol: None, float
+        (Optional) Also stop if the duality gap falls below this value. Requires dual_gap_func.
+
+    gap_freq: int
+        How often to check the duality gap when gap_tol is provided.
+
+    counters: None, yaglm.opt.counters.OptCounters
+        (Optional) Records the number of calls to and time spent in the products with A1/A2, the proximal operators of g1/g2, the D matrix setup and the duality gap computations.
+
     tracking_level: int
         How much data to track.
 
@@ -102,55 +122,66 @@ def solve(g1, g2, A1, A2,
     g1 = Zero() if g1 is None else g1
     g2 = Zero() if g2 is None else g2
 
+    # possibly count the function calls
+    if counters is not None:
+        g1 = CountedFunc(g1, counters=counters, kind='g1')
+        g2 = CountedFunc(g2, counters=counters, kind='g2')
+
+    # represent A = [A1; A2] lazily to avoid copying
+    A_mat = AMat(A1=A1, A2=A2, counters=counters)
+
     ########################
     # initialize variables #
     ########################
-    # primal = np.zeros(d)
-    # dual_1 = np.zeros(n_row_1)
-    # dual_1_bar = np.zeros(n_row_1)
-    # dual_2 = np.zeros(n_row_2)
-    # dual_2_bar = np.zeros(n_row_2)
+    # we carry the products A @ primal, A.T @ dual and A.T @ dual_bar
+    # across iterations so each iteration only needs one product with A
+    # and two products with A.T
 
     if primal_init is None:
         primal = np.zeros(d)
     else:
         primal = deepcopy(primal_init)
 
+    A_primal = A_mat.A_prod(primal)
+
     # dual variables
     if dual_init is not None:
         dual_1, dual_2 = dual_init[0]
         dual_1_bar, dual_2_bar = dual_init[1]
 
+        dual_cat = np.concatenate([dual_1, dual_2])
+        At_dual = A_mat.At_prod(dual_cat)
+        At_dual_bar = A_mat.At_prod(np.concatenate([dual_1_bar,
+                                                    dual_2_bar]))
+
     else:
         # technically this initializes from 0 and takes one ADMM step
-        dual_1 = g1.prox(rho * A1 @ primal, step=rho)
-        dual_2 = g2.prox(rho * A2 @ primal, step=rho)
+        dual_1 = g1.prox(rho * A_primal[:n_row_1], step=rho)
+        dual_2 = g2.prox(rho * A_primal[n_row_1:], step=rho)
 
-        dual_1_bar = 2 * dual_1
-        dual_2_bar = 2 * dual_2
+        dual_cat = np.concatenate([dual_1, dual_2])
+        At_dual = A_mat.At_prod(dual_cat)
+
+        # dual_bar = 2 * dual
+        At_dual_bar = 2 * At_dual
 
     # make sure we have correct shapes
     assert dual_1.shape[0] == n_row_1
     assert dual_2.shape[0] == n_row_2
 
-    dual_cat = np.concatenate([dual_1, dual_2])
-    dual_cat_prev = deepcopy(dual_cat)
-
-    #################################
-    # setup D matrix and A matrices #
-    #################################
+    ####################
+    # setup D matrices #
+    ####################
 
     if D_mat == 'prop_id':
         D_mat = DMatrixPropId()
     elif D_mat == 'diag':
         D_mat = DMatrixDiag()
+    elif D_mat == 'abs_diag':
+        D_mat = DMatrixAbsDiag()
 
-    D_mat.setup(A1=A1, A2=A2)
-
-    # Other setup
-    # TODO: represent this lazily to avoid copying
-    # A = np.vstack([A1, A2])
-    A_mat = AMat(A1=A1, A2=A2)
+    with maybe_timer(counters, 'D_mat_setup'):
+        D_mat.setup(A1=A1, A2=A2)
 
     ##########################
     # setup history tracking #
@@ -167,35 +198,49 @@ def solve(g1, g2, A1, A2,
     if tracking_level >= 2:
         history['primal'] = [primal]
 
+    use_gap = gap_tol is not None
+    if use_gap:
+        assert dual_gap_func is not None, \
+            "dual_gap_func must be provided for gap_tol"
+
+        if tracking_level >= 1:
+            history['dual_gap'] = []
+
+    gap = None
     for it in range(int(max_iter)):
 
         # primal update
-        primal_new = primal - \
-            (1 / rho) * D_mat.inv_prod(A1.T @ dual_1_bar + A2.T @ dual_2_bar)
+        primal_new = primal - (1 / rho) * D_mat.inv_prod(At_dual_bar)
+        A_primal_new = A_mat.A_prod(primal_new)
 
         # update dual variables
-        dual_1_new = g1.conj_prox(rho * (A1 @ primal_new) + dual_1, step=rho)
-        dual_2_new = g2.conj_prox(rho * (A2 @ primal_new) + dual_2, step=rho)
+        dual_1_new = g1.conj_prox(rho * A_primal_new[:n_row_1] + dual_1,
+                                  step=rho)
+        dual_2_new = g2.conj_prox(rho * A_primal_new[n_row_1:] + dual_2,
+                                  step=rho)
 
         dual_1_bar_new = 2 * dual_1_new - dual_1
         dual_2_bar_new = 2 * dual_2_new - dual_2
 
-        # check stopping
         dual_cat_new = np.concatenate([dual_1_new, dual_2_new])
+        At_dual_new = A_mat.At_prod(dual_cat_new)
+
+        # check stopping
         primal_resid_norm = euclid_norm(dual_cat_new - dual_cat) / rho
 
-        dual_resid = rho * A_mat.AtA_prod(primal_new - primal) + \
-            A_mat.At_prod(2 * dual_cat - dual_cat_prev - dual_cat_new)
+        # rho * A.T @ A @ (primal_new - primal) + A.T @ (dual_bar - dual_new)
+        dual_resid = rho * A_mat.At_prod(A_primal_new - A_primal) + \
+            At_dual_bar - At_dual_new
 
         dual_resid_norm = euclid_norm(dual_resid)
 
         # check stopping criteria
         # TODO: the relative part is not quite right, but I can't quite tell what it should be from the paper. Probably need to stare at it longer
         primal_tol = np.sqrt(A_mat.shape[0]) * atol + \
-            rtol * euclid_norm(A_mat.A_prod(primal))
+            rtol * euclid_norm(A_primal)
 
         dual_tol = np.sqrt(A_mat.shape[1]) * atol + \
-            rtol * euclid_norm(A_mat.At_prod(dual_cat))
+            rtol * euclid_norm(At_dual)
 
         # possibly track history
         if tracking_level >= 1:
@@ -214,14 +259,27 @@ def solve(g1, g2, A1, A2,
         if primal_resid_norm <= primal_tol and dual_resid_norm <= dual_tol:
             break
 
+        # check duality gap of the original problem
+        if use_gap and it % gap_freq == 0:
+            with maybe_timer(counters, 'dual_gap'):
+                gap = dual_gap_func(primal_new)[0]
+
+            if tracking_level >= 1:
+                history['dual_gap'].append(gap)
+
+            if gap <= gap_tol:
+                break
+            else:
+                gap = None
+
         # update variables if not stopping
         primal = primal_new
+        A_primal = A_primal_new
         dual_1 = dual_1_new
         dual_2 = dual_2_new
-        dual_cat_prev = deepcopy(dual_cat)
         dual_cat = dual_cat_new
-        dual_1_bar = dual_1_bar_new
-        dual_2_bar = dual_2_bar_new
+        At_dual_bar = 2 * At_dual_new - At_dual
+        At_dual = At_dual_new
 
         # update rho
         # TODO: dont do every iteration
@@ -243,6 +301,17 @@ def solve(g1, g2, A1, A2,
                 'history': history
                 }
 
+    # report the duality gap of the solution; only pay for it if it is
+    # asked for
+    if dual_gap_func is not None and (use_gap or tracking_level >= 1):
+        if gap is None:
+            with maybe_timer(counters, 'dual_gap'):
+                gap = dual_gap_func(primal_new)[0]
+        opt_info['dual_gap'] = gap
+
+    if counters is not None:
+        opt_info['counters'] = counters.to_dict()
+
     # other data
     admm_data = {'dual_vars': [[dual_1_new, dual_2_new],
                                [dual_1_bar_new, dual_2_bar_new]],
@@ -332,9 +401,14 @@ class DMatrixPropId(DMatrix):
         ------
         self
         """
-        AtA = A1.T @ A1 + A2.T @ A2
-        self.sval_sq = leading_sval(AtA) ** 2
-        # self.val = leading_sval(A1) + leading_sval(A2)
+        # compute ||A||_op without forming A.T @ A
+        A_mat = AMat(A1=A1, A2=A2)
+        if A_mat.shape[1] == 1:
+            self.sval_sq = A_mat.At_prod(A_mat.A_prod(np.ones(1))).item()
+        elif A_mat.shape[0] == 1:
+            self.sval_sq = A_mat.A_prod(A_mat.At_prod(np.ones(1))).item()
+        else:
+            self.sval_sq = leading_sval(A_mat) ** 2
 
     def inv_prod(self, v):
         """
@@ -353,8 +427,16 @@ class DMatrixPropId(DMatrix):
 
 class DMatrixDiag(DMatrix):
     """
-    Represents the diagonal matrix whose diagonal elements are given by sum_{j=1}^d |A^TA|_{ij}.
+    Represents the diagonal matrix whose diagonal elements are given by sum_{j=1}^d |A^TA|_{ij}. The columns of A^TA are computed one block at a time so we never store the d x d matrix A^TA.
+
+    Parameters
+    ----------
+    max_block_entries: int
+        The maximum number of entries of A^TA to compute at once.
     """
+    def __init__(self, max_block_entries=int(1e7)):
+        self.max_block_entries = max_block_entries
+
     def setup(self, A1, A2):
         """
         Sets up the D matrix from the A1, A2 matrices.
@@ -368,11 +450,9 @@ class DMatrixDiag(DMatrix):
         ------
         self
         """
-        AtA = A1.T @ A1 + A2.T @ A2
-        row_sums = abs(AtA).sum(axis=1)
-        row_sums = np.array(row_sums).reshape(-1)  # annoying issue with sparse matrices
-
-        self.diag_mat_inv = diags(1 / row_sums)
+        row_sums = gram_abs_row_sums(A1, A2,
+                                     max_block_entries=self.max_block_entries)
+        self.diag_inv = safe_inv(row_sums)
 
     def inv_prod(self, v):
         """
@@ -386,7 +466,32 @@ class DMatrixDiag(DMatrix):
         ------
         D^{-1} v
         """
-        return self.diag_mat_inv @ v
+        return self.diag_inv * v
+
+
+class DMatrixAbsDiag(DMatrixDiag):
+    """
+    Represents the diagonal matrix whose diagonal elements are given by sum_{j=1}^d (|A|^T|A|)_{ij}. This upper bounds the row sums of |A^TA| and can be computed in O(nnz(A)) operations without forming A^TA, which makes it suitable for very wide problems. Since D - A^TA is diagonally dominant, D - A^TA is positive semi-definite.
+
+    Note this bound may be loose when A has many entries of mixed signs (e.g. a dense data matrix) in which case ADMM may take more iterations than with DMatrixDiag.
+    """
+    def __init__(self): pass
+
+    def setup(self, A1, A2):
+        """
+        Sets up the D matrix from the A1, A2 matrices.
+
+        Parameters
+        ----------
+        A1, A2: array-like
+            The two matrices in the objective function.
+
+        Output
+        ------
+        self
+        """
+        row_sums = abs_gram_row_sums(A1) + abs_gram_row_sums(A2)
+        self.diag_inv = safe_inv(row_sums)
 
 
 class DMatrixAtA(DMatrix):
@@ -406,7 +511,7 @@ class DMatrixAtA(DMatrix):
         ------
         self
         """
-        A = np.vstack([A1, A2])
+        A = np.vstack([_to_dense(A1), _to_dense(A2)])
         self.AtA_inv = np.linalg.pinv(A.T @ A)
 
     def inv_prod(self, v):
@@ -424,9 +529,9 @@ class DMatrixAtA(DMatrix):
         return self.AtA_inv @ v
 
 
-class AMat:
+class AMat(LinearOperator):
     """
-    Represents the vertical concatenation of two matrices.
+    Represents the vertical concatenation of two matrices without copying them.
 
     Parameters
     ----------
@@ -436,52 +541,19 @@ class AMat:
     A2: array-like, (n_rows_2, n_cols)
         The second matrix.
 
-    explicit_AtA: str, bool
-        Whether or not to explicitly compute A.T @ A, which may save computational time but will take more memory. If default, will explicitly compute this if the number of columns significantly exceedds the number of rows.
+    counters: None, yaglm.opt.counters.OptCounters
+        (Optional) Records the products with A and A.T as 'matvec'.
     """
 
-    def __init__(self, A1, A2, explicit_AtA='default'):
+    def __init__(self, A1, A2, counters=None):
         self.A1 = A1
         self.A2 = A2
+        self.counters = counters
 
         self.n_rows_1 = A1.shape[0]
         self.n_rows_2 = A2.shape[0]
-        self.shape = (self.n_rows_1 + self.n_rows_2, A1.shape[1])
-
-        if explicit_AtA == 'default':
-
-            if self.shape[0] < 10 * self.shape[1]:
-                # lets only use more memory if it really really makes sense to
-                self.explicit_AtA = False
-            else:
-                self.explicit_AtA = True
-
-        assert type(self.explicit_AtA) == bool
-
-        if explicit_AtA:
-            self.AtA = np.array(A1.T @ A1 + A2.T @ A2)
-
-    def AtA_prod(self, v):
-        """
-        Represents  A.T @ A @ v
-        Parameteres
-        -----------
-        v: array-like, (n_cols, )
-            The input vector.
-
-        Output
-        ------
-        out: array-like, (n_cols, )
-            out = A.T @ A @ v
-        """
-        if self.explicit_AtA:
-
-            # n_cols ** 2
-            return self.AtA @ v
-
-        else:
-            # n_rows x n_cols
-            return self.A1.T @ (self.A1 @ v) + self.A2.T @ (self.A2 @ v)
+        shape = (self.n_rows_1 + self.n_rows_2, A1.shape[1])
+        super().__init__(dtype=float, shape=shape)
 
     def At_prod(self, v):
         """
@@ -497,10 +569,11 @@ class AMat:
         out: array-like, (n_cols, )
             out = A.T @ v
         """
-        p1 = self.A1.T @ v[:self.n_rows_1]
-        p2 = self.A2.T @ v[self.n_rows_1:]
+        with maybe_timer(self.counters, 'matvec'):
+            p1 = self.A1.T @ v[:self.n_rows_1]
+            p2 = self.A2.T @ v[self.n_rows_1:]
 
-        return p1 + p2
+            return p1 + p2
 
     def A_prod(self, v):
         """
@@ -516,6 +589,159 @@ class AMat:
         out: array-like, (n_rows, )
             out = A @ v
         """
-        p1 = self.A1 @ v
-        p2 = self.A2 @ v
-        return np.hstack([p1, p2])
+        with maybe_timer(self.counters, 'matvec'):
+            p1 = self.A1 @ v
+            p2 = self.A2 @ v
+            return np.concatenate([p1, p2])
+
+    def _matvec(self, x):
+        return self.A_prod(np.asarray(x).reshape(-1))
+
+    def _rmatvec(self, x):
+        return self.At_prod(np.asarray(x).reshape(-1))
+
+
+def gram_abs_row_sums(A1, A2, max_block_entries=int(1e7)):
+    """
+    Computes the row sums of |A^TA| where A = [A1; A2] by computing A^TA one block of columns at a time.
+
+    Parameters
+    ----------
+    A1, A2: array-like, sparse matrix or LinearOperator
+        The two matrices.
+
+    max_block_entries: int
+        The maximum number of entries of A^TA to compute at once.
+
+    Output
+    ------
+    row_sums: array-like, shape (n_cols, )
+        The row sums.
+    """
+    A1, A2 = _to_csc(A1), _to_csc(A2)
+
+    n_cols = A1.shape[1]
+    block_size = max(1, int(max_block_entries // n_cols))
+
+    row_sums = np.zeros(n_cols)
+    for left in range(0, n_cols, block_size):
+        right = min(left + block_size, n_cols)
+
+        # columns left:right of A^TA
+        AtA_block = np.zeros((n_cols, right - left))
+        for A in [A1, A2]:
+            if isinstance(A, InterceptAugmented):
+                # computed from X without forming [1_n, X]
+                prod = A.gram_cols(left, right)
+
+            elif isinstance(A, LinearOperator):
+                # A[:, left:right] = A @ E for the identity columns E
+                E = np.zeros((n_cols, right - left))
+                E[left:right, :] = np.eye(right - left)
+                prod = A.rmatmat(A.matmat(E))
+            else:
+                prod = A.T @ A[:, left:right]
+
+            AtA_block += prod.toarray() if issparse(prod) else prod
+
+        row_sums[left:right] = abs(AtA_block).sum(axis=0)
+
+    return row_sums
+
+
+def abs_gram_row_sums(A, chunk_size=1000):
+    """
+    Computes the row sums of |A|^T |A| i.e. |A|^T (|A| 1) in O(nnz(A)) operations without forming A.T @ A.
+
+    Parameters
+    ----------
+    A: array-like, sparse matrix, HStacked or InterceptAugmented, shape (n_rows, n_cols)
+        The matrix.
+
+    chunk_size: int
+        For dense matrices we process this many rows at a time to avoid copying A.
+
+    Output
+    ------
+    row_sums: array-like, shape (n_cols, )
+        The row sums.
+    """
+    if isinstance(A, HStacked):
+        blocks = A.tup
+    elif isinstance(A, InterceptAugmented) and \
+            not isinstance(A.X, LinearOperator):
+        blocks = [np.ones((A.shape[0], 1)), A.X]
+    elif isinstance(A, LinearOperator):
+        raise ValueError("Cannot compute the diagonal preconditioner for a "
+                         "linear operator; try D_mat='prop_id'")
+    else:
+        blocks = [A]
+
+    # |A| 1
+    abs_row_sums = sum(_abs_prod(B, np.ones(B.shape[1]),
+                                 chunk_size=chunk_size)
+                       for B in blocks)
+
+    return np.concatenate([_abs_prod(B, abs_row_sums, transpose=True,
+                                     chunk_size=chunk_size)
+                           for B in blocks])
+
+
+def _abs_prod(A, v, transpose=False, chunk_size=1000):
+    """
+    Computes |A| @ v or |A|.T @ v. For dense matrices we process chunks of rows at a time to avoid copying A.
+    """
+    if issparse(A):
+        abs_A = abs(A)
+        out = abs_A.T @ v if transpose else abs_A @ v
+        return np.array(out).reshape(-1)
+
+    A = np.asarray(A).reshape(A.shape[0], -1)
+    if transpose:
+        out = np.zeros(A.shape[1])
+    else:
+        out = np.zeros(A.shape[0])
+
+    for left in range(0, A.shape[0], chunk_size):
+        right = min(left + chunk_size, A.shape[0])
+        abs_block = abs(A[left:right])
+
+        if transpose:
+            out += abs_block.T @ v[left:right]
+        else:
+            out[left:right] = abs_block @ v
+
+    return out
+
+
+def _to_csc(A):
+    """
+    Converts sparse matrices (including the data matrix of an InterceptAugmented) to CSC format so their columns can be sliced efficiently.
+    """
+    if issparse(A):
+        return A.tocsc()
+    elif isinstance(A, InterceptAugmented) and issparse(A.X):
+        return InterceptAugmented(A.X.tocsc())
+    else:
+        return A
+
+
+def _to_dense(A):
+    """
+    Converts a sparse matrix or linear operator to a dense array.
+    """
+    if issparse(A):
+        return A.toarray()
+    elif isinstance(A, LinearOperator):
+        return A.matmat(np.eye(A.shape[1]))
+    else:
+        return np.asarray(A)
+
+
+def safe_inv(x):
+    """
+    Computes 1 / x setting the entries where x = 0 to 1.
+    """
+    x = np.array(x, dtype=float)
+    x[x == 0] = 1
+    return 1 / x
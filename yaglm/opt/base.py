@@ -37,6 +37,26 @@ class Func(object):
         return np.array(x, copy=False) - step * self.prox(x=x / step,
                                                           step=1/step)
 
+    def eval_and_grad(self, x):
+        """
+        Evaluates the function and its gradient at the same point. Subclasses may override this to share computation between the two e.g. GLM losses only need to compute X @ coef once.
+
+        Output
+        ------
+        value, grad
+        """
+        return self.eval(x), self.grad(x)
+
+    def conj(self, x):
+        """
+        The convex conjugate function
+
+        conj_func(x) := sup_z <x, z> - func(z)
+
+        Note this may be np.inf.
+        """
+        return self._conj(np.array(x, copy=False))
+
     def _eval(self, x):
         raise NotImplementedError
 
@@ -46,6 +66,9 @@ class Func(object):
     def _prox(self, x, step):
         raise NotImplementedError
 
+    def _conj(self, x):
+        raise NotImplementedError
+
     @property
     def grad_lip(self):
         if hasattr(self, '_grad_lip'):
@@ -71,9 +94,6 @@ class Func(object):
         """
         raise NotImplementedError
 
-    # def eval_and_grad(self, x):
-    #     return self.eval(x), self.grad(x)
-
     # def capabilities(self, x):
     #     # TODO: do we actually need this???
 
@@ -117,6 +137,10 @@ class EntrywiseFunc(Func):
         p = self._prox(x.reshape(-1), step=step)
         return p.reshape(x.shape)
 
+    def conj(self, x):
+        x = np.array(x, copy=False)
+        return self._conj(x.reshape(-1))
+
 
 class Zero(Func):
     def _eval(self, x):
@@ -154,6 +178,14 @@ class Sum(Func):
     def grad(self, x):
         return sum(f.grad(x) for f in self.funcs)
 
+    def eval_and_grad(self, x):
+        value, grad = 0, 0
+        for f in self.funcs:
+            v, g = f.eval_and_grad(x)
+            value += v
+            grad += g
+        return value, grad
+
     @property
     def grad_lip(self):
         lip = 0
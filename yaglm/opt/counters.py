@@ -0,0 +1,173 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+from yaglm.opt.base import Func
+
+
+class OptCounters(object):
+    """
+    Counts and times the expensive operations performed by an optimization algorithm e.g. products with the data matrix, gradient evaluations and proximal operator calls. This is used to profile where a solver spends its time.
+
+    Attributes
+    ----------
+    counts: dict
+        The number of times each operation was performed.
+
+    runtimes: dict
+        The total time (in seconds) spent on each operation. Only present for operations that are timed.
+    """
+    def __init__(self):
+        self.counts = {}
+        self.runtimes = {}
+
+    def add(self, name, runtime=None, count=1):
+        """
+        Records an operation.
+
+        Parameters
+        ----------
+        name: str
+            The name of the operation e.g. 'matvec'.
+
+        runtime: None, float
+            (Optional) The time spent on this operation.
+
+        count: int
+            Number of times the operation was performed.
+        """
+        self.counts[name] = self.counts.get(name, 0) + count
+
+        if runtime is not None:
+            self.runtimes[name] = self.runtimes.get(name, 0) + runtime
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Context manager that counts and times the operation performed inside its block.
+
+        Parameters
+        ----------
+        name: str
+            The name of the operation.
+        """
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, runtime=perf_counter() - start_time)
+
+    def update(self, other):
+        """
+        Adds the counts and runtimes from another OptCounters object.
+
+        Parameters
+        ----------
+        other: OptCounters
+            The other counters.
+
+        Output
+        ------
+        self
+        """
+        for name, count in other.counts.items():
+            self.add(name, runtime=other.runtimes.get(name, None),
+                     count=count)
+        return self
+
+    def to_dict(self):
+        """
+        Returns a flat dict of the counts and runtimes e.g. {'n_matvec': 10, 'runtime_matvec': 0.1}.
+
+        Output
+        ------
+        out: dict
+            The counts are stored as 'n_NAME' and the runtimes as 'runtime_NAME'.
+        """
+        out = {}
+        for name, count in self.counts.items():
+            out['n_' + name] = count
+            if name in self.runtimes:
+                out['runtime_' + name] = self.runtimes[name]
+        return out
+
+
+def maybe_timer(counters, name):
+    """
+    Returns counters.timer(name) or a context manager that does nothing if counters is None.
+
+    Parameters
+    ----------
+    counters: None, OptCounters
+        The counters.
+
+    name: str
+        The name of the operation.
+
+    Output
+    ------
+    context: context manager
+    """
+    if counters is None:
+        return nullcontext()
+    else:
+        return counters.timer(name)
+
+
+class CountedFunc(Func):
+    """
+    Wraps a function and counts/times each call to its eval, grad, eval_and_grad, prox and conj_prox methods. All other attributes are looked up from the wrapped function.
+
+    Parameters
+    ----------
+    func: yaglm.opt.base.Func
+        The function to wrap.
+
+    counters: OptCounters
+        The counters where the calls are recorded.
+
+    kind: str
+        The calls are recorded as 'KIND_eval', 'KIND_grad', etc.
+    """
+    def __init__(self, func, counters, kind):
+        self.func = func
+        self.counters = counters
+        self.kind = kind
+
+    def __getattr__(self, name):
+        # only called if the attribute is not found on this object
+        # note we use __dict__ to avoid recursion during copying/pickling
+        if 'func' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.func, name)
+
+    def eval(self, x):
+        with self.counters.timer(self.kind + '_eval'):
+            return self.func.eval(x)
+
+    def grad(self, x):
+        with self.counters.timer(self.kind + '_grad'):
+            return self.func.grad(x)
+
+    def eval_and_grad(self, x):
+        with self.counters.timer(self.kind + '_eval_and_grad'):
+            return self.func.eval_and_grad(x)
+
+    def prox(self, x, step=1):
+        with self.counters.timer(self.kind + '_prox'):
+            return self.func.prox(x, step=step)
+
+    def conj_prox(self, x, step=1):
+        with self.counters.timer(self.kind + '_prox'):
+            return self.func.conj_prox(x, step=step)
+
+    @property
+    def grad_lip(self):
+        return self.func.grad_lip
+
+    @property
+    def is_smooth(self):
+        return self.func.is_smooth
+
+    @property
+    def is_proximable(self):
+        return self.func.is_proximable
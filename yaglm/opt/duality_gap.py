@@ -0,0 +1,276 @@
+import numpy as np
+from scipy.sparse import issparse
+
+from yaglm.opt.penalty.convex import Ridge, Lasso, GroupLasso, \
+    MultiTaskLasso, NuclearNorm, ElasticNetLikeMixinCooprativeProx
+
+
+class GlmDualityGap(object):
+    """
+    Computes the duality gap of a convex, penalized GLM problem
+
+    min_{coef, intercept} F(X @ coef + intercept) + p(coef)
+
+    where F(z) = (1/n) sum_i w_i L(z_i, y_i) is the GLM input loss. The Fenchel dual problem is
+
+    max_{theta} - F^*(theta) - p^*(-X.T @ theta) s.t. 1.T @ theta = 0
+
+    where the constraint is only present if we fit an intercept. At the optimum theta = grad F(X @ coef + intercept), which we use to build a dual feasible point from the current primal value as follows.
+
+    1. If we fit an intercept, theta is (weighted) centered so it sums to zero. For losses whose conjugate has a restricted domain (e.g. logistic regression) the centered point may not be in the domain of F^*. In this case we move it towards the dual point of the intercept only model, which is strictly feasible.
+
+    2. theta is rescaled so that -X.T @ theta lies in the domain of p^* e.g. the dual norm ball for norm penalties. No scaling is needed for penalties with a ridge component.
+
+    The duality gap, primal(coef, intercept) - dual(theta), upper bounds the suboptimality of the current primal value and goes to zero as the primal value converges.
+
+    Parameters
+    ----------
+    loss_func: yaglm.opt.glm_loss.base.Glm
+        The GLM loss function.
+
+    penalty_func: yaglm.opt.base.Func
+        The penalty function; see is_gap_supported_penalty() for the currently supported penalties.
+
+    References
+    ----------
+    Ndiaye, E., Fercoq, O., Gramfort, A. and Salmon, J., 2017. Gap safe screening rules for sparsity enforcing penalties. The Journal of Machine Learning Research, 18(1), pp.4671-4703.
+    """
+    def __init__(self, loss_func, penalty_func):
+        self.loss_func = loss_func
+        self.penalty_func = penalty_func
+
+        self._theta_int_only = None
+        if loss_func.fit_intercept:
+            self._theta_int_only = get_intercept_only_dual(loss_func.glm_loss)
+
+    def __call__(self, x):
+        """
+        Computes the duality gap.
+
+        Parameters
+        ----------
+        x: array-like
+            The current value of the optimization variable i.e. the coefficient possibly concatenated with the intercept.
+
+        Output
+        ------
+        gap, primal
+
+        gap: float
+            The duality gap. This may be np.inf if we were not able to find a dual feasible point.
+
+        primal: float
+            The primal objective function value.
+        """
+        glm_loss = self.loss_func.glm_loss
+
+        z = self.loss_func.get_z(x)
+        coef = x[1:] if self.loss_func.fit_intercept else x
+        primal = glm_loss.eval(z) + self.penalty_func.eval(coef)
+
+        # dual candidate
+        theta = glm_loss.grad(z)
+
+        # enforce the intercept's zero sum constraint
+        if self.loss_func.fit_intercept:
+            theta = center_dual(theta, sample_weight=glm_loss.sample_weight)
+            theta = self._move_to_domain(theta)
+            if theta is None:
+                return np.inf, primal
+
+        # rescale to put X.T @ theta in the domain of the penalty conjugate
+        u = -(self.loss_func.X.T @ theta)
+        scale = get_dual_scale(self.penalty_func, u)
+        theta = scale * theta
+        u = scale * u
+
+        dual = -glm_loss.conj(theta) - self.penalty_func.conj(u)
+
+        return primal - dual, primal
+
+    def _move_to_domain(self, theta, max_steps=30):
+        """
+        Moves a zero sum dual point into the domain of the loss conjugate by taking a convex combination with the intercept only dual point.
+
+        Output
+        ------
+        theta: None, array-like
+            The dual point; None if we could not find a feasible point.
+        """
+        glm_loss = self.loss_func.glm_loss
+        if np.isfinite(glm_loss.conj(theta)):
+            return theta
+
+        if self._theta_int_only is None:
+            return None
+
+        # bisection search for the smallest mixing weight we can find
+        # with a feasible point
+        lower, upper = 0, 1
+        for _ in range(max_steps):
+            mid = 0.5 * (lower + upper)
+            cand = (1 - mid) * theta + mid * self._theta_int_only
+            if np.isfinite(glm_loss.conj(cand)):
+                upper = mid
+            else:
+                lower = mid
+
+        return (1 - upper) * theta + upper * self._theta_int_only
+
+
+def get_glm_dual_gap_func(loss_func, penalty_func):
+    """
+    Gets the duality gap function for a penalized GLM if it is available.
+
+    Parameters
+    ----------
+    loss_func: yaglm.opt.glm_loss.base.Glm
+        The GLM loss function.
+
+    penalty_func: None, yaglm.opt.base.Func
+        The penalty function.
+
+    Output
+    ------
+    dual_gap_func: None, GlmDualityGap
+        The duality gap function. None if the duality gap is not currently available for this loss/penalty.
+    """
+    glm_loss = getattr(loss_func, 'glm_loss', None)
+    if glm_loss is None or glm_loss.sample_conjugates is None:
+        return None
+
+    if not is_gap_supported_penalty(penalty_func):
+        return None
+
+    return GlmDualityGap(loss_func=loss_func, penalty_func=penalty_func)
+
+
+def is_gap_supported_penalty(func):
+    """
+    Whether or not we can compute the duality gap for a penalty function. Currently supports the lasso, group lasso, multi-task lasso, unweighted nuclear norm, ridge and elastic net like penalties with unweighted ridges. Norm penalties must have strictly positive penalty values/weights; otherwise the dual feasible point built by GlmDualityGap would give a trivial gap.
+
+    Parameters
+    ----------
+    func: None, yaglm.opt.base.Func
+        The penalty function.
+
+    Output
+    ------
+    is_supported: bool
+    """
+    if isinstance(func, Ridge):
+        return True
+
+    elif isinstance(func, GroupLasso):
+        return all(f.mult > 0 for f in func.pen_funcs)
+
+    elif isinstance(func, (Lasso, MultiTaskLasso)):
+        return func.pen_val > 0 and \
+            (func.weights is None or np.all(np.array(func.weights) > 0))
+
+    elif isinstance(func, NuclearNorm):
+        return func.pen_val > 0 and func.weights is None
+
+    elif isinstance(func, ElasticNetLikeMixinCooprativeProx):
+        return is_gap_supported_penalty(func.lasso) and \
+            (func.ridge.pen_val == 0 or func.ridge.weights is None)
+
+    else:
+        return False
+
+
+def get_dual_scale(func, u):
+    """
+    Gets the largest scaling in [0, 1] that puts the point u in the domain of the penalty's conjugate.
+
+    Parameters
+    ----------
+    func: yaglm.opt.base.Func
+        The penalty function.
+
+    u: array-like
+        The point.
+
+    Output
+    ------
+    scale: float
+        The scaling.
+    """
+
+    # the conjugate of ridge like penalties are finite everywhere
+    if isinstance(func, Ridge):
+        return 1
+
+    if isinstance(func, ElasticNetLikeMixinCooprativeProx):
+        if func.ridge.pen_val > 0:
+            return 1
+        else:
+            func = func.lasso
+
+    # the conjugate of a norm is the indicator of the dual norm ball
+    dual_norm = func.dual_norm(u)
+    if dual_norm <= 1:
+        return 1
+    else:
+        return 1 / dual_norm
+
+
+def center_dual(theta, sample_weight=None):
+    """
+    Centers the dual variable so each column sums to zero. Samples with zero weight are kept at zero.
+
+    Parameters
+    ----------
+    theta: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The dual variable.
+
+    sample_weight: None, array-like, shape (n_samples, )
+        (Optional) The sample weights.
+
+    Output
+    ------
+    theta: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The centered dual variable.
+    """
+    if sample_weight is None:
+        return theta - theta.mean(axis=0)
+
+    w = np.array(sample_weight) / np.sum(sample_weight)
+    if theta.ndim == 2:
+        w = w.reshape(-1, 1)
+
+    return theta - w * theta.sum(axis=0)
+
+
+def get_intercept_only_dual(glm_loss):
+    """
+    Gets the dual point of the intercept only model i.e. theta_i = (w_i / n) * (mu - y_i) where mu is the weighted mean of the response. This is the gradient of the loss at the optimal intercept only model for canonical GLMs (e.g. linear, logistic, poisson, multinomial) and lies in the interior of the loss conjugate's domain.
+
+    Parameters
+    ----------
+    glm_loss: yaglm.opt.glm_loss.base.GlmInputLoss
+        The GLM input loss.
+
+    Output
+    ------
+    theta: None, array-like
+        The dual point; None if there are offsets.
+    """
+    if glm_loss.offsets is not None:
+        return None
+
+    y = glm_loss.y
+    if issparse(y):
+        y = y.toarray()
+    y = np.array(y, dtype=float)
+
+    if glm_loss.sample_weight is None:
+        mult = np.ones(glm_loss.n_samples) / glm_loss.n_samples
+    else:
+        mult = np.array(glm_loss.sample_weight) / glm_loss.n_samples
+
+    mu = np.average(y, axis=0, weights=mult)
+    if y.ndim == 2:
+        mult = mult.reshape(-1, 1)
+
+    return mult * (mu - y)
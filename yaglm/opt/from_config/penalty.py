@@ -24,7 +24,7 @@ from yaglm.opt.base import Sum
 from yaglm.opt.BlockSeparable import BlockSeparable
 from yaglm.opt.penalty.convex import Ridge, GeneralizedRidge,\
      Lasso, GroupLasso, ExclusiveGroupLasso, \
-     MultiTaskLasso, NuclearNorm, GeneralizedLasso, \
+     MultiTaskLasso, NuclearNorm, GeneralizedLasso, TrendFiltering, \
      ElasticNet, GroupElasticNet, MultiTaskElasticNet, SparseGroupLasso
 from yaglm.opt.penalty.nonconvex import get_nonconvex_func
 from yaglm.opt.penalty.composite_structured import CompositeGroup, \
@@ -121,7 +121,15 @@ def get_penalty_func(config, n_features=None, n_responses=None):
 
     # Generalized and fused lasso
     elif isinstance(config, (FusedLassoConfig, GeneralizedLassoConfig)):
-        # TODO: perhaps add separate TV-1
+
+        # trend filtering on a chain graph has an efficient prox
+        if isinstance(config, FusedLassoConfig) \
+                and is_str_and_matches(config.edgelist, 'chain') \
+                and flavor_kind != 'non_convex':
+
+            return TrendFiltering(pen_val=config.pen_val,
+                                  order=config.order,
+                                  weights=config.weights)
 
         if isinstance(config, FusedLassoConfig):
             mat = get_fused_lasso_diff_mat(config=config, n_nodes=n_features)
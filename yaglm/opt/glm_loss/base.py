@@ -1,9 +1,11 @@
-from scipy.sparse import diags
+from scipy.sparse import diags, issparse
+from sklearn.utils.extmath import row_norms
 import numpy as np
 
 from yaglm.opt.base import Func
 from yaglm.opt.utils import safe_data_mat_coef_dot, safe_data_mat_coef_mat_dot
 from yaglm.opt.glm_loss.utils import safe_covar_mat_op_norm
+from yaglm.opt.counters import maybe_timer
 
 
 # TODO how to handle loss kws
@@ -19,6 +21,9 @@ class GlmInputLoss(Func):
     sample_losses = None
     sample_grads = None
     sample_proxs = None
+    sample_losses_and_grads = None  # (optional) fused losses and grads
+    sample_hess_diags = None
+    sample_conjugates = None
 
     def __init__(self, y, sample_weight=None, offsets=None, **loss_kws):
         self.y = y
@@ -54,6 +59,146 @@ class GlmInputLoss(Func):
 
         return grads
 
+    def eval_and_grad(self, x):
+        """
+        Computes the loss and its gradient with respect to z. If the input loss implements sample_losses_and_grads() these are computed together in one pass.
+
+        Parameters
+        ----------
+        x: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The linear predictor (excluding the offsets).
+
+        Output
+        ------
+        value, grad
+
+        value: float
+            The loss value.
+
+        grad: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The gradient.
+        """
+        if self.sample_losses_and_grads is None:
+            return self.eval(x), self.grad(x)
+
+        z = x if self.offsets is None else x + self.offsets
+
+        losses, grads = \
+            self.sample_losses_and_grads(z=z, y=self.y, **self.loss_kws)
+
+        if self.sample_weight is None:
+            value = losses.sum() / self.n_samples
+
+        else:
+            value = (losses.T @ self.sample_weight) / self.n_samples
+
+            # reweight in place
+            weights = np.asarray(self.sample_weight)
+            if grads.ndim == 2:
+                weights = weights.reshape(-1, 1)
+            grads *= weights
+
+        grads /= self.n_samples
+
+        return value, grads
+
+    def hess_diag(self, x):
+        """
+        Computes the diagonal of the Hessian of f(z) with respect to z i.e. (1/n_samples) w_i d^2L(z_i, y_i)/dz_i^2. For multiple response losses this is the diagonal of each sample's Hessian with respect to its responses.
+
+        Parameters
+        ----------
+        x: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The linear predictor (excluding the offsets).
+
+        Output
+        ------
+        hess_diag: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The Hessian diagonals.
+        """
+        z = x if self.offsets is None else x + self.offsets
+
+        hess = self.sample_hess_diags(z=z, y=self.y, **self.loss_kws)
+
+        # possibly reweight
+        if self.sample_weight is not None:
+            hess = diags(self.sample_weight) @ hess
+
+        hess /= self.n_samples
+
+        return hess
+
+    def _conj(self, x):
+        """
+        The convex conjugate f^*(x) = -x.T @ offsets + sum_i (w_i / n) L^*(n * x_i / w_i, y_i) where L^*(s, y) is the conjugate of the sample loss with respect to its first argument. Samples with zero weight must have x_i = 0.
+        """
+        if self.sample_conjugates is None:
+            raise NotImplementedError("Conjugate not implemented for {}".
+                                      format(self))
+
+        if self.sample_weight is None:
+            mult = np.ones(self.n_samples) / self.n_samples
+        else:
+            mult = np.array(self.sample_weight) / self.n_samples
+
+        # zero weight samples must have zero dual variable
+        zero_wt = mult == 0
+        if np.any(zero_wt):
+            if np.any(x[zero_wt] != 0):
+                return np.inf
+            mult = mult.copy()
+            mult[zero_wt] = 1
+
+        mult_ = mult.reshape(-1, 1) if x.ndim == 2 else mult
+        conj = self.sample_conjugates(s=x / mult_, y=self.y, **self.loss_kws)
+        conj = conj.reshape(self.n_samples, -1).sum(axis=1)
+
+        if np.any(zero_wt):
+            conj[zero_wt] = 0
+
+        value = mult @ conj
+        if self.offsets is not None:
+            value -= (x * self.offsets).sum()
+
+        return value
+
+    @property
+    def has_hess_diag(self):
+        # if we have implemented the sample Hessian diagonals then
+        # we can use second order methods
+        return self.sample_hess_diags is not None
+
+    def batch_grads(self, z, idxs):
+        """
+        Computes the weighted sample gradients, w_i * dL(z_i, y_i)/dz_i, for a batch of samples. Note these are not divided by n_samples.
+
+        Parameters
+        ----------
+        z: array-like, shape (n_batch, ) or (n_batch, n_responses)
+            The linear predictor for the batch samples (excluding the offsets).
+
+        idxs: array-like of ints, shape (n_batch, )
+            The indices of the batch samples.
+
+        Output
+        ------
+        grads: array-like, shape (n_batch, ) or (n_batch, n_responses)
+            The batch sample gradients.
+        """
+        if self.offsets is not None:
+            if np.isscalar(self.offsets):
+                z = z + self.offsets
+            else:
+                z = z + self.offsets[idxs]
+
+        grads = self.sample_grads(z=z, y=self.y[idxs], **self.loss_kws)
+
+        # possibly reweight
+        if self.sample_weight is not None:
+            grads = diags(self.sample_weight[idxs]) @ grads
+
+        return grads
+
     def _prox(self, x, step=1):
         if self.sample_weight is not None:
             raise NotImplementedError()  # TODO
@@ -77,6 +222,8 @@ class Glm(Func):
     """
     Represents a GLM loss function.
     (1/n) sum_{i=1}^n w_i L(x_i^T coef + intercept, y_i)
+
+    X may be a linear operator e.g. a yaglm.sparse_utils.RowChunked matrix in which case the products in get_z() and grad() stream over blocks of rows.
     """
 
     # the GLM input loss
@@ -87,6 +234,21 @@ class Glm(Func):
     # a method to compute the gradient Lipschitz constant
     compute_lip = None
 
+    # (Optional) a yaglm.opt.counters.OptCounters that records
+    # the products with X
+    counters = None
+
+    # whether or not to memoize the linear predictor; see get_z()
+    cache_z = True
+
+    # update the memoized linear predictor incrementally if at most this
+    # fraction of the coefficients changed
+    z_update_max_frac = 0.25
+
+    # recompute the linear predictor from scratch after this many
+    # incremental updates to avoid accumulating rounding errors
+    z_update_max_count = 100
+
     def __init__(self, X, y, fit_intercept=True,
                  sample_weight=None, offsets=None,
                  **loss_kws):
@@ -133,7 +295,8 @@ class Glm(Func):
             if input_loss_lip is not None:
                 X_op_norm = \
                     safe_covar_mat_op_norm(X=self.X,
-                                           fit_intercept=self.fit_intercept)
+                                           fit_intercept=self.fit_intercept,
+                                           sample_weight=self.sample_weight)
 
                 self._grad_lip = input_loss_lip * X_op_norm ** 2
             else:
@@ -141,6 +304,32 @@ class Glm(Func):
 
         return self._grad_lip
 
+    @property
+    def sample_grad_lip(self):
+        """
+        The largest gradient Lipschitz constant of the individual sample losses w_i L(x_i^T coef + intercept, y_i). This is used to set the step size for stochastic algorithms. Is None if the input loss is not Lipschitz differentiable.
+        """
+        if not hasattr(self, '_sample_grad_lip'):
+
+            input_loss_lip = self.glm_loss.grad_lip
+
+            if input_loss_lip is not None:
+                # the input loss lipschitz constants are scaled by 1/n
+                lip = input_loss_lip * self.glm_loss.n_samples
+
+                if self.sample_weight is not None:
+                    lip *= np.max(self.sample_weight)
+
+                max_row_norm_sq = row_norms(self.X, squared=True).max()
+                if self.fit_intercept:
+                    max_row_norm_sq += 1
+
+                self._sample_grad_lip = lip * max_row_norm_sq
+            else:
+                self._sample_grad_lip = None
+
+        return self._sample_grad_lip
+
     def _set_shape_data(self):
         # set coefficient shapes
         if self.y.ndim in [0, 1]:
@@ -161,8 +350,127 @@ class Glm(Func):
                 self.var_shape_ = self.coef_shape_
 
     def get_z(self, x):
-        return safe_data_mat_coef_dot(X=self.X, coef=x,
-                                      fit_intercept=self.fit_intercept)
+        """
+        Computes the linear predictor, X @ coef + intercept.
+
+        The linear predictor of the most recent point is memoized so repeated calls at the same point (e.g. eval() then grad(), or tracking the objective) only compute one product with X. If only a few coefficients changed since the most recent point, the linear predictor is updated incrementally i.e. z_new = z + X[:, changed] @ delta. This assumes X is not modified after this object is created. The returned array is read only.
+
+        Parameters
+        ----------
+        x: array-like
+            The coefficient/intercept.
+
+        Output
+        ------
+        z: array-like, shape (n_samples, ) or (n_samples, n_responses)
+            The linear predictor.
+        """
+        if not self.cache_z:
+            return self._compute_z(x)
+
+        x = np.asarray(x).reshape(self.var_shape_)
+
+        cache = getattr(self, '_z_cache', None)
+        z = None
+        n_updates = 0
+        if cache is not None:
+            delta = x - cache['x']
+
+            if not np.any(delta):
+                return cache['z']
+
+            if cache['n_updates'] < self.z_update_max_count:
+                z = self._update_z(z=cache['z'], delta=delta)
+                n_updates = cache['n_updates'] + 1
+
+        if z is None:
+            z = np.asarray(self._compute_z(x))
+            n_updates = 0
+
+        z.flags.writeable = False
+        self._z_cache = {'x': np.array(x, dtype=float),
+                         'z': z,
+                         'n_updates': n_updates}
+
+        return z
+
+    def _compute_z(self, x):
+        with maybe_timer(self.counters, 'matvec'):
+            return safe_data_mat_coef_dot(X=self.X, coef=x,
+                                          fit_intercept=self.fit_intercept)
+
+    def _update_z(self, z, delta):
+        """
+        Incrementally updates the linear predictor after the coefficient/intercept changes by delta i.e. z + X[:, changed] @ delta[changed] + delta_intercept.
+
+        Output
+        ------
+        z_new: None, array-like
+            The updated linear predictor. None if an incremental update is not worthwhile e.g. too many coefficients changed or X does not support fast column slicing.
+        """
+        # only dense arrays and CSC matrices can cheaply slice columns
+        if not (type(self.X) == np.ndarray or
+                (issparse(self.X) and self.X.format == 'csc')):
+            return None
+
+        if self.fit_intercept:
+            delta_intercept, delta_coef = delta[0], delta[1:]
+        else:
+            delta_intercept, delta_coef = None, delta
+
+        if delta_coef.ndim == 2:
+            changed = np.flatnonzero(np.any(delta_coef != 0, axis=1))
+        else:
+            changed = np.flatnonzero(delta_coef)
+
+        if len(changed) > self.z_update_max_frac * self.X.shape[1]:
+            return None
+
+        with maybe_timer(self.counters, 'matvec'):
+            z_new = z + self.X[:, changed] @ delta_coef[changed]
+
+        if delta_intercept is not None:
+            z_new += delta_intercept
+
+        return z_new
+
+    def get_z_rows(self, x, idxs):
+        """
+        Computes the linear predictor for a subset of the samples i.e. the rows get_z(x)[idxs].
+        """
+        with maybe_timer(self.counters, 'matvec'):
+            return safe_data_mat_coef_dot(X=self.X[idxs],
+                                          coef=x,
+                                          fit_intercept=self.fit_intercept)
+
+    def grad_from_sample_grads(self, sample_grads, idxs=None):
+        """
+        Maps sample gradients to the gradient with respect to the coefficient/intercept i.e. X.T @ sample_grads.
+
+        Parameters
+        ----------
+        sample_grads: array-like, shape (n_batch, ) or (n_batch, n_responses)
+            The sample gradients.
+
+        idxs: None, array-like of ints, shape (n_batch, )
+            (Optional) The indices of the samples. If None, uses all the samples.
+
+        Output
+        ------
+        grad: array-like
+            The gradient; has the same shape as the optimization variable.
+        """
+        X = self.X if idxs is None else self.X[idxs]
+
+        with maybe_timer(self.counters, 'matvec'):
+            grad = X.T @ sample_grads
+
+        # possibly add intercept to gradient
+        if self.fit_intercept:
+            intercept_grad = sample_grads.sum(axis=0)
+            grad = self.cat_intercept_coef(intercept_grad, grad)
+
+        return grad
 
     def cat_intercept_coef(self, intercept, coef):
         return np.concatenate([[intercept], coef])
@@ -178,7 +486,8 @@ class Glm(Func):
         sample_grads = self.glm_loss.grad(self.get_z(x))
 
         # get coefficient gradients
-        grad = self.X.T @ sample_grads
+        with maybe_timer(self.counters, 'matvec'):
+            grad = self.X.T @ sample_grads
 
         # possibly add intercept to gradient
         if self.fit_intercept:
@@ -187,6 +496,29 @@ class Glm(Func):
 
         return grad
 
+    def eval_and_grad(self, x):
+        """
+        Evaluates the loss and its gradient using a single product with X to compute the linear predictor.
+
+        Parameters
+        ----------
+        x: array-like
+            The coefficient/intercept.
+
+        Output
+        ------
+        value, grad
+
+        value: float
+            The loss value.
+
+        grad: array-like
+            The gradient; has the same shape as x.
+        """
+        x = np.array(x, copy=False)
+        value, sample_grads = self.glm_loss.eval_and_grad(self.get_z(x))
+        return value, self.grad_from_sample_grads(sample_grads)
+
     def grad_at_coef_eq0(self):
         """
         Computes the gradient when the coefficeint is zero and the intercept is set to the minimizer of the loss function when the coefficient is held at zero.
@@ -223,10 +555,17 @@ class Glm(Func):
 
 class GlmMultiResp(Glm):
 
-    def get_z(self, x):
-        return safe_data_mat_coef_mat_dot(X=self.X,
-                                          coef=x.reshape(self.var_shape_),
-                                          fit_intercept=self.fit_intercept)
+    def _compute_z(self, x):
+        with maybe_timer(self.counters, 'matvec'):
+            return safe_data_mat_coef_mat_dot(X=self.X,
+                                              coef=x.reshape(self.var_shape_),
+                                              fit_intercept=self.fit_intercept)
+
+    def get_z_rows(self, x, idxs):
+        with maybe_timer(self.counters, 'matvec'):
+            return safe_data_mat_coef_mat_dot(X=self.X[idxs],
+                                              coef=x.reshape(self.var_shape_),
+                                              fit_intercept=self.fit_intercept)
 
     def cat_intercept_coef(self, intercept, coef):
         if intercept.ndim == 1:
@@ -0,0 +1,161 @@
+import numpy as np
+
+from yaglm.opt.base import Func
+
+
+class BatchGlm(Func):
+    """
+    Represents K independent GLM loss functions with the same loss but different data,
+
+    f_k(coef_k, intercept_k) = (1/n_k) sum_{i=1}^{n_k} w_ki L(x_ki^T coef_k + intercept_k, y_ki)
+
+    for k = 1, ..., K. The data for each problem are stacked into arrays with a leading batch axis; problems with fewer samples should be padded with zero weight samples. The optimization variable is an array of shape (K, n_features + 1) (or (K, n_features) if fit_intercept=False) where the intercept is the first column. eval() returns an array of shape (K, ) with the loss of each problem.
+
+    Parameters
+    ----------
+    X: array-like, shape (K, n_samples, n_features)
+        The stacked data matrices.
+
+    y: array-like, shape (K, n_samples)
+        The stacked responses.
+
+    loss_class: GlmInputLoss
+        The GLM input loss class e.g. yaglm.opt.glm_loss.linear_regression.LeastSquares. Its sample_losses and sample_grads are applied entrywise to the (K, n_samples) linear predictor array.
+
+    fit_intercept: bool
+        Whether or not to fit an intercept.
+
+    sample_weight: None, array-like, shape (K, n_samples)
+        (Optional) The sample weights. Padded samples should have zero weight.
+
+    n_samples: None, array-like, shape (K, )
+        (Optional) The number of (non-padded) samples in each problem. Defaults to n_samples for every problem.
+
+    **loss_kws:
+        Keyword arguments for the loss function e.g. the huber knot.
+    """
+    def __init__(self, X, y, loss_class, fit_intercept=True,
+                 sample_weight=None, n_samples=None, **loss_kws):
+
+        self.X = X
+        self.y = y
+        self.loss_class = loss_class
+        self.fit_intercept = fit_intercept
+        self.sample_weight = sample_weight
+        self.loss_kws = loss_kws
+
+        if n_samples is None:
+            n_samples = X.shape[1] * np.ones(X.shape[0])
+        self.n_samples = np.array(n_samples, dtype=float)
+
+    @property
+    def n_problems(self):
+        return self.X.shape[0]
+
+    @property
+    def is_smooth(self):
+        return self.loss_class(y=np.zeros(1), **self.loss_kws).is_smooth
+
+    @property
+    def is_proximable(self):
+        return False
+
+    @property
+    def grad_lip(self):
+        """
+        The gradient Lipschitz constant of each problem, shape (K, ). Is None if the input loss is not Lipschitz differentiable.
+        """
+        if not hasattr(self, '_grad_lip'):
+
+            # the lipschitz constant of a single sample's loss
+            sample_lip = self.loss_class(y=np.zeros(1),
+                                         **self.loss_kws).grad_lip
+
+            if sample_lip is None:
+                self._grad_lip = None
+            else:
+                # ||diag(sqrt(w)) [1, X]||_op^2 / n for each problem
+                X_tilde = self.X
+                if self.fit_intercept:
+                    ones = np.ones(X_tilde.shape[:2] + (1, ))
+                    X_tilde = np.concatenate([ones, X_tilde], axis=2)
+
+                if self.sample_weight is not None:
+                    X_tilde = X_tilde * \
+                        np.sqrt(self.sample_weight)[:, :, np.newaxis]
+
+                op_norms = np.linalg.norm(X_tilde, ord=2, axis=(1, 2))
+                self._grad_lip = sample_lip * op_norms ** 2 / self.n_samples
+
+        return self._grad_lip
+
+    def subset(self, idxs):
+        """
+        Returns the loss function for a subset of the problems.
+
+        Parameters
+        ----------
+        idxs: array-like of ints
+            The problems to keep.
+
+        Output
+        ------
+        func: BatchGlm
+        """
+        sample_weight = None if self.sample_weight is None \
+            else self.sample_weight[idxs]
+
+        func = BatchGlm(X=self.X[idxs], y=self.y[idxs],
+                        loss_class=self.loss_class,
+                        fit_intercept=self.fit_intercept,
+                        sample_weight=sample_weight,
+                        n_samples=self.n_samples[idxs],
+                        **self.loss_kws)
+
+        if getattr(self, '_grad_lip', None) is not None:
+            func._grad_lip = self._grad_lip[idxs]
+
+        return func
+
+    def get_z(self, x):
+        """
+        Computes the linear predictors, shape (K, n_samples).
+        """
+        if self.fit_intercept:
+            coef = x[:, 1:]
+        else:
+            coef = x
+
+        z = np.matmul(self.X, coef[:, :, np.newaxis])[:, :, 0]
+
+        if self.fit_intercept:
+            z += x[:, [0]]
+
+        return z
+
+    def _eval(self, x):
+        losses = self.loss_class.sample_losses(z=self.get_z(x), y=self.y,
+                                               **self.loss_kws)
+
+        if self.sample_weight is not None:
+            losses = losses * self.sample_weight
+
+        return losses.sum(axis=1) / self.n_samples
+
+    def _grad(self, x):
+        sample_grads = self.loss_class.sample_grads(z=self.get_z(x), y=self.y,
+                                                    **self.loss_kws)
+
+        if self.sample_weight is not None:
+            sample_grads = sample_grads * self.sample_weight
+
+        sample_grads /= self.n_samples[:, np.newaxis]
+
+        # X_k.T @ sample_grads_k for each problem
+        grad = np.matmul(sample_grads[:, np.newaxis, :], self.X)[:, 0, :]
+
+        if self.fit_intercept:
+            intercept_grad = sample_grads.sum(axis=1)
+            grad = np.hstack([intercept_grad[:, np.newaxis], grad])
+
+        return grad
@@ -0,0 +1,309 @@
+import numpy as np
+
+from yaglm.opt.base import Func
+from yaglm.extmath import weighted_shifted_gram
+from yaglm.linalg_utils import leading_sval
+
+
+class LeastSquaresGram(Func):
+    """
+    Represents the least squares loss in covariance (Gram) mode i.e.
+
+    0.5 * coef.T @ gram @ coef - Xty.T @ coef + const
+
+    where gram = X_c.T @ W @ X_c / n_samples and Xty = X_c.T @ W @ y_c / n_samples. Here X_c, y_c are the weighted column centered data if there is an intercept (which profiles out the intercept). Every evaluation only costs O(n_features^2) operations regardless of the number of samples.
+
+    Parameters
+    ----------
+    gram: array-like, shape (n_features, n_features)
+        The Gram matrix.
+
+    Xty: array-like, shape (n_features, ) or (n_features, n_responses)
+        The linear term.
+
+    const: float
+        The constant term e.g. y_c.T @ W @ y_c / (2 * n_samples) so this function equals the least squares loss.
+    """
+    def __init__(self, gram, Xty, const=0):
+        self.gram = gram
+        self.Xty = Xty
+        self.const = const
+
+    def _eval(self, x):
+        return 0.5 * (x * (self.gram @ x)).sum() - (self.Xty * x).sum() \
+            + self.const
+
+    def _grad(self, x):
+        return self.gram @ x - self.Xty
+
+    def eval_and_grad(self, x):
+        x = np.array(x, copy=False)
+        gram_x = self.gram @ x
+        value = 0.5 * (x * gram_x).sum() - (self.Xty * x).sum() + self.const
+        return value, gram_x - self.Xty
+
+    @property
+    def is_smooth(self):
+        return True
+
+    @property
+    def is_proximable(self):
+        return False
+
+    @property
+    def grad_lip(self):
+        if not hasattr(self, '_grad_lip'):
+            # the largest eigenvalue of the PSD gram matrix
+            self._grad_lip = leading_sval(self.gram)
+
+        return self._grad_lip
+
+
+def get_gram_sums(X, fit_intercept=True, sample_weight=None, y=None):
+    """
+    Computes the weighted Gram matrix of X about its weighted column means (or about zero if there is no intercept). The Gram matrix of any subset of X's rows can then be computed with downdate_gram_sums() e.g. cross-validation computes each training fold's Gram matrix in O(n_test * n_features^2) operations instead of O(n_train * n_features^2). New rows can be added with update_gram_sums().
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or RowChunked, shape (n_samples, n_features)
+        The raw covariate data.
+
+    fit_intercept: bool
+        Whether or not we fit an intercept.
+
+    sample_weight: None or array-like,  shape (n_samples,)
+        Individual weights for each sample.
+
+    y: None, array-like, shape (n_samples, ) or (n_samples, n_responses)
+        (Optional) The response data. If provided, we also compute the statistics of y needed by the least squares loss; see get_Xty_from_sums().
+
+    Output
+    ------
+    gram_sums: dict
+        The summary statistics with keys ['n_samples', 'fit_intercept', 'shift', 'sum_w', 'sum', 'gram']. If y is provided we also have the keys ['y_shift', 'sum_y', 'Xy', 'yy'].
+    """
+    if fit_intercept:
+        # shift by the column means for numerical stability
+        if sample_weight is None:
+            w = np.ones(X.shape[0])
+        else:
+            w = np.asarray(sample_weight, dtype=float).reshape(-1)
+
+        shift = np.asarray(X.T @ w).reshape(-1) / w.sum()
+    else:
+        shift = np.zeros(X.shape[1])
+
+    sum_w, sums, gram = weighted_shifted_gram(X, shift=shift,
+                                              sample_weight=sample_weight)
+
+    gram_sums = {'n_samples': X.shape[0],
+                 'fit_intercept': fit_intercept,
+                 'shift': shift,
+                 'sum_w': sum_w,
+                 'sum': sums,
+                 'gram': gram}
+
+    if y is not None:
+        y = np.asarray(y, dtype=float)
+        if fit_intercept:
+            gram_sums['y_shift'] = np.average(y, axis=0, weights=sample_weight)
+        else:
+            gram_sums['y_shift'] = np.zeros(y.shape[1:])
+
+        gram_sums.update(_get_y_sums(X=X, y=y, shift=shift,
+                                     y_shift=gram_sums['y_shift'],
+                                     sample_weight=sample_weight))
+
+    return gram_sums
+
+
+def downdate_gram_sums(gram_sums, X_rows, sample_weight=None):
+    """
+    Computes the statistics from get_gram_sums() after removing some rows of X e.g. the training fold statistics from the full data statistics and the test fold rows.
+
+    Parameters
+    ----------
+    gram_sums: dict
+        The statistics of the full data matrix.
+
+    X_rows: array-like, sparse matrix or RowChunked, shape (n_rows, n_features)
+        The rows to remove.
+
+    sample_weight: None or array-like,  shape (n_rows,)
+        The sample weights of the rows to remove.
+
+    Output
+    ------
+    gram_sums: dict
+        The statistics of the remaining rows.
+    """
+    sum_w, sums, gram = \
+        weighted_shifted_gram(X_rows, shift=gram_sums['shift'],
+                              sample_weight=sample_weight)
+
+    return {'n_samples': gram_sums['n_samples'] - X_rows.shape[0],
+            'fit_intercept': gram_sums['fit_intercept'],
+            'shift': gram_sums['shift'],
+            'sum_w': gram_sums['sum_w'] - sum_w,
+            'sum': gram_sums['sum'] - sums,
+            'gram': gram_sums['gram'] - gram}
+
+
+def update_gram_sums(gram_sums, X_rows, y_rows=None, sample_weight=None,
+                     decay=1):
+    """
+    Computes the statistics from get_gram_sums() after adding some rows to X e.g. when new data arrive. The previous statistics may be exponentially down weighted.
+
+    Parameters
+    ----------
+    gram_sums: dict
+        The statistics of the current data matrix.
+
+    X_rows: array-like, sparse matrix or RowChunked, shape (n_rows, n_features)
+        The rows to add.
+
+    y_rows: None, array-like, shape (n_rows, ) or (n_rows, n_responses)
+        The responses of the rows to add. Required if gram_sums includes the response statistics.
+
+    sample_weight: None or array-like,  shape (n_rows,)
+        The sample weights of the rows to add.
+
+    decay: float
+        The current statistics are multiplied by this factor before the new rows are added i.e. each previous sample's weight is multiplied by decay. The number of samples is also decayed so it is the effective sample size. Must be in (0, 1].
+
+    Output
+    ------
+    gram_sums: dict
+        The statistics with the new rows.
+    """
+    if not 0 < decay <= 1:
+        raise ValueError("decay must be in (0, 1], not {}".format(decay))
+
+    has_y = 'Xy' in gram_sums
+    if has_y and y_rows is None:
+        raise ValueError("y_rows must be provided to update the "
+                         "response statistics")
+
+    sum_w, sums, gram = \
+        weighted_shifted_gram(X_rows, shift=gram_sums['shift'],
+                              sample_weight=sample_weight)
+
+    new_sums = {'n_samples': decay * gram_sums['n_samples'] +
+                X_rows.shape[0],
+                'fit_intercept': gram_sums['fit_intercept'],
+                'shift': gram_sums['shift'],
+                'sum_w': decay * gram_sums['sum_w'] + sum_w,
+                'sum': decay * gram_sums['sum'] + sums,
+                'gram': decay * gram_sums['gram'] + gram}
+
+    if has_y:
+        y_sums = _get_y_sums(X=X_rows, y=np.asarray(y_rows, dtype=float),
+                             shift=gram_sums['shift'],
+                             y_shift=gram_sums['y_shift'],
+                             sample_weight=sample_weight)
+
+        new_sums['y_shift'] = gram_sums['y_shift']
+        for k, v in y_sums.items():
+            new_sums[k] = decay * gram_sums[k] + v
+
+    return new_sums
+
+
+def get_gram_from_sums(gram_sums, X_scale=None):
+    """
+    Computes the Gram matrix used by LeastSquaresGram, X_c.T @ W @ X_c / n_samples, of the processed data matrix from the statistics of the raw data matrix.
+
+    Parameters
+    ----------
+    gram_sums: dict
+        The statistics from get_gram_sums() or downdate_gram_sums().
+
+    X_scale: None, array-like, shape (n_features, )
+        (Optional) The column scaling applied to X during preprocessing. Note centering X during processing does not affect the centered Gram matrix.
+
+    Output
+    ------
+    gram: array-like, shape (n_features, n_features)
+        The Gram matrix.
+    """
+    gram = np.array(gram_sums['gram'], dtype=float)
+
+    if gram_sums['fit_intercept']:
+        # about the weighted means instead of the shift
+        sums = gram_sums['sum']
+        gram -= np.outer(sums, sums) / gram_sums['sum_w']
+
+    gram /= gram_sums['n_samples']
+
+    if X_scale is not None:
+        gram /= np.outer(X_scale, X_scale)
+
+    return gram
+
+
+def get_Xty_from_sums(gram_sums, X_scale=None):
+    """
+    Computes the linear and constant terms used by LeastSquaresGram, X_c.T @ W @ y_c / n_samples and y_c.T @ W @ y_c / (2 * n_samples), of the processed data from the statistics from get_gram_sums(..., y=y) or update_gram_sums().
+
+    Parameters
+    ----------
+    gram_sums: dict
+        The statistics including the response statistics.
+
+    X_scale: None, array-like, shape (n_features, )
+        (Optional) The column scaling applied to X during preprocessing.
+
+    Output
+    ------
+    Xty, const
+
+    Xty: array-like, shape (n_features, ) or (n_features, n_responses)
+        The linear term.
+
+    const: float
+        The constant term.
+    """
+    Xty = np.array(gram_sums['Xy'], dtype=float)
+    yy = np.array(gram_sums['yy'], dtype=float)
+
+    if gram_sums['fit_intercept']:
+        # about the weighted means instead of the shifts
+        sum_y = gram_sums['sum_y']
+        Xty -= np.multiply.outer(gram_sums['sum'], sum_y) / gram_sums['sum_w']
+        yy -= sum_y ** 2 / gram_sums['sum_w']
+
+    Xty /= gram_sums['n_samples']
+    const = 0.5 * yy.sum() / gram_sums['n_samples']
+
+    if X_scale is not None:
+        if Xty.ndim == 2:
+            Xty /= np.asarray(X_scale).reshape(-1, 1)
+        else:
+            Xty /= X_scale
+
+    return Xty, const
+
+
+def _get_y_sums(X, y, shift, y_shift, sample_weight=None):
+    """
+    Computes the weighted sums of y - y_shift, (X - shift).T @ (y - y_shift) and (y - y_shift)^2.
+    """
+    if sample_weight is None:
+        w = np.ones(X.shape[0])
+    else:
+        w = np.asarray(sample_weight, dtype=float).reshape(-1)
+
+    y = y - y_shift
+    w_y = w.reshape(-1, 1) * y if y.ndim == 2 else w * y
+
+    sum_y = w_y.sum(axis=0)
+
+    # (X - 1 s^T)^T W y = X^T W y - s * sum(W y)
+    Xy = np.asarray(X.T @ w_y)
+    if y.ndim == 1:
+        Xy = Xy.reshape(-1)
+    Xy = Xy - np.multiply.outer(shift, sum_y)
+
+    yy = (w_y * y).sum(axis=0)
+
+    return {'sum_y': sum_y, 'Xy': Xy, 'yy': yy}
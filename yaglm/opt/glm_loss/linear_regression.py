@@ -15,6 +15,17 @@ def sample_grads(z, y):
     return z - y
 
 
+def sample_hess_diags(z, y):
+    return np.ones_like(z, dtype=float)
+
+
+def sample_conjugates(s, y):
+    """
+    The conjugate of the loss with respect to z i.e. 0.5 * s ** 2 + s * y.
+    """
+    return 0.5 * s ** 2 + s * y
+
+
 def sample_proxs(z, y, step=1):
     """
     computes prox_(step * f)(z)
@@ -28,6 +39,8 @@ class LeastSquares(GlmInputLoss):
     sample_losses = staticmethod(sample_losses)
     sample_grads = staticmethod(sample_grads)
     sample_proxs = staticmethod(sample_proxs)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     @property
     def is_smooth(self):
@@ -48,9 +61,11 @@ class LinReg(Glm):
 
 
 class LeastSquaresMulti(GlmInputLoss):
-    sample_losses = staticmethod(sample_losses)
+    sample_losses = staticmethod(sample_losses_multi_resp)
     sample_grads = staticmethod(sample_grads)
     sample_proxs = staticmethod(sample_proxs)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     @property
     def is_smooth(self):
@@ -1,46 +1,96 @@
 import numpy as np
+from scipy.special import expit, xlogy
 
 from yaglm.opt.glm_loss.base import Glm, GlmInputLoss
 
 
 def logsig(x):
     """
-    Compute the log-sigmoid function component-wise, see http://fa.bianp.net/blog/2019/evaluate_logistic/
+    Compute the log-sigmoid function, log(1 / (1 + exp(-x))), component-wise.
     """
-    out = np.zeros_like(x)
-    idx0 = x < -33
-    out[idx0] = x[idx0]
-    idx1 = (x >= -33) & (x < -18)
-    out[idx1] = x[idx1] - np.exp(x[idx1])
-    idx2 = (x >= -18) & (x < 37)
-    out[idx2] = -np.log1p(np.exp(-x[idx2]))
-    idx3 = x >= 37
-    out[idx3] = -np.exp(-x[idx3])
-    return out
+    return -np.logaddexp(0, -x)
 
 
 def sample_losses(z, y):
-    return (1 - y) * z - logsig(z)
+    # log(1 + exp(z)) - y * z
+    return np.logaddexp(0, z) - y * z
 
 
 def sample_grads(z, y):
     """
-    Compute sigmoid(z) - y component-wise, see http://fa.bianp.net/blog/2019/evaluate_logistic/
+    Compute sigmoid(z) - y component-wise.
     """
-    idx = z < 0
-    out = np.zeros_like(z)
-    exp_z = np.exp(z[idx])
-    y_idx = y[idx]
-    out[idx] = ((1 - y_idx) * exp_z - y_idx) / (1 + exp_z)
-    exp_nx = np.exp(-z[~idx])
-    y_nidx = y[~idx]
-    out[~idx] = ((1 - y_nidx) - y_nidx * exp_nx) / (1 + exp_nx)
+    out = expit(z)
+    out -= y
     return out
 
 
+def sample_losses_and_grads(z, y):
+    """
+    Computes the sample losses and gradients in one pass. We write
+
+    log(1 + exp(z)) = max(z, 0) + log(1 + exp(-|z|))
+    sigmoid(z) = 1 / (1 + exp(-|z|)) if z >= 0 else exp(-|z|) / (1 + exp(-|z|))
+
+    so both only need the one exponential exp(-|z|), which never overflows.
+
+    Output
+    ------
+    losses, grads
+
+    losses: array-like, shape (n_samples, )
+        The sample losses.
+
+    grads: array-like, shape (n_samples, )
+        The sample gradients.
+    """
+    z = np.asarray(z, dtype=float)
+
+    # exp(-|z|)
+    exp_nabs = np.abs(z)
+    np.negative(exp_nabs, out=exp_nabs)
+    np.exp(exp_nabs, out=exp_nabs)
+
+    # losses = max(z, 0) + log(1 + exp(-|z|)) - y * z
+    losses = np.log1p(exp_nabs)
+    losses += np.maximum(z, 0)
+    losses -= y * z
+
+    # grads = sigmoid(z) - y
+    grads = np.where(z >= 0, 1.0, exp_nabs)
+    exp_nabs += 1
+    grads /= exp_nabs
+    grads -= y
+
+    return losses, grads
+
+
+def sample_hess_diags(z, y):
+    """
+    Compute sigmoid(z) * (1 - sigmoid(z)) component-wise.
+    """
+    probs = expit(z)
+    return probs * (1 - probs)
+
+
+def sample_conjugates(s, y, tol=1e-12):
+    """
+    The conjugate of the loss with respect to z i.e. p log(p) + (1 - p) log(1 - p) where p = s + y must lie in [0, 1].
+    """
+    p = s + y
+    if np.any(p < -tol) or np.any(p > 1 + tol):
+        return np.inf * np.ones_like(p)
+
+    p = np.clip(p, a_min=0, a_max=1)
+    return xlogy(p, p) + xlogy(1 - p, 1 - p)
+
+
 class Logistic(GlmInputLoss):
     sample_losses = staticmethod(sample_losses)
     sample_grads = staticmethod(sample_grads)
+    sample_losses_and_grads = staticmethod(sample_losses_and_grads)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     # TODO: add this
     # sample_proxs = !!!!
@@ -1,6 +1,6 @@
 import numpy as np
-from scipy.special import logsumexp
-from scipy.sparse import diags
+from scipy.special import logsumexp, xlogy
+from scipy.sparse import diags, issparse
 
 from yaglm.opt.glm_loss.base import GlmMultiResp, GlmInputLoss
 from yaglm.opt.utils import safe_entrywise_mult
@@ -16,9 +16,93 @@ def sample_losses(z, y):
 
 
 def sample_grads(z, y):
-    log_probs = z - logsumexp(z, axis=1)[:, np.newaxis]
-    probs = np.exp(log_probs)
-    return np.array(probs - y)
+    probs = _softmax(z)[0]
+    return _subtract_y(probs, y)
+
+
+def sample_losses_and_grads(z, y):
+    """
+    Computes the sample losses and gradients from a single softmax computation.
+
+    Output
+    ------
+    losses, grads
+
+    losses: array-like, shape (n_samples, )
+        The sample losses.
+
+    grads: array-like, shape (n_samples, n_classes)
+        The sample gradients.
+    """
+    probs, log_norm = _softmax(z)
+
+    tops = np.array(safe_entrywise_mult(y, z).sum(axis=1)).ravel()
+    losses = log_norm - tops
+
+    return losses, _subtract_y(probs, y)
+
+
+def _softmax(z):
+    """
+    Computes the softmax of each row with as few temporary arrays as possible.
+
+    Output
+    ------
+    probs, log_norm
+
+    probs: array-like, shape (n_samples, n_classes)
+        The softmax probabilities.
+
+    log_norm: array-like, shape (n_samples, )
+        The log normalizing constants i.e. logsumexp(z, axis=1).
+    """
+    z_max = np.max(z, axis=1, keepdims=True)
+    probs = np.subtract(z, z_max, dtype=float)
+    np.exp(probs, out=probs)
+
+    norm = probs.sum(axis=1, keepdims=True)
+    probs /= norm
+
+    log_norm = np.log(norm, out=norm).ravel()
+    log_norm += z_max.ravel()
+
+    return probs, log_norm
+
+
+def _subtract_y(probs, y):
+    """
+    Computes probs - y in place.
+    """
+    if issparse(y):
+        y = y.tocoo()
+        np.subtract.at(probs, (y.row, y.col), y.data)
+    else:
+        probs -= y
+
+    return probs
+
+
+def sample_hess_diags(z, y):
+    """
+    The diagonal of each sample's Hessian i.e. p_k (1 - p_k) where p_k are the class probabilities.
+    """
+    probs = _softmax(z)[0]
+    return probs * (1 - probs)
+
+
+def sample_conjugates(s, y, tol=1e-12):
+    """
+    The conjugate of the loss with respect to z i.e. sum_k p_k log(p_k) where p = s + y must lie in the probability simplex.
+    """
+    if issparse(y):
+        y = y.toarray()
+
+    p = s + y
+    if np.any(p < -tol) or np.any(abs(p.sum(axis=1) - 1) > 1e-8):
+        return np.inf * np.ones(p.shape[0])
+
+    p = np.clip(p, a_min=0, a_max=None)
+    return xlogy(p, p).sum(axis=1)
 
 
 def combine_weights(y, sample_weight=None, class_weight=None):
@@ -32,6 +116,9 @@ def combine_weights(y, sample_weight=None, class_weight=None):
 class MultinomialLoss(GlmInputLoss):
     sample_losses = staticmethod(sample_losses)
     sample_grads = staticmethod(sample_grads)
+    sample_losses_and_grads = staticmethod(sample_losses_and_grads)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     # TODO: add this
     # sample_proxs = !!!!
@@ -1,4 +1,6 @@
 import numpy as np
+from scipy.special import xlogy
+
 from yaglm.opt.glm_loss.base import Glm, GlmMultiResp, GlmInputLoss
 
 
@@ -14,10 +16,28 @@ def sample_grads(z, y):
     return np.exp(z) - y
 
 
+def sample_hess_diags(z, y):
+    return np.exp(z)
+
+
+def sample_conjugates(s, y, tol=1e-12):
+    """
+    The conjugate of the loss with respect to z i.e. p log(p) - p where p = s + y must be non-negative.
+    """
+    p = s + y
+    if np.any(p < -tol):
+        return np.inf * np.ones_like(p)
+
+    p = np.clip(p, a_min=0, a_max=None)
+    return xlogy(p, p) - p
+
+
 class Poisson(GlmInputLoss):
 
     sample_losses = staticmethod(sample_losses)
     sample_grads = staticmethod(sample_grads)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     # TODO: add this
     # sample_proxs = !!!!
@@ -36,6 +56,8 @@ class PoissonMulti(GlmInputLoss):
 
     sample_losses = staticmethod(sample_losses_multi_resp)
     sample_grads = staticmethod(sample_grads)
+    sample_hess_diags = staticmethod(sample_hess_diags)
+    sample_conjugates = staticmethod(sample_conjugates)
 
     # TODO: add this
     # sample_proxs = !!!!
@@ -1,12 +1,12 @@
 import numpy as np
 
 from yaglm.linalg_utils import leading_sval
-from yaglm.sparse_utils import safe_hstack
+from yaglm.sparse_utils import InterceptAugmented, RowScaled
 
 
-def safe_covar_mat_op_norm(X, fit_intercept=True):
+def safe_covar_mat_op_norm(X, fit_intercept=True, sample_weight=None):
     """
-    Computes the operator norm of  X or [X; 1_n] safely. This works when X is dense, sparse, or a linear operator.
+    Computes the operator norm of  X or [1_n, X] safely. This works when X is dense, sparse, or a linear operator. The intercept column is represented implicitly so X is never copied.
 
     Parameters
     ---------
@@ -16,15 +16,20 @@ def safe_covar_mat_op_norm(X, fit_intercept=True):
     fit_intercept: bool
         Whether or not to include the intercept term.
 
+    sample_weight: None, array-like, shape (n_samples, )
+        (Optional) Sample weights. If provided, computes the operator norm of diag(sqrt(sample_weight)) [1_n, X].
+
     Output
     ------
     op_norm: float
     """
 
     if fit_intercept:
-        constant_col = np.ones((X.shape[0], 1))
-        X_ = safe_hstack([constant_col, X])
+        X_ = InterceptAugmented(X)
     else:
         X_ = X
 
+    if sample_weight is not None:
+        X_ = RowScaled(mat=X_, s=np.sqrt(sample_weight))
+
     return leading_sval(X_)
@@ -0,0 +1,95 @@
+import numpy as np
+
+from yaglm.opt.base import Func
+from yaglm.opt.prox import soft_thresh
+
+
+class BatchEntrywise(Func):
+    """
+    Represents K independent entrywise elastic net penalties
+
+    f_k(coef_k) = sum_j lasso_pen_vals_kj |coef_kj| + 0.5 * sum_j ridge_pen_vals_kj coef_kj^2
+
+    for k = 1, ..., K. This covers the lasso, ridge and elastic net. The input is an array of shape (K, n_features + 1) (or (K, n_features) if fit_intercept=False) whose first column is the unpenalized intercept. eval() returns an array of shape (K, ) and prox() accepts a step size for each problem.
+
+    Parameters
+    ----------
+    lasso_pen_vals: None, array-like, shape (K, n_features)
+        The entrywise lasso penalty values.
+
+    ridge_pen_vals: None, array-like, shape (K, n_features)
+        The entrywise ridge penalty values.
+
+    fit_intercept: bool
+        Whether or not the first column of the input is an intercept.
+    """
+    def __init__(self, lasso_pen_vals=None, ridge_pen_vals=None,
+                 fit_intercept=True):
+        self.lasso_pen_vals = lasso_pen_vals
+        self.ridge_pen_vals = ridge_pen_vals
+        self.fit_intercept = fit_intercept
+
+    @property
+    def is_smooth(self):
+        return self.lasso_pen_vals is None
+
+    @property
+    def is_proximable(self):
+        return True
+
+    def subset(self, idxs):
+        """
+        Returns the penalty for a subset of the problems.
+
+        Parameters
+        ----------
+        idxs: array-like of ints
+            The problems to keep.
+
+        Output
+        ------
+        func: BatchEntrywise
+        """
+        lasso_pen_vals = None if self.lasso_pen_vals is None \
+            else self.lasso_pen_vals[idxs]
+        ridge_pen_vals = None if self.ridge_pen_vals is None \
+            else self.ridge_pen_vals[idxs]
+
+        return BatchEntrywise(lasso_pen_vals=lasso_pen_vals,
+                              ridge_pen_vals=ridge_pen_vals,
+                              fit_intercept=self.fit_intercept)
+
+    def _get_coef(self, x):
+        if self.fit_intercept:
+            return x[:, 1:]
+        else:
+            return x
+
+    def _eval(self, x):
+        coef = self._get_coef(x)
+
+        out = np.zeros(x.shape[0])
+        if self.lasso_pen_vals is not None:
+            out += (self.lasso_pen_vals * abs(coef)).sum(axis=1)
+
+        if self.ridge_pen_vals is not None:
+            out += 0.5 * (self.ridge_pen_vals * coef ** 2).sum(axis=1)
+
+        return out
+
+    def _prox(self, x, step):
+        step = np.array(step, dtype=float).reshape(-1, 1)
+
+        coef = self._get_coef(x)
+
+        # prox decomposition formula; see ElasticNetLikeMixinCooprativeProx
+        if self.lasso_pen_vals is not None:
+            coef = soft_thresh(coef, step * self.lasso_pen_vals)
+
+        if self.ridge_pen_vals is not None:
+            coef = coef / (1 + step * self.ridge_pen_vals)
+
+        if self.fit_intercept:
+            return np.hstack([x[:, [0]], coef])
+        else:
+            return coef
@@ -3,8 +3,10 @@ from scipy.linalg import svd
 
 from yaglm.opt.base import Func, EntrywiseFunc
 from yaglm.opt.convex_funcs import L2Norm, SquaredL1
-from yaglm.opt.prox import soft_thresh, L2_prox
-from yaglm.linalg_utils import euclid_norm, leading_sval
+from yaglm.opt.prox import soft_thresh, L2_prox, tv1_prox, \
+    tf_prox_dual_newton
+from yaglm.linalg_utils import euclid_norm, leading_sval, truncated_svd
+from yaglm.trend_filtering import get_tf_mat
 
 
 class Ridge(EntrywiseFunc):
@@ -52,6 +54,14 @@ class Ridge(EntrywiseFunc):
 
         return x / (1 + shrink_vals)
 
+    def _conj(self, x):
+        # conj(x) = 0.5 * sum_j x_j^2 / (pen_val * weights_j)
+        mult = self.pen_val
+        if self.weights is not None:
+            mult = mult * self.weights
+
+        return 0.5 * safe_divide_sum(num=x ** 2, denom=mult)
+
     def _grad(self, x):
         coef_grad = x
         if self.weights is not None:
@@ -164,6 +174,21 @@ class Lasso(EntrywiseFunc):
         # apply soft thresholding
         return soft_thresh(x, thresh_vals)
 
+    def _conj(self, x):
+        return norm_ball_indicator(self.dual_norm(x))
+
+    def dual_norm(self, x):
+        """
+        Computes max_j |x_j| / (pen_val * weights_j). The conjugate of this penalty is the indicator of the set {x: dual_norm(x) <= 1}.
+        """
+        x = np.array(x, copy=False).reshape(-1)
+        if self.weights is None:
+            mult = self.pen_val
+        else:
+            mult = self.pen_val * self.weights
+
+        return safe_divide_max(num=abs(x), denom=mult)
+
     @property
     def is_smooth(self):
         return False
@@ -227,6 +252,18 @@ class GroupLasso(Func):
 
         return out
 
+    def _conj(self, x):
+        return norm_ball_indicator(self.dual_norm(x))
+
+    def dual_norm(self, x):
+        """
+        Computes max_g ||x_g||_2 / (pen_val * weights_g). The conjugate of this penalty is the indicator of the set {x: dual_norm(x) <= 1}.
+        """
+        x = np.array(x, copy=False)
+        norms = [euclid_norm(x[grp_idxs]) for grp_idxs in self.groups]
+        mults = [self.pen_funcs[g].mult for g in range(len(self.groups))]
+        return safe_divide_max(num=np.array(norms), denom=np.array(mults))
+
     @property
     def is_smooth(self):
         return False
@@ -303,34 +340,183 @@ class ExclusiveGroupLasso(Func):
 
 
 class NuclearNorm(Func):
+    """
+    f(x) = pen_val * sum_j weights_j sigma_j(x)
+
+    where sigma_j(x) are the singular values of x in decreasing order.
+
+    The prox only needs the singular triplets whose singular values are above the thresholds. By default we track the rank of the last prox output and compute only the top rank + rank_buffer singular triplets using a subspace iteration that is warm started from the previous leading right singular vectors; the number of triplets is doubled until we find one below the threshold. We fall back on a full SVD for the first prox, when the required rank grows too large or when the subspace iteration does not converge (e.g. if there is no spectral gap near the threshold). The singular values of the last prox output are cached so evaluating the penalty at this value does not need another SVD.
+
+    Parameters
+    ----------
+    pen_val: float
+        The multiplicative penalty value.
+
+    weights: None, array-like
+        The (optional) weights for each singular value. The truncated SVD is only used if the weights are non-decreasing.
+
+    truncate: bool
+        Whether or not to use the truncated SVD for the prox.
+
+    rank_buffer: int
+        Number of extra singular triplets to compute beyond the rank of the previous prox output.
+
+    max_rank_frac: float
+        Use a full SVD if we need more than this fraction of the singular triplets.
+
+    max_iter: int
+        Maximum number of subspace iterations for the truncated SVD.
+
+    n_skip_fail: int
+        If the truncated SVD fails to converge, use the full SVD for this many subsequent prox evaluations.
+
+    References
+    ----------
+    Halko, N., Martinsson, P.G. and Tropp, J.A., 2011. Finding structure with randomness: Probabilistic algorithms for constructing approximate matrix decompositions. SIAM review, 53(2), pp.217-288.
+    """
     # https://github.com/scikit-learn-contrib/lightning/blob/master/lightning/impl/penalty.py
 
-    def __init__(self, pen_val=1, weights=None):
+    def __init__(self, pen_val=1, weights=None,
+                 truncate=True, rank_buffer=5, max_rank_frac=0.25,
+                 max_iter=10, n_skip_fail=10):
         self.pen_val = pen_val
         if weights is not None:
             weights = np.array(weights).ravel()
 
         self.weights = weights
+        self.truncate = truncate
+        self.rank_buffer = rank_buffer
+        self.max_rank_frac = max_rank_frac
+        self.max_iter = max_iter
+        self.n_skip_fail = n_skip_fail
+
+        # the truncated SVD is only exact for non-decreasing weights
+        self._can_truncate = truncate and \
+            (weights is None or np.all(np.diff(weights) >= 0))
+
+        # warm start data from the last prox
+        self._n_skip = 0
+        self._rank = 0
+        self._V = None
+        self._last_prox = None
+        self._rng = np.random.RandomState(0)
+
+    def _get_thresh(self, step, n_svals):
+        """
+        Gets the threshold for each singular value.
+        """
+        if self.weights is None:
+            return (self.pen_val * step) * np.ones(n_svals)
+        else:
+            return (self.pen_val * step) * self.weights[:n_svals]
 
     def _prox(self, x, step=1):
 
-        U, s, V = svd(x, full_matrices=False)
-        if self.weights is None:
-            thresh = self.pen_val * step
-        else:
-            thresh = (self.pen_val * step) * self.weights
+        thresh = self._get_thresh(step=step, n_svals=min(x.shape))
+        U, s, V = self._top_svd(x, thresh=thresh)
+
+        s = np.maximum(s - thresh[:len(s)], 0)
+        nonzero = s > 0
+        s = s[nonzero]
+        V = V[nonzero, :]
+        prox = np.dot(U[:, nonzero] * s, V)
+
+        # cache data for evaluation
+        self._last_prox = (prox.copy(), s)
+
+        return prox
+
+    def _top_svd(self, x, thresh):
+        """
+        Computes (at least) the singular triplets of x whose singular values are above the thresholds.
+
+        Output
+        ------
+        U, s, V
+            The (possibly truncated) SVD.
+        """
+        n_svals = min(x.shape)
+        max_rank = int(self.max_rank_frac * n_svals)
+
+        # the first prox uses the full SVD to initialize the rank and we
+        # skip the truncated SVD for a while after it fails to converge
+        use_trunc = self._can_truncate and self._V is not None \
+            and self._n_skip == 0
+        self._n_skip = max(self._n_skip - 1, 0)
+
+        if use_trunc:
+            V_init = self._V
+            n_comp = self._rank + self.rank_buffer
+
+            def n_converge(s):
+                # the triplets above the threshold
+                return np.sum(s > thresh[:len(s)])
+
+            while n_comp <= max_rank:
+                U, s, V, converged = \
+                    truncated_svd(x, rank=n_comp, V_init=V_init,
+                                  n_converge=n_converge,
+                                  max_iter=self.max_iter,
+                                  random_state=self._rng)
+
+                if not converged:
+                    self._n_skip = self.n_skip_fail
+                    break
+
+                # if one of the singular values is below the threshold
+                # then so are all remaining singular values
+                if np.any(s <= thresh[:n_comp]):
+                    self._set_warm_start(s=s, V=V, thresh=thresh)
+                    return U, s, V
+
+                V_init = V.T
+                n_comp *= 2
 
-        s = np.maximum(s - thresh, 0)
-        U *= s
-        return np.dot(U, V)
+        U, s, V = svd(x, full_matrices=False)
+        if self._can_truncate:
+            self._set_warm_start(s=s, V=V, thresh=thresh)
+        return U, s, V
+
+    def _set_warm_start(self, s, V, thresh):
+        """
+        Stores the rank of the prox output and the leading right singular vectors (including the buffer directions) for warm starting the next prox.
+        """
+        self._rank = np.sum(s > thresh[:len(s)])
+        n_keep = min(self._rank + self.rank_buffer, len(s))
+        self._V = V[:n_keep, :].T
 
     def _eval(self, x):
 
-        U, s, V = svd(x, full_matrices=False)
+        # reuse the singular values from the last prox
+        if self._last_prox is not None and \
+                np.array_equal(x, self._last_prox[0]):
+            s = self._last_prox[1]
+        else:
+            s = svd(x, compute_uv=False)
+
         if self.weights is None:
             return self.pen_val * np.sum(s)
         else:
-            return self.pen_val * self.weights.T @ s
+            return self.pen_val * self.weights[:len(s)].T @ s
+
+    def _conj(self, x):
+        return norm_ball_indicator(self.dual_norm(x))
+
+    def dual_norm(self, x):
+        """
+        Computes sigma_1(x) / pen_val. The conjugate of this penalty is the indicator of the set {x: dual_norm(x) <= 1}. This is only implemented for the unweighted nuclear norm.
+        """
+        if self.weights is not None:
+            raise NotImplementedError("The dual norm is only implemented "
+                                      "for the unweighted nuclear norm")
+
+        if min(x.shape) <= 2:
+            op_norm = svd(x, compute_uv=False)[0]
+        else:
+            op_norm = leading_sval(x, solver='arpack')
+
+        return safe_divide_max(num=np.array([op_norm]),
+                               denom=np.array([self.pen_val]))
 
     @property
     def is_smooth(self):
@@ -369,6 +555,21 @@ class MultiTaskLasso(Func):
 
         return out
 
+    def _conj(self, x):
+        return norm_ball_indicator(self.dual_norm(x))
+
+    def dual_norm(self, x):
+        """
+        Computes max_r ||x_r||_2 / (pen_val * weights_r) where x_r are the rows of x. The conjugate of this penalty is the indicator of the set {x: dual_norm(x) <= 1}.
+        """
+        norms = np.sqrt((np.array(x, copy=False) ** 2).sum(axis=1))
+        if self.weights is None:
+            mult = self.pen_val
+        else:
+            mult = self.pen_val * np.array(self.weights)
+
+        return safe_divide_max(num=norms, denom=mult)
+
     @property
     def is_smooth(self):
         return False
@@ -415,6 +616,116 @@ class GeneralizedLasso(Func):
     def is_proximable(self):
         return False
 
+
+class TrendFiltering(Func):
+    """
+    The trend filtering penalty on a chain graph
+
+    f(x) = pen_val * sum_r weights_r |(D_k @ x)_r|
+
+    where D_k is the kth order difference matrix (see yaglm.trend_filtering.get_tf_mat). When order=1 this is the fused lasso i.e. total-variation 1 penalty. This is a special case of the generalized lasso whose prox can be computed efficiently. For the unweighted order 1 case we use the linear time algorithm of (Condat, 2013). Otherwise we use a projected Newton method on the dual problem that is warm started from the previous prox evaluation.
+
+    Multiple response coefficients are penalized separately for each column.
+
+    Parameters
+    ----------
+    pen_val: float
+        The multiplicative penalty value.
+
+    order: int
+        The order of the trend filtering difference.
+
+    weights: None, array-like, shape (n_features - order, )
+        The (optional) weights for each difference.
+
+    References
+    ----------
+    Tibshirani, R.J., 2014. Adaptive piecewise polynomial estimation via trend filtering. The Annals of statistics, 42(1), pp.285-323.
+
+    Condat, L., 2013. A direct algorithm for 1-D total variation denoising. IEEE Signal Processing Letters, 20(11), pp.1054-1057.
+    """
+    def __init__(self, pen_val=1.0, order=1, weights=None):
+
+        self.pen_val = pen_val
+        self.order = int(order)
+
+        if weights is not None:
+            weights = np.array(weights).reshape(-1)
+        self.weights = weights
+
+        # cache the difference matrices and dual variables
+        # so we can warm start the dual prox algorithm
+        self._diff_mats = {}
+        self._dual_vars = {}
+
+    @property
+    def is_smooth(self):
+        return False
+
+    @property
+    def is_proximable(self):
+        return True
+
+    def _eval(self, x):
+        diffs = abs(np.diff(x, n=self.order, axis=0))
+
+        if self.weights is not None:
+            if diffs.ndim == 2:
+                diffs = diffs * self.weights.reshape(-1, 1)
+            else:
+                diffs = diffs * self.weights
+
+        return self.pen_val * diffs.sum()
+
+    def _prox(self, x, step):
+        if x.ndim == 2:
+            return np.stack([self._prox_vec(x[:, j], step=step, key=j)
+                             for j in range(x.shape[1])], axis=1)
+        else:
+            return self._prox_vec(x, step=step, key=0)
+
+    def _prox_vec(self, x, step, key):
+        """
+        Computes the prox for a single vector.
+
+        Parameters
+        ----------
+        x: array-like, shape (n_features, )
+            The vector to evaluate the prox at.
+
+        step: float
+            The prox step size.
+
+        key: int
+            Which response this vector corresponds to; used for warm starting.
+        """
+        thresh = step * self.pen_val
+        if self.weights is not None:
+            thresh = thresh * self.weights
+
+        # direct algorithm for the TV-1 prox
+        if self.order == 1 and self.weights is None:
+            return tv1_prox(x, thresh)
+
+        # projected newton on the dual problem
+        n_features = x.shape[0]
+        if n_features not in self._diff_mats:
+            diff_mat = get_tf_mat(d=n_features, k=self.order).tocsr()
+            self._diff_mats[n_features] = (diff_mat,
+                                           (diff_mat @ diff_mat.T).tocsr())
+        diff_mat, gram = self._diff_mats[n_features]
+
+        dual_init = self._dual_vars.get(key, None)
+        if dual_init is not None and dual_init.shape[0] != diff_mat.shape[0]:
+            dual_init = None
+
+        prox, self._dual_vars[key] = \
+            tf_prox_dual_newton(x=x, thresh=thresh,
+                                diff_mat=diff_mat, gram=gram,
+                                dual_init=dual_init)
+
+        return prox
+
 ########################
 # ElasticNet Penalties #
 ########################
@@ -468,6 +779,21 @@ class ElasticNetLikeMixinCooprativeProx:
         y = self.lasso._prox(x, step=step)
         return self.ridge._prox(y, step=step)
 
+    def _conj(self, x):
+        ridge_pen_val = self.ridge.pen_val
+        if ridge_pen_val == 0:
+            return self.lasso._conj(x)
+
+        if self.ridge.weights is not None:
+            raise NotImplementedError("The conjugate is only implemented "
+                                      "for unweighted ridges")
+
+        # the sup in the conjugate is achieved at
+        # z = argmin_z lasso(z) + 0.5 * ridge_pen_val ||z - x / ridge_pen_val||^2
+        z = self.lasso._prox(x / ridge_pen_val, step=1 / ridge_pen_val)
+        return x.ravel() @ z.ravel() - self.lasso._eval(z) - \
+            self.ridge._eval(z)
+
 
 class ElasticNet(ElasticNetLikeMixinCooprativeProx, Func):
 
@@ -540,3 +866,53 @@ class SparseGroupLasso(Func):
         # Prop 2.1 from Zhang et al 2020 goes through with weights
         y = self.group._prox(x, step=step)
         return self.sparse._prox(y, step=step)
+
+
+def norm_ball_indicator(dual_norm, tol=1e-10):
+    """
+    The conjugate of a norm penalty is the indicator function of its dual norm ball.
+
+    Parameters
+    ----------
+    dual_norm: float
+        The value of the (scaled) dual norm.
+
+    tol: float
+        Numerical tolerance for being in the dual norm ball.
+
+    Output
+    ------
+    value: float
+        0 if dual_norm <= 1 + tol, otherwise np.inf.
+    """
+    if dual_norm <= 1 + tol:
+        return 0
+    else:
+        return np.inf
+
+
+def safe_divide_max(num, denom):
+    """
+    Computes max_j num_j / denom_j for non-negative num where 0 / 0 = 0 and num / 0 = np.inf for num > 0.
+    """
+    ratio = np.divide(num, denom,
+                      out=np.zeros(np.broadcast(num, denom).shape),
+                      where=np.array(denom) != 0)
+
+    if np.any((np.array(denom) == 0) & (np.array(num) > 0)):
+        return np.inf
+
+    return ratio.max() if ratio.size > 0 else 0
+
+
+def safe_divide_sum(num, denom):
+    """
+    Computes sum_j num_j / denom_j for non-negative num where 0 / 0 = 0 and num / 0 = np.inf for num > 0.
+    """
+    if np.any((np.array(denom) == 0) & (np.array(num) > 0)):
+        return np.inf
+
+    return np.divide(num, denom,
+                     out=np.zeros(np.broadcast(num, denom).shape),
+                     where=np.array(denom) != 0).sum()
+
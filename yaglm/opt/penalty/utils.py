@@ -3,6 +3,7 @@ import numpy as np
 from yaglm.opt.base import Func
 from yaglm.opt.utils import decat_coef_inter_mat
 from yaglm.opt.utils import decat_coef_inter_vec
+from yaglm.opt.penalty.convex import Lasso, Ridge, ElasticNet
 
 
 class WithIntercept(Func):
@@ -67,3 +68,49 @@ class MatWithIntercept(Func):
     @property
     def is_proximable(self):
         return self.func.is_proximable
+
+
+def get_entrywise_pen_vals(func, coef_shape):
+    """
+    Gets the entrywise lasso and ridge penalty values of a lasso, ridge or elastic net penalty function.
+
+    Parameters
+    ----------
+    func: None, Lasso, Ridge, ElasticNet
+        The penalty function.
+
+    coef_shape: tuple of ints
+        Shape of the coefficient.
+
+    Output
+    ------
+    lasso_pen_vals, ridge_pen_vals
+
+    lasso_pen_vals: None, array-like, shape coef_shape
+        The lasso penalty value for each coefficient entry.
+
+    ridge_pen_vals: None, array-like, shape coef_shape
+        The ridge penalty value for each coefficient entry.
+    """
+
+    def get_vals(f):
+        if f.weights is None:
+            return f.pen_val * np.ones(coef_shape)
+        else:
+            return f.pen_val * np.array(f.weights).reshape(coef_shape)
+
+    if func is None:
+        return None, None
+
+    elif isinstance(func, Lasso):
+        return get_vals(func), None
+
+    elif isinstance(func, Ridge):
+        return None, get_vals(func)
+
+    elif isinstance(func, ElasticNet):
+        return get_vals(func.lasso), get_vals(func.ridge)
+
+    else:
+        raise NotImplementedError("{} is not an entrywise penalty".
+                                  format(func))
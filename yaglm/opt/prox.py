@@ -1,4 +1,7 @@
 import numpy as np
+from scipy.linalg import solveh_banded
+from scipy.sparse import coo_matrix
+
 from yaglm.linalg_utils import euclid_norm
 
 
@@ -167,3 +170,297 @@ def squared_l1_prox_pos(x, step=1, weights=None, check=False):
 
     # return soft thresholding
     return np.maximum(x - thresh, 0)
+
+
+def tv1_prox(x, thresh):
+    """
+    Computes the proximal operator of the total-variation 1 (i.e. 1D fused lasso) penalty
+
+    argmin_z 0.5 * ||x - z||_2^2 + thresh * sum_{j=1}^{d - 1} |z_{j+1} - z_j|
+
+    using the direct, linear time algorithm of (Condat, 2013).
+
+    Parameters
+    ----------
+    x: array-like, shape (d, )
+        The vector to evaluate the prox at.
+
+    thresh: float
+        The (non-negative) penalty value.
+
+    Output
+    ------
+    p: array-like, shape (d, )
+        The value of the proximal operator.
+
+    References
+    ----------
+    Condat, L., 2013. A direct algorithm for 1-D total variation denoising. IEEE Signal Processing Letters, 20(11), pp.1054-1057.
+    """
+    # pure python loops are much faster on lists than on numpy arrays
+    y = np.array(x, dtype=float).reshape(-1).tolist()
+    width = len(y)
+    out = [0.0] * width
+
+    if width == 0:
+        return np.array(out)
+
+    lam = float(thresh)
+    if lam <= 0 or width == 1:
+        return np.array(y)
+
+    k = k0 = k_minus = k_plus = 0
+    u_min = lam
+    u_max = -lam
+    v_min = y[0] - lam
+    v_max = y[0] + lam
+
+    # see the c code accompanying (Condat, 2013). The variable names
+    # follow the c code
+    while True:
+
+        # we are at the last point
+        while k == width - 1:
+            if u_min < 0:
+                # the segment k0, ..., k_minus is at v_min
+                out[k0:k_minus + 1] = [v_min] * (k_minus + 1 - k0)
+                k = k0 = k_minus = k_minus + 1
+                v_min = y[k]
+                u_min = lam
+                u_max = v_min + u_min - v_max
+
+            elif u_max > 0:
+                # the segment k0, ..., k_plus is at v_max
+                out[k0:k_plus + 1] = [v_max] * (k_plus + 1 - k0)
+                k = k0 = k_plus = k_plus + 1
+                v_max = y[k]
+                u_max = -lam
+                u_min = v_max + u_max - v_min
+
+            else:
+                # the last segment
+                v_min += u_min / (k - k0 + 1)
+                out[k0:k + 1] = [v_min] * (k + 1 - k0)
+                return np.array(out)
+
+        u_min += y[k + 1] - v_min
+        u_max += y[k + 1] - v_max
+
+        if u_min < -lam:
+            # negative jump
+            out[k0:k_minus + 1] = [v_min] * (k_minus + 1 - k0)
+            k = k0 = k_plus = k_minus = k_minus + 1
+            v_min = y[k]
+            v_max = v_min + 2 * lam
+            u_min = lam
+            u_max = -lam
+
+        elif u_max > lam:
+            # positive jump
+            out[k0:k_plus + 1] = [v_max] * (k_plus + 1 - k0)
+            k = k0 = k_plus = k_minus = k_plus + 1
+            v_max = y[k]
+            v_min = v_max - 2 * lam
+            u_min = lam
+            u_max = -lam
+
+        else:
+            # no jump
+            k += 1
+            if u_min >= lam:
+                k_minus = k
+                v_min += (u_min - lam) / (k_minus - k0 + 1)
+                u_min = lam
+
+            if u_max <= -lam:
+                k_plus = k
+                v_max += (u_max + lam) / (k_plus - k0 + 1)
+                u_max = -lam
+
+
+def tf_prox_dual_newton(x, thresh, diff_mat, gram=None, dual_init=None,
+                        tol=1e-10, max_iter=200, ls_max_steps=30):
+    """
+    Computes the proximal operator of the (weighted) generalized lasso
+
+    argmin_z 0.5 * ||x - z||_2^2 + sum_r thresh_r |diff_mat[r, :].T @ z|
+
+    for a banded difference matrix (e.g. the trend filtering difference matrix) using a projected Newton method on the dual problem
+
+    min_u 0.5 * ||diff_mat.T @ u||_2^2 - u.T @ diff_mat @ x s.t. |u_r| <= thresh_r
+
+    The primal solution is given by z = x - diff_mat.T @ u. Each Newton step requires solving a banded linear system in diff_mat @ diff_mat.T restricted to the free (not at the boundary) dual variables, which is linear time for trend filtering. The method stops when the duality gap is small.
+
+    Parameters
+    ----------
+    x: array-like, shape (d, )
+        The vector to evaluate the prox at.
+
+    thresh: float, array-like shape (m, )
+        The (non-negative) penalty values.
+
+    diff_mat: array-like, shape (m, d)
+        The difference matrix. This should be banded i.e. diff_mat @ diff_mat.T should have a small bandwidth.
+
+    gram: None, array-like, shape (m, m)
+        (Optional) The precomputed diff_mat @ diff_mat.T.
+
+    dual_init: None, array-like, shape (m, )
+        (Optional) Warm start for the dual variable.
+
+    tol: float
+        Stop when the duality gap is less than tol * (primal objective + 1).
+
+    max_iter: int
+        Maximum number of Newton steps.
+
+    ls_max_steps: int
+        Maximum number of steps for the projected Armijo line search.
+
+    Output
+    ------
+    p, dual
+
+    p: array-like, shape (d, )
+        The value of the proximal operator.
+
+    dual: array-like, shape (m, )
+        The dual solution; this can be used to warm start the next call.
+
+    References
+    ----------
+    Bertsekas, D.P., 1982. Projected Newton methods for optimization problems with simple constraints. SIAM Journal on control and Optimization, 20(2), pp.221-246.
+
+    Barbero, A. and Sra, S., 2018. Modular proximal optimization for multidimensional total-variation regularization. Journal of Machine Learning Research, 19(56), pp.1-82.
+    """
+    x = np.array(x, dtype=float).reshape(-1)
+    n_dual = diff_mat.shape[0]
+
+    if n_dual == 0:
+        return x, np.zeros(0)
+
+    if gram is None:
+        gram = diff_mat @ diff_mat.T
+    bands = get_sym_bands(gram)
+
+    t = np.array(thresh, dtype=float) * np.ones(n_dual)
+
+    if dual_init is None:
+        u = np.zeros(n_dual)
+    else:
+        u = np.clip(dual_init, a_min=-t, a_max=t)
+
+    Dx = diff_mat @ x
+
+    def dual_obj(u):
+        Dt_u = diff_mat.T @ u
+        return 0.5 * Dt_u @ Dt_u - u @ Dx
+
+    # boundary tolerance for identifying the active constraints
+    bd_eps = 1e-12 * (1 + t.max())
+
+    for it in range(int(max_iter)):
+        z = x - diff_mat.T @ u
+        Dz = diff_mat @ z
+
+        # the duality gap is sum_r t_r |Dz_r| - u.T @ Dz >= 0
+        primal_pen = t @ abs(Dz)
+        gap = primal_pen - u @ Dz
+        primal_obj = 0.5 * ((x - z) ** 2).sum() + primal_pen
+        if gap <= tol * (primal_obj + 1):
+            break
+
+        # the gradient of the dual objective
+        grad = -Dz
+
+        # active constraints are at the boundary with the gradient
+        # pointing outward
+        active = ((u <= -t + bd_eps) & (grad > 0)) | \
+            ((u >= t - bd_eps) & (grad < 0))
+        free = np.where(~active)[0]
+
+        # Newton direction on the free variables
+        direction = np.zeros(n_dual)
+        if len(free) > 0:
+            ab = get_sub_bands(bands=bands, idxs=free)
+            direction[free] = solveh_banded(ab, grad[free],
+                                            check_finite=False)
+        else:
+            # all constraints are active and we cannot make progress
+            break
+
+        # projected Armijo line search
+        obj = dual_obj(u)
+        step = 1
+        for _ in range(ls_max_steps):
+            u_new = np.clip(u - step * direction, a_min=-t, a_max=t)
+            if dual_obj(u_new) <= obj + 1e-4 * grad @ (u_new - u):
+                break
+            step *= 0.5
+
+        u = u_new
+
+    z = x - diff_mat.T @ u
+    return z, u
+
+
+def get_sym_bands(mat):
+    """
+    Gets the upper bands of a sparse, symmetric banded matrix.
+
+    Parameters
+    ----------
+    mat: array-like, shape (m, m)
+        The symmetric banded matrix.
+
+    Output
+    ------
+    bands: array-like, shape (bandwidth + 1, m)
+        The upper diagonals of the matrix; bands[j] is the jth upper diagonal padded with zeros at the end.
+    """
+    mat = coo_matrix(mat)
+    n = mat.shape[0]
+    offsets = mat.col - mat.row
+    bw = max(offsets.max(), 0) if len(offsets) > 0 else 0
+
+    bands = np.zeros((bw + 1, n))
+    upper = offsets >= 0
+    bands[offsets[upper], mat.row[upper]] = mat.data[upper]
+    return bands
+
+
+def get_sub_bands(bands, idxs):
+    """
+    Gets the upper banded representation (see scipy.linalg.solveh_banded) of a principal submatrix of a symmetric banded matrix.
+
+    Parameters
+    ----------
+    bands: array-like, shape (bandwidth + 1, m)
+        The upper diagonals of the matrix output by get_sym_bands().
+
+    idxs: array-like of ints
+        The sorted indices of the rows/columns of the submatrix.
+
+    Output
+    ------
+    ab: array-like, shape (sub_bandwidth + 1, len(idxs))
+        The upper banded form of the submatrix.
+    """
+    bw = len(bands) - 1
+    n_sub = len(idxs)
+    sub_bw = min(bw, n_sub - 1)
+    ab = np.zeros((sub_bw + 1, n_sub))
+    ab[sub_bw, :] = bands[0][idxs]
+
+    # the jth upper diagonal of the submatrix contains
+    # mat[idxs[p], idxs[p + j]] which is only non-zero if
+    # idxs[p + j] - idxs[p] <= bw
+    for j in range(1, sub_bw + 1):
+        gaps = idxs[j:] - idxs[:-j]
+        vals = np.zeros(n_sub - j)
+        in_band = gaps <= bw
+        if in_band.any():
+            vals[in_band] = bands[gaps[in_band], idxs[:-j][in_band]]
+        ab[sub_bw - j, j:] = vals
+
+    return ab
@@ -53,13 +53,13 @@ def check_no_change(current, prev, norm='max', tol=None,
         def f(x): return np.abs(x).max()
 
     elif norm == 'mad':
-        def f(x): np.abs(x).mean()
+        def f(x): return np.abs(x).mean()
 
     elif norm == 'L2':
-        def f(x): np.sqrt(((x) ** 2).sum())
+        def f(x): return np.sqrt(((x) ** 2).sum())
 
     elif norm == 'rmse':
-        def f(x): np.sqrt(((x) ** 2).mean())
+        def f(x): return np.sqrt(((x) ** 2).mean())
 
     else:
         raise ValueError("Bad input to norm: {}".format(norm))
@@ -139,3 +139,40 @@ def check_decreasing_loss(current, prev, tol=None,
         return True
     else:
         return False
+
+
+def check_duality_gap(gap, primal, tol=None,
+                      rel_crit=False, tol_eps=np.finfo(float).eps):
+    """
+    Decides whether or not to stop an optimization algorithm based on the duality gap, which certifies the suboptimality of the current primal value i.e. primal - optimal_value <= gap.
+
+    Parameters
+    ----------
+    gap: float
+        The duality gap.
+
+    primal: float
+        The primal objective function value.
+
+    tol: None, float
+        The tolerance stopping criteria i.e. will stop if gap <= tol. If None, will always return stop=False.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale i.e. gap / (|primal| + tol_eps) <= tol
+
+    tol_eps: float
+        Epsilon value for relative tolerance.
+
+    Output
+    ------
+    stop: bool
+        Whether or not to stop.
+    """
+    if tol is None or gap is None:
+        return False
+
+    if rel_crit:
+        gap = gap / (abs(primal) + tol_eps)
+
+    return gap <= tol
+
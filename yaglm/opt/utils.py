@@ -231,3 +231,30 @@ def safe_concat(a, b):
         to_cat.append(np.array(b).reshape(-1))
 
     return np.concatenate(to_cat)
+
+
+def progress_range(n, verbose=False, desc=None):
+    """
+    Returns range(n), wrapped in a tqdm progress bar if verbose. tqdm is only imported when needed since it is slow to import.
+
+    Parameters
+    ----------
+    n: int
+        Number of iterations.
+
+    verbose: bool
+        Whether or not to show a progress bar.
+
+    desc: None, str
+        (Optional) Description for the progress bar.
+
+    Output
+    ------
+    iterator: iterable
+        The iterations.
+    """
+    if not verbose:
+        return range(int(n))
+
+    from tqdm import tqdm
+    return tqdm(range(int(n)), desc=desc)
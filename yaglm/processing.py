@@ -5,19 +5,21 @@ from copy import deepcopy
 from numbers import Number
 
 from yaglm.utils import is_multi_response
-from yaglm.extmath import weighted_mean_std
+from yaglm.extmath import weighted_mean_std, weighted_shifted_sums
 from yaglm.sparse_utils import center_scale_sparse, is_sparse_or_lin_op, \
-    safe_norm
+    safe_norm, is_out_of_core, as_row_chunked
 
 
 def process_X(X, fit_intercept=True,
               standardize=False, groups=None, sample_weight=None, copy=True,
-              check_input=True, accept_sparse=True):
+              check_input=True, accept_sparse=True, X_sums=None):
     """
     Processes and possibly standardize the X feature matrix. If standardize=True then the coulmns are scaled such that their euclidean norm is equal to sqrt(n_samples). If additionally fit_intercept=True, the columns of X are first mean centered before scaling.
 
     If grouops is provided an additional scaling is applied that scales each variable by 1 / sqrt(group size).
 
+    Out-of-core matrices (np.memmap or yaglm.sparse_utils.RowChunked) are never copied; they are wrapped as a RowChunked linear operator and any standardization is applied lazily.
+
     Parameters
     ----------
     X: array-like, shape (n_samples, n_features)
@@ -36,7 +38,7 @@ def process_X(X, fit_intercept=True,
         Individual weights for each sample.
 
     copy: bool
-        Copy data matrix or standardize in place.
+        Copy data matrix or standardize in place. Ignored for out-of-core matrices, which are never copied.
 
     check_input: bool
         Whether or not we should validate the input.
@@ -44,6 +46,9 @@ def process_X(X, fit_intercept=True,
     accept_sparse : str, bool or list/tuple of str
         See sklearn.utils.validation.check_array.
 
+    X_sums: None, dict
+        (Optional) Precomputed summary statistics of X from get_X_sums() or downdate_X_sums(). If provided, the column means/scales are computed from these instead of from X.
+
     Output
     ------
     X, out
@@ -63,7 +68,11 @@ def process_X(X, fit_intercept=True,
     out = {}
 
     # input validation and copying
-    if check_input:
+    if is_out_of_core(X):
+        # never copy on disk data; products with X stream over row blocks
+        X = as_row_chunked(X)
+
+    elif check_input:
         X = check_array(X, copy=copy,
                         accept_sparse=accept_sparse,
                         dtype=FLOAT_DTYPES)
@@ -75,7 +84,14 @@ def process_X(X, fit_intercept=True,
 
     if standardize:
 
-        if fit_intercept:
+        if X_sums is not None:
+            if X_sums['n_samples'] != X.shape[0] or \
+                    X_sums['fit_intercept'] != fit_intercept:
+                raise ValueError("X_sums do not match X")
+
+            X_offset, X_scale = get_center_scale_from_sums(X_sums)
+
+        elif fit_intercept:
 
             # compute mean and standard deviations of each feature
             # TODO: this computes a weighted STD so the columns will be be perfectly norm 1.
@@ -129,6 +145,161 @@ def process_X(X, fit_intercept=True,
     return X, out
 
 
+def get_X_sums(X, fit_intercept=True, sample_weight=None):
+    """
+    Computes summary statistics of X from which process_X() can compute the standardization of X, or of any subset of X's rows via downdate_X_sums(). This lets cross-validation compute the standardization of each training fold in O(n_test * n_features) operations instead of re-standardizing the training data.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or RowChunked, shape (n_samples, n_features)
+        The covariate data.
+
+    fit_intercept: bool
+        Whether or not we fit an intercept. If True, we compute the weighted column sums and sums of squares about the column means. Otherwise we compute the unweighted column sums of squares (see process_X).
+
+    sample_weight: None or array-like,  shape (n_samples,)
+        Individual weights for each sample.
+
+    Output
+    ------
+    X_sums: dict
+        The summary statistics with keys ['n_samples', 'fit_intercept', 'shift', 'sum_w', 'sum', 'sum_sq'].
+    """
+    if fit_intercept:
+        # center the sums at the column means for numerical stability
+        if sample_weight is None:
+            w = np.ones(X.shape[0])
+        else:
+            w = np.asarray(sample_weight, dtype=float).reshape(-1)
+
+        shift = np.asarray(X.T @ w).reshape(-1) / w.sum()
+
+    else:
+        # the L2 norms are unweighted
+        shift = np.zeros(X.shape[1])
+        sample_weight = None
+
+    sum_w, sums, sums_sq = weighted_shifted_sums(X, shift=shift,
+                                                 sample_weight=sample_weight)
+
+    return {'n_samples': X.shape[0],
+            'fit_intercept': fit_intercept,
+            'shift': shift,
+            'sum_w': sum_w,
+            'sum': sums,
+            'sum_sq': sums_sq}
+
+
+def downdate_X_sums(X_sums, X_rows, sample_weight=None):
+    """
+    Computes the summary statistics from get_X_sums() after removing some rows of X e.g. the training fold statistics from the full data statistics and the test fold rows.
+
+    Parameters
+    ----------
+    X_sums: dict
+        The summary statistics of the full data matrix.
+
+    X_rows: array-like, sparse matrix or RowChunked, shape (n_rows, n_features)
+        The rows to remove.
+
+    sample_weight: None or array-like,  shape (n_rows,)
+        The sample weights of the rows to remove.
+
+    Output
+    ------
+    X_sums: dict
+        The summary statistics of the remaining rows.
+    """
+    if not X_sums['fit_intercept']:
+        sample_weight = None
+
+    sum_w, sums, sums_sq = \
+        weighted_shifted_sums(X_rows, shift=X_sums['shift'],
+                              sample_weight=sample_weight)
+
+    return {'n_samples': X_sums['n_samples'] - X_rows.shape[0],
+            'fit_intercept': X_sums['fit_intercept'],
+            'shift': X_sums['shift'],
+            'sum_w': X_sums['sum_w'] - sum_w,
+            'sum': X_sums['sum'] - sums,
+            'sum_sq': X_sums['sum_sq'] - sums_sq}
+
+
+def update_X_sums(X_sums, X_rows, sample_weight=None, decay=1):
+    """
+    Computes the summary statistics from get_X_sums() after adding some rows to X e.g. when new data arrive. The previous statistics may be exponentially down weighted.
+
+    Parameters
+    ----------
+    X_sums: dict
+        The summary statistics of the current data matrix.
+
+    X_rows: array-like, sparse matrix or RowChunked, shape (n_rows, n_features)
+        The rows to add.
+
+    sample_weight: None or array-like,  shape (n_rows,)
+        The sample weights of the rows to add.
+
+    decay: float
+        The current statistics, including the number of samples, are multiplied by this factor before the new rows are added. Must be in (0, 1].
+
+    Output
+    ------
+    X_sums: dict
+        The summary statistics with the new rows.
+    """
+    if not 0 < decay <= 1:
+        raise ValueError("decay must be in (0, 1], not {}".format(decay))
+
+    if not X_sums['fit_intercept']:
+        sample_weight = None
+
+    sum_w, sums, sums_sq = \
+        weighted_shifted_sums(X_rows, shift=X_sums['shift'],
+                              sample_weight=sample_weight)
+
+    return {'n_samples': decay * X_sums['n_samples'] + X_rows.shape[0],
+            'fit_intercept': X_sums['fit_intercept'],
+            'shift': X_sums['shift'],
+            'sum_w': decay * X_sums['sum_w'] + sum_w,
+            'sum': decay * X_sums['sum'] + sums,
+            'sum_sq': decay * X_sums['sum_sq'] + sums_sq}
+
+
+def get_center_scale_from_sums(X_sums):
+    """
+    Computes the column centers and scales used by process_X() from the summary statistics from get_X_sums().
+
+    Parameters
+    ----------
+    X_sums: dict
+        The summary statistics.
+
+    Output
+    ------
+    X_offset, X_scale
+
+    X_offset: None, array-like, shape (n_features, )
+        The weighted column means if fit_intercept=True.
+
+    X_scale: array-like, shape (n_features, )
+        The weighted column standard deviations if fit_intercept=True. Otherwise the column L2 norms divided by sqrt(n_samples).
+    """
+    if X_sums['fit_intercept']:
+        mean_resid = X_sums['sum'] / X_sums['sum_w']
+        X_offset = X_sums['shift'] + mean_resid
+
+        var = X_sums['sum_sq'] / X_sums['sum_w'] - mean_resid ** 2
+        X_scale = np.sqrt(np.maximum(var, 0))
+
+    else:
+        X_offset = None
+        X_scale = np.sqrt(np.maximum(X_sums['sum_sq'], 0) /
+                          X_sums['n_samples'])
+
+    return X_offset, X_scale
+
+
 def process_groups(groups, n_features):
     return [np.array(grp_idxs).astype(int) for grp_idxs in groups]
 
@@ -0,0 +1,75 @@
+from yaglm.config.base import Config
+from yaglm.autoassign import autoassign
+
+
+class BatchFISTA(Config):
+    """
+    Solves a batch of independent penalized GLM problems using one vectorized FISTA loop; see yaglm.opt.algo.batch_fista.solve_batch_fista. This is used by yaglm.GlmBatch.GlmBatch.
+
+    Parameters
+    ----------
+    max_iter: int
+        Maximum number of iterations.
+
+    stop_crit: str
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss']. The criterion is checked separately for each problem.
+
+        If stop_crit='x_max' then we use ||x_new - x_prev||_max.
+
+        If stop_crit='x_L2' then we use ||x_new - x_prev||_2.
+
+        If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    bt_max_steps: int
+        Maximum number of backtracking steps to take.
+
+    bt_shrink: float
+        How much to shrink the step size in each backtracking step. Should lie strictly in the unit interval.
+
+    bt_grow: float, None
+        (Optional) How much to grow the step size each iteraction when using backgracking.
+
+    accel: bool
+        Whether or not to use FISTA acceleration.
+
+    restart: bool
+        Whether or not to restart the acceleration scheme.
+
+    compact_frac: float
+        Stop computing with converged problems once the fraction of running problems falls to or below this value.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an iteration progress bar.
+    """
+    @autoassign
+    def __init__(self,
+                 max_iter=1000,
+                 tol=1e-5, rel_crit=False, stop_crit='x_max',
+                 bt_max_steps=20,
+                 bt_shrink=0.5,
+                 bt_grow=1.58,  # 10**.2
+                 accel=True,
+                 restart=True,
+                 compact_frac=0.5,
+                 tracking_level=0,
+                 verbose=False): pass
+
+    def get_solve_kws(self):
+        """
+        Returns the optimization config parameters.
+
+        Output
+        ------
+        kws: dict
+            The keyword arguments for solve_batch_fista.
+        """
+        return self.get_params()
@@ -0,0 +1,247 @@
+import numpy as np
+
+from yaglm.solver.base import GlmSolverWithPath
+from yaglm.autoassign import autoassign
+
+from yaglm.opt.algo.exact_admm import solve_exact_admm, LeastSquaresLinSys
+from yaglm.opt.from_config.mat_and_func import get_mat_and_func
+from yaglm.opt.from_config.penalty import get_penalty_func
+from yaglm.opt.base import Zero
+
+from yaglm.config.penalty import NoPenalty
+from yaglm.utils import is_multi_response
+from yaglm.sparse_utils import is_sparse_or_lin_op
+
+
+class ExactADMM(GlmSolverWithPath):
+    """
+    Solves a penalized linear regression problem of the form
+
+    min_coef (1/2n) ||y - X @ coef - intercept||_2^2 + p(mat @ coef)
+
+    using the standard ADMM algorithm with exact primal updates (e.g. the generalized lasso, fused lasso/trend filtering or generalized ridge). Each primal update solves a linear system involving X.T @ X + rho * mat.T @ mat; this system is factorized once and reused across ADMM iterations and along the penalty path while rho is fixed. This typically needs far fewer iterations than the linearized ADMM of ZhuADMM.
+
+    Parameters
+    ----------
+    factorization: str
+        How to factorize the linear system. Must be one of ['auto', 'dense', 'sparse', 'woodbury']; see yaglm.opt.algo.exact_admm.LeastSquaresLinSys.
+
+    rho: float, str
+        The ADMM penalty parameter. If rho='auto', rho is set to put X.T @ X / n and mat.T @ mat on the same scale. For trend filtering (Ramdas and Tibshirani, 2016) suggest setting rho to the penalty value.
+
+    rho_update: bool
+        Whether or not to adpatively update the rho parameter. Note each update requires refactorizing the linear system.
+
+    atol, rtol: float
+        The absolute and relative stopping criteria.
+
+    eta: float
+        Amount to increase/decrease rho by.
+
+    mu: float
+        Parameter for deciding whether or not to increase rho.
+
+    max_iter: int
+        Maximum number of iterations.
+
+    tracking_level: int
+        How much data to track.
+
+    References
+    ----------
+    Boyd, S., Parikh, N., Chu, E., Peleato, B. and Eckstein, J., 2011. Distributed optimization and statistical learning via the alternating direction method of multipliers. Foundations and Trends in Machine learning, 3(1), pp.1-122.
+
+    Ramdas, A. and Tibshirani, R.J., 2016. Fast and flexible ADMM algorithms for trend filtering. Journal of Computational and Graphical Statistics, 25(3), pp.839-858.
+    """
+
+    @autoassign
+    def __init__(self,
+                 factorization='auto',
+                 rho='auto',
+                 rho_update=False,
+                 atol=1e-5,
+                 rtol=1e-5,
+                 eta=2,
+                 mu=10,
+                 max_iter=1000,
+                 tracking_level=0): pass
+
+    @classmethod
+    def _is_applicable(self, loss, penalty=None, constraint=None):
+        """
+        Determines whether or not this problem can be solved by the exact ADMM algorithm i.e. if the loss is least squares and the penalty is of the form p(mat @ coef) for some proximable p.
+
+        Parameters
+        ----------
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+
+        Output
+        ------
+        is_applicable: bool
+            Wheter or not this solver can be used.
+        """
+        if constraint is not None:
+            return False
+
+        if loss.name != 'lin_reg':
+            return False
+
+        n_features = 2
+        try:
+            g_config = get_mat_and_func(config=penalty,
+                                        n_features=n_features)[1]
+        except NotImplementedError:
+            return False
+
+        g = get_penalty_func(g_config, n_features=n_features)
+
+        return g is None or g.is_proximable
+
+    def get_solve_kws(self):
+        """
+        Returns the optimization config parameters need to solve each GLM problem.
+
+        Output
+        ------
+        kws: dict
+            Any parameters from this config object that are used by solve_exact_admm.
+        """
+        kws = self.get_params()
+        kws.pop('factorization')
+        return kws
+
+    def uses_gram(self, X):
+        """
+        Only the dense factorization uses the Gram matrix. With factorization='auto' this is the factorization used for dense X with at least as many samples as features; the sparse, banded and woodbury factorizations never form the dense Gram matrix.
+        """
+        if self.factorization == 'auto':
+            return not is_sparse_or_lin_op(X) and X.shape[0] >= X.shape[1]
+        else:
+            return self.factorization == 'dense'
+
+    def setup(self, X, y, loss, penalty, constraint=None,
+              fit_intercept=True, sample_weight=None, offsets=None,
+              gram=None):
+        """
+        Sets up anything the solver needs.
+
+        Parameters
+        ----------
+        gram: None, array-like, shape (n_features, n_features)
+            (Optional) The precomputed Gram matrix X_c.T @ W @ X_c / n_samples of the processed X; see yaglm.opt.glm_loss.gram.get_gram_from_sums. Only used by the dense factorization; see uses_gram().
+        """
+        # make sure ADMM is applicable
+        if not self.is_applicable(loss, penalty, constraint):
+            raise ValueError("ExactADMM is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(loss, penalty, constraint))
+
+        if is_multi_response(y):
+            raise NotImplementedError("ExactADMM currently only supports "
+                                      "single response linear regression")
+
+        self.fit_intercept_ = fit_intercept
+        self.n_features_ = X.shape[1]
+
+        # the response after subtracting the offsets
+        y = np.asarray(y, dtype=float).reshape(-1)
+        if offsets is not None:
+            y = y - np.asarray(offsets).reshape(-1)
+        self.y_ = y
+
+        ###############################
+        # setup penalty function data #
+        ###############################
+        if penalty is None:
+            penalty = NoPenalty()
+
+        self.mat_, self.g_config_ = \
+            get_mat_and_func(config=penalty, n_features=self.n_features_)
+
+        self.g_ = get_penalty_func(config=self.g_config_,
+                                   n_features=self.mat_.shape[0])
+
+        ###########################
+        # setup the linear system #
+        ###########################
+        # the factorization is computed lazily the first time we solve
+        self.lin_sys_ = LeastSquaresLinSys(X=X, mat=self.mat_,
+                                           sample_weight=sample_weight,
+                                           fit_intercept=fit_intercept,
+                                           kind=self.factorization,
+                                           gram=gram)
+
+        self.Xty_ = self.lin_sys_.get_Xty(self.y_)
+
+    def update_penalty(self, **params):
+        """
+        Updates the penalty parameters. Note this does not require refactorizing the linear system.
+        """
+        self.g_config_.set_params(**params)
+        self.g_ = get_penalty_func(config=self.g_config_,
+                                   n_features=self.mat_.shape[0])
+
+    def solve(self, coef_init=None, intercept_init=None, other_init=None):
+        """
+        Solves the optimization problem.
+
+        Parameters
+        ----------
+        coef_init: None, array-like
+            (Optional) Initialization for the coefficient.
+
+        intercept_init: None, array-like
+            (Optional) Initialization for the intercept. This is ignored since the intercept is profiled out.
+
+        other_init: None, dicts
+            (Optional) Initialization for other optimization data e.g. dual variables.
+
+        Output
+        ------
+        soln, other_data, opt_info
+
+        soln: dict of array-like
+            The coefficient/intercept solutions,
+
+        other_data: dict
+            Other optimzation output data e.g. dual variables.
+
+        opt_info: dict
+            Optimization information e.g. number of iterations, runtime, etc.
+        """
+        # merge other_init with solver keyword arguments
+        kws = self.get_solve_kws()
+        if other_init is not None:
+            if 'dual_vars' in other_init:
+                kws['dual_init'] = other_init['dual_vars']
+
+            # keep rho from the previous problem so we can reuse
+            # the factorization
+            if 'rho' in other_init:
+                kws['rho'] = other_init['rho']
+
+        # handle the case of no penalty
+        g = Zero() if self.g_ is None else self.g_
+
+        coef, admm_data, opt_info = \
+            solve_exact_admm(lin_sys=self.lin_sys_,
+                             Xty=self.Xty_,
+                             mat=self.mat_,
+                             func=g,
+                             primal_init=coef_init,
+                             **kws)
+
+        if self.fit_intercept_:
+            intercept = self.lin_sys_.get_intercept(coef=coef, y=self.y_)
+        else:
+            intercept = None
+
+        soln = {'coef': coef, 'intercept': intercept}
+
+        return soln, admm_data, opt_info
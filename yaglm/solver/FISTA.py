@@ -11,6 +11,8 @@ from yaglm.opt.from_config.penalty import get_penalty_func, wrap_intercept
 from yaglm.opt.split_smooth_and_non_smooth import split_smooth_and_non_smooth
 from yaglm.opt.from_config.constraint import get_constraint_func
 from yaglm.opt.base import Sum
+from yaglm.opt.duality_gap import get_glm_dual_gap_func
+from yaglm.opt.counters import OptCounters, maybe_timer
 from yaglm.opt.utils import decat_coef_inter_vec, decat_coef_inter_mat
 
 
@@ -24,7 +26,7 @@ class FISTA(GlmSolverWithPath):
         Maximum number of iterations.
 
     stop_crit: str
-        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss'].
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss', 'gap'].
 
         If stop_crit='x_max' then we use ||x_new - x_prev||_max.
 
@@ -32,6 +34,8 @@ class FISTA(GlmSolverWithPath):
 
         If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
 
+        If stop_crit='gap' then we use the duality gap, which certifies the accuracy of the objective function value. This is only available for some convex loss/penalty combinations; see yaglm.opt.duality_gap.
+
     tol: float, None
         Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
 
@@ -54,6 +58,12 @@ class FISTA(GlmSolverWithPath):
         Whether or not to restart the acceleration scheme. See (13) from https://bodono.github.io/publications/adap_restart.pdf
         for the strategy we employ.
 
+    gap_freq: int
+        How often to check the duality gap when stop_crit='gap'.
+
+    instrument: bool
+        Whether or not to count and time the expensive operations (e.g. products with X, gradient evaluations, proximal operator calls, backtracking trials, restarts) of each solve. These are reported in opt_info['counters']; see yaglm.opt.counters.OptCounters.
+
     tracking_level: int
         How much data to track.
 
@@ -74,6 +84,8 @@ class FISTA(GlmSolverWithPath):
                  bt_grow=1.58,  # 10**.2
                  accel=True,
                  restart=True,
+                 gap_freq=10,
+                 instrument=False,
                  tracking_level=0,
                  verbose=False): pass
 
@@ -104,9 +116,14 @@ class FISTA(GlmSolverWithPath):
 
         # make fake data just for getting functions
         X = np.zeros((3, 2))
-        y = np.zeros(3)
         n_features = 2
 
+        # the multinomial loss only has a multiple response version
+        if loss.name == 'multinomial':
+            y = np.zeros((3, 2))
+        else:
+            y = np.zeros(3)
+
         # get functions
         loss_func = get_glm_loss_func(config=loss, X=X, y=y)
         penalty_func = get_penalty_func(config=penalty, n_features=n_features)
@@ -178,6 +195,26 @@ class FISTA(GlmSolverWithPath):
         if constraint is not None:
             self.constraint_func_ = get_constraint_func(config=constraint)
 
+        if self.stop_crit == 'gap' and self.get_dual_gap_func() is None:
+            raise ValueError("The duality gap stopping criterion is not "
+                             "available for loss={}, penalty={}, "
+                             "constraint={}".format(loss, penalty, constraint))
+
+    def get_dual_gap_func(self):
+        """
+        Gets the duality gap function for the current problem.
+
+        Output
+        ------
+        dual_gap_func: None, yaglm.opt.duality_gap.GlmDualityGap
+            The duality gap function; None if it is not available for this problem.
+        """
+        if self.constraint_func_ is not None:
+            return None
+
+        return get_glm_dual_gap_func(loss_func=self.loss_func_,
+                                     penalty_func=self.penalty_func_)
+
     def update_penalty(self, **params):
         """
         Updates the penalty parameters.
@@ -218,6 +255,11 @@ class FISTA(GlmSolverWithPath):
         #########
         # Setup #
         #########
+        kws = self.get_solve_kws()
+
+        # possibly count/time the expensive operations
+        counters = OptCounters() if kws.pop('instrument') else None
+        self.loss_func_.counters = counters
 
         # split penalty into smooth and non-smooth parts
         smooth_pen, non_smooth_pen = \
@@ -250,7 +292,10 @@ class FISTA(GlmSolverWithPath):
             non_smooth_func = non_smooth_pen
 
         # setup step size/backtracking
-        if smooth_func.grad_lip is not None:
+        with maybe_timer(counters, 'grad_lip'):
+            grad_lip = smooth_func.grad_lip
+
+        if grad_lip is not None:
             # use Lipchtiz constant if it is available
             step = 'lip'
             backtracking = False
@@ -278,7 +323,10 @@ class FISTA(GlmSolverWithPath):
                                 non_smooth_func=non_smooth_func,
                                 step=step,
                                 backtracking=backtracking,
-                                **self.get_solve_kws())
+                                dual_gap_func=self.get_dual_gap_func(),
+                                counters=counters,
+                                **kws)
+        self.loss_func_.counters = None
 
         # format output
         if self.fit_intercept_:
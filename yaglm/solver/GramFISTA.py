@@ -0,0 +1,292 @@
+import numpy as np
+
+from yaglm.solver.FISTA import FISTA
+from yaglm.autoassign import autoassign
+from yaglm.utils import is_multi_response
+from yaglm.config.penalty import NoPenalty
+
+from yaglm.opt.algo.fista import solve_fista
+from yaglm.opt.algo.exact_admm import get_centered_gram
+from yaglm.opt.glm_loss.gram import LeastSquaresGram, get_gram_from_sums, \
+    get_Xty_from_sums
+from yaglm.opt.from_config.penalty import get_penalty_func
+from yaglm.opt.split_smooth_and_non_smooth import split_smooth_and_non_smooth
+from yaglm.opt.from_config.constraint import get_constraint_func
+from yaglm.opt.base import Sum
+from yaglm.opt.counters import OptCounters, maybe_timer
+
+
+class GramFISTA(FISTA):
+    """
+    Solves a penalized least squares problem,
+
+    min_coef (1/2n) ||y - X @ coef - intercept||_W^2 + p(coef)
+
+    with FISTA in covariance (Gram) mode. The weighted Gram matrix X_c.T @ W @ X_c / n and X_c.T @ W @ y / n are computed once in setup() after which every iteration only costs O(n_features^2) operations. This is much faster than FISTA when n_samples >> n_features. The intercept is profiled out by centering X and y.
+
+    During cross-validation the Gram matrix of each training fold is computed by subtracting the held out rows' contribution from the full data's Gram matrix; see yaglm.opt.glm_loss.gram.
+
+    For generalized penalties, p(mat @ coef), use ExactADMM which also works with the Gram matrix.
+
+    Parameters
+    ----------
+    See FISTA. Note the duality gap stopping criterion is not available.
+    """
+
+    @autoassign
+    def __init__(self,
+                 max_iter=1000,
+                 tol=1e-5, rel_crit=False, stop_crit='x_max',
+                 bt_max_steps=20,
+                 bt_shrink=0.5,
+                 bt_grow=1.58,  # 10**.2
+                 accel=True,
+                 restart=True,
+                 gap_freq=10,
+                 instrument=False,
+                 tracking_level=0,
+                 verbose=False): pass
+
+    @classmethod
+    def _is_applicable(self, loss, penalty=None, constraint=None):
+        """
+        Determines whether or not this problem can be solved by GramFISTA i.e. if the loss is least squares and FISTA is applicable.
+
+        Parameters
+        ----------
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+
+        Output
+        ------
+        is_applicable: bool
+            Wheter or not this solver can be used.
+        """
+        if loss.name != 'lin_reg':
+            return False
+
+        return super()._is_applicable(loss=loss, penalty=penalty,
+                                      constraint=constraint)
+
+    def uses_gram(self, X):
+        """
+        GramFISTA always works with the Gram matrix.
+        """
+        return True
+
+    def setup(self, X, y, loss, penalty, constraint=None,
+              fit_intercept=True, sample_weight=None, offsets=None,
+              gram=None):
+        """
+        Sets up anything the solver needs.
+
+        Parameters
+        ----------
+        gram: None, array-like, shape (n_features, n_features)
+            (Optional) The precomputed Gram matrix X_c.T @ W @ X_c / n_samples of the processed X; see yaglm.opt.glm_loss.gram.get_gram_from_sums. If not provided, it is computed from X.
+        """
+        self._check_setup(loss=loss, penalty=penalty, constraint=constraint)
+
+        self.is_mr_ = is_multi_response(y)
+        self.fit_intercept_ = fit_intercept
+
+        n_samples = X.shape[0]
+        if sample_weight is None:
+            w = np.ones(n_samples)
+        else:
+            w = np.asarray(sample_weight, dtype=float).reshape(-1)
+
+        # the response after subtracting the offsets
+        y = np.asarray(y, dtype=float)
+        if offsets is not None:
+            y = y - np.asarray(offsets)
+
+        ###################
+        # Gram statistics #
+        ###################
+        if fit_intercept:
+            self.X_mean_ = np.asarray(X.T @ w).reshape(-1) / w.sum()
+            self.y_mean_ = w @ y / w.sum()
+            y = y - self.y_mean_
+        else:
+            self.X_mean_ = None
+            self.y_mean_ = None
+
+        if gram is None:
+            gram = get_centered_gram(X=X, sample_weight=w,
+                                     X_mean=self.X_mean_)
+
+        # X_c.T W y_c = X.T W y_c since the weighted mean of y_c is zero
+        if self.is_mr_:
+            Xty = np.asarray(X.T @ (w.reshape(-1, 1) * y)) / n_samples
+        else:
+            Xty = np.asarray(X.T @ (w * y)).reshape(-1) / n_samples
+
+        const = 0.5 * (w @ y ** 2).sum() / n_samples
+
+        self._setup_funcs(gram=gram, Xty=Xty, const=const,
+                          penalty=penalty, constraint=constraint)
+
+    def setup_from_gram_sums(self, gram_sums, loss, penalty,
+                             constraint=None, X_scale=None):
+        """
+        Sets up the solver from the running statistics of the data instead of the data e.g. for incremental fitting where the statistics are updated as new rows arrive. The solution is for the data X / X_scale i.e. the coefficient is on the scale of the processed data while the intercept is on the scale of the raw data.
+
+        Parameters
+        ----------
+        gram_sums: dict
+            The statistics of X and y; see yaglm.opt.glm_loss.gram.get_gram_sums(..., y=y) and yaglm.opt.glm_loss.gram.update_gram_sums().
+
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+            The constraint.
+
+        X_scale: None, array-like, shape (n_features, )
+            (Optional) The column scaling applied to X.
+        """
+        self._check_setup(loss=loss, penalty=penalty, constraint=constraint)
+
+        gram = get_gram_from_sums(gram_sums, X_scale=X_scale)
+        Xty, const = get_Xty_from_sums(gram_sums, X_scale=X_scale)
+
+        self.is_mr_ = Xty.ndim == 2
+        self.fit_intercept_ = gram_sums['fit_intercept']
+
+        if self.fit_intercept_:
+            sum_w = gram_sums['sum_w']
+            self.X_mean_ = gram_sums['shift'] + gram_sums['sum'] / sum_w
+            if X_scale is not None:
+                self.X_mean_ = self.X_mean_ / X_scale
+
+            self.y_mean_ = gram_sums['y_shift'] + gram_sums['sum_y'] / sum_w
+
+        else:
+            self.X_mean_ = None
+            self.y_mean_ = None
+
+        self._setup_funcs(gram=gram, Xty=Xty, const=const,
+                          penalty=penalty, constraint=constraint)
+
+    def _check_setup(self, loss, penalty, constraint):
+        if not self.is_applicable(loss, penalty, constraint):
+            raise ValueError("GramFISTA is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(loss, penalty, constraint))
+
+        if self.stop_crit == 'gap':
+            raise ValueError("The duality gap stopping criterion is not "
+                             "available for GramFISTA")
+
+    def _setup_funcs(self, gram, Xty, const, penalty, constraint):
+        """
+        Sets up the loss, penalty and constraint functions.
+        """
+        self.penalty_config_ = penalty if penalty is not None else NoPenalty()
+        self.n_features_ = gram.shape[0]
+
+        self.loss_func_ = LeastSquaresGram(gram=gram, Xty=Xty, const=const)
+
+        ##########################
+        # Penalty and constraint #
+        ##########################
+        self.penalty_func_ = None
+        self.constraint_func_ = None
+
+        if penalty is not None:
+            self.penalty_func_ = get_penalty_func(config=self.penalty_config_,
+                                                  n_features=self.n_features_)
+        if constraint is not None:
+            self.constraint_func_ = get_constraint_func(config=constraint)
+
+    def get_dual_gap_func(self):
+        return None
+
+    def solve(self, coef_init=None, intercept_init=None, other_init=None):
+        """
+        Solves the optimization problem.
+
+        Parameters
+        ----------
+        coef_init: None, array-like
+            (Optional) Initialization for the coefficient.
+
+        intercept_init: None, array-like
+            (Optional) Initialization for the intercept. This is ignored since the intercept is profiled out.
+
+        other_init: None, array-like
+            (Optional) Initialization for other optimization data e.g. dual variables.
+
+        Output
+        ------
+        soln, other_data, opt_info
+
+        soln: dict of array-like
+            The coefficient/intercept solutions,
+
+        other_data: dict
+            Other optimzation output data e.g. dual variables.
+
+        opt_info: dict
+            Optimization information e.g. number of iterations, runtime, etc.
+        """
+        kws = self.get_solve_kws()
+
+        # possibly count/time the expensive operations
+        counters = OptCounters() if kws.pop('instrument') else None
+
+        # the intercept is profiled out so the penalty/constraint
+        # is only applied to the coefficient
+        smooth_pen, non_smooth_pen = \
+            split_smooth_and_non_smooth(self.penalty_func_)
+
+        if smooth_pen is not None:
+            smooth_func = Sum([self.loss_func_, smooth_pen])
+        else:
+            smooth_func = self.loss_func_
+
+        if self.constraint_func_ is not None:
+            assert non_smooth_pen is None
+            non_smooth_func = self.constraint_func_
+        else:
+            non_smooth_func = non_smooth_pen
+
+        with maybe_timer(counters, 'grad_lip'):
+            grad_lip = smooth_func.grad_lip
+
+        if grad_lip is not None:
+            step = 'lip'
+            backtracking = False
+        else:
+            step = 1
+            backtracking = True
+
+        if coef_init is not None:
+            init_val = np.array(coef_init, dtype=float)
+        else:
+            init_val = np.zeros(self.loss_func_.Xty.shape)
+
+        coef, out = solve_fista(smooth_func=smooth_func,
+                                init_val=init_val,
+                                non_smooth_func=non_smooth_func,
+                                step=step,
+                                backtracking=backtracking,
+                                counters=counters,
+                                **kws)
+
+        if self.fit_intercept_:
+            intercept = self.y_mean_ - coef.T @ self.X_mean_
+        else:
+            intercept = None
+
+        soln = {'coef': coef, 'intercept': intercept}
+        return soln, None, out
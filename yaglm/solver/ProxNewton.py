@@ -0,0 +1,229 @@
+import numpy as np
+from scipy.sparse import issparse
+
+from yaglm.solver.base import GlmSolverWithPath
+from yaglm.autoassign import autoassign
+from yaglm.utils import is_multi_response
+from yaglm.config.penalty import NoPenalty
+
+from yaglm.opt.algo.prox_newton import solve_prox_newton
+from yaglm.opt.from_config.loss import get_glm_loss_func
+from yaglm.opt.from_config.penalty import get_penalty_func
+from yaglm.opt.penalty.convex import Lasso, Ridge, ElasticNet
+from yaglm.opt.penalty.utils import get_entrywise_pen_vals
+from yaglm.opt.utils import decat_coef_inter_vec, decat_coef_inter_mat
+
+
+class ProxNewton(GlmSolverWithPath):
+    """
+    Solves a penalized GLM problem using a proximal Newton algorithm i.e. the IRLS algorithm of glmnet. Each Newton step solves a penalized weighted least squares problem using coordinate descent. This is applicable to losses with per-sample Hessians (linear, logistic, poisson and multinomial regression) and entrywise penalties (lasso, ridge and elastic net, possibly weighted).
+
+    Parameters
+    ----------
+    max_iter: int
+        Maximum number of Newton iterations.
+
+    max_cd_epochs: int
+        Maximum number of coordinate descent sweeps for each Newton step.
+
+    cd_tol: float
+        Tolerance for the coordinate descent subproblems; a subproblem is solved when a sweep changes no entry by more than cd_tol. This should be smaller than tol.
+
+    stop_crit: str
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss'].
+
+        If stop_crit='x_max' then we use ||x_new - x_prev||_max.
+
+        If stop_crit='x_L2' then we use ||x_new - x_prev||_2.
+
+        If stop_crit='loss' then we use loss(x_prev) - loss(x_new).
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    ls_max_steps: int
+        Maximum number of backtracking line search steps.
+
+    ls_shrink: float
+        How much to shrink the step in each line search step. Should lie strictly in the unit interval.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an iteration progress bar.
+
+    References
+    ----------
+    Friedman, J., Hastie, T. and Tibshirani, R., 2010. Regularization paths for generalized linear models via coordinate descent. Journal of statistical software, 33(1), p.1.
+
+    Lee, J.D., Sun, Y. and Saunders, M.A., 2014. Proximal Newton-type methods for minimizing composite functions. SIAM Journal on Optimization, 24(3), pp.1420-1443.
+    """
+
+    @autoassign
+    def __init__(self,
+                 max_iter=50,
+                 max_cd_epochs=1000,
+                 cd_tol=1e-7,
+                 tol=1e-6, rel_crit=False, stop_crit='x_max',
+                 ls_max_steps=20,
+                 ls_shrink=0.5,
+                 tracking_level=0,
+                 verbose=False): pass
+
+    @classmethod
+    def _is_applicable(self, loss, penalty=None, constraint=None):
+        """
+        Determines whether or not this problem can be solved by the proximal Newton algorithm i.e. if the loss has per-sample Hessians and the penalty is an entrywise lasso/ridge/elastic net.
+
+        Parameters
+        ----------
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+
+        Output
+        ------
+        is_applicable: bool
+            Wheter or not this solver can be used.
+        """
+        # constraints are not supported
+        if constraint is not None:
+            return False
+
+        # make fake data just for getting functions
+        X = np.zeros((3, 2))
+        if loss.name == 'multinomial':
+            y = np.zeros((3, 2))
+        else:
+            y = np.zeros(3)
+
+        loss_func = get_glm_loss_func(config=loss, X=X, y=y)
+        penalty_func = get_penalty_func(config=penalty, n_features=2)
+
+        # we need the per-sample hessians
+        if not loss_func.glm_loss.has_hess_diag:
+            return False
+
+        # coordinate descent needs an entrywise penalty
+        return penalty_func is None or \
+            type(penalty_func) in [Lasso, Ridge, ElasticNet]
+
+    def setup(self, X, y, loss, penalty, constraint=None,
+              fit_intercept=True, sample_weight=None, offsets=None):
+        """
+        Sets up anything the solver needs.
+        """
+        # make sure the solver is applicable
+        if not self.is_applicable(loss, penalty, constraint):
+            raise ValueError("ProxNewton is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(loss, penalty, constraint))
+
+        # coordinate descent needs access to the columns of X
+        if not isinstance(X, np.ndarray) and not issparse(X):
+            raise ValueError("ProxNewton requires X to be a numpy array "
+                             "or sparse matrix; got {}. Note standardizing "
+                             "sparse X with fit_intercept=True results in a "
+                             "linear operator.".format(type(X)))
+
+        self.is_mr_ = is_multi_response(y)
+        self.fit_intercept_ = fit_intercept
+        self.penalty_config_ = penalty if penalty is not None else NoPenalty()
+        self.n_features_ = X.shape[1]
+
+        # get the loss function
+        self.loss_func_ = get_glm_loss_func(config=loss, X=X, y=y,
+                                            fit_intercept=fit_intercept,
+                                            sample_weight=sample_weight,
+                                            offsets=offsets)
+
+        self.penalty_func_ = None
+        if penalty is not None:
+            self.penalty_func_ = get_penalty_func(config=self.penalty_config_,
+                                                  n_features=self.n_features_)
+
+    def update_penalty(self, **params):
+        """
+        Updates the penalty parameters.
+        """
+        self.penalty_config_.set_params(**params)
+        self.penalty_func_ = get_penalty_func(config=self.penalty_config_,
+                                              n_features=self.n_features_)
+
+    def solve(self, coef_init=None, intercept_init=None, other_init=None):
+        """
+        Solves the optimization problem.
+
+        Parameters
+        ----------
+        coef_init: None, array-like
+            (Optional) Initialization for the coefficient.
+
+        intercept_init: None, array-like
+            (Optional) Initialization for the intercept.
+
+        other_init: None, array-like
+            (Optional) Initialization for other optimization data e.g. dual variables.
+
+        Output
+        ------
+        soln, other_data, opt_info
+
+        soln: dict of array-like
+            The coefficient/intercept solutions,
+
+        other_data: dict
+            Other optimzation output data e.g. dual variables.
+
+        opt_info: dict
+            Optimization information e.g. number of iterations, runtime, etc.
+        """
+
+        # setup initial value
+        if coef_init is None or  \
+                (self.fit_intercept_ and intercept_init is None):
+            init_val = self.loss_func_.default_init()
+        else:
+            if self.fit_intercept_:
+                init_val = self.loss_func_.\
+                    cat_intercept_coef(intercept_init, coef_init)
+            else:
+                init_val = coef_init
+
+        lasso_pen_vals, ridge_pen_vals = \
+            get_entrywise_pen_vals(self.penalty_func_,
+                                   coef_shape=self.loss_func_.coef_shape_)
+
+        ##################################
+        # solve problem with prox Newton #
+        ##################################
+        soln, out = solve_prox_newton(glm_loss=self.loss_func_,
+                                      init_val=init_val,
+                                      lasso_pen_vals=lasso_pen_vals,
+                                      ridge_pen_vals=ridge_pen_vals,
+                                      **self.get_solve_kws())
+
+        # format output
+        if self.fit_intercept_:
+            if self.is_mr_:
+                coef, intercept = decat_coef_inter_mat(soln)
+            else:
+                coef, intercept = decat_coef_inter_vec(soln)
+        else:
+            coef = soln
+            intercept = None
+
+        soln = {'coef': coef, 'intercept': intercept}
+        opt_data = None
+        opt_info = out
+
+        return soln, opt_data, opt_info
+
@@ -0,0 +1,327 @@
+import numpy as np
+from scipy.linalg import eigh, LinAlgError
+from scipy.sparse import issparse
+from time import time
+
+from yaglm.solver.base import GlmSolverWithPath
+from yaglm.autoassign import autoassign
+from yaglm.utils import is_multi_response
+from yaglm.config.penalty import Ridge, GeneralizedRidge
+from yaglm.opt.algo.exact_admm import get_centered_gram
+from yaglm.sparse_utils import is_sparse_or_lin_op
+
+
+class RidgeSVD(GlmSolverWithPath):
+    """
+    Solves the (generalized) ridge regression problem
+
+    min_coef (1/2n) ||y - X @ coef - intercept||_W^2 + pen_val * 0.5 * coef.T @ P @ coef
+
+    in closed form for every value of pen_val from a single decomposition. Here P = diag(weights) for the Ridge penalty and P = mat.T @ mat for the GeneralizedRidge penalty. The intercept is profiled out by centering X and y.
+
+    We compute coef(pen_val) = V @ diag(1 / (a + pen_val * b)) @ V.T @ X_c.T @ W @ y_c / n where
+
+    - for the unweighted ridge V, a are the right singular vectors and squared singular values of W^{1/2} X_c / sqrt(n) i.e. the eigendecomposition of the Gram matrix X_c.T @ W @ X_c / n (whichever is cheaper) and b = 1.
+
+    - otherwise V comes from the generalized eigendecomposition of the pair (Gram, P) if P is positive definite (a = eigenvalues, b = 1) or of the pair (P, Gram) if the Gram is positive definite (a = 1, b = eigenvalues).
+
+    After the decomposition each solution on the path only costs O(n_features * rank) operations. We also compute the exact leave-one-out (LOO) and generalized cross-validation (GCV) errors for each pen_val in O(n_samples * rank) operations so the penalty value can be tuned without refitting the model on cross-validation folds; see GlmTrainMetric with select_metric='loo' or 'gcv'.
+
+    The LOO errors come from the closed form hat matrix shortcut, which keeps the 1/n normalization of the full data loss. Since the loss is normalized by the number of samples, the LOO error of pen_val is therefore exactly the LOO error of refitting this model on n_samples - 1 samples with penalty value pen_val * n_samples / (n_samples - 1). This is a negligible difference in the penalty value unless n_samples is small.
+
+    Parameters
+    ----------
+    decomposition: str
+        Which decomposition to use. Must be one of ['auto', 'svd', 'eigh']. 'svd' computes a thin SVD of the processed X and is only available for the unweighted ridge penalty. 'eigh' computes an eigendecomposition of the Gram matrix. If 'auto', we use the SVD when there are fewer samples than features and the eigendecomposition otherwise.
+
+    compute_loo: bool
+        Whether or not to compute the LOO and GCV errors (see above for how the LOO error relates to refitting with pen_val). These are reported as the negative mean squared errors (so larger is better) in opt_info['train_metrics']['loo'] and opt_info['train_metrics']['gcv'].
+
+    References
+    ----------
+    Golub, G.H., Heath, M. and Wahba, G., 1979. Generalized cross-validation as a method for choosing a good ridge parameter. Technometrics, 21(2), pp.215-223.
+
+    Hastie, T., Tibshirani, R. and Friedman, J., 2009. The elements of statistical learning: data mining, inference, and prediction. Springer.
+    """
+
+    @autoassign
+    def __init__(self, decomposition='auto', compute_loo=True): pass
+
+    @classmethod
+    def _is_applicable(self, loss, penalty=None, constraint=None):
+        """
+        Determines whether or not this problem can be solved by RidgeSVD i.e. if the loss is least squares and the penalty is a (generalized) ridge penalty.
+
+        Parameters
+        ----------
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+
+        Output
+        ------
+        is_applicable: bool
+            Wheter or not this solver can be used.
+        """
+        return loss.name == 'lin_reg' and constraint is None and \
+            isinstance(penalty, (Ridge, GeneralizedRidge))
+
+    def uses_gram(self, X):
+        """
+        Only the eigendecomposition uses the Gram matrix; with decomposition='auto' this is used when there are at least as many samples as features.
+        """
+        if self.decomposition == 'auto':
+            return X.shape[0] >= X.shape[1]
+        else:
+            return self.decomposition == 'eigh'
+
+    def setup(self, X, y, loss, penalty, constraint=None,
+              fit_intercept=True, sample_weight=None, offsets=None,
+              gram=None):
+        """
+        Sets up anything the solver needs i.e. computes the decomposition.
+
+        Parameters
+        ----------
+        gram: None, array-like, shape (n_features, n_features)
+            (Optional) The precomputed Gram matrix X_c.T @ W @ X_c / n_samples of the processed X; see yaglm.opt.glm_loss.gram.get_gram_from_sums. Only used by the eigendecomposition.
+        """
+        if not self.is_applicable(loss, penalty, constraint):
+            raise ValueError("RidgeSVD is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(loss, penalty, constraint))
+
+        if self.decomposition not in ['auto', 'svd', 'eigh']:
+            raise ValueError("decomposition must be one of "
+                             "['auto', 'svd', 'eigh'], not {}".
+                             format(self.decomposition))
+
+        self.is_mr_ = is_multi_response(y)
+        self.fit_intercept_ = fit_intercept
+        self.penalty_config_ = penalty
+
+        n_samples, n_features = X.shape
+        if sample_weight is None:
+            w = np.ones(n_samples)
+        else:
+            w = np.asarray(sample_weight, dtype=float).reshape(-1)
+
+        # the response after subtracting the offsets
+        y = np.asarray(y, dtype=float)
+        if offsets is not None:
+            y = y - np.asarray(offsets)
+
+        if fit_intercept:
+            self.X_mean_ = np.asarray(X.T @ w).reshape(-1) / w.sum()
+            self.y_mean_ = w @ y / w.sum()
+            y = y - self.y_mean_
+        else:
+            self.X_mean_ = None
+            self.y_mean_ = None
+
+        # X_c.T W y_c = X.T W y_c since the weighted mean of y_c is zero
+        if self.is_mr_:
+            Xty = np.asarray(X.T @ (w.reshape(-1, 1) * y)) / n_samples
+        else:
+            Xty = np.asarray(X.T @ (w * y)).reshape(-1) / n_samples
+
+        ###########################
+        # penalty quadratic form  #
+        ###########################
+        if isinstance(penalty, GeneralizedRidge):
+            mat = penalty.mat
+            if issparse(mat):
+                pen_quad = (mat.T @ mat).toarray()
+            else:
+                mat = np.asarray(mat)
+                pen_quad = mat.T @ mat
+
+        elif penalty.weights is not None:
+            pen_quad = np.diag(np.asarray(penalty.weights, dtype=float).
+                               reshape(-1))
+        else:
+            pen_quad = None  # the identity
+
+        #################
+        # decomposition #
+        #################
+        decomposition = self.decomposition
+        if decomposition == 'auto':
+            decomposition = 'svd' if n_samples < n_features \
+                and pen_quad is None and gram is None else 'eigh'
+
+        if decomposition == 'svd':
+            if pen_quad is not None:
+                raise ValueError("decomposition='svd' is only available "
+                                 "for the unweighted ridge penalty")
+
+            # thin SVD of W^{1/2} X_c / sqrt(n)
+            X_c = _to_dense(X)
+            if self.X_mean_ is not None:
+                X_c = X_c - self.X_mean_
+            A = np.sqrt(w / n_samples).reshape(-1, 1) * X_c
+
+            _, svals, V_t = np.linalg.svd(A, full_matrices=False)
+            V = V_t.T
+            a = svals ** 2
+            b = np.ones_like(a)
+
+        else:
+            if gram is None:
+                gram = get_centered_gram(X=X, sample_weight=w,
+                                         X_mean=self.X_mean_)
+
+            if pen_quad is None:
+                a, V = np.linalg.eigh(gram)
+                a = np.clip(a, a_min=0, a_max=None)
+                b = np.ones_like(a)
+
+            else:
+                try:
+                    # pen_quad is positive definite
+                    a, V = eigh(gram, pen_quad)
+                    a = np.clip(a, a_min=0, a_max=None)
+                    b = np.ones_like(a)
+
+                except LinAlgError:
+                    try:
+                        # gram is positive definite
+                        b, V = eigh(pen_quad, gram)
+                        b = np.clip(b, a_min=0, a_max=None)
+                        a = np.ones_like(b)
+
+                    except LinAlgError:
+                        raise ValueError("RidgeSVD requires either the "
+                                         "penalty matrix or the Gram matrix "
+                                         "to be positive definite")
+
+        self.decomposition_ = decomposition
+        self.V_ = V
+        self.a_ = a
+        self.b_ = b
+        self.Xty_eig_ = V.T @ Xty
+
+        ######################
+        # LOO/GCV statistics #
+        ######################
+        if self.compute_loo:
+            # X_c @ V; the fitted values are XV @ diag(d) @ Xty_eig
+            XV = X @ V
+            if self.X_mean_ is not None:
+                XV = XV - self.X_mean_ @ V
+            self.XV_ = np.asarray(XV)
+            self.XV_sq_ = self.XV_ ** 2
+
+            self.y_c_ = y
+            self.sample_weight_ = w
+
+    def update_penalty(self, **params):
+        """
+        Updates the penalty parameters.
+        """
+        self.penalty_config_.set_params(**params)
+
+    def solve(self, coef_init=None, intercept_init=None, other_init=None):
+        """
+        Solves the optimization problem for the current penalty value. The initializations are ignored since the solution is computed in closed form.
+
+        Parameters
+        ----------
+        coef_init: None, array-like
+            (Optional) Initialization for the coefficient.
+
+        intercept_init: None, array-like
+            (Optional) Initialization for the intercept.
+
+        other_init: None, array-like
+            (Optional) Initialization for other optimization data e.g. dual variables.
+
+        Output
+        ------
+        soln, other_data, opt_info
+
+        soln: dict of array-like
+            The coefficient/intercept solutions,
+
+        other_data: dict
+            Other optimzation output data e.g. dual variables.
+
+        opt_info: dict
+            Optimization information e.g. runtime and the LOO/GCV errors.
+        """
+        start_time = time()
+
+        pen_val = self.penalty_config_.pen_val
+        denom = self.a_ + pen_val * self.b_
+        if np.any(denom <= np.finfo(float).eps):
+            raise ValueError("The ridge problem with pen_val={} does not have "
+                             "a unique solution".format(pen_val))
+        d = 1 / denom
+
+        if self.is_mr_:
+            coef_eig = d.reshape(-1, 1) * self.Xty_eig_
+        else:
+            coef_eig = d * self.Xty_eig_
+
+        coef = self.V_ @ coef_eig
+
+        if self.fit_intercept_:
+            intercept = self.y_mean_ - coef.T @ self.X_mean_
+        else:
+            intercept = None
+
+        opt_info = {}
+        if self.compute_loo:
+            opt_info['train_metrics'] = self._get_loo_gcv(d=d,
+                                                          coef_eig=coef_eig)
+
+        opt_info['runtime'] = time() - start_time
+
+        soln = {'coef': coef, 'intercept': intercept}
+        return soln, None, opt_info
+
+    def _get_loo_gcv(self, d, coef_eig):
+        """
+        Computes the negative LOO and GCV mean squared errors.
+        """
+        w = self.sample_weight_
+        n_samples = self.XV_.shape[0]
+
+        resid = self.y_c_ - self.XV_ @ coef_eig
+
+        # diagonal of the hat matrix
+        # X_c @ (Gram + pen_val * P)^{-1} @ X_c.T @ W / n
+        hat_diag = (w / n_samples) * (self.XV_sq_ @ d)
+        if self.fit_intercept_:
+            # the unpenalized intercept projects onto the ones vector
+            hat_diag += w / w.sum()
+
+        if self.is_mr_:
+            sq_resid = (resid ** 2).sum(axis=1)
+        else:
+            sq_resid = resid ** 2
+
+        loo_mse = (w * sq_resid / (1 - hat_diag) ** 2).sum() / n_samples
+
+        dof = hat_diag.sum()
+        gcv = (w * sq_resid).sum() / n_samples / (1 - dof / n_samples) ** 2
+
+        return {'loo': -loo_mse, 'gcv': -gcv}
+
+
+def _to_dense(X):
+    """
+    Returns a dense version of a data matrix.
+    """
+    if issparse(X):
+        return X.toarray()
+
+    elif is_sparse_or_lin_op(X):
+        return X @ np.eye(X.shape[1])
+
+    else:
+        return np.asarray(X)
@@ -0,0 +1,244 @@
+from yaglm.solver.base import GlmSolverWithPath
+from yaglm.solver.FISTA import FISTA
+from yaglm.autoassign import autoassign
+from yaglm.utils import is_multi_response
+from yaglm.config.penalty import NoPenalty
+from yaglm.sparse_utils import is_sparse_or_lin_op
+
+from yaglm.opt.algo.stochastic import solve_stochastic_prox_grad
+from yaglm.opt.from_config.loss import get_glm_loss_func
+from yaglm.opt.from_config.penalty import get_penalty_func, wrap_intercept
+from yaglm.opt.split_smooth_and_non_smooth import split_smooth_and_non_smooth
+from yaglm.opt.from_config.constraint import get_constraint_func
+from yaglm.opt.utils import decat_coef_inter_vec, decat_coef_inter_mat
+
+from scipy.sparse import issparse
+
+
+class StochasticProxGrad(GlmSolverWithPath):
+    """
+    Solves a penalized GLM problem using a stochastic proximal gradient algorithm that only looks at a (mini) batch of samples at each step. This is useful when n_samples is so large that a full gradient evaluation is expensive.
+
+    Parameters
+    ----------
+    method: str
+        Which algorithm to use. Must be one of ['saga', 'svrg', 'sgd'].
+
+        'saga': SAGA (Defazio et al, 2014).
+
+        'svrg': proximal SVRG (Xiao and Zhang, 2014).
+
+        'sgd': mini-batch proximal stochastic gradient descent with a decreasing step size.
+
+    batch_size: int
+        Number of samples in each batch.
+
+    max_epochs: int
+        Maximum number of passes over the data.
+
+    step: float, 'lip'
+        The step size. If 'lip', will be set from the largest per-sample gradient Lipschitz constant.
+
+    stop_crit: str
+        Which stopping criterion to use. Must be one of ['x_max', 'x_L2', 'loss']. This is checked after every epoch.
+
+    tol: float, None
+        Numerical value for stopping criterion. If None, then we will not use a stopping criterion.
+
+    rel_crit: bool
+        Should the tolerance be computed on a relative scale e.g. stop if ||x_new - x_prev||  <= tol * (||x_prev|| + epsilon).
+
+    random_state: None, int
+        The seed for sampling the batches.
+
+    tracking_level: int
+        How much data to track.
+
+    verbose: bool
+        Whether or not to display an epoch progress bar.
+
+    References
+    ----------
+    Defazio, A., Bach, F. and Lacoste-Julien, S., 2014. SAGA: A fast incremental gradient method with support for non-strongly convex composite objectives. In Advances in neural information processing systems (pp. 1646-1654).
+
+    Xiao, L. and Zhang, T., 2014. A proximal stochastic gradient method with progressive variance reduction. SIAM Journal on Optimization, 24(4), pp.2057-2075.
+    """
+
+    @autoassign
+    def __init__(self,
+                 method='saga',
+                 batch_size=1,
+                 max_epochs=100,
+                 step='lip',
+                 tol=1e-5, rel_crit=False, stop_crit='x_max',
+                 random_state=None,
+                 tracking_level=0,
+                 verbose=False): pass
+
+    @classmethod
+    def _is_applicable(self, loss, penalty=None, constraint=None):
+        """
+        Determines whether or not this problem can be solved by a stochastic proximal gradient algorithm i.e. if it is in the form
+
+        min L(coef) + p(coef)
+
+        where L is smooth and p is proximable. Note we also require the constraint and non-smooth penalty are not both provided.
+
+        Parameters
+        ----------
+        loss: LossConfig
+            The loss.
+
+        penalty: None, PenaltyConfig
+            The penalty.
+
+        constraint: None, ConstraintConfig
+
+        Output
+        ------
+        is_applicable: bool
+            Wheter or not this solver can be used.
+        """
+        # these are the same requirements as FISTA
+        return FISTA._is_applicable(loss=loss, penalty=penalty,
+                                    constraint=constraint)
+
+    def setup(self, X, y, loss, penalty, constraint=None,
+              fit_intercept=True, sample_weight=None, offsets=None):
+        """
+        Sets up anything the solver needs.
+        """
+        # make sure the solver is applicable
+        if not self.is_applicable(loss, penalty, constraint):
+            raise ValueError("StochasticProxGrad is not applicable to "
+                             "loss={}, penalty={}, constrain={}".
+                             format(loss, penalty, constraint))
+
+        # we need to be able to pull out rows of X
+        if is_sparse_or_lin_op(X) and not issparse(X):
+            raise ValueError("StochasticProxGrad requires X to be a dense "
+                             "or sparse matrix; got a linear operator. "
+                             "Note standardizing sparse X with "
+                             "fit_intercept=True results in a linear "
+                             "operator.")
+
+        self.is_mr_ = is_multi_response(y)
+        self.fit_intercept_ = fit_intercept
+        self.penalty_config_ = penalty if penalty is not None else NoPenalty()
+        self.n_features_ = X.shape[1]
+
+        # get the loss function
+        self.loss_func_ = get_glm_loss_func(config=loss, X=X, y=y,
+                                            fit_intercept=fit_intercept,
+                                            sample_weight=sample_weight,
+                                            offsets=offsets)
+
+        # penalty and constraint
+        self.penalty_func_ = None
+        self.constraint_func_ = None
+
+        if penalty is not None:
+            self.penalty_func_ = get_penalty_func(config=self.penalty_config_,
+                                                  n_features=self.n_features_)
+        if constraint is not None:
+            self.constraint_func_ = get_constraint_func(config=constraint)
+
+    def update_penalty(self, **params):
+        """
+        Updates the penalty parameters.
+        """
+        self.penalty_config_.set_params(**params)
+        self.penalty_func_ = get_penalty_func(config=self.penalty_config_,
+                                              n_features=self.n_features_)
+
+    def solve(self, coef_init=None, intercept_init=None, other_init=None):
+        """
+        Solves the optimization problem.
+
+        Parameters
+        ----------
+        coef_init: None, array-like
+            (Optional) Initialization for the coefficient.
+
+        intercept_init: None, array-like
+            (Optional) Initialization for the intercept.
+
+        other_init: None, array-like
+            (Optional) Initialization for other optimization data e.g. dual variables.
+
+        Output
+        ------
+        soln, other_data, opt_info
+
+        soln: dict of array-like
+            The coefficient/intercept solutions,
+
+        other_data: dict
+            Other optimzation output data e.g. dual variables.
+
+        opt_info: dict
+            Optimization information e.g. number of iterations, runtime, etc.
+        """
+        #########
+        # Setup #
+        #########
+
+        # split penalty into smooth and non-smooth parts
+        smooth_pen, non_smooth_pen = \
+            split_smooth_and_non_smooth(self.penalty_func_)
+
+        # maybe add an intercept to the penalty
+        if smooth_pen is not None:
+            smooth_pen = wrap_intercept(func=smooth_pen,
+                                        fit_intercept=self.fit_intercept_,
+                                        is_mr=self.is_mr_)
+
+        if non_smooth_pen is not None:
+            non_smooth_pen = wrap_intercept(func=non_smooth_pen,
+                                            fit_intercept=self.fit_intercept_,
+                                            is_mr=self.is_mr_)
+
+        if self.constraint_func_ is not None:
+            assert non_smooth_pen is None
+            non_smooth_func = wrap_intercept(func=self.constraint_func_,
+                                             fit_intercept=self.fit_intercept_,
+                                             is_mr=self.is_mr_)
+
+        else:
+            non_smooth_func = non_smooth_pen
+
+        # setup initial value
+        if coef_init is None or  \
+                (self.fit_intercept_ and intercept_init is None):
+            init_val = self.loss_func_.default_init()
+        else:
+            if self.fit_intercept_:
+                init_val = self.loss_func_.\
+                    cat_intercept_coef(intercept_init, coef_init)
+            else:
+                init_val = coef_init
+
+        ####################################
+        # solve problem with stochastic PG #
+        ####################################
+        soln, out = solve_stochastic_prox_grad(glm_loss=self.loss_func_,
+                                               init_val=init_val,
+                                               smooth_pen=smooth_pen,
+                                               non_smooth_func=non_smooth_func,
+                                               **self.get_solve_kws())
+
+        # format output
+        if self.fit_intercept_:
+            if self.is_mr_:
+                coef, intercept = decat_coef_inter_mat(soln)
+            else:
+                coef, intercept = decat_coef_inter_vec(soln)
+        else:
+            coef = soln
+            intercept = None
+
+        soln = {'coef': coef, 'intercept': intercept}
+        opt_data = None
+        opt_info = out
+
+        return soln, opt_data, opt_info
@@ -6,14 +6,17 @@ from yaglm.autoassign import autoassign
 
 from yaglm.opt.algo.zhu_admm import solve
 from yaglm.opt.from_config.input_loss import get_glm_input_loss
+from yaglm.opt.from_config.loss import get_glm_loss_func
 from yaglm.opt.from_config.mat_and_func import get_mat_and_func
 from yaglm.opt.from_config.penalty import get_penalty_func
+from yaglm.opt.duality_gap import get_glm_dual_gap_func
+from yaglm.opt.counters import OptCounters
 
 from yaglm.config.penalty import NoPenalty
 from yaglm.opt.utils import decat_coef_inter_vec, decat_coef_inter_mat, \
     process_zero_init
 from yaglm.utils import is_multi_response, get_shapes_from
-from yaglm.sparse_utils import safe_hstack
+from yaglm.sparse_utils import safe_hstack, InterceptAugmented
 
 
 class ZhuADMM(GlmSolverWithPath):
@@ -23,9 +26,10 @@ class ZhuADMM(GlmSolverWithPath):
     Parameters
     ----------
     D_mat: str, yaglm.addm.addm.DMatrix
-        The D matrix. If str, must be one of ['prop_id', 'diag'].
-        If 'prop_id' then D will be ||A||_op * I_d.
-        If 'diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d |A^TA|_{ij}.
+        The D matrix. If str, must be one of ['prop_id', 'diag', 'abs_diag'].
+        If 'prop_id' then D will be ||A||_op^2 * I_d.
+        If 'diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d |A^TA|_{ij}; this is computed one block of columns at a time.
+        If 'abs_diag', then D will be the diagonal matrix whose ith element is given by sum_{j=1}^d (|A|^T|A|)_{ij}, which upper bounds the 'diag' option and can be computed in O(nnz(A)) operations.
 
     rho: float
         The ADMM penalty parameter.
@@ -45,6 +49,15 @@ class ZhuADMM(GlmSolverWithPath):
     max_iter: int
         Maximum number of iterations.
 
+    gap_tol: None, float
+        (Optional) Also stop if the duality gap of the penalized GLM problem falls below this value. This is currently only available for convex penalties applied directly to the coefficient; see yaglm.opt.duality_gap.
+
+    gap_freq: int
+        How often to check the duality gap when gap_tol is provided. Each check requires an extra pass over the data.
+
+    instrument: bool
+        Whether or not to count and time the expensive operations (e.g. products with X, proximal operator calls) of each solve. These are reported in opt_info['counters']; see yaglm.opt.counters.OptCounters.
+
     tracking_level: int
         How much data to track.
 
@@ -63,6 +76,9 @@ class ZhuADMM(GlmSolverWithPath):
                  eta=2,
                  mu=10,
                  max_iter=1000,
+                 gap_tol=None,
+                 gap_freq=10,
+                 instrument=False,
                  tracking_level=0): pass
 
     @classmethod
@@ -147,9 +163,8 @@ class ZhuADMM(GlmSolverWithPath):
         ############################
         # set the X transformation matrix
         if fit_intercept:
-            ones_col = np.ones(X.shape[0]).reshape(-1, 1)
-            # TODO: make ones a linear operator if X is sparse
-            self.A1_ = safe_hstack([ones_col, X])  # safely addresses sparse X
+            # [1_n, X] without copying X
+            self.A1_ = InterceptAugmented(X)
         else:
             self.A1_ = X
 
@@ -159,6 +174,39 @@ class ZhuADMM(GlmSolverWithPath):
                                       sample_weight=sample_weight,
                                       offsets=offsets)
 
+        #####################
+        # setup duality gap #
+        #####################
+        # the duality gap is only available when the penalty is
+        # applied directly to the coefficient i.e. A2 is the identity
+        self.glm_loss_func_ = None
+        if self.g2_config_ is penalty:
+            self.glm_loss_func_ = \
+                get_glm_loss_func(config=loss, X=X, y=y,
+                                  fit_intercept=fit_intercept,
+                                  sample_weight=sample_weight,
+                                  offsets=offsets)
+
+        if self.gap_tol is not None and self.get_dual_gap_func() is None:
+            raise ValueError("The duality gap stopping criterion is not "
+                             "available for loss={}, penalty={}".
+                             format(loss, penalty))
+
+    def get_dual_gap_func(self):
+        """
+        Gets the duality gap function for the current problem.
+
+        Output
+        ------
+        dual_gap_func: None, yaglm.opt.duality_gap.GlmDualityGap
+            The duality gap function; None if it is not available for this problem.
+        """
+        if self.glm_loss_func_ is None:
+            return None
+
+        return get_glm_dual_gap_func(loss_func=self.glm_loss_func_,
+                                     penalty_func=self.g2_)
+
     def update_penalty(self, **params):
         """
         Updates the penalty parameters.
@@ -245,11 +293,16 @@ class ZhuADMM(GlmSolverWithPath):
             if k == 'dual_vars':
                 kws['dual_init'] = kws.pop('dual_vars')
 
+        # possibly count/time the expensive operations
+        counters = OptCounters() if kws.pop('instrument') else None
+
         soln, admm_data, opt_info = solve(g1=self.g1_,
                                           g2=self.g2_,
                                           A1=self.A1_,
                                           A2=A2,
                                           primal_init=primal_init,
+                                          dual_gap_func=self.get_dual_gap_func(),
+                                          counters=counters,
                                           **kws)
 
         # format output
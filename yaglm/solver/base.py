@@ -116,6 +116,22 @@ class GlmSolver(Config):
         """
         return False
 
+    def uses_gram(self, X):
+        """
+        Whether or not setup() accepts and benefits from a precomputed Gram matrix of X for this data e.g. cross-validation then computes each fold's Gram matrix by downdating the full data's Gram matrix.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            The raw covariate data.
+
+        Output
+        ------
+        uses_gram: bool
+            Whether or not to pass the Gram matrix to setup().
+        """
+        return False
+
     @property
     def needs_fixed_init(self):
         """
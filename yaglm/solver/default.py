@@ -1,6 +1,11 @@
 from yaglm.solver.FISTA import FISTA
 from yaglm.solver.ZhuADMM import ZhuADMM
 from yaglm.solver.Cvxpy import Cvxpy
+from yaglm.solver.StochasticProxGrad import StochasticProxGrad
+from yaglm.solver.ProxNewton import ProxNewton
+from yaglm.solver.ExactADMM import ExactADMM
+from yaglm.solver.GramFISTA import GramFISTA
+from yaglm.solver.RidgeSVD import RidgeSVD
 
 
 def get_solver(solver='default', loss='lin_reg',
@@ -77,6 +82,13 @@ def get_solver(solver='default', loss='lin_reg',
 
 solvers_str2obj = {'fista': FISTA(),
                    'admm': ZhuADMM(),
-                   'cvxpy': Cvxpy()
+                   'exact_admm': ExactADMM(),
+                   'gram_fista': GramFISTA(),
+                   'ridge_svd': RidgeSVD(),
+                   'cvxpy': Cvxpy(),
+                   'prox_newton': ProxNewton(),
+                   'saga': StochasticProxGrad(method='saga'),
+                   'svrg': StochasticProxGrad(method='svrg'),
+                   'sgd': StochasticProxGrad(method='sgd')
                    }
 avail_solvers = list(solvers_str2obj.keys())
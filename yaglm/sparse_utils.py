@@ -9,7 +9,16 @@ import numpy as np
 
 
 def safe_norm(X, ord=None, axis=0):
-    if is_sparse_or_lin_op(X):
+    if isinstance(X, RowChunked) and ord is None and axis == 0:
+        # column norms of an out-of-core matrix are computed block by block
+        sum_sq = sum((block ** 2).sum(axis=0)
+                     for _, _, block in X.iter_row_blocks())
+        return np.sqrt(sum_sq)
+
+    elif isinstance(X, InterceptAugmented) and ord is None and axis == 0:
+        return X.col_norms()
+
+    elif is_sparse_or_lin_op(X):
         # TODO: check how this works for  linear operator
         return norm_sparse(X, ord=ord, axis=axis)
 
@@ -91,7 +100,7 @@ def center_scale_sparse(X, X_offset=None, X_scale=None):
         X_offset_scale = None
 
     if X_scale is not None:
-        X_ = X @ diags(1 / X_scale)
+        X_ = safe_col_scaled(X, 1 / X_scale)
     else:
         X_ = X
 
@@ -105,6 +114,183 @@ def is_sparse_or_lin_op(a):
     return issparse(a) or isinstance(a, LinearOperator)
 
 
+def is_out_of_core(a):
+    """
+    Whether or not a data matrix lives on disk (e.g. a np.memmap) or is an already chunked matrix. These matrices should never be copied in memory.
+    """
+    return isinstance(a, (np.memmap, RowChunked))
+
+
+def check_out_of_core(X):
+    """
+    Basic validation for out-of-core data matrices that does not read the data e.g. we do not check for infinite values.
+
+    Parameters
+    ----------
+    X: np.memmap, RowChunked
+        The data matrix.
+
+    Output
+    ------
+    X: np.memmap, RowChunked
+        The unmodified data matrix.
+    """
+    if len(X.shape) != 2:
+        raise ValueError("Expected 2D array, got {}D array instead".
+                         format(len(X.shape)))
+
+    if X.dtype not in [np.float64, np.float32]:
+        raise ValueError("Out-of-core data matrices must have a float64 "
+                         "or float32 dtype; got {}. We will not copy "
+                         "the data to convert its type".format(X.dtype))
+
+    return X
+
+
+def as_row_chunked(X, chunk_size=None):
+    """
+    Wraps a data matrix as a RowChunked linear operator. Does nothing if X is already a RowChunked.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_samples, n_features)
+        The data matrix e.g. a np.memmap.
+
+    chunk_size: None, int
+        (Optional) Number of rows in each block. If None, uses RowChunked's default.
+
+    Output
+    ------
+    X_chunked: RowChunked
+    """
+    if isinstance(X, RowChunked):
+        return X
+
+    if chunk_size is None:
+        return RowChunked(X)
+    else:
+        return RowChunked(X, chunk_size=chunk_size)
+
+
+def take_rows(X, idxs, copy='auto'):
+    """
+    Gets the rows X[idxs] of a data matrix e.g. the training samples for a cross-validation fold.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_samples, n_features)
+        The data matrix.
+
+    idxs: array-like of ints
+        The rows to take.
+
+    copy: bool, str
+        Whether or not to copy the rows. If False, the rows of a dense or out-of-core matrix are represented by a RowChunked view that shares the memory of X; sparse matrices and other linear operators are always copied. If 'auto', only out-of-core matrices are represented by views.
+
+    Output
+    ------
+    X_rows: array-like, sparse matrix or RowChunked, shape (len(idxs), n_features)
+        The rows of X.
+    """
+    if copy == 'auto':
+        copy = not is_out_of_core(X)
+
+    if not copy and (is_out_of_core(X) or not is_sparse_or_lin_op(X)):
+        return as_row_chunked(X).take_rows(idxs)
+    else:
+        return X[idxs, :]
+
+
+def get_active_coef(coef):
+    """
+    Gets the active set of a coefficient i.e. its non-zero rows.
+
+    Parameters
+    ----------
+    coef: array-like, shape (n_features, ) or (n_features, n_responses)
+        The coefficient.
+
+    Output
+    ------
+    active_idxs, active_coef
+
+    active_idxs: array-like of ints, shape (n_active, )
+        The indices of the non-zero rows of the coefficient.
+
+    active_coef: array-like, shape (n_active, ) or (n_active, n_responses)
+        The compact coefficient i.e. coef[active_idxs].
+    """
+    coef = np.asarray(coef)
+    if coef.ndim == 1:
+        active = coef != 0
+    else:
+        active = (coef != 0).any(axis=1)
+
+    active_idxs = np.flatnonzero(active)
+    return active_idxs, coef[active_idxs]
+
+
+# Slicing out the active columns of X copies them so it only beats the
+# full product X @ coef when the active set is a small fraction of the
+# features. Gathering columns of a row major array is much slower than
+# for column major arrays (and CSC matrices) so it needs a smaller
+# active set to pay off. Column slicing a CSR matrix never paid off.
+_MAX_ACTIVE_FRAC_ROW_MAJOR = 0.01
+_MAX_ACTIVE_FRAC_COL_MAJOR = 0.1
+
+
+def active_set_dot(X, active_idxs, active_coef):
+    """
+    Computes X @ coef where coef is only non-zero on an active set. When the active set is small enough, only the active columns of X are touched e.g. for dense and CSC matrices this costs O(n_samples * n_active) operations instead of O(n_samples * n_features). Otherwise (and for CSR matrices, out-of-core matrices and linear operators) the full coefficient is used since copying most of the columns of X costs more than the full product.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or LinearOperator, shape (n_samples, n_features)
+        The data matrix.
+
+    active_idxs: array-like of ints, shape (n_active, )
+        The indices of the non-zero rows of the coefficient.
+
+    active_coef: array-like, shape (n_active, ) or (n_active, n_responses)
+        The non-zero rows of the coefficient; see get_active_coef().
+
+    Output
+    ------
+    z: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The product X @ coef.
+    """
+    active_coef = np.asarray(active_coef)
+    n_samples, n_features = X.shape
+    n_active = len(active_idxs)
+
+    if n_active == 0:
+        return np.zeros((n_samples, ) + active_coef.shape[1:])
+
+    if issparse(X) and X.format not in ['csr', 'csc']:
+        X = X.tocsc()
+
+    # the largest fraction of active features for which we slice X
+    if is_out_of_core(X) or (is_sparse_or_lin_op(X) and not issparse(X)):
+        max_frac = 0
+
+    elif issparse(X):
+        max_frac = _MAX_ACTIVE_FRAC_COL_MAJOR if X.format == 'csc' else 0
+
+    else:
+        X = np.asarray(X)
+        max_frac = _MAX_ACTIVE_FRAC_COL_MAJOR if X.flags.f_contiguous \
+            and not X.flags.c_contiguous else _MAX_ACTIVE_FRAC_ROW_MAJOR
+
+    if n_active <= max_frac * n_features:
+        return np.asarray(X[:, active_idxs] @ active_coef)
+
+    else:
+        coef = np.zeros((n_features, ) + active_coef.shape[1:],
+                        dtype=active_coef.dtype)
+        coef[active_idxs] = active_coef
+        return np.asarray(X @ coef)
+
+
 class HStacked(LinearOperator):
     """
     Represents np.hstack
@@ -143,6 +329,104 @@ class HStacked(LinearOperator):
         return np.concatenate([mat.T @ x for mat in self.tup])
 
 
+class RowChunked(LinearOperator):
+    """
+    Represents a data matrix whose products are computed by streaming over blocks of rows. Only one block of rows is ever loaded into memory so this works with matrices that are larger than memory e.g. np.memmap arrays or any object supporting row slicing.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_samples, n_features)
+        The data matrix e.g. a np.memmap.
+
+    chunk_size: int
+        Number of rows in each block.
+
+    rows: None, array-like of ints
+        (Optional) The rows of X this operator represents i.e. this represents X[rows] without copying X. If None, represents all of X.
+    """
+    def __init__(self, X, chunk_size=10000, rows=None):
+        assert X.ndim == 2
+        self.X = X
+        self.chunk_size = int(chunk_size)
+
+        if rows is None:
+            self.rows = None
+            shape = X.shape
+        else:
+            self.rows = np.asarray(rows).reshape(-1)
+            shape = (len(self.rows), X.shape[1])
+
+        super().__init__(dtype=X.dtype, shape=shape)
+
+    def take_rows(self, idxs):
+        """
+        Returns a view of a subset of the rows that shares the underlying data matrix.
+
+        Parameters
+        ----------
+        idxs: array-like of ints
+            The rows to take.
+
+        Output
+        ------
+        X_rows: RowChunked, shape (len(idxs), n_features)
+            Represents X[idxs].
+        """
+        idxs = np.asarray(idxs).reshape(-1)
+        rows = idxs if self.rows is None else self.rows[idxs]
+        return RowChunked(self.X, chunk_size=self.chunk_size, rows=rows)
+
+    def iter_row_blocks(self):
+        """
+        Iterates over the blocks of rows.
+
+        Yields
+        ------
+        left, right, block
+
+        left, right: int
+            The row indices of this block i.e. block = X[left:right].
+
+        block: array-like, shape (right - left, n_features)
+            The in memory block of rows.
+        """
+        n_rows = self.shape[0]
+        for left in range(0, n_rows, self.chunk_size):
+            right = min(left + self.chunk_size, n_rows)
+
+            if self.rows is None:
+                block = self.X[left:right]
+            else:
+                block = self.X[self.rows[left:right]]
+
+            yield left, right, np.asarray(block)
+
+    def _matvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        out = np.empty(self.shape[0], dtype=np.result_type(self.dtype, x))
+        for left, right, block in self.iter_row_blocks():
+            out[left:right] = block @ x
+        return out
+
+    def _matmat(self, X):
+        X = np.asarray(X)
+        out = np.empty((self.shape[0], X.shape[1]),
+                       dtype=np.result_type(self.dtype, X))
+        for left, right, block in self.iter_row_blocks():
+            out[left:right] = block @ X
+        return out
+
+    def _rmatvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        return sum(block.T @ x[left:right]
+                   for left, right, block in self.iter_row_blocks())
+
+    def _rmatmat(self, X):
+        X = np.asarray(X)
+        return sum(block.T @ X[left:right]
+                   for left, right, block in self.iter_row_blocks())
+
+
 class OnesOuterVec(LinearOperator):
     """
     Represents the outer product 1_n vec.T where 1_n is the vector of ones
@@ -192,3 +476,102 @@ class ColScaled(LinearOperator):
 
     def _rmatvec(self, x):
         return self.s @ (self.mat.T @ x)
+
+
+class InterceptAugmented(LinearOperator):
+    """
+    Represents the intercept augmented data matrix [1_n, X] without copying X.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or LinearOperator, shape (n_samples, n_features)
+        The data matrix.
+    """
+    def __init__(self, X):
+        self.X = X
+        shape = (X.shape[0], X.shape[1] + 1)
+        dtype = np.result_type(X.dtype, np.float64)
+        super().__init__(dtype=dtype, shape=shape)
+
+    def _matvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        return np.asarray(self.X @ x[1:]).reshape(-1) + x[0]
+
+    def _matmat(self, X):
+        X = np.asarray(X)
+        return np.asarray(self.X @ X[1:]) + X[0]
+
+    def _rmatvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        return np.concatenate([[x.sum()],
+                               np.asarray(self.X.T @ x).reshape(-1)])
+
+    def _rmatmat(self, X):
+        X = np.asarray(X)
+        return np.vstack([X.sum(axis=0), np.asarray(self.X.T @ X)])
+
+    def col_norms(self):
+        """
+        The euclidean norms of the columns of [1_n, X].
+
+        Output
+        ------
+        norms: array-like, shape (n_features + 1, )
+        """
+        X_norms = np.asarray(safe_norm(self.X, axis=0)).reshape(-1)
+        return np.concatenate([[np.sqrt(self.shape[0])], X_norms])
+
+    def gram_diag(self):
+        """
+        The diagonal of [1_n, X]^T [1_n, X].
+
+        Output
+        ------
+        diag: array-like, shape (n_features + 1, )
+        """
+        return self.col_norms() ** 2
+
+    def gram_cols(self, left, right):
+        """
+        Computes columns left:right of the Gram matrix [1_n, X]^T [1_n, X] without forming the augmented matrix.
+
+        Parameters
+        ----------
+        left, right: int
+            The columns to compute.
+
+        Output
+        ------
+        block: array-like, shape (n_features + 1, right - left)
+        """
+        n_samples, n_cols = self.shape
+        block = np.zeros((n_cols, right - left))
+
+        # the intercept column is 1_n.T [1_n, X] = [n, sum(X, axis=0)]
+        if left == 0:
+            block[0, 0] = n_samples
+            block[1:, 0] = np.asarray(self.X.T @ np.ones(n_samples)).\
+                reshape(-1)
+            left += 1
+            offset = 1
+        else:
+            offset = 0
+
+        if right > left:
+            # columns of X i.e. [sum(X_b, axis=0); X^T X_b]
+            if isinstance(self.X, LinearOperator):
+                E = np.zeros((n_cols - 1, right - left))
+                E[left - 1:right - 1, :] = np.eye(right - left)
+                X_b = self.X.matmat(E)
+            else:
+                X_b = self.X[:, left - 1:right - 1]
+
+            if issparse(X_b):
+                block[0, offset:] = np.asarray(X_b.sum(axis=0)).reshape(-1)
+                block[1:, offset:] = (self.X.T @ X_b).toarray()
+            else:
+                X_b = np.asarray(X_b)
+                block[0, offset:] = X_b.sum(axis=0)
+                block[1:, offset:] = self.X.T @ X_b
+
+        return block
@@ -1,9 +1,14 @@
 import numpy as np
 from sklearn.utils import check_random_state
 from scipy.special import expit
+from scipy import sparse
 from sklearn.utils.extmath import softmax
+from scipy.signal import lfilter
+from scipy.fft import fft, next_fast_len
 from numbers import Number
 
+from yaglm.sparse_utils import safe_vstack
+
 # TODO: add signal to noise ratio for logistic, multinomial and poisson
 
 
@@ -16,6 +21,9 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
                           noise_std=1,
                           snr=None,
                           intercept=0,
+                          block_size=10,
+                          X_density=None,
+                          chunk_size=None,
                           random_state=None):
     """
     Samples linear regression data with a sparse regression coefficient.
@@ -38,11 +46,20 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
         Which type of coefficient to create; see Section 3.1 of (Hastie et al, 2017).
 
     cov: str
-        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T.
+        The covariance matrix of the X data; see get_cov(). Must be one of ['ident', 'tot', 'ar', 'block', 'toeplitz'].
 
-    corr: float
+    corr: float, array-like
         The correlation for the covariace matrix for the X data.
 
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    X_density: None, float
+        (Optional) If provided, X is a sparse matrix with this fraction of non-zero entries; see sample_X(). Requires cov='ident'.
+
+    chunk_size: None, int
+        (Optional) Sample X in chunks of this many rows; see iter_X_chunks().
+
     noise_std: None, float
         The user specified noise level. This is overwitten if snr is provided.
 
@@ -60,13 +77,13 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
     X, y, info
 
     X: array-like, shape (n_samples, n_features)
-        The X data.
+        The X data. This is a scipy.sparse matrix if X_density is provided.
         
     y: array-like, shape (n_samples, ) or (n_samples, n_responses)
         The response.
         
     info: dict
-        Information related to the true sample distribution e.g. the true coefficient.
+        Information related to the true sample distribution e.g. the true coefficient. The dense covariance matrix, info['cov'], is only included if n_features <= 5000.
     """
     rng = check_random_state(random_state)
 
@@ -74,10 +91,10 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
     coef = get_sparse_coef(n_features=n_features, n_nonzero=n_nonzero,
                            n_responses=n_responses, beta_type=beta_type)
 
-    cov = get_cov(n_features=n_features, cov=cov, corr=corr)
+    cov_kws = {'cov': cov, 'corr': corr, 'block_size': block_size}
 
     # determine the noise_std
-    ct_Sigma_c = coef_cov_quad_form(coef, cov)
+    ct_Sigma_c = coef_cov_quad_form(coef, **cov_kws)
     if snr is not None:
         # user specified signal to noise ratio
         # overwrite specified noise_std
@@ -87,8 +104,9 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
         snr = ct_Sigma_c / (noise_std ** 2)
 
     # sample X data
-    X = rng.multivariate_normal(mean=np.zeros(n_features), cov=cov,
-                                size=n_samples)
+    X = sample_X(n_samples=n_samples, n_features=n_features,
+                 density=X_density, chunk_size=chunk_size,
+                 random_state=rng, **cov_kws)
 
     # sample noise
     if n_responses == 1:
@@ -105,7 +123,11 @@ def sample_sparse_lin_reg(n_samples=100, n_features=10,
     # other information
     info = {'coef': coef, 'intercept': intercept,
             'snr': snr, 'noise_std': noise_std,
-            'cov': cov}
+            'cov_kws': cov_kws}
+
+    # only form the dense covariance matrix if it is reasonably sized
+    if n_features <= _MAX_DENSE_COV_FEATURES:
+        info['cov'] = get_cov(n_features=n_features, **cov_kws)
     
     return X, y, info
 
@@ -161,6 +183,9 @@ def sample_sparse_log_reg(n_samples=100, n_features=10, n_nonzero=5,
                           corr=0.35,
                           coef_scale=1,
                           intercept=0,
+                          block_size=10,
+                          X_density=None,
+                          chunk_size=None,
                           random_state=None):
     """
     Samples logistic regression data with a sparse regression coefficient.
@@ -180,11 +205,20 @@ def sample_sparse_log_reg(n_samples=100, n_features=10, n_nonzero=5,
         Which type of coefficient to create; see Section 3.1 of (Hastie et al, 2017).
 
     cov: str
-        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T.
+        The covariance matrix of the X data; see get_cov(). Must be one of ['ident', 'tot', 'ar', 'block', 'toeplitz'].
 
-    corr: float
+    corr: float, array-like
         The correlation for the covariace matrix for the X data.
 
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    X_density: None, float
+        (Optional) If provided, X is a sparse matrix with this fraction of non-zero entries; see sample_X(). Requires cov='ident'.
+
+    chunk_size: None, int
+        (Optional) Sample X in chunks of this many rows; see iter_X_chunks().
+
     coef_scale: float
         The value of coef.T @ cov @ coef, which controls the signal to noise ratio.
 
@@ -199,7 +233,7 @@ def sample_sparse_log_reg(n_samples=100, n_features=10, n_nonzero=5,
     X, y, info
 
     X: array-like, shape (n_samples, n_features)
-        The X data.
+        The X data. This is a scipy.sparse matrix if X_density is provided.
 
     y: array-like, shape (n_samples, )
         The binary response
@@ -213,16 +247,17 @@ def sample_sparse_log_reg(n_samples=100, n_features=10, n_nonzero=5,
     coef = get_sparse_coef(n_features=n_features, n_nonzero=n_nonzero,
                            beta_type=beta_type)
 
-    cov = get_cov(n_features=n_features, cov=cov, corr=corr)
+    cov_kws = {'cov': cov, 'corr': corr, 'block_size': block_size}
 
     # determine the noise_std
-    ct_Sigma_c = coef_cov_quad_form(coef, cov)
+    ct_Sigma_c = coef_cov_quad_form(coef, **cov_kws)
     if ct_Sigma_c > np.finfo(float).eps:
         coef *= (coef_scale / ct_Sigma_c)
 
     # sample X data
-    X = rng.multivariate_normal(mean=np.zeros(n_features), cov=cov,
-                                size=n_samples)
+    X = sample_X(n_samples=n_samples, n_features=n_features,
+                 density=X_density, chunk_size=chunk_size,
+                 random_state=rng, **cov_kws)
 
     z = X @ coef + intercept
     p = expit(z)
@@ -242,6 +277,9 @@ def sample_sparse_multinomial(n_samples=100, n_features=10,
                               corr=0.35,
                               coef_scale=1,
                               intercept=0,
+                              block_size=10,
+                              X_density=None,
+                              chunk_size=None,
                               random_state=None):
     """
     Samples multinomial regression data with a sparse regression coefficient.
@@ -261,11 +299,20 @@ def sample_sparse_multinomial(n_samples=100, n_features=10,
         Which type of coefficient to create; see Section 3.1 of (Hastie et al, 2017).
 
     cov: str
-        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T.
+        The covariance matrix of the X data; see get_cov(). Must be one of ['ident', 'tot', 'ar', 'block', 'toeplitz'].
 
-    corr: float
+    corr: float, array-like
         The correlation for the covariace matrix for the X data.
 
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    X_density: None, float
+        (Optional) If provided, X is a sparse matrix with this fraction of non-zero entries; see sample_X(). Requires cov='ident'.
+
+    chunk_size: None, int
+        (Optional) Sample X in chunks of this many rows; see iter_X_chunks().
+
     coef_scale: float
         The value of coef.T @ cov @ coef, which controls the signal to noise ratio.
 
@@ -280,7 +327,7 @@ def sample_sparse_multinomial(n_samples=100, n_features=10,
     X, y, info
 
     X: array-like, shape (n_samples, n_features)
-        The X data.
+        The X data. This is a scipy.sparse matrix if X_density is provided.
 
     y: array-like, shape (n_samples, )
         The binary response
@@ -294,22 +341,24 @@ def sample_sparse_multinomial(n_samples=100, n_features=10,
     coef = get_sparse_coef(n_features=n_features, n_nonzero=n_nonzero,
                            beta_type=beta_type, n_responses=n_classes)
 
-    cov = get_cov(n_features=n_features, cov=cov, corr=corr)
+    cov_kws = {'cov': cov, 'corr': corr, 'block_size': block_size}
 
     # determine the noise_std
-    ct_Sigma_c = coef_cov_quad_form(coef, cov)
+    ct_Sigma_c = coef_cov_quad_form(coef, **cov_kws)
     if ct_Sigma_c > np.finfo(float).eps:
         coef *= (coef_scale / ct_Sigma_c)
 
     # sample X data
-    X = rng.multivariate_normal(mean=np.zeros(n_features), cov=cov,
-                                size=n_samples)
+    X = sample_X(n_samples=n_samples, n_features=n_features,
+                 density=X_density, chunk_size=chunk_size,
+                 random_state=rng, **cov_kws)
     z = X @ coef + intercept
     p = softmax(z)
 
-    classes = np.arange(n_classes)
-    y = np.array([np.random.choice(a=classes,  p=p[i, :])
-                  for i in range(n_samples)])
+    # inverse CDF sampling of each class label
+    u = rng.uniform(size=(n_samples, 1))
+    y = (u > np.cumsum(p, axis=1)).sum(axis=1)
+    y = np.minimum(y, n_classes - 1)
 
     # other information
     info = {'coef': coef, 'intercept': intercept,
@@ -326,6 +375,9 @@ def sample_sparse_poisson_reg(n_samples=100, n_features=10, n_responses=1,
                               cov='ar',
                               corr=0.35,
                               intercept=0,
+                              block_size=10,
+                              X_density=None,
+                              chunk_size=None,
                               random_state=None):
     """
     Samples linear regression data with a sparse regression coefficient.
@@ -348,11 +400,20 @@ def sample_sparse_poisson_reg(n_samples=100, n_features=10, n_responses=1,
         Which type of coefficient to create; see Section 3.1 of (Hastie et al, 2017).
 
     cov: str
-        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T.
+        The covariance matrix of the X data; see get_cov(). Must be one of ['ident', 'tot', 'ar', 'block', 'toeplitz'].
 
-    corr: float
+    corr: float, array-like
         The correlation for the covariace matrix for the X data.
 
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    X_density: None, float
+        (Optional) If provided, X is a sparse matrix with this fraction of non-zero entries; see sample_X(). Requires cov='ident'.
+
+    chunk_size: None, int
+        (Optional) Sample X in chunks of this many rows; see iter_X_chunks().
+
     coef_scale: float
         The value of coef.T @ cov @ coef, which controls the signal to noise ratio.
 
@@ -367,7 +428,7 @@ def sample_sparse_poisson_reg(n_samples=100, n_features=10, n_responses=1,
     X, y, info
 
     X: array-like, shape (n_samples, n_features)
-        The X data.
+        The X data. This is a scipy.sparse matrix if X_density is provided.
 
     y: array-like, shape (n_samples, ) or (n_samples, n_responses)
         The response.
@@ -381,16 +442,17 @@ def sample_sparse_poisson_reg(n_samples=100, n_features=10, n_responses=1,
     coef = get_sparse_coef(n_features=n_features, n_nonzero=n_nonzero,
                            beta_type=beta_type)
 
-    cov = get_cov(n_features=n_features, cov=cov, corr=corr)
+    cov_kws = {'cov': cov, 'corr': corr, 'block_size': block_size}
 
     # determine the noise_std
-    ct_Sigma_c = coef_cov_quad_form(coef, cov)
+    ct_Sigma_c = coef_cov_quad_form(coef, **cov_kws)
     if ct_Sigma_c > np.finfo(float).eps:
         coef *= (coef_scale / ct_Sigma_c)
 
     # sample X data
-    X = rng.multivariate_normal(mean=np.zeros(n_features), cov=cov,
-                                size=n_samples)
+    X = sample_X(n_samples=n_samples, n_features=n_features,
+                 density=X_density, chunk_size=chunk_size,
+                 random_state=rng, **cov_kws)
     # set y
     z = X @ coef + intercept
     lam = np.exp(z)
@@ -518,9 +580,9 @@ def get_sparse_coef(n_features=10, n_nonzero=5, n_responses=1, beta_type=1,
     return coef
 
 
-def get_cov(n_features=10, cov='ar', corr=0.35):
+def get_cov(n_features=10, cov='ar', corr=0.35, block_size=10):
     """
-    Sets up the covariance matrix.
+    Sets up the covariance matrix. Note this is a dense n_features x n_features matrix; use sample_X() and apply_cov() to work with these covariance matrices at scale.
 
     Parameters
     ----------
@@ -528,20 +590,21 @@ def get_cov(n_features=10, cov='ar', corr=0.35):
         Number of features.
 
     cov: str
-        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T.
+        The covariance matrix of the X data. Must be one of ['ident', 'tot', 'ar', 'block', 'toeplitz']. If cov == 'ident' then we use the identity. If cov == 'ar' then Sigma_{ij} = corr **|i-j| follows an autoregression process. If cov == 'tot' then  (1 - corr) * I + corr * 11^T. If cov == 'block' then the features are split into consecutive blocks of size block_size; features in the same block have correlation corr and features in different blocks are uncorrelated. If cov == 'toeplitz' then Sigma_{ij} = r_{|i - j|} where r = [1, corr] i.e. corr gives the correlations at lags 1, 2, ..., len(corr) and the correlations at larger lags are zero.
+
+    corr: float, array-like
+        How correlated the data are. Is an array-like of correlations at each lag for cov='toeplitz'.
 
-    corr: float
-        How correlated the data are.
+    block_size: int
+        Size of the blocks for cov='block'.
 
     Output
     ------
-    X: array-like, (n_samples, n_features)
-        The sampled
+    cov: array-like, (n_features, n_features)
+        The covariance matrix.
     """
+    assert cov in _COV_KINDS
 
-    assert cov in ['ident', 'tot', 'ar']
-
-    # sample X data
     if cov == 'ident':
         return np.eye(n_features)
 
@@ -550,20 +613,360 @@ def get_cov(n_features=10, cov='ar', corr=0.35):
             corr * np.ones((n_features, n_features))
 
     elif cov == 'ar':
-        cov = np.array([[abs(i - j) for i in range(n_features)]
-                        for j in range(n_features)])
+        lags = abs(np.subtract.outer(np.arange(n_features),
+                                     np.arange(n_features)))
+        return corr ** lags
 
-        return corr ** cov
+    elif cov == 'block':
+        block_idxs = np.arange(n_features) // block_size
+        same_block = np.equal.outer(block_idxs, block_idxs)
+        return (1 - corr) * np.eye(n_features) + corr * same_block
 
+    elif cov == 'toeplitz':
+        autocorr = get_autocorr(n_features=n_features, corr=corr)
+        lags = abs(np.subtract.outer(np.arange(n_features),
+                                     np.arange(n_features)))
+        return autocorr[lags]
+
+
+def apply_cov(v, cov='ar', corr=0.35, block_size=10):
+    """
+    Computes Sigma @ v without forming the covariance matrix Sigma. This takes O(n_features) operations for cov in ['ident', 'tot', 'ar', 'block'] and O(n_features * len(corr)) operations for cov='toeplitz'.
+
+    Parameters
+    ----------
+    v: array-like, shape (n_features, ) or (n_features, K)
+        The vector or matrix to multiply.
+
+    cov: str
+        The covariance matrix; see get_cov().
+
+    corr: float, array-like
+        How correlated the data are; see get_cov().
+
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    Output
+    ------
+    Sigma_v: array-like, shape (n_features, ) or (n_features, K)
+        The product Sigma @ v.
+    """
+    assert cov in _COV_KINDS
+    v = np.asarray(v, dtype=float)
+    n_features = v.shape[0]
+
+    if cov == 'ident':
+        return v.copy()
+
+    elif cov == 'tot':
+        return (1 - corr) * v + corr * v.sum(axis=0)
 
-def coef_cov_quad_form(coef, cov):
+    elif cov == 'ar':
+        # sum_j corr^|i - j| v_j = forward pass + backward pass - v_i
+        fwd = lfilter([1], [1, -corr], v, axis=0)
+        bwd = lfilter([1], [1, -corr], v[::-1], axis=0)[::-1]
+        return fwd + bwd - v
+
+    elif cov == 'block':
+        block_idxs = np.arange(n_features) // block_size
+        block_sums = np.zeros((block_idxs[-1] + 1, ) + v.shape[1:])
+        np.add.at(block_sums, block_idxs, v)
+        return (1 - corr) * v + corr * block_sums[block_idxs]
+
+    elif cov == 'toeplitz':
+        r = np.atleast_1d(np.asarray(corr, dtype=float))
+        r = r[:n_features - 1]
+        out = v.copy()
+        for lag in range(1, len(r) + 1):
+            out[lag:] += r[lag - 1] * v[:-lag]
+            out[:-lag] += r[lag - 1] * v[lag:]
+        return out
+
+
+def coef_cov_quad_form(coef, cov, corr=0.35, block_size=10):
     """
     Computes the quadratic form coef.T @ cov @ coef. Handles the case when coef is is a matrix by returning np.trace(coef.T @ cov @ coef).
+
+    Parameters
+    ----------
+    coef: array-like, shape (n_features, ) or (n_features, n_responses)
+        The coefficient.
+
+    cov: str, array-like shape (n_features, n_features)
+        Either the covariance matrix or the name of a structured covariance matrix; see get_cov(). The quadratic form for the latter is computed without forming the covariance matrix.
+
+    corr: float, array-like
+        How correlated the data are; only used if cov is a str.
+
+    block_size: int
+        Size of the blocks for cov='block'; only used if cov is a str.
+
+    Output
+    ------
+    quad_form: float
     """
-    ct_Sigma_c = coef.T @ cov @ coef
+    if isinstance(cov, str):
+        ct_Sigma_c = coef.T @ apply_cov(coef, cov=cov, corr=corr,
+                                        block_size=block_size)
+    else:
+        ct_Sigma_c = coef.T @ cov @ coef
 
     # TODO: is this how we want to handle the SNR?
     if coef.ndim >= 2:
         return np.trace(ct_Sigma_c) / coef.shape[1]
     else:
         return ct_Sigma_c
+
+
+def sample_X(n_samples=100, n_features=10, cov='ar', corr=0.35,
+             block_size=10, density=None, chunk_size=None,
+             random_state=None):
+    """
+    Samples a Gaussian design matrix X whose rows are iid N(0, Sigma) without forming Sigma. This takes O(n_samples * n_features) operations for cov in ['ident', 'tot', 'ar', 'block'] and O(n_samples * n_features * log(n_features)) operations for cov='toeplitz'.
+
+    Parameters
+    ----------
+    n_samples: int
+        Number of samples to draw.
+
+    n_features: int
+        Number of features.
+
+    cov: str
+        The covariance matrix; see get_cov().
+
+    corr: float, array-like
+        How correlated the data are; see get_cov().
+
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    density: None, float
+        (Optional) If provided, X is a scipy.sparse CSR matrix where each entry is non-zero with probability density. The non-zero entries are N(0, 1 / density) so each feature has unit variance. Requires cov='ident'.
+
+    chunk_size: None, int
+        (Optional) Sample X in chunks of this many rows; see iter_X_chunks(). This can reduce the peak memory of the sampling algorithm.
+
+    random_state: None, int, RandomState
+        The seed.
+
+    Output
+    ------
+    X: array-like or scipy.sparse.csr_matrix, shape (n_samples, n_features)
+        The sampled X data.
+    """
+    if chunk_size is None:
+        rng = check_random_state(random_state)
+        return _sample_X(rng=rng, n_samples=n_samples, n_features=n_features,
+                         cov=cov, corr=corr, block_size=block_size,
+                         density=density)
+
+    chunks = iter_X_chunks(n_samples=n_samples, n_features=n_features,
+                           cov=cov, corr=corr, block_size=block_size,
+                           density=density, chunk_size=chunk_size,
+                           random_state=random_state)
+
+    return safe_vstack(list(chunks))
+
+
+def iter_X_chunks(n_samples=100, n_features=10, cov='ar', corr=0.35,
+                  block_size=10, density=None, chunk_size=1000,
+                  random_state=None):
+    """
+    Generator that samples a Gaussian design matrix one chunk of rows at a time; see sample_X(). Each chunk has its own random seed spawned from random_state so a given chunk only depends on random_state and its position e.g. the chunks may be written to an np.memmap file one at a time to create out of core data sets.
+
+    Parameters
+    ----------
+    n_samples: int
+        Total number of samples to draw.
+
+    n_features: int
+        Number of features.
+
+    cov: str
+        The covariance matrix; see get_cov().
+
+    corr: float, array-like
+        How correlated the data are; see get_cov().
+
+    block_size: int
+        Size of the blocks for cov='block'.
+
+    density: None, float
+        (Optional) Density of sparse X data; see sample_X().
+
+    chunk_size: int
+        Number of rows in each chunk; the last chunk may be smaller.
+
+    random_state: None, int, RandomState
+        The seed.
+
+    Yields
+    ------
+    X_chunk: array-like or scipy.sparse.csr_matrix, shape (chunk_size, n_features)
+        The next chunk of rows.
+    """
+    n_chunks = int(np.ceil(n_samples / chunk_size))
+    seeds = get_chunk_seeds(n_chunks=n_chunks, random_state=random_state)
+
+    for c in range(n_chunks):
+        rng = np.random.RandomState(np.random.MT19937(seeds[c]))
+        n_rows = min(chunk_size, n_samples - c * chunk_size)
+
+        yield _sample_X(rng=rng, n_samples=n_rows, n_features=n_features,
+                        cov=cov, corr=corr, block_size=block_size,
+                        density=density)
+
+
+def get_chunk_seeds(n_chunks, random_state=None):
+    """
+    Spawns independent seeds for each chunk of rows.
+
+    Parameters
+    ----------
+    n_chunks: int
+        Number of chunks.
+
+    random_state: None, int, RandomState
+        The base seed.
+
+    Output
+    ------
+    seeds: list of np.random.SeedSequence
+        The seed for each chunk.
+    """
+    if isinstance(random_state, np.random.RandomState):
+        entropy = random_state.randint(np.iinfo(np.int32).max)
+    else:
+        entropy = random_state
+
+    return np.random.SeedSequence(entropy).spawn(n_chunks)
+
+
+def get_autocorr(n_features, corr):
+    """
+    Gets the autocorrelation sequence r_0, ..., r_{n_features - 1} for cov='toeplitz' i.e. r = [1, corr] padded with zeros.
+    """
+    r = np.atleast_1d(np.asarray(corr, dtype=float))
+    autocorr = np.zeros(n_features)
+    autocorr[0] = 1
+    n_lags = min(len(r), n_features - 1)
+    autocorr[1:n_lags + 1] = r[:n_lags]
+    return autocorr
+
+
+def _sample_X(rng, n_samples, n_features, cov='ar', corr=0.35,
+              block_size=10, density=None):
+    """
+    Samples X data; see sample_X().
+    """
+    assert cov in _COV_KINDS
+
+    if density is not None:
+        if cov != 'ident':
+            raise ValueError("Sparse X data currently requires cov='ident'; "
+                             "got {}".format(cov))
+
+        return _sample_sparse_X(rng=rng, n_samples=n_samples,
+                                n_features=n_features, density=density)
+
+    Z = rng.standard_normal(size=(n_samples, n_features))
+
+    if cov == 'ident':
+        return Z
+
+    elif cov == 'tot':
+        # shared factor model X_j = sqrt(1 - corr) Z_j + sqrt(corr) U
+        U = rng.standard_normal(size=(n_samples, 1))
+        return np.sqrt(1 - corr) * Z + np.sqrt(corr) * U
+
+    elif cov == 'ar':
+        # X_j = corr * X_{j - 1} + sqrt(1 - corr^2) Z_j with X_0 = Z_0
+        assert abs(corr) < 1
+        scale = np.sqrt(1 - corr ** 2)
+        Z[:, 0] /= scale
+        return lfilter([scale], [1, -corr], Z, axis=1)
+
+    elif cov == 'block':
+        # one shared factor per block
+        block_idxs = np.arange(n_features) // block_size
+        U = rng.standard_normal(size=(n_samples, block_idxs[-1] + 1))
+        return np.sqrt(1 - corr) * Z + np.sqrt(corr) * U[:, block_idxs]
+
+    elif cov == 'toeplitz':
+        return _sample_toeplitz(rng=rng, n_samples=n_samples,
+                                n_features=n_features, corr=corr)
+
+
+def _sample_sparse_X(rng, n_samples, n_features, density):
+    """
+    Samples a sparse X matrix whose entries are independently non-zero with probability density; see sample_X(). The gaps between successive non-zero entries (in row major order) are geometric random variables so this takes O(n_samples * n_features * density) operations.
+    """
+    assert 0 < density <= 1
+    n_entries = n_samples * n_features
+
+    # raveled indices of the non-zero entries
+    idxs = []
+    last = -1
+    while last < n_entries - 1:
+        n_draw = int(1.1 * density * (n_entries - last)) + 100
+        new_idxs = last + np.cumsum(rng.geometric(p=density, size=n_draw))
+        idxs.append(new_idxs)
+        last = new_idxs[-1]
+    idxs = np.concatenate(idxs)
+    idxs = idxs[idxs < n_entries]
+
+    rows = idxs // n_features
+    cols = idxs % n_features
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows,
+                                                        minlength=n_samples))])
+
+    data = rng.standard_normal(size=len(idxs)) / np.sqrt(density)
+
+    return sparse.csr_matrix((data, cols, indptr),
+                             shape=(n_samples, n_features))
+
+
+def _sample_toeplitz(rng, n_samples, n_features, corr):
+    """
+    Samples from N(0, Sigma) where Sigma is a banded Toeplitz matrix using circulant embedding.
+
+    References
+    ----------
+    Dietrich, C.R. and Newsam, G.N., 1997. Fast and exact simulation of stationary Gaussian processes through circulant embedding of the covariance matrix. SIAM Journal on Scientific Computing, 18(4), pp.1088-1107.
+    """
+    autocorr = get_autocorr(n_features=n_features, corr=corr)
+    n_lags = np.nonzero(autocorr)[0].max()
+    if n_lags == 0:
+        return rng.standard_normal(size=(n_samples, n_features))
+
+    # since Sigma is banded we only need a circulant matrix of size
+    # n_features + n_lags to embed Sigma
+    n_circ = next_fast_len(max(n_features + n_lags, 2 * n_lags + 1))
+    circ = np.zeros(n_circ)
+    circ[0:n_lags + 1] = autocorr[0:n_lags + 1]
+    circ[-n_lags:] = autocorr[n_lags:0:-1]
+
+    eigvals = fft(circ).real
+    if eigvals.min() < -1e-8 * eigvals.max():
+        raise ValueError("The circulant embedding of the Toeplitz "
+                         "covariance matrix is not positive semi-definite; "
+                         "try smaller correlations.")
+    eigvals = np.clip(eigvals, a_min=0, a_max=None)
+
+    # the real and imaginary parts of F diag(sqrt(eigvals / n_circ)) W
+    # are independent N(0, circ) samples
+    n_complex = int(np.ceil(n_samples / 2))
+    W = rng.standard_normal(size=(n_complex, n_circ)) + \
+        1j * rng.standard_normal(size=(n_complex, n_circ))
+    Y = fft(np.sqrt(eigvals / n_circ) * W, axis=1)[:, 0:n_features]
+
+    return np.vstack([Y.real, Y.imag])[0:n_samples]
+
+
+_COV_KINDS = ['ident', 'tot', 'ar', 'block', 'toeplitz']
+
+# sample_sparse_lin_reg only returns the dense covariance matrix
+# if there are at most this many features
+_MAX_DENSE_COV_FEATURES = 5000
@@ -0,0 +1,256 @@
+import numpy as np
+from scipy.sparse import issparse, diags
+
+from yaglm.config.base_params import get_base_config
+from yaglm.config.loss import get_loss_config
+from yaglm.config.penalty import get_penalty_config
+from yaglm.config.penalty import NoPenalty, Ridge, Lasso, ElasticNet, \
+    GroupLasso
+from yaglm.config.flavor import NonConvex
+from yaglm.opt.from_config.loss import get_glm_loss_func
+from yaglm.utils import is_multi_response
+
+# losses whose approximate leave-one-out correction we can compute
+_ALO_LOSSES = ['lin_reg', 'log_reg', 'poisson', 'huber']
+
+
+def get_alo_correction(X, y, coef, intercept=None, loss='lin_reg',
+                       penalty=None, fit_intercept=True,
+                       sample_weight=None, offsets=None, zero_tol=1e-10):
+    """
+    Computes the approximate leave-one-out (ALO) correction to the linear predictor of a penalized GLM fit to the full data (Rad and Maleki, 2020). The ALO prediction for the ith sample is
+
+    z_i + h_i * g_i / (1 - h_i * d_i)
+
+    where z_i = x_i.T @ coef + intercept + offset_i is the full data linear predictor, g_i, d_i are the first and second derivatives of the ith sample's (weighted) loss at z_i and h_i = x_iA.T @ J^{-1} @ x_iA. Here A is the active set (including the intercept) and J = X_A.T @ diag(d) @ X_A + the Hessian of the penalty on the active set.
+
+    The correction only requires the full data solution so ALO risk estimates for an entire tuning path cost about one path fit instead of the K + 1 path fits of K-fold cross-validation.
+
+    For linear regression with a ridge penalty the ALO prediction is the closed form leave-one-out prediction. Since the loss is normalized by the number of samples while the penalty is not, leaving a sample out effectively rescales the penalty; the ALO prediction for pen_val is exactly the leave-one-out prediction of refitting on n_samples - 1 samples with penalty value pen_val * n_samples / (n_samples - 1), not pen_val.
+
+    Parameters
+    ----------
+    X: array-like, sparse matrix or LinearOperator, shape (n_samples, n_features)
+        The (processed) covariate data the model was fit to.
+
+    y: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The (processed) response data.
+
+    coef: array-like, shape (n_features, ) or (n_features, n_responses)
+        The fitted coefficient.
+
+    intercept: None, float, array-like
+        The fitted intercept.
+
+    loss: str, LossConfig
+        The loss; must be one of ['lin_reg', 'log_reg', 'poisson', 'huber']. Multiple responses are only supported for linear regression.
+
+    penalty: None, PenaltyConfig
+        The penalty with the value used for this fit; must be a NoPenalty, Ridge, Lasso, ElasticNet or GroupLasso penalty possibly with an adaptive flavor.
+
+    fit_intercept: bool
+        Whether or not an intercept was fit.
+
+    sample_weight: None, array-like, shape (n_samples, )
+        (Optional) The sample weights.
+
+    offsets: None, array-like, shape (n_samples, )
+        (Optional) The sample offsets.
+
+    zero_tol: float
+        Coefficients with absolute value below this are not in the active set.
+
+    Output
+    ------
+    correction: array-like, shape (n_samples, ) or (n_samples, n_responses)
+        The correction to add to the linear predictor to obtain the ALO linear predictor.
+
+    References
+    ----------
+    Rad, K.R. and Maleki, A., 2020. A scalable estimate of the out-of-sample prediction error via approximate leave-one-out cross-validation. Journal of the Royal Statistical Society: Series B (Statistical Methodology), 82(4), pp.965-996.
+    """
+    loss = get_base_config(get_loss_config(loss))
+    penalty = get_base_config(get_penalty_config(penalty))
+
+    if loss.name not in _ALO_LOSSES:
+        raise NotImplementedError("ALO is not currently supported for "
+                                  "the {} loss; must be one of {}".
+                                  format(loss.name, _ALO_LOSSES))
+
+    is_mr = is_multi_response(y)
+    if is_mr and loss.name != 'lin_reg':
+        raise NotImplementedError("ALO only supports multiple responses "
+                                  "for linear regression")
+
+    coef = np.asarray(coef)
+    n_samples = X.shape[0]
+
+    ###############################
+    # per-sample loss derivatives #
+    ###############################
+    loss_func = get_glm_loss_func(config=loss, X=X, y=y,
+                                  fit_intercept=fit_intercept,
+                                  sample_weight=sample_weight,
+                                  offsets=offsets)
+
+    z = np.asarray(X @ coef)
+    if fit_intercept and intercept is not None:
+        z = z + intercept
+
+    # these include the sample weights and the 1 / n_samples scaling
+    grads = loss_func.glm_loss.grad(z)
+    hess = _get_hess_diag(loss_func=loss_func, loss=loss, z=z)
+    if is_mr:
+        # the least squares Hessian is the same for each response
+        hess = hess[:, 0]
+
+    ##############
+    # active set #
+    ##############
+    if is_mr:
+        active = np.linalg.norm(coef, axis=1) > zero_tol
+    else:
+        active = abs(coef) > zero_tol
+    active_idxs = np.where(active)[0]
+
+    X_A = _get_cols(X, active_idxs)
+    pen_hess = _get_pen_hess(penalty=penalty, coef=coef,
+                             active_idxs=active_idxs,
+                             n_features=X.shape[1])
+
+    if fit_intercept:
+        # the unpenalized intercept is always active
+        X_A = np.hstack([np.ones((n_samples, 1)), X_A])
+        pen_hess = _pad_zero_row_col(pen_hess)
+
+    ################
+    # ALO leverage #
+    ################
+    if X_A.shape[1] == 0:
+        return np.zeros_like(grads)
+
+    J = X_A.T @ (hess.reshape(-1, 1) * X_A) + pen_hess
+
+    # h_i = x_iA.T @ J^{-1} @ x_iA
+    J_inv = np.linalg.pinv(J, hermitian=True)
+    lev = ((X_A @ J_inv) * X_A).sum(axis=1)
+
+    scale = lev / (1 - lev * hess)
+    if is_mr:
+        scale = scale.reshape(-1, 1)
+
+    return scale * grads
+
+
+def _get_hess_diag(loss_func, loss, z):
+    """
+    The diagonal of the loss's Hessian with respect to the linear predictor.
+    """
+    if loss.name == 'huber':
+        # the huber loss is only twice differentiable almost everywhere
+        glm_loss = loss_func.glm_loss
+        z_off = z if glm_loss.offsets is None else z + glm_loss.offsets
+        hess = (abs(z_off - glm_loss.y) <= loss.knot).astype(float)
+
+        if glm_loss.sample_weight is not None:
+            hess = diags(glm_loss.sample_weight) @ hess
+
+        return hess / glm_loss.n_samples
+
+    else:
+        return loss_func.glm_loss.hess_diag(z)
+
+
+def _get_pen_hess(penalty, coef, active_idxs, n_features):
+    """
+    The Hessian of the penalty restricted to the active set.
+    """
+    n_active = len(active_idxs)
+
+    if isinstance(penalty, NoPenalty):
+        return np.zeros((n_active, n_active))
+
+    elif isinstance(penalty, Ridge):
+        weights = np.ones(n_features) if penalty.weights is None \
+            else np.asarray(penalty.weights).reshape(-1)
+
+        return penalty.pen_val * np.diag(weights[active_idxs])
+
+    elif isinstance(penalty, Lasso):
+        _check_convex(penalty.flavor)
+
+        # the Lasso is linear on the active set
+        return np.zeros((n_active, n_active))
+
+    elif isinstance(penalty, ElasticNet):
+        _check_convex(penalty.lasso_flavor)
+
+        weights = np.ones(n_features) if penalty.ridge_weights is None \
+            else np.asarray(penalty.ridge_weights).reshape(-1)
+
+        pen_val = penalty.pen_val * (1 - penalty.mix_val)
+        return pen_val * np.diag(weights[active_idxs])
+
+    elif isinstance(penalty, GroupLasso):
+        _check_convex(penalty.flavor)
+
+        groups = [np.arange(n_features)] if penalty.groups is None \
+            else penalty.groups
+
+        weights = np.ones(len(groups)) if penalty.weights is None \
+            else np.asarray(penalty.weights).reshape(-1)
+
+        # Hessian of ||coef_g||_2 is (I - u u.T) / ||coef_g||_2
+        # where u = coef_g / ||coef_g||_2
+        hess = np.zeros((n_features, n_features))
+        for g, grp_idxs in enumerate(groups):
+            grp_idxs = np.asarray(grp_idxs)
+            norm = np.linalg.norm(coef[grp_idxs])
+            if norm == 0:
+                continue
+
+            u = coef[grp_idxs] / norm
+            grp_hess = (np.eye(len(grp_idxs)) - np.outer(u, u)) / norm
+            hess[np.ix_(grp_idxs, grp_idxs)] = \
+                penalty.pen_val * weights[g] * grp_hess
+
+        return hess[np.ix_(active_idxs, active_idxs)]
+
+    else:
+        raise NotImplementedError("ALO is not currently supported for "
+                                  "the {} penalty".format(penalty))
+
+
+def _check_convex(flavor):
+    if isinstance(get_base_config(flavor), NonConvex):
+        raise NotImplementedError("ALO is not currently supported for "
+                                  "non-convex penalties")
+
+
+def _pad_zero_row_col(mat):
+    """
+    Adds a leading row and column of zeros to a square matrix.
+    """
+    out = np.zeros((mat.shape[0] + 1, mat.shape[1] + 1))
+    out[1:, 1:] = mat
+    return out
+
+
+def _get_cols(X, idxs):
+    """
+    Returns a dense array of some columns of X.
+    """
+    if len(idxs) == 0:
+        return np.zeros((X.shape[0], 0))
+
+    elif issparse(X):
+        return X[:, idxs].toarray()
+
+    elif isinstance(X, np.ndarray):
+        return X[:, idxs]
+
+    else:
+        # linear operators
+        E = np.zeros((X.shape[1], len(idxs)))
+        E[idxs, np.arange(len(idxs))] = 1
+        return np.asarray(X @ E)
@@ -1,4 +1,5 @@
 import numpy as np
+import re
 from copy import deepcopy
 from itertools import product
 # from sklearn.utils.fixes import _joblib_parallel_args
@@ -7,6 +8,11 @@ from joblib import Parallel, delayed
 
 # from sklearn.metrics import get_scorer
 from yaglm.metrics.scorer_with_offsets import get_scorer, check_accepts_offsets
+from yaglm.sparse_utils import take_rows
+from yaglm.processing import downdate_X_sums
+from yaglm.opt.glm_loss.gram import get_gram_sums, downdate_gram_sums, \
+    get_gram_from_sums
+from yaglm.tune.alo import get_alo_correction
 
 
 def run_fit_and_score_jobs(job_configs,
@@ -97,7 +103,8 @@ def run_fit_and_score_jobs(job_configs,
 
 
 def get_cross_validation_jobs(raw_data, est, solver, tune_iter, fold_iter,
-                              path_algo=True, solver_init={}):
+                              path_algo=True, solver_init={},
+                              copy_folds='auto'):
     """
     Iterates over all jobs for cross-validation with a double loop. The outer loop splits and processes each fold; the inner loop is over the parameter settings.
 
@@ -124,6 +131,9 @@ def get_cross_validation_jobs(raw_data, est, solver, tune_iter, fold_iter,
     solver_init: dict
         Initialization for the solver.
 
+    copy_folds: bool, str
+        Whether or not to copy the rows of X for each fold. See split_and_process().
+
     Yields
     ------
     job_configs: dict
@@ -133,13 +143,29 @@ def get_cross_validation_jobs(raw_data, est, solver, tune_iter, fold_iter,
     # use a path algo if the solver has one available
     path_algo = path_algo and solver.has_path_algo
 
+    # statistics of the full data; each fold's standardization is
+    # computed by removing the test rows' contributions
+    X_sums = est.get_X_sums(X=raw_data['X'],
+                            sample_weight=raw_data['sample_weight'])
+
+    # for solvers working with the Gram matrix each fold's Gram matrix
+    # is also computed by removing the test rows' contributions
+    if solver.uses_gram(X=raw_data['X']):
+        gram_sums = get_gram_sums(X=raw_data['X'],
+                                  fit_intercept=est.fit_intercept,
+                                  sample_weight=raw_data['sample_weight'])
+    else:
+        gram_sums = None
+
     # outer loop over folds, inner loop over parameter settings
     for fold_idx, (train, test) in enumerate(fold_iter):
 
         # split/process train data
         solver_data, eval_data = \
             split_and_process(**raw_data,  # X, y, sample_weight, offsets
-                              est=est, train=train, test=test)
+                              est=est, train=train, test=test,
+                              copy_folds=copy_folds, X_sums=X_sums,
+                              gram_sums=gram_sums)
 
         # setup tuning prameter iterator
         if path_algo:
@@ -165,7 +191,8 @@ def get_cross_validation_jobs(raw_data, est, solver, tune_iter, fold_iter,
 def get_validation_jobs(raw_data, est, solver, tune_iter,
                         train, test,
                         path_algo=True,
-                        solver_init={}):
+                        solver_init={},
+                        copy_folds='auto'):
     """
     Iterates over all jobs for tuning with a validation set.
 
@@ -192,6 +219,9 @@ def get_validation_jobs(raw_data, est, solver, tune_iter,
     solver_init: dict
         Initialization for the solver.
 
+    copy_folds: bool, str
+        Whether or not to copy the rows of X for the train/test sets. See split_and_process().
+
     Yields
     ------
     job_configs: dict
@@ -205,7 +235,8 @@ def get_validation_jobs(raw_data, est, solver, tune_iter,
     solver_data, eval_data = split_and_process(**raw_data,
                                                # X,y,sample_weight, offsets
                                                est=est,
-                                               train=train, test=test)
+                                               train=train, test=test,
+                                               copy_folds=copy_folds)
 
     # setup tuning prameter iterator
     if path_algo:
@@ -230,7 +261,8 @@ def get_validation_jobs(raw_data, est, solver, tune_iter,
 def get_train_jobs(pro_data, raw_data, pre_pro_out,
                    est, solver, tune_iter,
                    path_algo=True,
-                   solver_init={}):
+                   solver_init={},
+                   alo=False):
     """
     Iterates over all jobs for training only tuning.
 
@@ -260,6 +292,9 @@ def get_train_jobs(pro_data, raw_data, pre_pro_out,
     solver_init: dict
         Initialization for the solver.
 
+    alo: bool
+        Whether or not to compute approximate leave-one-out test scores; see fit_and_score(). If True, the results are formatted like cross-validation results with a single fold whose test set is the training data.
+
     Yields
     ------
     job_configs: dict
@@ -277,6 +312,10 @@ def get_train_jobs(pro_data, raw_data, pre_pro_out,
     for k in raw_data.keys():
         eval_data[k + '_train'] = raw_data[k]
 
+    if alo:
+        eval_data['alo'] = True
+        eval_data['fold_idx'] = 0
+
     # use a path algo if the solver has one available
     path_algo = path_algo and solver.has_path_algo
 
@@ -301,7 +340,8 @@ def get_train_jobs(pro_data, raw_data, pre_pro_out,
 
 
 def split_and_process(X, y, est, train=None, test=None,
-                      sample_weight=None, offsets=None):
+                      sample_weight=None, offsets=None, copy_folds='auto',
+                      X_sums=None, gram_sums=None):
     """
     Possibly splits the data into train/test sets then processes the training data.
 
@@ -328,6 +368,15 @@ def split_and_process(X, y, est, train=None, test=None,
     offsets: None, float, array-like, shape (n_samples, )
         (Optional) The offsets for each sample.
 
+    copy_folds: bool, str
+        Whether or not to copy the train/test rows of X. If False, the rows of a dense or out-of-core X are represented by row-index views (yaglm.sparse_utils.RowChunked) that share X's memory; preprocessing is then applied lazily so the training data is never copied. If 'auto', views are only used for out-of-core X (e.g. np.memmap). See yaglm.sparse_utils.take_rows.
+
+    X_sums: None, dict
+        (Optional) Summary statistics of the full X from est.get_X_sums(). If provided with the test indices, the training data's standardization is computed by removing the test rows' contributions from these statistics.
+
+    gram_sums: None, dict
+        (Optional) Gram matrix statistics of the full X from yaglm.opt.glm_loss.gram.get_gram_sums(). If provided with the test indices, the processed training data's Gram matrix is computed by removing the test rows' contributions and passed to the solver as solver_data['gram'].
+
     Output
     ------
     solver_data, eval_data
@@ -344,6 +393,9 @@ def split_and_process(X, y, est, train=None, test=None,
         offsets: None, array-like
             The processed training offsets.
 
+        gram: array-like
+            The processed training data's Gram matrix; only included if gram_sums is provided.
+
     eval_data: dict
         The raw data that will be used for computing evaluation metrics. Includes keys
 
@@ -375,7 +427,7 @@ def split_and_process(X, y, est, train=None, test=None,
             X, y, sample_weight, offsets
 
     else:
-        X_train = X[train, :]
+        X_train = take_rows(X, train, copy=copy_folds)
         y_train = y[train]
 
         sample_weight_train = None if sample_weight is None \
@@ -384,16 +436,36 @@ def split_and_process(X, y, est, train=None, test=None,
         offsets_train = None if offsets is None \
             else offsets[train]
 
+    if test is not None:
+        X_test = take_rows(X, test, copy=copy_folds)
+
     #########################
     # process training data #
     #########################
 
+    # possibly get the training data's X statistics by removing
+    # the test rows from the full data's statistics
+    is_partition = train is not None and test is not None and \
+        _is_partition(train, test, n_samples=X.shape[0])
+
+    if X_sums is not None and train is not None:
+        if is_partition:
+
+            X_sums = downdate_X_sums(X_sums=X_sums,
+                                     X_rows=X_test,
+                                     sample_weight=None
+                                     if sample_weight is None
+                                     else sample_weight[test])
+        else:
+            X_sums = None
+
     # TODO: need to think carefully about processing fit_params_train
     pro_data, pre_pro_out = \
         est.preprocess(X=X_train, y=y_train,
                        sample_weight=sample_weight_train,
                        offsets=offsets_train,
-                       copy=True)
+                       copy=True,
+                       X_sums=X_sums)
 
     # processed data to be passed to the solver
     solver_data = {**pro_data,
@@ -402,6 +474,19 @@ def split_and_process(X, y, est, train=None, test=None,
                    'fit_intercept': est.fit_intercept
                    }
 
+    # possibly get the processed training data's Gram matrix by removing
+    # the test rows from the full data's Gram matrix
+    if gram_sums is not None and is_partition:
+        gram_sums = downdate_gram_sums(gram_sums=gram_sums,
+                                       X_rows=X_test,
+                                       sample_weight=None
+                                       if sample_weight is None
+                                       else sample_weight[test])
+
+        solver_data['gram'] = \
+            get_gram_from_sums(gram_sums,
+                               X_scale=pre_pro_out.get('X_scale', None))
+
     # raw data that will be used for evaulation
     eval_data = {'X_train': X_train,
                  'y_train': y_train,
@@ -416,7 +501,7 @@ def split_and_process(X, y, est, train=None, test=None,
     # extract test data #
     #####################
     if test is not None:
-        eval_data['X_test'] = X[test, :]
+        eval_data['X_test'] = X_test
         eval_data['y_test'] = y[test]
 
         eval_data['sample_weight_test'] = None if sample_weight is None \
@@ -428,6 +513,16 @@ def split_and_process(X, y, est, train=None, test=None,
     return solver_data, eval_data
 
 
+def _is_partition(train, test, n_samples):
+    """
+    Checks whether or not the train and test indices partition the samples.
+    """
+    idxs = np.concatenate([np.asarray(train).reshape(-1),
+                           np.asarray(test).reshape(-1)])
+    return len(idxs) == n_samples and \
+        np.all(np.bincount(idxs, minlength=n_samples) == 1)
+
+
 # TODO: add store best estimator only functionality
 def fit_and_score(solver_data, solver, path_algo, solver_init,
                   tune_configs, tune_idx_outer,
@@ -446,7 +541,8 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
                   scorer=None,
                   fit_evals=None,
 
-                  relaxed=False):
+                  relaxed=False,
+                  alo=False):
     """
     Fits and scores an estimator for either a single parameter setting or a path of parameters.
 
@@ -532,6 +628,9 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
     relaxed: bool
         Fit the relaxed version of the penalty.
 
+    alo: bool
+        Whether or not to compute the approximate leave-one-out (ALO) test scores. The ALO predictions of the training samples are scored by passing the ALO correction to the linear predictor (see yaglm.tune.alo.get_alo_correction) to the scorer as offsets.
+
     Output
     ------
     results: dict
@@ -544,13 +643,13 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
         The tuning parameter values.
 
     results['train']: list of dicts
-        The training scores for each parameter setting.
+        The training scores for each parameter setting. This includes any training metrics reported by the solver in opt_info['train_metrics'].
 
     results['test']: list of dicts
         The test scores for each parameter setting.
 
     results['fit']: list of dicts
-        The fit evaluation measures.
+        The fit evaluation measures. If the solver is instrumented this includes its counters prefixed by 'counter_' (e.g. counter_n_matvec, counter_runtime_matvec) and the time spent preprocessing the training data, counter_runtime_preprocess, which is shared by all the tuning parameter settings fit to this training data. The prefix keeps the counters separate from the fit_evals measures.
 
     results['est']: list of estimators
         (Optional) The fit estimators. Included only if store_ests=True.
@@ -695,6 +794,35 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
         ###########################
         # score the fit estimator #
         ###########################
+
+        if alo:
+            # score the approximate leave-one-out predictions
+            X_test, y_test = X_train, y_train
+            sample_weight_test = sample_weight_train
+
+            offsets_test = \
+                get_alo_correction(X=solver_data['X'],
+                                   y=solver_data['y'],
+                                   coef=fit_out['coef'],
+                                   intercept=fit_out['intercept'],
+                                   loss=base_configs['loss'],
+                                   penalty=base_configs['penalty'],
+                                   fit_intercept=solver_data['fit_intercept'],
+                                   sample_weight=solver_data['sample_weight'],
+                                   offsets=solver_data['offsets'])
+
+            if offsets_train is not None:
+                if offsets_test.ndim == 2:
+                    offsets_test = offsets_test + \
+                        np.asarray(offsets_train).reshape(-1, 1)
+                else:
+                    offsets_test = offsets_test + offsets_train
+
+            if scorer is not None and type(scorer) != str and \
+                    not check_accepts_offsets(scorer):
+                raise RuntimeError("ALO scores require a scorer that accepts "
+                                   "an 'offsets' argument. See "
+                                   "yaglm.metrics.scorer_with_offsets")
         
         # TODO: add sample weight and other fit params
         tst = None
@@ -748,6 +876,11 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
             tr = {'score': tr}
         if tst is not None and not isinstance(tst, dict):
             tst = {'score': tst}
+
+        # training metrics computed by the solver e.g. the exact
+        # leave-one-out error from yaglm.solver.RidgeSVD
+        if 'train_metrics' in opt_info:
+            tr.update(opt_info['train_metrics'])
         
         res['train'] = tr
         res['test'] = tst
@@ -762,6 +895,14 @@ def fit_and_score(solver_data, solver, path_algo, solver_init,
         if 'runtime' in opt_info:
             # get solver runtime from fit_out if available 
             fit['runtime'] = opt_info['runtime']
+
+        if 'counters' in opt_info:
+            # solver instrumentation counters e.g. number of matvecs
+            for name, value in opt_info['counters'].items():
+                fit['counter_' + name] = value
+
+            fit['counter_runtime_preprocess'] = \
+                pre_pro_out.get('runtime', np.nan)
             
         res['fit'] = fit
 
@@ -1071,6 +1212,54 @@ def format_cv_fold_scores(fold_scores, kind,
     return out
 
 
+def get_tune_counters(tune_results, opt_info=None):
+    """
+    Totals the solver instrumentation counters (see yaglm.opt.counters.OptCounters) over all tuning parameter settings and cross-validation folds.
+
+    Parameters
+    ----------
+    tune_results: dict
+        The tuning results e.g. the output of run_fit_and_score_jobs().
+
+    opt_info: None, dict
+        (Optional) The optimization output of the refit estimator.
+
+    Output
+    ------
+    counters: None, dict
+        The counter totals for tuning, counters['tune'], and (optionally) refitting, counters['refit']. None if the solver was not instrumented.
+    """
+    # cross-validation results store each fold's values as
+    # splitK_fit_counter_NAME; other tuning methods store them as
+    # fit_counter_NAME. The prefix distinguishes the counters from
+    # user provided fit_evals measures.
+    pattern = re.compile(r'^(split\d+_)?fit_counter_(.+)$')
+
+    totals = {}
+    for key, values in tune_results.items():
+        match = pattern.match(key)
+        if match is None:
+            continue
+        name = match.group(2)
+
+        # the preprocessing is done once for each training set
+        if name == 'runtime_preprocess':
+            value = values[0]
+        else:
+            value = np.nansum(values)
+
+        totals[name] = totals.get(name, 0) + value
+
+    if len(totals) == 0:
+        return None
+
+    counters = {'tune': totals}
+    if opt_info is not None and 'counters' in opt_info:
+        counters['refit'] = opt_info['counters']
+
+    return counters
+
+
 def _joblib_parallel_args(**kwargs):
     """Set joblib.Parallel arguments in a compatible way for 0.11 and 0.12+
 
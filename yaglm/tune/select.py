@@ -1,4 +1,3 @@
-import pandas as pd
 from copy import deepcopy
 import numpy as np
 
@@ -80,6 +79,8 @@ def cv_select_tune_param(cv_results, metric='score',
                          format(rule))
 
     # format the data we will need into a pd.DataFrame
+    # pandas is slow to import so we only import it when needed
+    import pandas as pd
     cols_we_need = [test_key, 'params']
     if rule == '1se':
         se_key = 'se_test_' + metric
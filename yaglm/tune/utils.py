@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.utils import check_random_state
 
@@ -74,4 +73,5 @@ def get_tune_param_df(tune_results):
     tune_params: pd.DataFrame
         The tuning parameter settings
     """
+    import pandas as pd  # slow to import so only import when needed
     return pd.DataFrame(list(tune_results['params']))